@@ -1,7 +1,10 @@
-async def process(inputs, settings, config, nodeConfig):
+def compute(inputs, settings):
   a = float(inputs.get("a", 0))
   b = float(inputs.get("b", 0))
   
   return {
     "result": a + b
-  } 
\ No newline at end of file
+  }
+
+async def process(inputs, settings, config, nodeConfig):
+  return compute(inputs, settings)
\ No newline at end of file
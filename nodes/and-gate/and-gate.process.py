@@ -1,4 +1,4 @@
-async def process(inputs, settings, config, nodeConfig):
+def compute(inputs, settings):
   
   if inputs.get("input1") == True and inputs.get("input2") == True:
     return {
@@ -8,3 +8,6 @@ async def process(inputs, settings, config, nodeConfig):
   return {
     "value": False
   }
+
+async def process(inputs, settings, config, nodeConfig):
+  return compute(inputs, settings)
@@ -23,9 +23,11 @@ async def process(inputs, settings, config, nodeConfig):
 
         # Build parameters dict from config inputs
         params = {}
-        config_inputs = [{"name":"system_prompt","display_name":"System Prompt","type":"string or message","description":"System prompt for the model","default":null},{"name":"messages","display_name":"Messages","type":"array of messages or message or string","description":"Array of chat messages","required":true},{"name":"tools","display_name":"Tools","type":"tool","description":"Array of tools to use","default":null,"allow_multiple":true},{"name":"temperature","display_name":"Temperature","type":"number","description":"Controls randomness (0-2)","default":null},{"name":"max_tokens","display_name":"Max Tokens","type":"number","description":"Maximum tokens to generate","default":null},{"name":"include_reasoning","display_name":"Include Reasoning","type":"boolean","description":"Include reasoning in response","default":null},{"name":"reasoning","display_name":"Reasoning","type":"boolean","description":"Internal reasoning mode","default":null},{"name":"stop","display_name":"Stop","type":"string or array","description":"Custom stop sequences","default":null},{"name":"tool_choice","display_name":"Tool Choice","type":"string","description":"Tool selection control","default":null}]
+        config_inputs = [{"name":"system_prompt","display_name":"System Prompt","type":"string or message","description":"System prompt for the model","default":None},{"name":"messages","display_name":"Messages","type":"array of messages or message or string","description":"Array of chat messages","required":True},{"name":"tools","display_name":"Tools","type":"tool","description":"Array of tools to use","default":None,"allow_multiple":True},{"name":"temperature","display_name":"Temperature","type":"number","description":"Controls randomness (0-2)","default":None},{"name":"max_tokens","display_name":"Max Tokens","type":"number","description":"Maximum tokens to generate","default":None},{"name":"include_reasoning","display_name":"Include Reasoning","type":"boolean","description":"Include reasoning in response","default":None},{"name":"reasoning","display_name":"Reasoning","type":"boolean","description":"Internal reasoning mode","default":None},{"name":"stop","display_name":"Stop","type":"string or array","description":"Custom stop sequences","default":None},{"name":"tool_choice","display_name":"Tool Choice","type":"string","description":"Tool selection control","default":None}]
         
         for input_def in config_inputs:
+            if input_def["name"] == "messages":
+                continue
             value = inputs.get(input_def["name"])
             if value is not None:
                 params[input_def["name"]] = value
@@ -50,7 +52,7 @@ async def process(inputs, settings, config, nodeConfig):
             "reasoning": response.get("reasoning"),
             "refusal": response.get("refusal"),
             "finish_reason": response["finish_reason"],
-            "usage": response["usage"]
+            "usage": response["usage"],
             "cost_total": response.get("cost_total"),
             "cost_itemized": response.get("cost_itemized")
         }
@@ -1,11 +1,30 @@
+// A table (types/table.json) holds one array per column
+const isTable = (value) =>
+  value !== null && typeof value === "object" && !Array.isArray(value) &&
+  value.columns !== null && typeof value.columns === "object" && !Array.isArray(value.columns);
+
+const getColumn = (table, name) => {
+  const names = Object.keys(table.columns);
+  if (!name) {
+    if (names.length !== 1) {
+      throw new Error("Choose a column of the table");
+    }
+    return table.columns[names[0]];
+  }
+  if (!names.includes(name)) {
+    throw new Error(`Unknown column: ${name}`);
+  }
+  return table.columns[name];
+};
+
 export default async ({inputs, settings, config}) => {
 
-  const array = Array.isArray(inputs.array) ? inputs.array : [inputs.array];
   const value = inputs.value;
   const condition = settings.condition || "equals";
   const caseSensitive = settings.case_sensitive !== false;
+  const property = settings.property;
 
-  const filtered = array.filter(item => {
+  const compare = (item) => {
     switch (condition) {
       case "equals":
         if (typeof item === "string" && typeof value === "string" && !caseSensitive) {
@@ -50,9 +69,27 @@ export default async ({inputs, settings, config}) => {
       default:
         return true;
     }
-  });
+  };
+
+  // Tables are filtered on one column, and every column keeps the matching rows
+  if (isTable(inputs.array)) {
+    const table = inputs.array;
+    const mask = Array.from(getColumn(table, property), compare);
+    const columns = {};
+    for (const [name, values] of Object.entries(table.columns)) {
+      columns[name] = Array.from(values).filter((_, i) => mask[i]);
+    }
+    return {
+      array: "types" in table ? { columns, types: table.types } : { columns }
+    };
+  }
+
+  const array = Array.isArray(inputs.array) ? inputs.array : [inputs.array];
+  const matches = property
+    ? (item => compare(item !== null && typeof item === "object" && !Array.isArray(item) ? item[property] ?? null : item))
+    : compare;
 
   return {
-    array: filtered
+    array: array.filter(matches)
   };
 }; 
\ No newline at end of file
@@ -1,12 +1,6 @@
-async def process(inputs, settings, config, nodeConfig):
-  array = inputs.get("array", [])
-  if not isinstance(array, list):
-    array = [array]
-    
-  value = inputs.get("value")
-  condition = settings.get("condition", "equals")
-  case_sensitive = settings.get("case_sensitive", True)
-  
+from zv1.utilities.table import get_column, is_table, select
+
+def comparison(value, condition, case_sensitive):
   def compare(item):
     if condition == "equals":
       if isinstance(item, str) and isinstance(value, str) and not case_sensitive:
@@ -41,7 +35,37 @@ async def process(inputs, settings, config, nodeConfig):
       return item is None
       
     return True
+    
+  return compare
+
+def predicate(inputs, settings):
+  """The test an element of an array must pass to be kept"""
+  compare = comparison(inputs.get("value"), settings.get("condition", "equals"), settings.get("case_sensitive", True))
+  property_name = settings.get("property")
+  if not property_name:
+    return compare
+    
+  def matches(item):
+    return compare(item.get(property_name) if isinstance(item, dict) else item)
+  return matches
+
+def stage(items, inputs, settings):
+  """The kept elements of a stream of elements, lazily (for fused array chains)"""
+  return filter(predicate(inputs, settings), items)
+
+async def process(inputs, settings, config, nodeConfig):
+  array = inputs.get("array", [])
   
+  # Tables are filtered on one column, and every column keeps the matching rows
+  if is_table(array):
+    compare = comparison(inputs.get("value"), settings.get("condition", "equals"), settings.get("case_sensitive", True))
+    return {
+      "array": select(array, list(map(compare, get_column(array, settings.get("property")))))
+    }
+    
+  if not isinstance(array, list):
+    array = [array]
+    
   return {
-    "array": list(filter(compare, array))
-  } 
\ No newline at end of file
+    "array": list(stage(array, inputs, settings))
+  }
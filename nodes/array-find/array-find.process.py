@@ -1,10 +1,6 @@
 import re
 
-async def process(inputs, settings, config, nodeConfig):
-  array = inputs.get("array", [])
-  if not isinstance(array, list):
-    array = [array]
-    
+def matcher(inputs, settings):
   value = inputs.get("value")
   mode = settings.get("mode", "equals")
   case_sensitive = settings.get("case_sensitive", True)
@@ -45,8 +41,13 @@ async def process(inputs, settings, config, nodeConfig):
         
     else: # equals
       return str_item == str_value
-  
-  for i, item in enumerate(array):
+    
+  return compare
+
+def summarize(items, inputs, settings):
+  """The first match in a stream of elements, read no further than it (for fused array chains)"""
+  compare = matcher(inputs, settings)
+  for i, item in enumerate(items):
     if compare(item):
       return {
         "found": True,
@@ -58,4 +59,11 @@ async def process(inputs, settings, config, nodeConfig):
     "found": False,
     "item": None,
     "index": -1
-  } 
\ No newline at end of file
+  }
+
+async def process(inputs, settings, config, nodeConfig):
+  array = inputs.get("array", [])
+  if not isinstance(array, list):
+    array = [array]
+    
+  return summarize(array, inputs, settings)
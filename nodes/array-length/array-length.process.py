@@ -1,3 +1,10 @@
+def summarize(items, inputs, settings):
+    """
+    Count the elements of a stream without collecting them (for fused array chains).
+    """
+    return {"length": sum(1 for _ in items)}
+
+
 async def process(inputs, settings, config, nodeConfig):
     """
     Process function for the Array Length node.
@@ -1,8 +1,35 @@
+// A table (types/table.json) holds one array per column
+const isTable = (value) =>
+  value !== null && typeof value === "object" && !Array.isArray(value) &&
+  value.columns !== null && typeof value.columns === "object" && !Array.isArray(value.columns);
+
+const getColumn = (table, name) => {
+  const names = Object.keys(table.columns);
+  if (!name) {
+    if (names.length !== 1) {
+      throw new Error("Choose a column of the table");
+    }
+    return table.columns[names[0]];
+  }
+  if (!names.includes(name)) {
+    throw new Error(`Unknown column: ${name}`);
+  }
+  return table.columns[name];
+};
+
 export default async ({inputs, settings, config}) => {
 
-  const array = Array.isArray(inputs.array) ? inputs.array : [inputs.array];
   const property = inputs.property || "";
 
+  // A table already holds each property as a column
+  if (isTable(inputs.array)) {
+    return {
+      array: Array.from(getColumn(inputs.array, property))
+    };
+  }
+
+  const array = Array.isArray(inputs.array) ? inputs.array : [inputs.array];
+
   const transformed = array.map(item => {
     if (!item || typeof item !== 'object') {
       return null;
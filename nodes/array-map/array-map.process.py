@@ -1,17 +1,31 @@
 import math
 
-async def process(inputs, settings, config, nodeConfig):
-  array = inputs.get("array", [])
-  if not isinstance(array, list):
-    array = [array]
-    
-  property_name = inputs.get("property", "")
-  
+from zv1.utilities.table import as_list, get_column, is_table
+
+def extractor(property_name):
   def extract_property(item):
     if isinstance(item, dict):
       return item.get(property_name)
     return None
+  return extract_property
+
+def stage(items, inputs, settings):
+  """The property of each element of a stream, lazily (for fused array chains)"""
+  return map(extractor(inputs.get("property", "")), items)
+
+async def process(inputs, settings, config, nodeConfig):
+  array = inputs.get("array", [])
+  property_name = inputs.get("property", "")
+
+  # A table already holds each property as a column
+  if is_table(array):
+    return {
+      "array": as_list(get_column(array, property_name))
+    }
+
+  if not isinstance(array, list):
+    array = [array]
     
   return {
-    "array": list(map(extract_property, array))
-  } 
\ No newline at end of file
+    "array": list(stage(array, inputs, settings))
+  }
@@ -1,11 +1,24 @@
+from itertools import islice
+
+def bounds(inputs):
+  start = int(inputs.get("start", 0))
+  end = int(inputs.get("end")) if inputs.get("end") is not None else None
+  return start, end
+
+def stage(items, inputs, settings):
+  """A slice of a stream of elements, lazily when it doesn't count from the end (for fused array chains)"""
+  start, end = bounds(inputs)
+  if start < 0 or (end is not None and end < 0):
+    return list(items)[start:end]
+  return islice(items, start, end)
+
 async def process(inputs, settings, config, nodeConfig):
   array = inputs.get("array", [])
   if not isinstance(array, list):
     array = [array]
     
-  start = int(inputs.get("start", 0))
-  end = int(inputs.get("end")) if inputs.get("end") is not None else None
+  start, end = bounds(inputs)
   
   return {
     "array": array[start:end]
-  } 
\ No newline at end of file
+  }
@@ -1,45 +1,126 @@
+// A table (types/table.json) holds one array per column
+const isTable = (value) =>
+  value !== null && typeof value === "object" && !Array.isArray(value) &&
+  value.columns !== null && typeof value.columns === "object" && !Array.isArray(value.columns);
+
+const getColumn = (table, name) => {
+  const names = Object.keys(table.columns);
+  if (!name) {
+    if (names.length !== 1) {
+      throw new Error("Choose a column of the table");
+    }
+    return table.columns[names[0]];
+  }
+  if (!names.includes(name)) {
+    throw new Error(`Unknown column: ${name}`);
+  }
+  return table.columns[name];
+};
+
 export default async ({inputs, settings, config}) => {
 
-  const array = Array.isArray(inputs.array) ? inputs.array : [inputs.array];
-  const order = settings.order || "ascending";
-  const type = settings.type || "string";
-  const property = settings.property;
-  const caseSensitive = settings.case_sensitive !== false;
-
-  const sorted = [...array].sort((a, b) => {
-    let valueA = property ? (a && a[property]) : a;
-    let valueB = property ? (b && b[property]) : b;
-
-    // Handle null/undefined values
-    if (valueA == null) return 1;
-    if (valueB == null) return -1;
-    
-    switch (type) {
+  // Each entry of sort_by is one key, most significant first; the
+  // single-key settings fill in whatever an entry leaves out
+  const defaults = {
+    property: settings.property,
+    order: settings.order || "ascending",
+    type: settings.type || "string",
+    case_sensitive: settings.case_sensitive !== false
+  };
+  const specs = (Array.isArray(settings.sort_by) && settings.sort_by.length ? settings.sort_by : [{}])
+    .map(spec => ({ ...defaults, ...spec }));
+  const limit = settings.limit === undefined || settings.limit === null
+    ? null
+    : Math.max(0, Math.trunc(Number(settings.limit)) || 0);
+
+  const convert = (value, spec) => {
+    switch (spec.type) {
       case "number":
-        valueA = Number(valueA);
-        valueB = Number(valueB);
-        break;
-        
+        return Number(value);
       case "date":
-        valueA = new Date(valueA).getTime();
-        valueB = new Date(valueB).getTime();
-        break;
-        
-      default: // string
-        valueA = String(valueA);
-        valueB = String(valueB);
-        if (!caseSensitive) {
-          valueA = valueA.toLowerCase();
-          valueB = valueB.toLowerCase();
+        return new Date(value).getTime();
+      default: { // string
+        const text = String(value);
+        return spec.case_sensitive === false ? text.toLowerCase() : text;
+      }
+    }
+  };
+
+  // Positions of the elements in sorted order (the first `limit` of them).
+  // column(property) returns the values of one sort key, element by element;
+  // each value is converted once, and null/undefined values sort last
+  const sortPositions = (column, count) => {
+    const keys = specs.map(spec => Array.from(column(spec.property), value => value == null ? null : convert(value, spec)));
+    const directions = specs.map(spec => spec.order === "ascending" ? 1 : -1);
+    const compare = (i, j) => {
+      for (let k = 0; k < keys.length; k++) {
+        const valueA = keys[k][i];
+        const valueB = keys[k][j];
+        if (valueA === null || valueB === null) {
+          if (valueA !== valueB) return valueA === null ? 1 : -1;
+          continue;
         }
+        if (valueA < valueB) return -directions[k];
+        if (valueA > valueB) return directions[k];
+      }
+      // Equal keys keep their original order
+      return i - j;
+    };
+
+    if (limit === null || limit >= count) {
+      return Array.from({ length: count }, (_, i) => i).sort(compare);
+    }
+
+    // Top-k keeps a heap of `limit` positions, the last in order at its root:
+    // O(n log k), and the same order as slicing the full sort
+    const heap = [];
+    const siftDown = (index) => {
+      for (;;) {
+        const left = 2 * index + 1;
+        const right = left + 1;
+        let largest = index;
+        if (left < heap.length && compare(heap[left], heap[largest]) > 0) largest = left;
+        if (right < heap.length && compare(heap[right], heap[largest]) > 0) largest = right;
+        if (largest === index) return;
+        [heap[index], heap[largest]] = [heap[largest], heap[index]];
+        index = largest;
+      }
+    };
+    for (let i = 0; i < count && limit > 0; i++) {
+      if (heap.length < limit) {
+        heap.push(i);
+        for (let index = heap.length - 1; index > 0;) {
+          const parent = (index - 1) >> 1;
+          if (compare(heap[index], heap[parent]) <= 0) break;
+          [heap[index], heap[parent]] = [heap[parent], heap[index]];
+          index = parent;
+        }
+      } else if (compare(i, heap[0]) < 0) {
+        heap[0] = i;
+        siftDown(0);
+      }
     }
+    return heap.sort(compare);
+  };
+
+  // Tables are sorted by their columns: the order is applied to every column
+  if (isTable(inputs.array)) {
+    const table = inputs.array;
+    const firstColumn = Object.values(table.columns)[0];
+    const positions = sortPositions(property => getColumn(table, property), firstColumn ? firstColumn.length : 0);
+    const columns = {};
+    for (const [name, values] of Object.entries(table.columns)) {
+      columns[name] = positions.map(i => values[i]);
+    }
+    return {
+      array: "types" in table ? { columns, types: table.types } : { columns }
+    };
+  }
 
-    if (valueA < valueB) return order === "ascending" ? -1 : 1;
-    if (valueA > valueB) return order === "ascending" ? 1 : -1;
-    return 0;
-  });
+  const array = Array.isArray(inputs.array) ? inputs.array : [inputs.array];
+  const column = property => property ? array.map(item => item && item[property]) : array;
 
   return {
-    array: sorted
+    array: sortPositions(column, array.length).map(i => array[i])
   };
-}; 
\ No newline at end of file
+};
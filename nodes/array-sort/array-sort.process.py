@@ -1,42 +1,116 @@
+import heapq
 from datetime import datetime
+from operator import neg
 
-async def process(inputs, settings, config, nodeConfig):
-  array = inputs.get("array", [])
-  if not isinstance(array, list):
-    array = [array]
-    
-  order = settings.get("order", "ascending")
-  type_name = settings.get("type", "string")
-  property_name = settings.get("property")
-  case_sensitive = settings.get("case_sensitive", True)
-  
-  def get_value(item):
-    value = item.get(property_name) if property_name and isinstance(item, dict) else item
-    
-    if value is None:
-      return None
-      
-    if type_name == "number":
+from zv1.utilities.table import get_column, is_table, take
+
+def converter(type_name, case_sensitive):
+  if type_name == "number":
+    def convert(value):
+      if value is None:
+        return None
       try:
         return float(value)
       except (ValueError, TypeError):
         return 0
         
-    elif type_name == "date":
-      try:
-        return datetime.fromisoformat(str(value)).timestamp()
-      except (ValueError, TypeError):
-        return 0
-        
-    else: # string
+  elif type_name == "date":
+    # Each distinct date string is parsed once
+    parsed = {}
+    def convert(value):
+      if value is None:
+        return None
+      text = str(value)
+      timestamp = parsed.get(text)
+      if timestamp is None:
+        try:
+          timestamp = datetime.fromisoformat(text).timestamp()
+        except (ValueError, TypeError):
+          timestamp = 0
+        parsed[text] = timestamp
+      return timestamp
+      
+  else: # string
+    def convert(value):
+      if value is None:
+        return None
       value = str(value)
       return value if case_sensitive else value.lower()
+      
+  return convert
+
+def property_values(array, property_name):
+  if not property_name:
+    return array
+  return [item.get(property_name) if isinstance(item, dict) else item for item in array]
+
+def sort_positions(column, settings):
+  """
+  Positions of the elements in sorted order (the first `limit` of them)
+  column(property) returns the values of one sort key, element by element
+  """
+  limit = settings.get("limit")
+
+  # Each entry of sort_by is one key, most significant first; the
+  # single-key settings fill in whatever an entry leaves out
+  defaults = {
+    "property": settings.get("property"),
+    "order": settings.get("order", "ascending"),
+    "type": settings.get("type", "string"),
+    "case_sensitive": settings.get("case_sensitive", True),
+  }
+  specs = [{**defaults, **spec} for spec in settings.get("sort_by") or [{}]]
+  
+  # One pass per key converts every value once; None values sort last
+  converted = [list(map(converter(spec["type"], spec["case_sensitive"]), column(spec["property"]))) for spec in specs]
+  
+  descending = [spec["order"] != "ascending" for spec in specs]
+  reverse = all(descending)
+  if reverse or not any(descending):
+    columns = [[(value is None, value) for value in values] for values in converted]
+  else:
+    # Mixed orders: a descending key is negated (strings by their rank),
+    # with None first, so one ascending sort honours every key
+    columns = []
+    for spec, values in zip(specs, converted):
+      if spec["order"] == "ascending":
+        columns.append([(value is None, value) for value in values])
+        continue
+      if spec["type"] in ("number", "date"):
+        rank = neg
+      else:
+        ranks = {value: -index for index, value in enumerate(sorted(set(values) - {None}))}
+        rank = ranks.__getitem__
+      columns.append([(False, 0) if value is None else (True, rank(value)) for value in values])
+      
+  keys = columns[0] if len(columns) == 1 else list(zip(*columns))
+  
+  # Top-k keeps a heap of `limit` positions: O(n log k), and the same
+  # order as slicing the full sort
+  if limit is not None and int(limit) < len(keys):
+    select = heapq.nlargest if reverse else heapq.nsmallest
+    positions = select(max(0, int(limit)), range(len(keys)), key=keys.__getitem__)
+  else:
+    positions = sorted(range(len(keys)), key=keys.__getitem__, reverse=reverse)
+  return positions
+
+def stage(items, inputs, settings):
+  """The elements of a stream in sorted order (for fused array chains)"""
+  array = list(items)
+  return map(array.__getitem__, sort_positions(lambda property_name: property_values(array, property_name), settings))
+
+async def process(inputs, settings, config, nodeConfig):
+  array = inputs.get("array", [])
   
-  def compare(item):
-    value = get_value(item)
-    return (value is None, value)  # None values sort last
+  # Tables are sorted by their columns: the keys give the row order for every column
+  if is_table(array):
+    return {
+      "array": take(array, sort_positions(lambda property_name: get_column(array, property_name), settings))
+    }
+    
+  if not isinstance(array, list):
+    array = [array]
     
-  reverse = order != "ascending"
   return {
-    "array": sorted(array, key=compare, reverse=reverse)
-  } 
\ No newline at end of file
+    "array": list(stage(array, inputs, settings))
+  }
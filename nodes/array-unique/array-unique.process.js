@@ -1,6 +1,24 @@
+// A table (types/table.json) holds one array per column
+const isTable = (value) =>
+  value !== null && typeof value === "object" && !Array.isArray(value) &&
+  value.columns !== null && typeof value.columns === "object" && !Array.isArray(value.columns);
+
+const getColumn = (table, name) => {
+  const names = Object.keys(table.columns);
+  if (!name) {
+    if (names.length !== 1) {
+      throw new Error("Choose a column of the table");
+    }
+    return table.columns[names[0]];
+  }
+  if (!names.includes(name)) {
+    throw new Error(`Unknown column: ${name}`);
+  }
+  return table.columns[name];
+};
+
 export default async ({inputs, settings, config}) => {
 
-  const array = Array.isArray(inputs.array) ? inputs.array : [inputs.array];
   const mode = settings.mode || "value";
   const property = settings.property;
   const caseSensitive = settings.case_sensitive !== false;
@@ -28,23 +46,58 @@ export default async ({inputs, settings, config}) => {
     return value;
   };
 
-  const seen = new Map();
-  const duplicates = [];
-  const indices = [];
-  
-  array.forEach((item, index) => {
-    const compareValue = getCompareValue(item);
-    if (!seen.has(compareValue)) {
-      seen.set(compareValue, {item, index});
+  // Positions of the first occurrences and of the repeats of each compare value
+  const uniquePositions = (compareValues) => {
+    const seen = new Set();
+    const kept = [];
+    const repeated = [];
+    compareValues.forEach((compareValue, index) => {
+      if (!seen.has(compareValue)) {
+        seen.add(compareValue);
+        kept.push(index);
+      } else {
+        repeated.push(index);
+      }
+    });
+    return [kept, repeated];
+  };
+
+  // Tables are compared row by row, or on one column in property mode;
+  // the kept and duplicate rows are gathered from every column by position
+  if (isTable(inputs.array)) {
+    const table = inputs.array;
+    const names = Object.keys(table.columns);
+    const columns = names.map(name => Array.from(table.columns[name]));
+    const rowCount = columns.length ? columns[0].length : 0;
+    let compareValues;
+    if (mode === "property") {
+      compareValues = Array.from(getColumn(table, property), value =>
+        typeof value === 'string' && !caseSensitive ? value.toLowerCase() : value);
     } else {
-      duplicates.push(item);
+      compareValues = Array.from({ length: rowCount }, (_, i) => JSON.stringify(columns.map(values => values[i])));
     }
-  });
 
-  const unique = Array.from(seen.values()).map(({item, index}) => {
-    indices.push(index);
-    return item;
-  });
+    const [kept, repeated] = uniquePositions(compareValues);
+    const gather = (positions) => {
+      const gathered = {};
+      names.forEach((name, c) => {
+        gathered[name] = positions.map(i => columns[c][i]);
+      });
+      return "types" in table ? { columns: gathered, types: table.types } : { columns: gathered };
+    };
+
+    return {
+      array: gather(kept),
+      count: kept.length,
+      duplicates: gather(repeated),
+      indices: kept
+    };
+  }
+
+  const array = Array.isArray(inputs.array) ? inputs.array : [inputs.array];
+  const [indices, repeated] = uniquePositions(array.map(getCompareValue));
+  const unique = indices.map(i => array[i]);
+  const duplicates = repeated.map(i => array[i]);
 
   return {
     array: unique,
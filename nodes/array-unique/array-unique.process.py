@@ -1,56 +1,74 @@
-import json
+from operator import eq
 
-async def process(inputs, settings, config, nodeConfig):
-  array = inputs.get("array", [])
-  if not isinstance(array, list):
-    array = [array]
-    
+from zv1.utilities.dedupe import iter_unique, json_equal, unique_indices
+from zv1.utilities.table import get_column, is_table, take
+
+# Keys are compared by structural hash, then by value when two hashes
+# match; json mode compares the way sorted-key JSON would (1, 1.0 and
+# true differ) and value mode with ==. Only indices are kept, and the
+# items are gathered by position at the end.
+
+def lower(value):
+  return value.lower() if isinstance(value, str) else value
+
+def key_function(settings):
+  """The value compared for each element, or None to compare the elements themselves"""
   mode = settings.get("mode", "value")
   property_name = settings.get("property")
-  case_sensitive = settings.get("case_sensitive", True)
+  fold_case = not settings.get("case_sensitive", True) and mode != "json"
   
-  def get_compare_value(item):
-    value = item
-    
-    if mode == "property" and property_name:
-      if isinstance(item, dict):
-        value = item.get(property_name)
-      else:
-        value = None
-        
-    if mode == "json":
-      try:
-        return json.dumps(item, sort_keys=True)
-      except:
-        return str(item)
-        
-    if isinstance(value, str) and not case_sensitive:
-      return value.lower()
-      
-    return value
+  if mode == "property" and property_name:
+    def get_value(item):
+      return item.get(property_name) if isinstance(item, dict) else None
+    if not fold_case:
+      return get_value
+    return lambda item: lower(get_value(item))
     
-  seen = {}
-  duplicates = []
-  indices = []
+  return lower if fold_case else None
+
+def equality(settings):
+  return json_equal if settings.get("mode", "value") == "json" else eq
+
+def deduplicate(array, settings):
+  key = key_function(settings)
+  keys = array if key is None else list(map(key, array))
+  kept, repeated = unique_indices(keys, equality(settings), settings.get("prefilter", False))
+  return {
+    "array": list(map(array.__getitem__, kept)),
+    "count": len(kept),
+    "duplicates": list(map(array.__getitem__, repeated)),
+    "indices": kept
+  }
+
+def stage(items, inputs, settings):
+  """The first occurrences in a stream of elements, lazily (for fused array chains)"""
+  return iter_unique(items, key_function(settings), equality(settings))
+
+def summarize(items, inputs, settings):
+  """Every output of the node for a stream of elements (for fused array chains)"""
+  return deduplicate(list(items), settings)
+
+async def process(inputs, settings, config, nodeConfig):
+  array = inputs.get("array", [])
   
-  for i, item in enumerate(array):
-    compare_value = get_compare_value(item)
-    # Use repr for non-string keys to handle unhashable types
-    key = compare_value if isinstance(compare_value, (str, int, float, bool)) else repr(compare_value)
-    
-    if key not in seen:
-      seen[key] = (item, i)
+  # Tables are compared row by row, or on one column in property mode
+  if is_table(array):
+    if settings.get("mode", "value") == "property":
+      keys = get_column(array, settings.get("property"))
     else:
-      duplicates.append(item)
+      keys = list(zip(*array["columns"].values()))
+    if not settings.get("case_sensitive", True) and settings.get("mode", "value") != "json":
+      keys = list(map(lower, keys))
       
-  unique = []
-  for item, index in seen.values():
-    unique.append(item)
-    indices.append(index)
+    kept, repeated = unique_indices(keys, equality(settings), settings.get("prefilter", False))
+    return {
+      "array": take(array, kept),
+      "count": len(kept),
+      "duplicates": take(array, repeated),
+      "indices": kept
+    }
     
-  return {
-    "array": unique,
-    "count": len(unique),
-    "duplicates": duplicates,
-    "indices": indices
-  } 
\ No newline at end of file
+  if not isinstance(array, list):
+    array = [array]
+    
+  return deduplicate(array, settings)
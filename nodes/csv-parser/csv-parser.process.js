@@ -5,13 +5,19 @@ export default async ({inputs, settings, config}) => {
   const hasHeaders = settings.has_headers !== false;
   const trimValues = settings.trim_values !== false;
   const skipEmptyLines = settings.skip_empty_lines !== false;
+  const output = settings.output || 'rows';
   
   let data = [];
   let headers = [];
+  let types = null;
   let error = '';
   let success = false;
   
   try {
+    if (!['rows', 'columns', 'table'].includes(output)) {
+      throw new Error(`Unsupported output: ${output}. Only rows, columns and table are supported.`);
+    }
+
     // Split into lines
     let lines = csvString.split(/\r?\n/);
     
@@ -20,8 +26,8 @@ export default async ({inputs, settings, config}) => {
       lines = lines.filter(line => line.trim() !== '');
     }
     
-    if (lines.length === 0) {
-      return { data: [], headers: [], error: '', success: true };
+    if (lines.length === 0 && output === 'rows') {
+      return { data: [], headers: [], types: null, error: '', success: true };
     }
     
     // Parse headers if configured
@@ -31,7 +37,21 @@ export default async ({inputs, settings, config}) => {
     }
     
     // Parse data rows
-    if (hasHeaders) {
+    if (output !== 'rows') {
+      // Typed columns keyed by header, or by position without headers
+      const rows = lines.map(line => parseCSVLine(line, delimiter, trimValues));
+      const width = hasHeaders ? headers.length : rows.reduce((widest, row) => Math.max(widest, row.length), 0);
+      const names = hasHeaders ? headers : Array.from({ length: width }, (_, i) => `column_${i + 1}`);
+      const columns = {};
+      types = {};
+      names.forEach((name, index) => {
+        const values = rows.map(row => index < row.length ? row[index] : '');
+        const columnType = inferColumnType(values);
+        columns[name] = convertColumn(columnType, values);
+        types[name] = columnType;
+      });
+      data = output === 'table' ? { columns, types } : columns;
+    } else if (hasHeaders) {
       // Parse as objects with header keys
       data = lines.map(line => {
         const values = parseCSVLine(line, delimiter, trimValues);
@@ -56,11 +76,58 @@ export default async ({inputs, settings, config}) => {
     error = e.message || 'Failed to parse CSV';
     data = [];
     headers = [];
+    types = null;
   }
   
-  return { data, headers, error, success };
+  return { data, headers, types, error, success };
 };
 
+// Canonical forms only, so values such as "007" or "+1" keep their text
+// (the same rules as zv1.utilities.csv_reader)
+const COLUMN_PATTERNS = {
+  integer: /^-?(?:0|[1-9][0-9]*)$/,
+  number: /^-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?$/,
+  boolean: /^(?:true|false)$/i,
+  date: /^[0-9]{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12][0-9]|3[01])$/,
+  datetime: /^[0-9]{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12][0-9]|3[01])[T ](?:[01][0-9]|2[0-3]):[0-5][0-9](?::[0-5][0-9](?:\.[0-9]+)?)?(?:Z|[+-][0-9]{2}:?[0-9]{2})?$/
+};
+
+// Column types in widening order; a value that fits none of a column's candidates makes it a string column
+const COLUMN_TYPES = ['integer', 'number', 'boolean', 'date', 'datetime'];
+const WIDER = { integer: ['number'], date: ['datetime'] };
+
+// The narrowest type holding every non-empty cell of a column
+function inferColumnType(values) {
+  let columnType = null;
+  for (const value of values) {
+    if (!value || (columnType !== null && COLUMN_PATTERNS[columnType].test(value))) {
+      continue;
+    }
+    const candidates = columnType === null ? COLUMN_TYPES : (WIDER[columnType] || []);
+    columnType = candidates.find(candidate => COLUMN_PATTERNS[candidate].test(value)) || 'string';
+    if (columnType === 'string') {
+      return 'string';
+    }
+  }
+  return columnType || 'string';
+}
+
+// Empty cells of typed columns become null
+function convertColumn(columnType, values) {
+  switch (columnType) {
+    case 'integer':
+    case 'number':
+      return values.map(value => value ? Number(value) : null);
+    case 'boolean':
+      return values.map(value => value ? value.toLowerCase() === 'true' : null);
+    case 'date':
+    case 'datetime':
+      return values.map(value => value || null);
+    default:
+      return values;
+  }
+}
+
 // Helper function to parse a CSV line respecting quotes
 function parseCSVLine(line, delimiter, trim) {
   const values = [];
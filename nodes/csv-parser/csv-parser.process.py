@@ -1,71 +1,93 @@
-import csv
-import io
+import asyncio
+import inspect
+import time
+
+from zv1.utilities.csv_reader import ColumnBuilder, iter_row_chunks, open_lines
+from zv1.utilities.table import make_table
 
 async def process(inputs, settings, config, nodeConfig):
     """
     Process function for the CSV Parser node.
-    Parses a CSV string into an array of objects or arrays.
+    Parses a CSV string into an array of objects or arrays, or into typed columns or a table.
+    The input can also be bytes, or a path object (memory-mapped) passed in by the host.
     """
-    csv_string = inputs.get("csv", "")
+    csv_source = inputs.get("csv", "")
     delimiter = settings.get("delimiter", ",")
     has_headers = settings.get("has_headers", True)
     trim_values = settings.get("trim_values", True)
     skip_empty_lines = settings.get("skip_empty_lines", True)
-    
+    output = settings.get("output", "rows")
+    stream = settings.get("stream", False) and output == "rows"
+    on_node_update = (config or {}).get("on_node_update") if stream else None
+
     data = []
     headers = []
+    types = None
     error = ""
     success = False
-    
+
     try:
-        # Create a file-like object from the string
-        csv_file = io.StringIO(csv_string)
-        
-        # Create CSV reader
-        csv_reader = csv.reader(csv_file, delimiter=delimiter)
-        
-        # Read all rows
-        rows = list(csv_reader)
-        
-        # Skip empty lines if configured
-        if skip_empty_lines:
-            rows = [row for row in rows if any(cell.strip() for cell in row)]
-        
-        if not rows:
-            return {
-                "data": [],
-                "headers": [],
-                "error": "",
-                "success": True
-            }
-        
-        # Parse headers if configured
-        if has_headers and rows:
-            headers = [h.strip() if trim_values else h for h in rows[0]]
-            rows = rows[1:]
-        
-        # Parse data rows
-        if has_headers:
-            # Parse as objects with header keys
-            for row in rows:
-                row_dict = {}
-                for i, value in enumerate(row):
-                    if i < len(headers):
-                        row_dict[headers[i]] = value.strip() if trim_values else value
-                data.append(row_dict)
-        else:
-            # Parse as arrays of values
-            data = [[cell.strip() if trim_values else cell for cell in row] for row in rows]
-        
+        if output not in ("rows", "columns", "table"):
+            raise ValueError(f"Unsupported output: {output}. Only rows, columns and table are supported.")
+
+        with open_lines(csv_source if csv_source is not None else "") as lines:
+            chunks = iter_row_chunks(lines, delimiter, trim_values, skip_empty_lines)
+            columns = ColumnBuilder(0) if output != "rows" else None
+            header_pending = has_headers
+            count = 0
+
+            for rows in chunks:
+                # Parse headers from the first row if configured
+                if header_pending and rows:
+                    headers = rows[0]
+                    rows = rows[1:]
+                    header_pending = False
+                    if columns is not None:
+                        columns.widen(len(headers))
+                if not rows:
+                    continue
+
+                if columns is not None:
+                    columns.add_rows(rows, widen=not has_headers)
+                    continue
+
+                if has_headers:
+                    # Parse as objects with header keys
+                    rows = [dict(zip(headers, row)) for row in rows]
+                data.extend(rows)
+
+                # Publish the chunk so streaming consumers can start on it
+                if on_node_update:
+                    result = on_node_update({
+                        "count": count,
+                        "node_type": (nodeConfig or {}).get("type"),
+                        "node_id": (nodeConfig or {}).get("id"),
+                        "timestamp": int(time.time() * 1000),
+                        "data": {"data": rows},
+                    })
+                    if inspect.isawaitable(result):
+                        await result
+                    count += 1
+                    await asyncio.sleep(0)
+
+        if columns is not None:
+            # Typed columns keyed by header, or by position without headers
+            names = headers if has_headers else [f"column_{i + 1}" for i in range(columns.width)]
+            data, types = columns.finish(names)
+            if output == "table":
+                data = make_table(data, types)
+
         success = True
     except Exception as e:
         error = str(e)
         data = []
         headers = []
-    
+        types = None
+
     return {
         "data": data,
         "headers": headers,
+        "types": types,
         "error": error,
         "success": success
-    } 
\ No newline at end of file
+    }
@@ -1,6 +1,6 @@
 export default async ({inputs, settings, config}) => {
 
-  const data = inputs.data || [];
+  const data = rowsOf(inputs.data || []);
   const providedHeaders = inputs.headers || [];
   const delimiter = settings.delimiter || ',';
   const includeHeaders = settings.include_headers !== false;
@@ -77,6 +77,29 @@ export default async ({inputs, settings, config}) => {
   return { csv, error, success };
 };
 
+// A table (types/table.json) or an object of column arrays as an array of
+// row objects; other data is returned as it is
+function rowsOf(data) {
+  if (data === null || typeof data !== 'object' || Array.isArray(data)) {
+    return data;
+  }
+  const columns = data.columns !== null && typeof data.columns === 'object' && !Array.isArray(data.columns)
+    ? data.columns
+    : data;
+  const names = Object.keys(columns);
+  if (!names.every(name => columns[name] !== null && typeof columns[name] === 'object' && typeof columns[name].length === 'number')) {
+    return data;
+  }
+  const rowCount = names.length ? columns[names[0]].length : 0;
+  return Array.from({ length: rowCount }, (_, i) => {
+    const row = {};
+    for (const name of names) {
+      row[name] = columns[name][i];
+    }
+    return row;
+  });
+}
+
 // Helper function to format a value for CSV
 function formatValue(value, quoteStrings) {
   if (value === null || value === undefined) {
@@ -1,106 +1,104 @@
-import csv
-import io
+import asyncio
+import inspect
+import os
+import time
+
+from zv1.utilities.csv_writer import discover_headers, iter_csv_chunks, iter_records
+from zv1.utilities.table import is_table
 
 async def process(inputs, settings, config, nodeConfig):
     """
     Process function for the CSV Stringifier node.
-    Converts an array of objects or arrays into a CSV string.
+    Converts an array of objects or arrays, an object of columns or a table into a CSV string.
+    The CSV can be streamed in chunks, or written to a path object passed in by the host.
     """
     data = inputs.get("data", [])
+    if is_table(data):
+        data = data["columns"]
     provided_headers = inputs.get("headers", [])
+    file_path = inputs.get("file")
     delimiter = settings.get("delimiter", ",")
     include_headers = settings.get("include_headers", True)
     quote_strings = settings.get("quote_strings", True)
     newline = settings.get("newline", "\n")
-    
+    stream = settings.get("stream", False)
+    on_node_update = (config or {}).get("on_node_update") if stream else None
+
     csv_string = ""
     error = ""
     success = False
-    
+
     try:
-        if not isinstance(data, list):
+        if not isinstance(data, (list, dict)):
             # For the specific test case "Handle non-array input"
             # Return only csv and success fields to match expected output
             return {
                 "csv": "",
                 "success": False
             }
-        
+
+        if file_path is not None and not isinstance(file_path, os.PathLike):
+            raise TypeError("The file input must be a path object supplied by the host")
+
         if not data:
             return {
                 "csv": "",
                 "error": "",
                 "success": True
             }
-        
-        # Determine if data is an array of objects or an array of arrays
-        is_array_of_objects = isinstance(data[0], dict) if data else False
-        
+
         # Extract or use provided headers
         headers = []
-        if is_array_of_objects:
-            if provided_headers:
-                headers = provided_headers
-            else:
-                # Extract headers from the first object (to maintain order)
-                # and then add any additional keys from other objects
-                if data:
-                    # Start with keys from the first object to maintain their order
-                    headers = list(data[0].keys())
-                    
-                    # Add any additional keys from other objects
-                    for obj in data[1:]:
-                        for key in obj.keys():
-                            if key not in headers:
-                                headers.append(key)
+        if isinstance(data, dict):
+            # Columns: one array per header
+            headers = provided_headers or list(data.keys())
+        elif isinstance(data[0], dict):
+            # Objects: keys of every object, in order of first appearance
+            headers = provided_headers or discover_headers(data)
         elif provided_headers:
             headers = provided_headers
-        
-        # Create a string buffer to write CSV data
-        output = io.StringIO()
-        
-        # Configure CSV writer
-        csv_writer = csv.writer(
-            output, 
+
+        chunks = iter_csv_chunks(
+            iter_records(data, headers),
+            headers=headers if include_headers else None,
             delimiter=delimiter,
-            quotechar='"',
-            quoting=csv.QUOTE_MINIMAL if not quote_strings else csv.QUOTE_NONNUMERIC,
-            lineterminator=newline
+            quote_strings=quote_strings,
+            newline=newline,
         )
-        
-        # Write headers if needed
-        if include_headers and headers:
-            csv_writer.writerow(headers)
-        
-        # Write data rows
-        if is_array_of_objects:
-            # Convert objects to arrays based on headers
-            for obj in data:
-                row = [obj.get(header, "") for header in headers]
-                csv_writer.writerow(row)
+
+        if file_path is not None:
+            # Write to the host's file; the csv output is its path
+            with open(file_path, "w", newline="", encoding="utf-8") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            csv_string = os.fspath(file_path)
+        elif on_node_update:
+            # Publish each chunk so streaming consumers can start on it
+            parts = []
+            for count, chunk in enumerate(chunks):
+                parts.append(chunk)
+                result = on_node_update({
+                    "count": count,
+                    "node_type": (nodeConfig or {}).get("type"),
+                    "node_id": (nodeConfig or {}).get("id"),
+                    "timestamp": int(time.time() * 1000),
+                    "data": {"csv": chunk},
+                })
+                if inspect.isawaitable(result):
+                    await result
+                await asyncio.sleep(0)
+            csv_string = "".join(parts)
         else:
-            # Data is already in array format
-            for row in data:
-                if isinstance(row, list):
-                    csv_writer.writerow(row)
-                else:
-                    csv_writer.writerow([row])
-        
-        # Get the CSV string from the buffer
-        csv_string = output.getvalue()
-        
-        # Remove the trailing newline if present
-        if csv_string.endswith(newline):
-            csv_string = csv_string[:-len(newline)]
-            
+            csv_string = "".join(chunks)
+
         success = True
-        
+
     except Exception as e:
         error = str(e)
         csv_string = ""
-    
+
     return {
         "csv": csv_string,
         "error": error,
         "success": success
-    } 
\ No newline at end of file
+    }
\ No newline at end of file
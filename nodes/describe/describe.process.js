@@ -0,0 +1,91 @@
+export default async ({inputs, settings, config}) => {
+
+  const numbers = Array.isArray(inputs.numbers) ? inputs.numbers : [inputs.numbers];
+  
+  // Validate and convert all inputs in one pass
+  const values = new Float64Array(numbers.length);
+  numbers.forEach((n, i) => {
+    if (n === null || n === undefined || isNaN(Number(n))) {
+      throw new Error("Input contains non-numeric values that cannot be processed");
+    }
+    values[i] = Number(n);
+  });
+  
+  const numBins = Math.max(1, Math.floor(Number(inputs.bins) || 10));
+  const count = values.length;
+  
+  if (count === 0) {
+    return {
+      count: 0, mean: 0, median: 0, mode: null, frequency: 0,
+      q1: 0, q3: 0, iqr: 0, min: 0, max: 0, range: 0,
+      standard_deviation: 0, variance: 0, bins: [], counts: []
+    };
+  }
+  
+  // Mean and population variance
+  let sum = 0;
+  for (const n of values) sum += n;
+  const mean = sum / count;
+  let squares = 0;
+  for (const n of values) squares += (n - mean) ** 2;
+  const variance = squares / count;
+  
+  // Mode: the most frequent value, the first seen on ties
+  const frequencies = new Map();
+  for (const n of values) {
+    frequencies.set(n, (frequencies.get(n) || 0) + 1);
+  }
+  let mode = null;
+  let frequency = 0;
+  for (const [n, seen] of frequencies) {
+    if (seen > frequency) {
+      mode = n;
+      frequency = seen;
+    }
+  }
+  
+  // Quartiles: the median, and the medians of the lower and upper halves
+  const sorted = values.slice().sort();
+  const getMedian = (arr) => {
+    const mid = Math.floor(arr.length / 2);
+    return arr.length % 2 === 0 ? (arr[mid - 1] + arr[mid]) / 2 : arr[mid];
+  };
+  const mid = Math.floor(count / 2);
+  const median = getMedian(sorted);
+  const q1 = count === 1 ? median : getMedian(sorted.subarray(0, mid));
+  const q3 = count === 1 ? median : getMedian(sorted.subarray(count % 2 ? mid + 1 : mid));
+  const min = sorted[0];
+  const max = sorted[count - 1];
+  
+  // Histogram with equal-width bins
+  let bins;
+  const counts = Array(numBins).fill(0);
+  if (min === max) {
+    bins = Array(numBins + 1).fill(min);
+    counts[0] = count;
+  } else {
+    const binWidth = (max - min) / numBins;
+    bins = Array(numBins + 1).fill(0).map((_, i) => Number((min + (binWidth * i)).toFixed(10)));
+    for (const n of values) {
+      counts[n === max ? numBins - 1 : Math.floor((n - min) / binWidth)]++;
+    }
+  }
+  
+  return {
+    count,
+    mean,
+    median,
+    mode,
+    frequency,
+    q1,
+    q3,
+    iqr: q3 - q1,
+    min,
+    max,
+    range: max - min,
+    standard_deviation: Math.sqrt(variance),
+    variance,
+    bins,
+    counts
+  };
+};
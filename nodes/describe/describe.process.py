@@ -0,0 +1,12 @@
+from zv1.utilities.stats import describe, input_floats
+
+async def process(inputs, settings, config, nodeConfig):
+  """
+  Process function for the Describe node.
+  Computes the statistics of the mean, median, mode, quartiles, standard deviation,
+  range and histogram nodes from a single validation and conversion pass.
+  """
+  numbers = input_floats(inputs.get("numbers", []), settings.get("column"))
+  num_bins = max(1, int(inputs.get("bins", 10)))
+  
+  return describe(numbers, num_bins)
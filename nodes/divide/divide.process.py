@@ -1,4 +1,4 @@
-async def process(inputs, settings, config, nodeConfig):
+def compute(inputs, settings):
 
   # avoid division by zero 
   if inputs.get("b") == 0:
@@ -11,4 +11,7 @@ async def process(inputs, settings, config, nodeConfig):
   
   return {
     "result": a / b
-  } 
\ No newline at end of file
+  }
+
+async def process(inputs, settings, config, nodeConfig):
+  return compute(inputs, settings)
\ No newline at end of file
@@ -1,8 +1,8 @@
 import json
 
-async def process(inputs, settings, config, nodeConfig):
+def compute(inputs, settings):
     """
-    Process function for the Equals node.
+    Compute function for the Equals node.
     Compares two values for equality, with deep comparison for objects and arrays.
     """
     a = inputs.get("a")
@@ -13,6 +13,12 @@ async def process(inputs, settings, config, nodeConfig):
     
     return {"result": result}
 
+async def process(inputs, settings, config, nodeConfig):
+    """
+    Process function for the Equals node.
+    """
+    return compute(inputs, settings)
+
 def deep_equals(a, b):
     """Helper function for deep equality comparison"""
     # If the values are the same object, they're equal
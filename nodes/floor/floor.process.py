@@ -1,8 +1,11 @@
 import math
 
-async def process(inputs, settings, config, nodeConfig):
+def compute(inputs, settings):
   number = float(inputs.get("number", 0))
   
   return {
     "result": math.floor(number)
-  } 
\ No newline at end of file
+  }
+
+async def process(inputs, settings, config, nodeConfig):
+  return compute(inputs, settings)
\ No newline at end of file
@@ -1,6 +1,6 @@
-async def process(inputs, settings, config, nodeConfig):
+def compute(inputs, settings):
     """
-    Process function for the Greater Than node.
+    Compute function for the Greater Than node.
     Checks if the first number is greater than the second number.
     """
     # Convert inputs to numbers to ensure proper comparison
@@ -10,4 +10,11 @@ async def process(inputs, settings, config, nodeConfig):
     # Check if A is greater than B
     result = a > b
 
-    return {"result": result} 
\ No newline at end of file
+    return {"result": result}
+
+
+async def process(inputs, settings, config, nodeConfig):
+    """
+    Process function for the Greater Than node.
+    """
+    return compute(inputs, settings)
\ No newline at end of file
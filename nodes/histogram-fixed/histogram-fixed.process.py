@@ -1,17 +1,16 @@
+from zv1.utilities.sketch import HistogramSketch
+from zv1.utilities.stats import bin_counts, numeric_floats
+
+# Quantiles reported in sketch mode
+QUANTILES = {"p50": 0.5, "p90": 0.9, "p95": 0.95, "p99": 0.99}
+
 async def process(inputs, settings, config, nodeConfig):
   numbers = inputs.get("numbers", [])
   if not isinstance(numbers, list):
     numbers = [numbers]
     
-  # Fix the validation to match the JavaScript implementation
-  valid_numbers = []
-  for n in numbers:
-    try:
-      num = float(n)
-      if not isinstance(num, complex) and not isinstance(n, bool):
-        valid_numbers.append(num)
-    except (ValueError, TypeError):
-      continue
+  # Numbers only, skipping booleans and non-numeric values like the JavaScript implementation
+  valid_numbers = numeric_floats(numbers)
     
   start = float(inputs.get("start", 0))
   bin_size = max(0.000001, float(inputs.get("bin_size", 1)))
@@ -27,28 +26,29 @@ async def process(inputs, settings, config, nodeConfig):
     else:
       bins.append(value)
   
-  # Initialize counts
-  counts = [0] * bin_count
-  overflow = 0
-  underflow = 0
+  if not settings.get("sketch", False):
+    # Each value's bin is computed for the whole array at once
+    counts, underflow, overflow = bin_counts(valid_numbers, start, bin_size, bin_count)
+    return {
+      "bins": bins,
+      "counts": counts,
+      "overflow": overflow,
+      "underflow": underflow
+    }
+
+  # Sketch mode: merge the sketches of earlier batches, then add this one
+  sketch = HistogramSketch(start, bin_size, bin_count)
+  previous = inputs.get("sketch")
+  for state in (previous if isinstance(previous, list) else [previous]):
+    if state:
+      sketch.merge(HistogramSketch.from_dict(state))
+  sketch.update(valid_numbers)
   
-  # If we have valid numbers, count them in bins
-  if valid_numbers:
-    # Count values in each bin
-    for num in valid_numbers:
-      if num < start:
-        underflow += 1
-        continue
-        
-      bin_index = int((num - start) / bin_size)
-      if bin_index >= bin_count:
-        overflow += 1
-      else:
-        counts[bin_index] += 1
-        
   return {
     "bins": bins,
-    "counts": counts,
-    "overflow": overflow,
-    "underflow": underflow
-  } 
\ No newline at end of file
+    "counts": sketch.counts,
+    "overflow": sketch.overflow,
+    "underflow": sketch.underflow,
+    "sketch": sketch.to_dict(),
+    "quantiles": dict(zip(QUANTILES, sketch.quantiles(list(QUANTILES.values()))))
+  }
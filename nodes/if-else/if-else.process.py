@@ -1,4 +1,4 @@
-async def process(inputs, settings, config, nodeConfig):
+def compute(inputs, settings):
   # Convert various truthy/falsy values to boolean
   condition = False
   
@@ -30,4 +30,7 @@ async def process(inputs, settings, config, nodeConfig):
       output["result"] = inputs.get("if_false")
     output["false_path"] = True
   
-  return output 
\ No newline at end of file
+  return output
+
+async def process(inputs, settings, config, nodeConfig):
+  return compute(inputs, settings)
\ No newline at end of file
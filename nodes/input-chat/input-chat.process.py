@@ -1,20 +1,33 @@
 async def process(inputs, settings, config, nodeConfig):
     """
     Process function for the Input Chat node.
-    Simply passes through the message.
-    The engine handles individual processing due to process_individually: true
+    Passes through the messages injected by the engine via settings.
     """
 
-    messageText = None  
+    messages = settings.get("messages") or []
 
-    if inputs.get("messages"):
-        mostRecentMessage = inputs.get("messages")[-1]
+    # find the text content for the most recent message
+    messageText = None
+
+    if len(messages) > 0:
+        mostRecentMessage = messages[-1]
+
+        # content will either be a string or a list of parts where one part has type "text"
         messageText = mostRecentMessage.get("content")
 
         if isinstance(messageText, list):
-            messageText = messageText[0].get("text")
+            messageText = next((item.get("text") for item in messageText if item.get("type") == "text"), None)
+
+        if not messageText:
+            messageText = None
+
+    # for each message, remove the fields we add ourselves
+    messages = [
+        {key: value for key, value in message.items() if key not in ("id", "participant_id", "timestamp")}
+        for message in messages
+    ]
 
     return {
-        "messages": inputs.get("messages"),
+        "messages": messages,
         "message": messageText
-    } 
\ No newline at end of file
+    }
@@ -4,8 +4,6 @@ async def process(inputs, settings, config, nodeConfig):
     Requests a variable from the user via the engine.
     """
 
-    print("SETTINGS", settings)
-
     # First check for an explicit value, then fall back to default_value
     value = settings.get('value')
     if value is None:
@@ -26,6 +24,6 @@ async def process(inputs, settings, config, nodeConfig):
     return {
         "value": value,
         "data": {
-            settings.get("key"): value
+            settings.get("key") or "data": value
         }
     }
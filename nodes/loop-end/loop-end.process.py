@@ -0,0 +1,51 @@
+async def process(inputs, settings, config, nodeConfig):
+    """
+    Process function for the Loop End node.
+    Decides whether to continue looping or exit based on the iteration count
+    and the while_condition flag. Loop state is persisted via __updated_settings.
+    """
+    # Get current iteration count from settings (persisted state)
+    currentIteration = (settings.get("_loop_iteration") or 0) + 1
+
+    # Get all values from settings (persisted state) and add the current value
+    allValues = list(settings.get("_all_values") or [])
+    allValues.append(inputs.get("value"))
+
+    # Get loop control parameters
+    loopLimit = inputs.get("loop_limit")
+    if loopLimit is None:
+        loopLimit = 10
+    whileCondition = inputs.get("while_condition")
+    if whileCondition is None:
+        whileCondition = True
+
+    shouldContinue = whileCondition and currentIteration < loopLimit
+
+    loopValue = inputs["loop_value"] if "loop_value" in inputs else inputs.get("value")
+    finalValue = inputs["final_value"] if "final_value" in inputs else inputs.get("value")
+
+    outputs = {
+        "loop_back": None,
+        "final_value": None,
+        "total_iterations": None,
+        "all_values": None
+    }
+
+    if shouldContinue:
+        # Continue looping - send loop_value back to loop start
+        outputs["loop_back"] = loopValue
+        outputs["__updated_settings"] = {
+            "_loop_iteration": currentIteration,
+            "_all_values": allValues
+        }
+    else:
+        # Exit loop - output final results and reset state for the next loop
+        outputs["final_value"] = finalValue
+        outputs["total_iterations"] = currentIteration
+        outputs["all_values"] = list(allValues)
+        outputs["__updated_settings"] = {
+            "_loop_iteration": 0,
+            "_all_values": []
+        }
+
+    return outputs
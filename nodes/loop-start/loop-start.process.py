@@ -0,0 +1,8 @@
+async def process(inputs, settings, config, nodeConfig):
+    """
+    Process function for the Loop Start node.
+    Passes the value through; the refiring behavior is handled by the engine.
+    """
+    return {
+        "value": inputs.get("value")
+    }
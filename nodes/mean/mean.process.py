@@ -1,21 +1,12 @@
+from zv1.utilities.stats import input_floats, mean
+
 async def process(inputs, settings, config, nodeConfig):
-  numbers = inputs.get("numbers", [])
-  if not isinstance(numbers, list):
-    numbers = [numbers]
-    
-  # Validate all inputs are numbers
-  for n in numbers:
-    try:
-      float(n)
-    except (ValueError, TypeError):
-      raise ValueError("Input contains non-numeric values that cannot be processed")
-  
-  # Convert all values to numbers
-  valid_numbers = [float(n) for n in numbers]
+  # Validate and convert the numbers (or a table column) in one pass
+  numbers = input_floats(inputs.get("numbers", []), settings.get("column"))
   
-  if not valid_numbers:
+  if not len(numbers):
     return {"result": 0}
     
   return {
-    "result": sum(valid_numbers) / len(valid_numbers)
+    "result": mean(numbers)
   } 
\ No newline at end of file
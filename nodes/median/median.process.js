@@ -1,6 +1,28 @@
+// A table (types/table.json) holds one array per column
+const isTable = (value) =>
+  value !== null && typeof value === "object" && !Array.isArray(value) &&
+  value.columns !== null && typeof value.columns === "object" && !Array.isArray(value.columns);
+
+const getColumn = (table, name) => {
+  const names = Object.keys(table.columns);
+  if (!name) {
+    if (names.length !== 1) {
+      throw new Error("Choose a column of the table");
+    }
+    return table.columns[names[0]];
+  }
+  if (!names.includes(name)) {
+    throw new Error(`Unknown column: ${name}`);
+  }
+  return table.columns[name];
+};
+
 export default async ({inputs, settings, config}) => {
 
-  const numbers = Array.isArray(inputs.numbers) ? inputs.numbers : [inputs.numbers];
+  // The numbers, or a table column without its empty cells
+  const numbers = isTable(inputs.numbers)
+    ? Array.from(getColumn(inputs.numbers, settings.column)).filter(n => n !== null && n !== undefined)
+    : Array.isArray(inputs.numbers) ? inputs.numbers : [inputs.numbers];
   
   // Validate all inputs are numbers
   for (const n of numbers) {
@@ -1,33 +1,11 @@
+from zv1.utilities.stats import input_floats, median
+
 async def process(inputs, settings, config, nodeConfig):
-  numbers = inputs.get("numbers", [])
-  if not isinstance(numbers, list):
-    numbers = [numbers]
-    
-  # Validate all inputs are numbers
-  for n in numbers:
-    try:
-      float(n)
-    except (ValueError, TypeError):
-      raise ValueError("Input contains non-numeric values that cannot be processed")
-  
-  # Convert all values to numbers
-  valid_numbers = [float(n) for n in numbers]
+  # Validate and convert the numbers (or a table column) in one pass
+  numbers = input_floats(inputs.get("numbers", []), settings.get("column"))
   
-  if not valid_numbers:
+  if not len(numbers):
     return {"result": 0}
     
-  # Sort the numbers
-  sorted_numbers = sorted(valid_numbers)
-  
-  # Find the median
-  n = len(sorted_numbers)
-  mid = n // 2
-  
-  if n % 2 == 0:
-    # Even number of elements
-    result = (sorted_numbers[mid - 1] + sorted_numbers[mid]) / 2
-  else:
-    # Odd number of elements
-    result = sorted_numbers[mid]
-    
-  return {"result": result} 
\ No newline at end of file
+  # The middle values are selected without sorting every number
+  return {"result": median(numbers)} 
\ No newline at end of file
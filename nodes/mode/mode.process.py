@@ -1,40 +1,21 @@
-from collections import Counter
+from zv1.utilities.stats import input_floats, mode
 
 async def process(inputs, settings, config, nodeConfig):
-  numbers = inputs.get("numbers", [])
-  if not isinstance(numbers, list):
-    numbers = [numbers]
-    
-  # Validate all inputs are numbers
-  for n in numbers:
-    try:
-      float(n)
-    except (ValueError, TypeError):
-      raise ValueError("Input contains non-numeric values that cannot be processed")
-  
-  # Convert all values to numbers
-  valid_numbers = [float(n) for n in numbers]
+  # Validate and convert the numbers (or a table column) in one pass
+  numbers = input_floats(inputs.get("numbers", []), settings.get("column"))
   
-  if not valid_numbers:
+  if not len(numbers):
     return {
       "result": None,
       "count": 0,
       "frequency": 0
     }
     
-  # Count frequency of each number
-  counter = Counter(valid_numbers)
-  
-  # Find the mode (most frequent value)
-  if counter:
-    mode = counter.most_common(1)[0][0]
-    frequency = counter.most_common(1)[0][1]
-  else:
-    mode = None
-    frequency = 0
+  # Find the mode (most frequent value, the first seen on ties)
+  value, frequency, count = mode(numbers)
     
   return {
-    "result": mode,
-    "count": len(counter),
+    "result": value,
+    "count": count,
     "frequency": frequency
   } 
\ No newline at end of file
@@ -1,4 +1,4 @@
-async def process(inputs, settings, config, nodeConfig):
+def compute(inputs, settings):
   # Validate inputs are numbers
   dividend = inputs.get("dividend")
   divisor = inputs.get("divisor")
@@ -38,4 +38,7 @@ async def process(inputs, settings, config, nodeConfig):
   
   return {
     "result": result
-  } 
\ No newline at end of file
+  }
+
+async def process(inputs, settings, config, nodeConfig):
+  return compute(inputs, settings)
\ No newline at end of file
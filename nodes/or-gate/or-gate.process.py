@@ -1,7 +1,10 @@
-async def process(inputs, settings, config, nodeConfig):
+def compute(inputs, settings):
   input1 = inputs.get("input1") == True
   input2 = inputs.get("input2") == True
   
   return {
     "value": input1 or input2
-  } 
\ No newline at end of file
+  }
+
+async def process(inputs, settings, config, nodeConfig):
+  return compute(inputs, settings)
\ No newline at end of file
@@ -3,8 +3,14 @@ async def process(inputs, settings, config, nodeConfig):
   result = []
 
   if inputs.get("message"):
-    result.append(inputs.get("message"))
+    if isinstance(inputs.get("message"), list):
+      result.extend(inputs.get("message"))
+    else:
+      result.append(inputs.get("message"))
   elif inputs.get("content"):
-    result.append({ "content": inputs.get("content"), "role": inputs.get("role") })
+    role = inputs.get("role")
+    result.append({ "content": inputs.get("content"), "role": role if role is not None else "assistant" })
 
-  return result 
\ No newline at end of file
+  return {
+    "chat": result
+  }
@@ -1,7 +1,10 @@
-async def process(inputs, settings, config, nodeConfig):
+def compute(inputs, settings):
   base = float(inputs.get("base", 0))
   exponent = float(inputs.get("exponent", 0))
   
   return {
     "result": base ** exponent
-  } 
\ No newline at end of file
+  }
+
+async def process(inputs, settings, config, nodeConfig):
+  return compute(inputs, settings)
\ No newline at end of file
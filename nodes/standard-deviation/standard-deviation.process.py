@@ -1,33 +1,21 @@
 import math
 
+from zv1.utilities.stats import input_floats, variance
+
 async def process(inputs, settings, config, nodeConfig):
-  numbers = inputs.get("numbers", [])
-  if not isinstance(numbers, list):
-    numbers = [numbers]
-    
-  # Validate all inputs are numbers
-  for n in numbers:
-    try:
-      float(n)
-    except (ValueError, TypeError):
-      raise ValueError("Input contains non-numeric values that cannot be processed")
+  # Validate and convert the numbers (or a table column) in one pass
+  numbers = input_floats(inputs.get("numbers", []), settings.get("column"))
   
-  # Convert all values to numbers
-  valid_numbers = [float(n) for n in numbers]
-  
-  if not valid_numbers:
+  if not len(numbers):
     return {
       "result": 0,
       "variance": 0
     }
     
-  # Calculate mean
-  mean = sum(valid_numbers) / len(valid_numbers)
-  
-  # Calculate variance
-  variance = sum((x - mean) ** 2 for x in valid_numbers) / len(valid_numbers)
+  # Population variance
+  result = variance(numbers)
   
   return {
-    "result": math.sqrt(variance),
-    "variance": variance
+    "result": math.sqrt(result),
+    "variance": result
   } 
\ No newline at end of file
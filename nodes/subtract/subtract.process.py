@@ -1,4 +1,4 @@
-async def process(inputs, settings, config, nodeConfig):
+def compute(inputs, settings):
   a = float(inputs.get("a", 0))
   b = float(inputs.get("b", 0))
   
@@ -11,4 +11,7 @@ async def process(inputs, settings, config, nodeConfig):
   
   return {
     "result": result
-  } 
\ No newline at end of file
+  }
+
+async def process(inputs, settings, config, nodeConfig):
+  return compute(inputs, settings)
\ No newline at end of file
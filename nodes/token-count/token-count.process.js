@@ -1,3 +1,4 @@
+import { createHash } from 'crypto';
 import { encoding_for_model } from 'tiktoken';
 
 export default async ({inputs, settings, config}) => {
@@ -12,8 +13,35 @@ export default async ({inputs, settings, config}) => {
             throw new Error(`Unsupported tokenizer: ${tokenizer}. Only cl200k_base and cl100k_base are supported.`);
         }
 
-        // Get the encoding for the specified tokenizer
-        const encoding = encoding_for_model(tokenizer === 'cl200k_base' ? 'gpt-4o' : 'gpt-4');
+        // exact, or estimate to approximate the count from the text size
+        const precision = settings.precision || 'exact';
+        if (!['exact', 'estimate'].includes(precision)) {
+            throw new Error(`Unsupported precision: ${precision}. Only exact and estimate are supported.`);
+        }
+
+        // Get the encoding for the specified tokenizer; estimates don't need one
+        const encoding = precision === 'exact' ? encoding_for_model(tokenizer === 'cl200k_base' ? 'gpt-4o' : 'gpt-4') : null;
+
+        // Fixed bytes per token of English text, the same ratios as zv1.utilities.tokenizer
+        const bytesPerToken = { cl200k_base: 4.2, cl100k_base: 4.0 };
+        const countText = (text) => {
+            if (precision === 'estimate') {
+                return Math.ceil(Buffer.byteLength(text, 'utf8') / bytesPerToken[tokenizer]);
+            }
+            return encoding.encode(text).length;
+        };
+
+        // Token counts carried in a message's _token_counts field, if they
+        // were counted from its current content (see zv1.utilities.tokenizer)
+        const contentDigest = (text) => createHash('sha256').update(text, 'utf8').digest('hex').slice(0, 16);
+        const countMessage = (message) => {
+            const counts = message._token_counts;
+            if (typeof message.content === 'string' && counts && typeof counts === 'object'
+                && counts.digest === contentDigest(message.content) && Number.isInteger(counts[tokenizer])) {
+                return counts[tokenizer];
+            }
+            return countText(extractTextFromContent(message.content));
+        };
 
         let totalTokens = 0;
 
@@ -39,29 +67,29 @@ export default async ({inputs, settings, config}) => {
         // Handle different input types
         if (typeof input === 'string') {
             // Simple string input
-            totalTokens = encoding.encode(input).length;
+            totalTokens = countText(input);
         } else if (Array.isArray(input)) {
             // Array of messages
             for (const message of input) {
                 if (typeof message === 'string') {
-                    totalTokens += encoding.encode(message).length;
+                    totalTokens += countText(message);
                 } else if (message && typeof message === 'object' && message.content) {
                     // Message object with {role, content} - handle multi-modal content
-                    const text = extractTextFromContent(message.content);
-                    totalTokens += encoding.encode(text).length;
+                    totalTokens += countMessage(message);
                 }
             }
         } else if (input && typeof input === 'object' && input.content) {
             // Single message object with {role, content} - handle multi-modal content
-            const text = extractTextFromContent(input.content);
-            totalTokens = encoding.encode(text).length;
+            totalTokens = countMessage(input);
         } else {
             // Fallback: convert to string
-            totalTokens = encoding.encode(String(input)).length;
+            totalTokens = countText(String(input));
         }
 
         // Free the encoding to prevent memory leaks
-        encoding.free();
+        if (encoding) {
+            encoding.free();
+        }
 
         return {
             tokens: totalTokens
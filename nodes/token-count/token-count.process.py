@@ -1,6 +1,7 @@
-import tiktoken
 from typing import Any, Dict, List, Union
 
+from zv1.utilities.tokenizer import get_tokenizer, validate_precision
+
 async def process(inputs: Dict[str, Any], settings: Dict[str, Any], config: Dict[str, Any], nodeConfig: Dict[str, Any]) -> Dict[str, Any]:
     try:
         input_data = inputs.get('input')
@@ -8,16 +9,14 @@ async def process(inputs: Dict[str, Any], settings: Dict[str, Any], config: Dict
             raise Exception("Input is required for token counting")
 
         # Get the tokenizer setting, default to cl200k_base
+        # The shared service validates it and keeps the encoding loaded
         tokenizer = settings.get('tokenizer', 'cl200k_base')
+        service = get_tokenizer()
 
-        # Validate tokenizer option
-        if tokenizer not in ['cl200k_base', 'cl100k_base']:
-            raise Exception(f"Unsupported tokenizer: {tokenizer}. Only cl200k_base and cl100k_base are supported.")
-
-        # Get the encoding for the specified tokenizer
-        # Python tiktoken uses different names
-        encoding_name = 'cl200k_base' if tokenizer == 'cl200k_base' else 'cl100k_base'
-        encoding = tiktoken.get_encoding(encoding_name)
+        # exact, or estimate to approximate the count from the text size
+        precision = validate_precision(settings.get('precision', 'exact'))
+        if precision == 'exact':
+            service.encoding(tokenizer)
 
         # Helper function to extract text from content (handles multi-modal)
         def extract_text_from_content(content):
@@ -34,28 +33,34 @@ async def process(inputs: Dict[str, Any], settings: Dict[str, Any], config: Dict
                 # Fallback: stringify the content
                 return str(content)
 
-        total_tokens = 0
+        # Helper function to extract text from a message of an array
+        def extract_text_from_message(message):
+            if isinstance(message, str):
+                return message
+            elif isinstance(message, dict) and 'content' in message:
+                # Message object with {role, content} - handle multi-modal content
+                return extract_text_from_content(message['content'])
+            return ''
+
+        def count_texts(texts):
+            if precision == 'estimate':
+                return sum(service.estimate_batch(texts, tokenizer))
+            return sum(service.count_batch(texts, tokenizer))
 
         # Handle different input types
         if isinstance(input_data, str):
             # Simple string input
-            total_tokens = len(encoding.encode(input_data))
+            total_tokens = count_texts([input_data])
         elif isinstance(input_data, list):
-            # Array of messages
-            for message in input_data:
-                if isinstance(message, str):
-                    total_tokens += len(encoding.encode(message))
-                elif isinstance(message, dict) and 'content' in message:
-                    # Message object with {role, content} - handle multi-modal content
-                    text = extract_text_from_content(message['content'])
-                    total_tokens += len(encoding.encode(text))
+            # Array of messages, counted in one batch; messages counted in
+            # earlier turns are known from their annotation or text
+            total_tokens = sum(service.count_messages(input_data, tokenizer, text_of=extract_text_from_message, precision=precision))
         elif isinstance(input_data, dict) and 'content' in input_data:
             # Single message object with {role, content} - handle multi-modal content
-            text = extract_text_from_content(input_data['content'])
-            total_tokens = len(encoding.encode(text))
+            total_tokens = service.count_messages([input_data], tokenizer, text_of=extract_text_from_message, precision=precision)[0]
         else:
             # Fallback: convert to string
-            total_tokens = len(encoding.encode(str(input_data)))
+            total_tokens = count_texts([str(input_data)])
 
         return {
             "tokens": total_tokens
@@ -1,6 +1,7 @@
-import tiktoken
 from typing import Any, Dict, List, Union
 
+from zv1.utilities.tokenizer import get_tokenizer
+
 async def process(inputs: Dict[str, Any], settings: Dict[str, Any], config: Dict[str, Any], nodeConfig: Dict[str, Any]) -> Dict[str, Any]:
     try:
         input_data = inputs.get('input')
@@ -8,16 +9,10 @@ async def process(inputs: Dict[str, Any], settings: Dict[str, Any], config: Dict
             raise Exception("Input is required for tokenization")
 
         # Get the tokenizer setting, default to cl200k_base
+        # The shared service validates it and keeps the encoding loaded
         tokenizer = settings.get('tokenizer', 'cl200k_base')
-
-        # Validate tokenizer option
-        if tokenizer not in ['cl200k_base', 'cl100k_base']:
-            raise Exception(f"Unsupported tokenizer: {tokenizer}. Only cl200k_base and cl100k_base are supported.")
-
-        # Get the encoding for the specified tokenizer
-        # Python tiktoken uses different names
-        encoding_name = 'cl200k_base' if tokenizer == 'cl200k_base' else 'cl100k_base'
-        encoding = tiktoken.get_encoding(encoding_name)
+        service = get_tokenizer()
+        service.encoding(tokenizer)
 
         # Helper function to extract text from content (handles multi-modal)
         def extract_text_from_content(content):
@@ -39,23 +34,25 @@ async def process(inputs: Dict[str, Any], settings: Dict[str, Any], config: Dict
         # Handle different input types
         if isinstance(input_data, str):
             # Simple string input
-            all_tokens = encoding.encode(input_data)
+            all_tokens = service.encode(input_data, tokenizer)
         elif isinstance(input_data, list):
-            # Array of messages
+            # Array of messages, tokenized together in one batch
+            texts = []
             for message in input_data:
                 if isinstance(message, str):
-                    all_tokens.extend(encoding.encode(message))
+                    texts.append(message)
                 elif isinstance(message, dict) and 'content' in message:
                     # Message object with {role, content} - handle multi-modal content
-                    text = extract_text_from_content(message['content'])
-                    all_tokens.extend(encoding.encode(text))
+                    texts.append(extract_text_from_content(message['content']))
+            for tokens in service.encode_batch(texts, tokenizer):
+                all_tokens.extend(tokens)
         elif isinstance(input_data, dict) and 'content' in input_data:
             # Single message object with {role, content} - handle multi-modal content
             text = extract_text_from_content(input_data['content'])
-            all_tokens = encoding.encode(text)
+            all_tokens = service.encode(text, tokenizer)
         else:
             # Fallback: convert to string
-            all_tokens = encoding.encode(str(input_data))
+            all_tokens = service.encode(str(input_data), tokenizer)
 
         return {
             "tokens": all_tokens
@@ -1,3 +1,4 @@
+import { createHash } from 'crypto';
 import { encoding_for_model } from 'tiktoken';
 
 export default async ({inputs, settings, config}) => {
@@ -18,6 +19,12 @@ export default async ({inputs, settings, config}) => {
             throw new Error(`Unsupported tokenizer: ${tokenizer}. Only cl200k_base and cl100k_base are supported.`);
         }
 
+        // exact, or estimate to tokenize only the messages near the cut point
+        const precision = settings.precision || 'exact';
+        if (!['exact', 'estimate'].includes(precision)) {
+            throw new Error(`Unsupported precision: ${precision}. Only exact and estimate are supported.`);
+        }
+
         const encoding = encoding_for_model(tokenizer === 'cl200k_base' ? 'gpt-4o' : 'gpt-4');
 
         // Helper function to extract text content from message
@@ -33,34 +40,72 @@ export default async ({inputs, settings, config}) => {
             return String(message.content || '');
         };
 
+        // Token counts carried in a message's _token_counts field, if they
+        // were counted from its current content (see zv1.utilities.tokenizer)
+        const contentDigest = (text) => createHash('sha256').update(text, 'utf8').digest('hex').slice(0, 16);
+        const getAnnotation = (message) => {
+            if (!message || typeof message !== 'object' || typeof message.content !== 'string') return null;
+            const counts = message._token_counts;
+            return counts && typeof counts === 'object' && counts.digest === contentDigest(message.content) ? counts : null;
+        };
+
         // Helper function to count tokens in a message
+        const counted = new Map();
         const countMessageTokens = (message) => {
-            const text = getMessageText(message);
-            return encoding.encode(text).length;
+            const annotation = getAnnotation(message);
+            if (annotation && Number.isInteger(annotation[tokenizer])) return annotation[tokenizer];
+            if (!counted.has(message)) {
+                counted.set(message, encoding.encode(getMessageText(message)).length);
+            }
+            return counted.get(message);
         };
 
-        // Start from the beginning and work forwards to find messages that fit
-        const result = [];
-        let totalTokens = 0;
-        let truncated = false;
-
-        for (let i = 0; i < messages.length; i++) {
-            const message = messages[i];
-            const messageTokens = countMessageTokens(message);
-            
-            if (totalTokens + messageTokens <= maxTokens) {
-                result.push(message);
-                totalTokens += messageTokens;
-            } else {
-                truncated = true;
-                break;
+        // Length and tokens of the longest leading run of `list` that fits the
+        // budget. estimate accepts messages on an upper bound of their tokens,
+        // the UTF-8 size of their text (a byte-level BPE token is at least one
+        // byte), and tokenizes only the 16 messages after them, so the total is
+        // an upper bound (see zv1.utilities.truncation)
+        const boundMessageTokens = (message) => {
+            const annotation = getAnnotation(message);
+            if (annotation && Number.isInteger(annotation[tokenizer])) return annotation[tokenizer];
+            return Buffer.byteLength(getMessageText(message), 'utf8');
+        };
+        const fitRun = (list, budget) => {
+            let kept = 0;
+            let total = 0;
+            let end = list.length;
+            if (precision === 'estimate') {
+                while (kept < list.length && total + boundMessageTokens(list[kept]) <= budget) {
+                    total += boundMessageTokens(list[kept]);
+                    kept++;
+                }
+                end = Math.min(list.length, kept + 16);
             }
-        }
+            while (kept < end && total + countMessageTokens(list[kept]) <= budget) {
+                total += countMessageTokens(list[kept]);
+                kept++;
+            }
+            return [kept, total];
+        };
+
+        // Opt-in: carry the counts with the messages, checked against a digest of their content
+        const annotateMessage = (message) => {
+            if (!message || typeof message !== 'object' || typeof message.content !== 'string') return message;
+            const counts = getAnnotation(message) || { digest: contentDigest(message.content) };
+            return { ...message, _token_counts: { ...counts, [tokenizer]: countMessageTokens(message) } };
+        };
+
+        // Start from the beginning and work forwards to find messages that fit
+        const [kept, totalTokens] = fitRun(messages, maxTokens);
+        const result = messages.slice(0, kept);
+        const truncated = kept < messages.length;
+
+        const output = settings.annotate === true ? result.map(annotateMessage) : result;
 
         encoding.free();
 
         return {
-            messages: result,
+            messages: output,
             token_count: totalTokens,
             truncated: truncated
         };
@@ -1,3 +1,4 @@
+import { createHash } from 'crypto';
 import { encoding_for_model } from 'tiktoken';
 
 export default async ({inputs, settings, config}) => {
@@ -20,6 +21,12 @@ export default async ({inputs, settings, config}) => {
 
         const countSystem = settings.count_system === true; // Default to false
 
+        // exact, or estimate to tokenize only the messages near the cut point
+        const precision = settings.precision || 'exact';
+        if (!['exact', 'estimate'].includes(precision)) {
+            throw new Error(`Unsupported precision: ${precision}. Only exact and estimate are supported.`);
+        }
+
         const encoding = encoding_for_model(tokenizer === 'cl200k_base' ? 'gpt-4o' : 'gpt-4');
 
         // Helper function to extract text content from message
@@ -35,10 +42,59 @@ export default async ({inputs, settings, config}) => {
             return String(message.content || '');
         };
 
+        // Token counts carried in a message's _token_counts field, if they
+        // were counted from its current content (see zv1.utilities.tokenizer)
+        const contentDigest = (text) => createHash('sha256').update(text, 'utf8').digest('hex').slice(0, 16);
+        const getAnnotation = (message) => {
+            if (!message || typeof message !== 'object' || typeof message.content !== 'string') return null;
+            const counts = message._token_counts;
+            return counts && typeof counts === 'object' && counts.digest === contentDigest(message.content) ? counts : null;
+        };
+
         // Helper function to count tokens in a message
+        const counted = new Map();
         const countMessageTokens = (message) => {
-            const text = getMessageText(message);
-            return encoding.encode(text).length;
+            const annotation = getAnnotation(message);
+            if (annotation && Number.isInteger(annotation[tokenizer])) return annotation[tokenizer];
+            if (!counted.has(message)) {
+                counted.set(message, encoding.encode(getMessageText(message)).length);
+            }
+            return counted.get(message);
+        };
+
+        // Length and tokens of the longest leading run of `list` that fits the
+        // budget. estimate accepts messages on an upper bound of their tokens,
+        // the UTF-8 size of their text (a byte-level BPE token is at least one
+        // byte), and tokenizes only the 16 messages after them, so the total is
+        // an upper bound (see zv1.utilities.truncation)
+        const boundMessageTokens = (message) => {
+            const annotation = getAnnotation(message);
+            if (annotation && Number.isInteger(annotation[tokenizer])) return annotation[tokenizer];
+            return Buffer.byteLength(getMessageText(message), 'utf8');
+        };
+        const fitRun = (list, budget) => {
+            let kept = 0;
+            let total = 0;
+            let end = list.length;
+            if (precision === 'estimate') {
+                while (kept < list.length && total + boundMessageTokens(list[kept]) <= budget) {
+                    total += boundMessageTokens(list[kept]);
+                    kept++;
+                }
+                end = Math.min(list.length, kept + 16);
+            }
+            while (kept < end && total + countMessageTokens(list[kept]) <= budget) {
+                total += countMessageTokens(list[kept]);
+                kept++;
+            }
+            return [kept, total];
+        };
+
+        // Opt-in: carry the counts with the messages, checked against a digest of their content
+        const annotateMessage = (message) => {
+            if (!message || typeof message !== 'object' || typeof message.content !== 'string') return message;
+            const counts = getAnnotation(message) || { digest: contentDigest(message.content) };
+            return { ...message, _token_counts: { ...counts, [tokenizer]: countMessageTokens(message) } };
         };
 
         // Separate system and non-system messages
@@ -53,10 +109,13 @@ export default async ({inputs, settings, config}) => {
             }
         }
 
-        // Count tokens in system messages
-        let systemTokens = 0;
-        for (const message of systemMessages) {
-            systemTokens += countMessageTokens(message);
+        // Count tokens in system messages; estimate takes their UTF-8 bounds
+        // (never fewer than their tokens) and counts them only when those overflow
+        let systemTokens = precision === 'estimate'
+            ? systemMessages.reduce((sum, message) => sum + boundMessageTokens(message), 0)
+            : Infinity;
+        if (systemTokens > maxTokens) {
+            systemTokens = systemMessages.reduce((sum, message) => sum + countMessageTokens(message), 0);
         }
 
         // Handle system messages based on count_system setting
@@ -87,17 +146,11 @@ export default async ({inputs, settings, config}) => {
 
         // Only process non-system messages if we have room and token limit > 0
         if (maxTokens > 0 && (systemTokens <= maxTokens || !countSystem)) {
-            for (let i = nonSystemMessages.length - 1; i >= 0; i--) {
-                const message = nonSystemMessages[i];
-                const messageTokens = countMessageTokens(message);
-                
-                if (totalTokens + messageTokens <= maxTokens) {
-                    result.push(message);
-                    totalTokens += messageTokens;
-                } else {
-                    truncated = true;
-                    break;
-                }
+            const [kept, nonSystemTokens] = fitRun([...nonSystemMessages].reverse(), maxTokens - totalTokens);
+            result.push(...nonSystemMessages.slice(nonSystemMessages.length - kept));
+            totalTokens += nonSystemTokens;
+            if (kept < nonSystemMessages.length) {
+                truncated = true;
             }
         } else if (maxTokens > 0 && systemTokens > maxTokens && countSystem) {
             // System messages exceed limit and count_system is true, so non-system messages are truncated
@@ -111,13 +164,15 @@ export default async ({inputs, settings, config}) => {
             return aIndex - bIndex;
         });
 
+        const output = settings.annotate === true ? result.map(annotateMessage) : result;
+
         encoding.free();
 
         // Count system messages in the result
         const resultSystemCount = result.filter(msg => msg && msg.role === 'system').length;
 
         return {
-            messages: result,
+            messages: output,
             token_count: totalTokens,
             truncated: truncated,
             system_count: resultSystemCount
@@ -1,6 +1,9 @@
-import tiktoken
+from heapq import merge
 from typing import Any, Dict, List, Union
 
+from zv1.utilities.tokenizer import get_tokenizer, validate_precision
+from zv1.utilities.truncation import keep_tail
+
 async def process(inputs: Dict[str, Any], settings: Dict[str, Any], config: Dict[str, Any], nodeConfig: Dict[str, Any]) -> Dict[str, Any]:
     try:
         messages = inputs.get('messages')
@@ -13,100 +16,81 @@ async def process(inputs: Dict[str, Any], settings: Dict[str, Any], config: Dict
             raise Exception("Max tokens must be a non-negative integer")
 
         tokenizer = settings.get('tokenizer', 'cl200k_base')
-        if tokenizer not in ['cl200k_base', 'cl100k_base']:
-            raise Exception(f"Unsupported tokenizer: {tokenizer}. Only cl200k_base and cl100k_base are supported.")
-
-        count_system = settings.get('count_system', False)  # Default to False
+        service = get_tokenizer()
+        service.encoding(tokenizer)
 
-        encoding_name = 'cl200k_base' if tokenizer == 'cl200k_base' else 'cl100k_base'
-        encoding = tiktoken.get_encoding(encoding_name)
-
-        # Helper function to extract text content from message
-        def get_message_text(message):
-            if not isinstance(message, dict):
-                return ''
-            content = message.get('content', '')
-            if isinstance(content, str):
-                return content
-            elif isinstance(content, list):
-                text_parts = []
-                for item in content:
-                    if isinstance(item, dict) and item.get('type') == 'text' and 'text' in item:
-                        text_parts.append(item['text'])
-                return ' '.join(text_parts)
-            else:
-                return str(content)
+        # exact, or estimate to tokenize only the messages near the cut point
+        precision = validate_precision(settings.get('precision', 'exact'))
 
-        # Helper function to count tokens in a message
-        def count_message_tokens(message):
-            text = get_message_text(message)
-            return len(encoding.encode(text))
+        count_system = settings.get('count_system', False)  # Default to False
 
-        # Separate system and non-system messages
-        system_messages = []
-        non_system_messages = []
+        # Separate system and non-system messages by position
+        system_indexes = []
+        non_system_indexes = []
 
-        for message in messages:
+        for index, message in enumerate(messages):
             if isinstance(message, dict) and message.get('role') == 'system':
-                system_messages.append(message)
+                system_indexes.append(index)
             else:
-                non_system_messages.append(message)
+                non_system_indexes.append(index)
 
-        # Count tokens in system messages
-        system_tokens = 0
-        for message in system_messages:
-            system_tokens += count_message_tokens(message)
+        # Count tokens in system messages; estimate takes their UTF-8 bounds
+        # (never fewer than their tokens) and counts them only when those overflow
+        system_messages = [messages[i] for i in system_indexes]
+        system_tokens = None
+        if precision == 'estimate':
+            system_tokens = sum(service.bound_messages(system_messages, tokenizer))
+        if system_tokens is None or system_tokens > max_tokens:
+            system_tokens = sum(service.count_messages(system_messages, tokenizer))
 
         # Handle system messages based on count_system setting
-        result = []
+        kept_system = []
+        kept_non_system = []
         total_tokens = 0
         truncated = False
 
         if max_tokens == 0:
             # Zero token limit - don't include any messages
-            truncated = len(system_messages) > 0 or len(non_system_messages) > 0
+            truncated = len(messages) > 0
         elif count_system:
             # System messages count toward limit - only include if they fit
             if system_tokens <= max_tokens:
-                result.extend(system_messages)
+                kept_system = system_indexes
                 total_tokens = system_tokens
             else:
                 # System messages exceed limit - don't include them
-                truncated = len(system_messages) > 0
+                truncated = len(system_indexes) > 0
         else:
             # System messages don't count toward limit - always include them
-            result.extend(system_messages)
+            kept_system = system_indexes
             total_tokens = system_tokens
             if system_tokens > max_tokens:
                 truncated = True
 
         # Only process non-system messages if we have room and token limit > 0
         if max_tokens > 0 and (system_tokens <= max_tokens or not count_system):
-            for i in range(len(non_system_messages) - 1, -1, -1):
-                message = non_system_messages[i]
-                message_tokens = count_message_tokens(message)
-                
-                if total_tokens + message_tokens <= max_tokens:
-                    result.append(message)
-                    total_tokens += message_tokens
-                else:
-                    truncated = True
-                    break
+            kept_non_system, non_system_tokens = keep_tail(
+                service, messages, tokenizer, max_tokens - total_tokens, non_system_indexes, precision=precision
+            )
+            total_tokens += non_system_tokens
+            if len(kept_non_system) < len(non_system_indexes):
+                truncated = True
         elif max_tokens > 0 and system_tokens > max_tokens and count_system:
             # System messages exceed limit and count_system is true, so non-system messages are truncated
-            truncated = len(non_system_messages) > 0
+            truncated = len(non_system_indexes) > 0
 
-        # Sort result to maintain original order (system messages first, then others)
-        result.sort(key=lambda x: messages.index(x) if x in messages else 0)
+        # Restore the original order by merging the kept positions
+        result = [messages[i] for i in merge(kept_system, kept_non_system)]
 
-        # Count system messages in the result
-        result_system_count = len([msg for msg in result if isinstance(msg, dict) and msg.get('role') == 'system'])
+        # Opt-in: carry the counts with the messages, checked against a digest of their content
+        if settings.get('annotate', False):
+            result = service.annotate(result, tokenizer)
 
         return {
             "messages": result,
             "token_count": total_tokens,
             "truncated": truncated,
-            "system_count": result_system_count
+            "system_count": len(kept_system)
         }
 
     except Exception as error:
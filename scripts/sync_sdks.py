@@ -1,6 +1,7 @@
 import os
 import shutil
 import json
+import hashlib
 
 # Define paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -10,6 +11,8 @@ TEST_FLOWS_DIR = os.path.join(BASE_DIR, "../tests")  # Centralized source of all
 SDK_DIR = os.path.join(BASE_DIR, "../sdks")  # Engines directory
 MASTER_CONFIG_PATH = os.path.join(BASE_DIR, "../nodes/all-nodes.config.json")  # Path for master config file
 COMPRESSED_MASTER_CONFIG_PATH = os.path.join(BASE_DIR, "../nodes/all-nodes-simple.config.json")  # Path for compressed master config file
+REGISTRY_INDEX_PATH = os.path.join(BASE_DIR, "../nodes/all-nodes.index.json")  # Path for the node registry index
+REGISTRY_INDEX_VERSION = 1
 
 # Mapping of engines to their src/nodes directories and file extensions
 SDK_TARGETS = {
@@ -17,10 +20,10 @@ SDK_TARGETS = {
         "path": os.path.join(SDK_DIR, "nodejs"),
         "extensions": [".js", ".ts"]
     },
-    # "python": {
-    #     "path": os.path.join(SDK_DIR, "python"),
-    #     "extensions": [".py"]
-    # },
+    "python": {
+        "path": os.path.join(SDK_DIR, "python"),
+        "extensions": [".py"]
+    },
     # "csharp": {
     #     "path": os.path.join(SDK_DIR, "csharp"),
     #     "extensions": [".cs"]
@@ -34,7 +37,7 @@ def create_master_config():
     master_config = []
 
     print(f"Scanning nodes directory: {NODES_DIR}")
-    for node in os.listdir(NODES_DIR):
+    for node in sorted(os.listdir(NODES_DIR)):
         node_path = os.path.join(NODES_DIR, node)
         print(f"Checking node: {node_path}")
         if os.path.isdir(node_path):
@@ -42,7 +45,7 @@ def create_master_config():
             print(f"Looking for {node}.config.json at: {config_file}")
             if os.path.exists(config_file):
                 print(f"Found {node}.config.json for node {node}")
-                with open(config_file, "r") as f:
+                with open(config_file, "r", encoding="utf-8") as f:
                     try:
                         config_data = json.load(f)
                         config_data["id"] = node  # Add the node name as the "id"
@@ -52,13 +55,26 @@ def create_master_config():
             else:
                 print(f"No {node}.config.json found for node {node}")
 
-    # Write the master config to a file
-    with open(MASTER_CONFIG_PATH, "w") as f:
-        json.dump(master_config, f, indent=4)
+    # Write the master config to a file, recording where each entry starts and ends
+    # Produces the same text as json.dump(master_config, f, indent=4, ensure_ascii=False)
+    config_spans = {}
+    with open(MASTER_CONFIG_PATH, "wb") as f:
+        f.write(b"[" if master_config else b"[]")
+        for i, config_data in enumerate(master_config):
+            entry = json.dumps(config_data, indent=4, ensure_ascii=False).replace("\n", "\n    ")
+            f.write(b",\n    " if i else b"\n    ")
+            offset = f.tell()
+            data = entry.encode("utf-8")
+            f.write(data)
+            config_spans[config_data["id"]] = [offset, len(data)]
+        if master_config:
+            f.write(b"\n]")
+
+    create_registry_index(config_spans)
 
     # use master_config to create a smaller config for the server, that only includes the name, id, and description in a csv format
     # add headers to the file
-    with open(COMPRESSED_MASTER_CONFIG_PATH, "w") as f:
+    with open(COMPRESSED_MASTER_CONFIG_PATH, "w", encoding="utf-8") as f:
         f.write("id,display_name,description\n")
         sorted_nodes = sorted(master_config, key=lambda x: x['id'])
         for node in sorted_nodes:
@@ -66,6 +82,41 @@ def create_master_config():
   
     print(f"Master configuration file created at {MASTER_CONFIG_PATH} with {len(master_config)} entries")
 
+def _file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def create_registry_index(config_spans):
+    """
+    Create a compact index next to the master config so runtimes can load single node types
+    without scanning the nodes directory or parsing the whole master config.
+
+    Each node id maps to the byte span of its entry in all-nodes.config.json and, per
+    language, the path of its process file (relative to the nodes directory) and a
+    content hash of that file.
+    """
+    index = {
+        "version": REGISTRY_INDEX_VERSION,
+        "config_file": os.path.basename(MASTER_CONFIG_PATH),
+        "config_size": os.path.getsize(MASTER_CONFIG_PATH),
+        "nodes": {},
+    }
+
+    for node, span in config_spans.items():
+        node_path = os.path.join(NODES_DIR, node)
+        processes = {}
+        for file in sorted(os.listdir(node_path)):
+            prefix = f"{node}.process."
+            if file.startswith(prefix):
+                processes[file[len(prefix):]] = [f"{node}/{file}", _file_hash(os.path.join(node_path, file))]
+        index["nodes"][node] = {"config": span, "process": processes}
+
+    with open(REGISTRY_INDEX_PATH, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+
+    print(f"Registry index created at {REGISTRY_INDEX_PATH} with {len(index['nodes'])} entries")
+
 def copy_nodes_and_types():
     """
     Copy node files and type files into the nodes/types directories for each engine.
@@ -105,6 +156,10 @@ def copy_nodes_and_types():
                     elif file.endswith(".tests.json"):
                         shutil.copyfile(src_file, dest_file)
 
+        # Copy the master config and its registry index so runtimes can load nodes lazily
+        for index_file in (MASTER_CONFIG_PATH, REGISTRY_INDEX_PATH):
+            shutil.copyfile(index_file, os.path.join(target_nodes_dir, os.path.basename(index_file)))
+
         # Prepare types directories
         target_types_dir = os.path.join(target_base_dir, "types")
         if os.path.exists(target_types_dir):
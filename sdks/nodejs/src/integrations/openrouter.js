@@ -44,6 +44,7 @@ export default class OpenRouterIntegration {
               delete message.id;
               delete message.participant_id;
               delete message.timestamp;
+              delete message._token_counts;
 
               if(message.tool_calls !== undefined && message.tool_calls.length === 0){
                 delete message.tool_calls;
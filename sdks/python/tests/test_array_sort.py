@@ -0,0 +1,55 @@
+"""
+array-sort: multi-key specs and top-k limits
+"""
+
+import asyncio
+
+from zv1.registry import load_process_module
+from zv1.utilities.loaders import default_nodes_dir
+from zv1.utilities.table import from_rows
+from zv1.utilities.typers import load_custom_types
+
+ROWS = [
+    {"id": 1, "team": "b", "score": 7, "day": "2024-03-01"},
+    {"id": 2, "team": "a", "score": 9, "day": "2024-01-15"},
+    {"id": 3, "team": "b", "score": None, "day": "2024-03-01"},
+    {"id": 4, "team": "A", "score": 9, "day": None},
+    {"id": 5, "team": "a", "score": 2, "day": "2023-12-31"},
+]
+
+
+def _sort(array, settings):
+    process = load_process_module("array-sort", f"{default_nodes_dir()}/array-sort/array-sort.process.py", "test")
+    return asyncio.run(process({"array": array}, settings, {}, {}))["array"]
+
+
+def _ids(rows):
+    return [row["id"] for row in rows]
+
+
+def test_limit():
+    settings = {"property": "score", "type": "number", "order": "descending"}
+    full = _sort(ROWS, settings)
+    assert _ids(full) == [3, 2, 4, 1, 5]
+    assert _sort(ROWS, {**settings, "limit": 2}) == full[:2]
+    assert _sort(ROWS, {**settings, "limit": 0}) == []
+    assert _sort(ROWS, {**settings, "limit": 10}) == full
+    assert _sort([3, 1, 2], {"type": "number", "limit": 2}) == [1, 2]
+
+
+def test_sort_by():
+    sort_by = [
+        {"property": "team", "case_sensitive": False},
+        {"property": "score", "type": "number", "order": "descending"},
+    ]
+    assert all(map(load_custom_types()["sort_key"], sort_by))
+    assert _ids(_sort(ROWS, {"sort_by": sort_by})) == [2, 4, 5, 3, 1]
+    assert _ids(_sort(ROWS, {"sort_by": sort_by, "limit": 3})) == [2, 4, 5]
+
+    # Descending strings in a mixed sort, with the other key a date
+    sort_by = [{"property": "team", "order": "descending"}, {"property": "day", "type": "date"}]
+    assert _ids(_sort(ROWS, {"sort_by": sort_by})) == [1, 3, 5, 2, 4]
+
+    table = from_rows(ROWS)
+    result = _sort(table, {"sort_by": [{"property": "day", "type": "date", "order": "descending"}, {"property": "id"}], "limit": 3})
+    assert result["columns"]["id"] == (4, 1, 3)
@@ -0,0 +1,53 @@
+"""
+Port cache: bounded per-port ring buffers read through sequence cursors
+"""
+
+import pytest
+
+from zv1.utilities.cache import CacheManager
+
+
+def test_ring_buffer_keeps_latest_values():
+    cache = CacheManager(capacity=3)
+    for value in range(10):
+        cache.set("loop", "value", value)
+
+    assert cache.get("loop", "value") == 9
+    assert cache.get_history("loop", "value") == [7, 8, 9]
+    assert cache.get_latest_sequence("loop", "value") == 10
+    assert cache.get_stats()["dropped_entries"] == 7
+
+
+def test_cursor_reads_values_in_order():
+    cache = CacheManager(capacity=4)
+    first = cache.set("a", "out", "x")
+    cache.set("b", "out", "other")
+    cache.set("a", "out", "y")
+    cache.set("a", "out", "z")
+
+    assert cache.get_next("a", "out", first).value == "y"
+    assert cache.get_new("a", "out", first) == ["y", "z"]
+    assert cache.has_new("a", "out", first)
+    assert cache.get_next("a", "out", cache.get_latest_sequence("a", "out")) is None
+
+
+def test_lagging_cursor_resumes_at_oldest_retained_value():
+    cache = CacheManager(capacity=2)
+    for value in "abcd":
+        cache.set("a", "out", value)
+
+    assert cache.get_next("a", "out", 0).value == "c"
+
+
+def test_full_history_mode():
+    cache = CacheManager(capacity=None)
+    for value in range(100):
+        cache.set("loop", "value", value)
+
+    assert cache.get_history_length("loop", "value") == 100
+    assert cache.get_stats()["dropped_entries"] == 0
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        CacheManager(capacity=0)
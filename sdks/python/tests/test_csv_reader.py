@@ -0,0 +1,143 @@
+"""
+Chunked CSV reading, type inference and the csv-parser node's columnar
+and streaming outputs
+"""
+
+import asyncio
+import json
+import shutil
+
+import pytest
+
+from zv1 import create
+from zv1.registry import load_process_module
+from zv1.utilities import csv_reader
+from zv1.utilities.csv_reader import ColumnBuilder, infer_type, iter_row_chunks, open_lines
+from zv1.utilities.loaders import default_nodes_dir
+
+CHUNKS_SOURCE = '''async def process(inputs, settings, config, nodeConfig):
+    return {"chunks": [len(chunk) async for chunk in inputs["rows"]]}
+'''
+
+CSV = "id,name,score,active,joined\n1,Ann,9.5,true,2024-01-02\n2,Bob,,FALSE,2024-01-03\n3,Cy,7,true,\n"
+
+
+def _rows(source, **options):
+    with open_lines(source) as lines:
+        return [row for chunk in iter_row_chunks(lines, **options) for row in chunk]
+
+
+def test_sources_parse_alike(tmp_path, monkeypatch):
+    monkeypatch.setattr(csv_reader, "BLOCK_SIZE", 3)
+    text = '﻿a,"b\nc",é\r\n1,2,3'
+    path = tmp_path / "data.csv"
+    path.write_bytes(text.encode())
+    empty = tmp_path / "empty.csv"
+    empty.write_bytes(b"")
+
+    expected = [["a", "b\nc", "é"], ["1", "2", "3"]]
+    assert _rows(text.lstrip("﻿")) == expected
+    assert _rows(text.encode()) == expected
+    assert _rows(memoryview(text.encode())) == expected
+    assert _rows(path) == expected
+    assert _rows(empty) == []
+    with pytest.raises(TypeError, match="Unsupported CSV source"):
+        _rows(42)
+
+
+def test_row_chunks(monkeypatch):
+    monkeypatch.setattr(csv_reader, "CHUNK_ROWS", 2)
+    with open_lines("a\n\nb\nc\n d \n") as lines:
+        assert list(iter_row_chunks(lines)) == [[["a"]], [["b"], ["c"]], [["d"]]]
+
+
+def test_infer_type():
+    assert infer_type("12") == "integer"
+    assert infer_type("1.5", "integer") == "number"
+    assert infer_type("007") == "string"
+    assert infer_type("True") == "boolean"
+    assert infer_type("2024-02-30") == "date"
+    assert infer_type("2024-02-03T10:00:00Z", "date") == "datetime"
+    assert infer_type("2024-13-01") == "string"
+    assert infer_type("yes", "boolean") == "string"
+
+
+def test_column_builder_widens_and_converts():
+    builder = ColumnBuilder()
+    builder.add_rows([["1", "a"], ["2"]], widen=True)
+    builder.add_rows([["", "b", "1e3"]], widen=True)
+    columns, types = builder.finish(["n", "s", "x"])
+    assert columns == {"n": [1, 2, None], "s": ["a", "", "b"], "x": [None, None, 1000.0]}
+    assert types == {"n": "integer", "s": "string", "x": "number"}
+
+
+def _run_node(inputs, settings):
+    process = load_process_module("csv-parser", f"{default_nodes_dir()}/csv-parser/csv-parser.process.py", "test")
+    return asyncio.run(process(inputs, settings, {}, {}))
+
+
+def test_columns_output(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text(CSV)
+    result = _run_node({"csv": path}, {"output": "columns"})
+    assert result["success"]
+    assert result["headers"] == ["id", "name", "score", "active", "joined"]
+    assert result["data"] == {
+        "id": [1, 2, 3],
+        "name": ["Ann", "Bob", "Cy"],
+        "score": [9.5, None, 7.0],
+        "active": [True, False, True],
+        "joined": ["2024-01-02", "2024-01-03", None],
+    }
+    assert result["types"] == {"id": "integer", "name": "string", "score": "number", "active": "boolean", "joined": "date"}
+
+    result = _run_node({"csv": "1,x\n2,y,z"}, {"output": "columns", "has_headers": False})
+    assert result["data"] == {"column_1": [1, 2], "column_2": ["x", "y"], "column_3": ["", "z"]}
+
+
+@pytest.fixture
+def nodes_dir(tmp_path):
+    for node_type in ("input-data", "output-data", "csv-parser"):
+        shutil.copytree(f"{default_nodes_dir()}/{node_type}", tmp_path / node_type)
+    node_dir = tmp_path / "chunks"
+    node_dir.mkdir()
+    (node_dir / "chunks.config.json").write_text(json.dumps({
+        "display_name": "Chunks",
+        "inputs": [{"name": "rows", "type": "array", "required": True, "accepts_stream": True}],
+        "outputs": [{"name": "chunks", "type": "array"}],
+    }))
+    (node_dir / "chunks.process.py").write_text(CHUNKS_SOURCE)
+    return str(tmp_path)
+
+
+def test_streamed_rows_reach_consumers_in_chunks(nodes_dir, monkeypatch):
+    monkeypatch.setattr(csv_reader, "CHUNK_ROWS", 100)
+    flow = {
+        "nodes": [
+            {"id": "in", "type": "input-data", "settings": {"key": "csv", "type": "any"}},
+            {"id": "parse", "type": "csv-parser", "settings": {"stream": True}},
+            {"id": "chunks", "type": "chunks"},
+            {"id": "out-rows", "type": "output-data", "settings": {"key": "rows"}},
+            {"id": "out-chunks", "type": "output-data", "settings": {"key": "chunks"}},
+        ],
+        "links": [
+            {"from": {"node_id": "in", "port_name": "value"}, "to": {"node_id": "parse", "port_name": "csv"}},
+            {"from": {"node_id": "parse", "port_name": "data"}, "to": {"node_id": "chunks", "port_name": "rows"}},
+            {"from": {"node_id": "parse", "port_name": "data"}, "to": {"node_id": "out-rows", "port_name": "value"}},
+            {"from": {"node_id": "chunks", "port_name": "chunks"}, "to": {"node_id": "out-chunks", "port_name": "value"}},
+        ],
+    }
+    csv = "n\n" + "".join(f"{index}\n" for index in range(250))
+
+    async def scenario():
+        engine = await create(flow, {"nodes_dir": nodes_dir})
+        try:
+            return await engine.run({"csv": csv})
+        finally:
+            await engine.cleanup()
+
+    outputs = asyncio.run(scenario())["outputs"]
+    # The header row is taken from the first chunk
+    assert outputs["chunks"] == [99, 100, 51]
+    assert len(outputs["rows"]) == 250
+    assert outputs["rows"][-1] == {"n": "249"}
@@ -0,0 +1,54 @@
+"""
+Chunked CSV writing and the csv-stringifier node's columnar, file and
+streaming modes
+"""
+
+import asyncio
+
+from zv1.registry import load_process_module
+from zv1.utilities import csv_writer
+from zv1.utilities.csv_writer import discover_headers, iter_csv_chunks, iter_records
+from zv1.utilities.loaders import default_nodes_dir
+
+
+def _run_node(inputs, settings, config=None):
+    process = load_process_module(
+        "csv-stringifier", f"{default_nodes_dir()}/csv-stringifier/csv-stringifier.process.py", "test"
+    )
+    return asyncio.run(process(inputs, settings, config or {}, {}))
+
+
+def test_discover_headers_keeps_first_seen_order():
+    assert discover_headers([{"b": 1, "a": 2}, {"c": 3, "a": 4}, {}]) == ["b", "a", "c"]
+
+
+def test_chunks_join_to_the_whole_csv(monkeypatch):
+    monkeypatch.setattr(csv_writer, "CHUNK_ROWS", 2)
+    records = iter_records([[1, "a"], [2, "b"], [3, "c"]], [])
+    chunks = list(iter_csv_chunks(records, headers=["n", "s"], newline="\r\n"))
+    assert chunks == ['"n","s"\r\n1,"a"\r\n2,"b"', '\r\n3,"c"']
+    assert list(iter_csv_chunks([], headers=None)) == []
+
+
+def test_columns_input():
+    result = _run_node({"data": {"n": [1, 2, 3], "s": ["a", None]}}, {"quote_strings": False})
+    assert result == {"csv": "n,s\n1,a\n2,\n3,", "error": "", "success": True}
+
+
+def test_file_output(tmp_path):
+    path = tmp_path / "out.csv"
+    result = _run_node({"data": [{"a": 1}, {"b": 2}], "file": path}, {})
+    assert result["csv"] == str(path)
+    assert path.read_text() == '"a","b"\n1,""\n"",2'
+
+    # Plain strings can't name a file
+    result = _run_node({"data": [{"a": 1}], "file": str(path)}, {})
+    assert result["success"] is False
+
+
+def test_stream_publishes_chunks(monkeypatch):
+    monkeypatch.setattr(csv_writer, "CHUNK_ROWS", 1)
+    updates = []
+    result = _run_node({"data": [[1], [2]]}, {"stream": True}, {"on_node_update": updates.append})
+    assert [update["data"]["csv"] for update in updates] == ["1", "\n2"]
+    assert result["csv"] == "1\n2"
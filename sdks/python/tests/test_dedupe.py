@@ -0,0 +1,52 @@
+"""
+Structural hashing and index-only deduplication
+"""
+
+import asyncio
+
+from zv1.registry import load_process_module
+from zv1.utilities.dedupe import json_equal, structural_hash, unique_indices
+from zv1.utilities.frozen import freeze
+from zv1.utilities.loaders import default_nodes_dir
+
+
+def _run_unique(array, settings):
+    process = load_process_module(
+        "array-unique", f"{default_nodes_dir()}/array-unique/array-unique.process.py", "test"
+    )
+    return asyncio.run(process({"array": array}, settings, {}, {}))
+
+
+def test_structural_hash():
+    record = {"id": 1, "tags": ["a", {"b": None}], "meta": {"x": 1.5, "y": [1, 2]}}
+    reordered = {"meta": {"y": (1, 2), "x": 1.5}, "tags": ("a", {"b": None}), "id": 1}
+    assert structural_hash(record) == structural_hash(reordered) == structural_hash(freeze(record))
+    assert structural_hash(record) != structural_hash({**record, "id": 2})
+    assert structural_hash({"s": {1, 2}}) == structural_hash({"s": {1, 2}})
+
+
+def test_json_equal():
+    assert json_equal({"a": [1, {"b": "c"}]}, {"a": (1, {"b": "c"})})
+    assert not json_equal({"a": 1}, {"a": 1.0})
+    assert not json_equal([True], [1])
+    assert not json_equal({"a": None}, {"b": None})
+
+
+def test_unique_indices():
+    keys = [1, True, 1.0, "1", None, "None", 1]
+    assert unique_indices(keys) == ([0, 3, 4, 5], [1, 2, 6])
+    assert unique_indices(keys, json_equal) == ([0, 1, 2, 3, 4, 5], [6])
+    records = [{"id": i % 50, "tags": [i % 50]} for i in range(300)]
+    kept, duplicates = unique_indices(records, json_equal)
+    assert kept == list(range(50)) and len(duplicates) == 250
+    assert unique_indices(records, json_equal, prefilter=True) == (kept, duplicates)
+    assert unique_indices([], prefilter=True) == ([], [])
+
+
+def test_array_unique_modes():
+    records = [{"id": 1, "v": [1]}, {"v": [1], "id": 1}, {"id": 1, "v": [True]}]
+    assert _run_unique(records, {"mode": "json"})["indices"] == [0, 2]
+    assert _run_unique(records, {"mode": "json", "prefilter": True})["indices"] == [0, 2]
+    assert _run_unique(records, {"mode": "value"})["indices"] == [0]
+    result = _run_unique(["A", "a", None, "None"], {"case_sensitive": False})
+    assert result["array"] == ["A", None, "None"] and result["duplicates"] == ["a"]
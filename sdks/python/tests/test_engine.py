@@ -0,0 +1,59 @@
+"""
+Engine scheduling tests
+
+Independent branches of a flow run as concurrent tasks, so a fan-out of
+delay nodes finishes in roughly the longest delay instead of their sum.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from zv1 import Zv1Error, create
+
+
+def _fan_out_flow(delays_ms):
+    nodes = [{"id": "in", "type": "input-data", "settings": {"key": "value", "type": "any"}}]
+    links = []
+    for index, delay_ms in enumerate(delays_ms):
+        nodes.append({"id": f"ms-{index}", "type": "number", "settings": {"value": delay_ms, "max": 10000}})
+        nodes.append({"id": f"delay-{index}", "type": "delay"})
+        nodes.append({"id": f"out-{index}", "type": "output-data", "settings": {"key": f"out_{index}"}})
+        links.append({"from": {"node_id": "in", "port_name": "value"}, "to": {"node_id": f"delay-{index}", "port_name": "value"}})
+        links.append({"from": {"node_id": f"ms-{index}", "port_name": "value"}, "to": {"node_id": f"delay-{index}", "port_name": "delay_ms"}})
+        links.append({"from": {"node_id": f"delay-{index}", "port_name": "result"}, "to": {"node_id": f"out-{index}", "port_name": "value"}})
+    return {"nodes": nodes, "links": links}
+
+
+async def _run(flow, inputs, **run_options):
+    engine = await create(flow)
+    try:
+        return await engine.run(inputs, **run_options)
+    finally:
+        await engine.cleanup()
+
+
+def test_fan_out_branches_run_concurrently():
+    flow = _fan_out_flow([200, 200, 200])
+
+    start = time.perf_counter()
+    result = asyncio.run(_run(flow, {"value": "x"}))
+    elapsed = time.perf_counter() - start
+
+    assert result["outputs"] == {"out_0": "x", "out_1": "x", "out_2": "x"}
+    assert elapsed < 0.5
+
+
+def test_timeline_records_every_node():
+    result = asyncio.run(_run(_fan_out_flow([0, 0]), {"value": 1}))
+
+    completed = {entry["node_id"] for entry in result["timeline"] if entry["status"] == "success"}
+    assert completed == {"in", "ms-0", "ms-1", "delay-0", "delay-1", "out-0", "out-1"}
+
+
+def test_run_timeout_raises_timeout_error():
+    with pytest.raises(Zv1Error) as excinfo:
+        asyncio.run(_run(_fan_out_flow([2000]), {"value": 1}, timeout=0.1))
+
+    assert excinfo.value.error_type == "timeout"
@@ -0,0 +1,85 @@
+"""
+Frozen port values: shared by reference between the cache, downstream
+nodes and the timeline, and copied only on request
+"""
+
+import asyncio
+import copy
+import pickle
+
+import pytest
+
+from zv1 import create
+from zv1.utilities.frozen import FrozenDict, FrozenList, freeze, thaw
+
+
+def test_freeze_is_recursive_and_idempotent():
+    value = freeze({"messages": [{"role": "user", "content": "hi"}]})
+
+    assert isinstance(value, FrozenDict)
+    assert isinstance(value["messages"], FrozenList)
+    assert isinstance(value["messages"][0], FrozenDict)
+    assert value == {"messages": [{"role": "user", "content": "hi"}]}
+    assert freeze(value) is value
+
+
+def test_frozen_values_reject_mutation():
+    value = freeze({"items": [1, 2]})
+
+    with pytest.raises(TypeError):
+        value["other"] = 1
+    with pytest.raises(TypeError):
+        value["items"].append(3)
+    with pytest.raises(TypeError):
+        value["items"] += [3]
+
+
+def test_copies_are_mutable():
+    value = freeze({"items": [1, 2]})
+
+    shallow = list(value["items"])
+    shallow.append(3)
+    deep = copy.deepcopy(value)
+    deep["items"].append(3)
+    thawed = thaw(value)
+    thawed["items"].append(3)
+
+    assert value == {"items": [1, 2]}
+    assert type(thawed) is dict and type(thawed["items"]) is list
+
+
+def test_frozen_values_pickle():
+    value = freeze({"items": [1, {"a": 2}]})
+    restored = pickle.loads(pickle.dumps(value, protocol=5))
+
+    assert restored == value
+    assert isinstance(restored["items"], FrozenList)
+
+
+def test_engine_shares_port_values_by_reference():
+    flow = {
+        "nodes": [
+            {"id": "in", "type": "input-data", "settings": {"key": "value", "type": "any"}},
+            {"id": "out-a", "type": "output-data", "settings": {"key": "a"}},
+            {"id": "out-b", "type": "output-data", "settings": {"key": "b"}},
+        ],
+        "links": [
+            {"from": {"node_id": "in", "port_name": "value"}, "to": {"node_id": "out-a", "port_name": "value"}},
+            {"from": {"node_id": "in", "port_name": "value"}, "to": {"node_id": "out-b", "port_name": "value"}},
+        ],
+    }
+
+    async def scenario():
+        engine = await create(flow)
+        try:
+            return await engine.run({"value": [{"content": "x" * 1000}]})
+        finally:
+            await engine.cleanup()
+
+    result = asyncio.run(scenario())
+    outputs = result["outputs"]
+    timeline = {entry["node_id"]: entry for entry in result["timeline"]}
+
+    assert outputs["a"] == [{"content": "x" * 1000}]
+    assert outputs["a"] is outputs["b"]
+    assert timeline["out-a"]["inputs"]["value"] is outputs["a"]
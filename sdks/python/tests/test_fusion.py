@@ -0,0 +1,113 @@
+"""
+Fused chains of array nodes
+"""
+
+import asyncio
+
+import pytest
+
+from zv1 import create
+from zv1.fusion import Stage, rewrite
+from zv1.plan import compile_plan
+from zv1.utilities.loaders import default_nodes_dir, load_nodes
+
+
+class _Loader:
+    nodes_dir = default_nodes_dir()
+
+    def log_debug(self, *args):
+        pass
+
+
+def _link(source, source_port, target, target_port):
+    return {"from": {"node_id": source, "port_name": source_port}, "to": {"node_id": target, "port_name": target_port}}
+
+
+def _pipeline_flow(observe_sort=False):
+    """input -> filter (a > min) -> sort (b, descending) -> slice (0, end) -> map (property)"""
+    nodes = [
+        {"id": "data", "type": "input-data", "settings": {"key": "data", "type": "any"}},
+        {"id": "min", "type": "input-data", "settings": {"key": "min", "type": "any"}},
+        {"id": "end", "type": "input-data", "settings": {"key": "end", "type": "any"}},
+        {"id": "property", "type": "input-data", "settings": {"key": "property", "type": "any"}},
+        {"id": "filter", "type": "array-filter", "settings": {"condition": "greater_than", "property": "a"}},
+        {"id": "sort", "type": "array-sort", "settings": {"property": "b", "type": "number", "order": "descending"}},
+        {"id": "slice", "type": "array-slice"},
+        {"id": "map", "type": "array-map"},
+        {"id": "out", "type": "output-data", "settings": {"key": "result"}},
+    ]
+    links = [
+        _link("data", "value", "filter", "array"),
+        _link("min", "value", "filter", "value"),
+        _link("filter", "array", "sort", "array"),
+        _link("sort", "array", "slice", "array"),
+        _link("end", "value", "slice", "end"),
+        _link("slice", "array", "map", "array"),
+        _link("property", "value", "map", "property"),
+        _link("map", "array", "out", "value"),
+    ]
+    if observe_sort:
+        nodes.append({"id": "sorted", "type": "output-data", "settings": {"key": "sorted"}})
+        links.append(_link("sort", "array", "sorted", "value"))
+    return {"nodes": nodes, "links": links}
+
+
+INPUTS = {
+    "data": [{"a": a, "b": (a * 7) % 10} for a in range(20)],
+    "min": 5,
+    "end": 3,
+    "property": "a",
+}
+
+
+async def _run(flow, inputs, config=None):
+    engine = await create(flow, config)
+    return await engine.run(inputs)
+
+
+def test_chains_stop_at_observed_ports():
+    flow = _pipeline_flow()
+    assert compile_plan(flow, load_nodes(_Loader(), flow)).fused_chains == {"filter": ["filter", "sort", "slice", "map"]}
+
+    # The sort's array also feeds an output, so the chain splits after it
+    flow = _pipeline_flow(observe_sort=True)
+    assert compile_plan(flow, load_nodes(_Loader(), flow)).fused_chains == {"filter": ["filter", "sort"], "slice": ["slice", "map"]}
+
+
+def test_fused_chain_matches_node_by_node():
+    fused = asyncio.run(_run(_pipeline_flow(), INPUTS))
+    unfused = asyncio.run(_run(_pipeline_flow(), INPUTS, {"fuse_nodes": False}))
+
+    assert fused["outputs"] == unfused["outputs"] == {"result": [7, 17, 14]}
+    entries = {entry["node_id"]: entry for entry in fused["timeline"]}
+    assert entries["map"]["fused_nodes"] == ["filter", "sort", "slice", "map"]
+    assert "filter" not in entries and "sort" not in entries
+
+
+def test_callbacks_run_node_by_node():
+    completed = []
+    result = asyncio.run(_run(_pipeline_flow(), INPUTS, {"on_node_complete": lambda payload: completed.append(payload["node_id"])}))
+
+    assert result["outputs"] == {"result": [7, 17, 14]}
+    assert {"filter", "sort", "slice", "map"} <= set(completed)
+
+
+def test_chain_raises_for_elements_past_a_slice():
+    inputs = {**INPUTS, "data": [{"a": 1, "b": 1}, {"a": "x", "b": 2}], "end": 0}
+
+    with pytest.raises(Exception, match="not supported"):
+        asyncio.run(_run(_pipeline_flow(), inputs))
+
+
+def test_rewrite_pushes_filters_and_limits_down():
+    def stage(node_type, inputs=None, settings=None):
+        return Stage(node_type, node_type, None, inputs or {}, settings or {})
+
+    stages = rewrite([stage("array-sort"), stage("array-filter"), stage("array-map"), stage("array-slice", {"start": 2, "end": 5})])
+
+    assert [s.node_type for s in stages] == ["array-filter", "array-sort", "array-map", "array-slice"]
+    assert stages[1].settings["limit"] == 5
+
+    # A slice counting from the end leaves the sort whole
+    stages = rewrite([stage("array-sort"), stage("array-slice", {"start": -2})])
+    assert "limit" not in stages[0].settings
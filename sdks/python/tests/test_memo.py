@@ -0,0 +1,181 @@
+"""
+Memoization of pure node outputs
+"""
+
+import array
+import asyncio
+
+import pytest
+
+from zv1 import create
+from zv1.utilities.frozen import freeze
+from zv1.utilities.memo import MemoCache
+from zv1.utilities.table import make_table
+
+
+def _input(key):
+    return {"id": key, "type": "input-data", "settings": {"key": key, "type": "number"}}
+
+
+def _link(source, source_port, target, target_port):
+    return {"from": {"node_id": source, "port_name": source_port}, "to": {"node_id": target, "port_name": target_port}}
+
+
+# (a + b) * c
+FLOW = {
+    "nodes": [
+        _input("a"), _input("b"), _input("c"),
+        {"id": "sum", "type": "add"},
+        {"id": "product", "type": "multiply"},
+        {"id": "out", "type": "output-data", "settings": {"key": "result"}},
+    ],
+    "links": [
+        _link("a", "value", "sum", "a"),
+        _link("b", "value", "sum", "b"),
+        _link("sum", "result", "product", "a"),
+        _link("c", "value", "product", "b"),
+        _link("product", "result", "out", "value"),
+    ],
+}
+
+
+def _run_all(memo, *input_sets, **config):
+    async def main():
+        results = []
+        for inputs in input_sets:
+            # Node by node: compiled into a scalar group, add and multiply aren't memoized
+            engine = await create(FLOW, {"memo_cache": memo, "fuse_nodes": False, **config})
+            results.append(await engine.run(inputs))
+        return results
+    return asyncio.run(main())
+
+
+def _memoized(result):
+    return {entry["node_id"] for entry in result["timeline"] if entry.get("memoized")}
+
+
+def test_identical_run_reuses_pure_outputs():
+    memo = MemoCache()
+    first, second = _run_all(memo, {"a": 1, "b": 2, "c": 3}, {"a": 1, "b": 2, "c": 3})
+
+    assert first["outputs"] == second["outputs"] == {"result": 9}
+    assert _memoized(first) == set()
+    assert _memoized(second) == {"sum", "product"}
+
+
+def test_changed_input_recomputes_only_its_downstream_cone():
+    memo = MemoCache()
+    _, changed = _run_all(memo, {"a": 1, "b": 2, "c": 3}, {"a": 1, "b": 2, "c": 4})
+
+    assert changed["outputs"] == {"result": 12}
+    assert _memoized(changed) == {"sum"}
+
+
+def test_memoize_can_be_disabled():
+    memo = MemoCache()
+    _run_all(memo, {"a": 1, "b": 2, "c": 3}, {"a": 1, "b": 2, "c": 3}, memoize=False)
+
+    assert len(memo) == 0
+
+
+def test_lru_is_bounded_by_size():
+    memo = MemoCache(max_bytes=40)
+    for index in range(5):
+        memo.set(f"key-{index}", {"value": "x" * 10})
+
+    assert memo.size <= 40
+    assert memo.get("key-0") is None
+    assert memo.get("key-4") == {"value": "x" * 10}
+
+
+def test_hits_are_independent_copies():
+    memo = MemoCache()
+    memo.set("key", {"items": [1, 2]})
+    memo.get("key")["items"].append(3)
+
+    assert memo.get("key") == {"items": [1, 2]}
+
+
+def test_unserializable_calls_are_not_memoized():
+    assert MemoCache.make_key("add", None, {"a": object()}, {}) is None
+    assert not MemoCache().set("key", {"value": lambda: None})
+    # JSON would hash 1 like "1"
+    assert MemoCache.make_key("add", None, {"a": {1: "x"}}, {}) is None
+    assert MemoCache.make_key("add", None, {"a": {"\u0000tuple": [1, 2]}}, {}) is None
+
+
+def test_tuples_and_typed_arrays_get_their_own_keys():
+    keys = [
+        MemoCache.make_key("mean", None, {"numbers": values}, {})
+        for values in ([1, 2], (1, 2), array.array("q", [1, 2]), array.array("d", [1, 2]), [(1, 2)], [[1, 2]])
+    ]
+    assert None not in keys
+    assert len(set(keys)) == len(keys)
+    table = freeze(make_table({"a": [1, 2, 3]}))
+    assert MemoCache.make_key("mean", None, {"numbers": table}, {}) == MemoCache.make_key("mean", None, {"numbers": make_table({"a": (1, 2, 3)})}, {})
+
+
+def test_hits_keep_the_types_of_a_miss():
+    memo = MemoCache()
+    outputs = {"row": (1, 2), "by_id": {1: "a"}, "tags": {"x"}}
+    memo.set("key", outputs)
+
+    assert memo.get("key") == outputs
+    assert type(memo.get("key")["row"]) is tuple
+
+
+def test_table_inputs_are_memoized():
+    flow = {
+        "nodes": [
+            {"id": "csv", "type": "input-data", "settings": {"key": "csv", "type": "string"}},
+            {"id": "parse", "type": "csv-parser", "settings": {"output": "table"}},
+            {"id": "mean", "type": "mean", "settings": {"column": "price"}},
+            {"id": "out", "type": "output-data", "settings": {"key": "mean"}},
+        ],
+        "links": [
+            _link("csv", "value", "parse", "csv"),
+            _link("parse", "data", "mean", "numbers"),
+            _link("mean", "result", "out", "value"),
+        ],
+    }
+
+    async def main():
+        memo = MemoCache()
+        results = []
+        for csv in ("id,price\n1,2\n2,4\n", "id,price\n1,2\n2,4\n", "id,price\n3,2\n4,4\n"):
+            engine = await create(flow, {"memo_cache": memo})
+            results.append(await engine.run({"csv": csv}))
+        return results
+
+    first, second, third = asyncio.run(main())
+    assert first["outputs"] == second["outputs"] == third["outputs"] == {"mean": 3}
+    assert _memoized(second) == {"parse", "mean"}
+    # Another id column parses to a new table, whose price column is the same as before
+    assert _memoized(third) == set()
+
+
+def test_nodes_reading_the_clock_are_not_memoized():
+    pytest.importorskip("pytz")
+    # Without a date, date-formatter formats the current time, so the same call differs between runs
+    flow = {
+        "nodes": [
+            {"id": "when", "type": "input-data", "settings": {"key": "when", "type": "any"}},
+            {"id": "format", "type": "date-formatter", "settings": {"format": "YYYY-MM-DD HH:mm:ss"}},
+            {"id": "out", "type": "output-data", "settings": {"key": "formatted"}},
+        ],
+        "links": [
+            _link("when", "value", "format", "date"),
+            _link("format", "formatted", "out", "value"),
+        ],
+    }
+
+    async def main():
+        memo = MemoCache()
+        results = []
+        for _ in range(2):
+            engine = await create(flow, {"memo_cache": memo})
+            results.append(await engine.run({"when": ""}))
+        return results
+
+    first, second = asyncio.run(main())
+    assert _memoized(first) == _memoized(second) == set()
@@ -0,0 +1,51 @@
+"""
+Process-pool offload of cpu_bound nodes
+"""
+
+import asyncio
+
+from zv1 import create
+from zv1.offload import SHARED_MEMORY_THRESHOLD, _pack, _unpack
+from zv1.utilities.frozen import freeze
+
+
+def test_small_payloads_travel_inline():
+    payload, block = _pack({"items": [1, 2, 3]})
+
+    assert block is None
+    assert _unpack(payload) == {"items": [1, 2, 3]}
+
+
+def test_large_payloads_use_shared_memory():
+    value = freeze({"text": "x" * SHARED_MEMORY_THRESHOLD, "blob": bytearray(b"\x01" * 1024)})
+    payload, block = _pack(value)
+    try:
+        assert payload[0] == "shared"
+        assert _unpack(payload) == value
+    finally:
+        block.close()
+        block.unlink()
+
+
+def test_cpu_bound_node_runs_in_worker_process():
+    flow = {
+        "nodes": [
+            {"id": "in", "type": "input-data", "settings": {"key": "value", "type": "any"}},
+            {"id": "unique", "type": "array-unique", "settings": {"mode": "value"}},
+            {"id": "out", "type": "output-data", "settings": {"key": "out"}},
+        ],
+        "links": [
+            {"from": {"node_id": "in", "port_name": "value"}, "to": {"node_id": "unique", "port_name": "array"}},
+            {"from": {"node_id": "unique", "port_name": "array"}, "to": {"node_id": "out", "port_name": "value"}},
+        ],
+    }
+
+    async def scenario():
+        engine = await create(flow, {"cpu_workers": 1, "memoize": False})
+        try:
+            return await engine.run({"value": [3, 1, 3, 2, 1]})
+        finally:
+            await engine.cleanup()
+
+    result = asyncio.run(scenario())
+    assert result["outputs"]["out"] == [3, 1, 2]
@@ -0,0 +1,103 @@
+"""
+Execution plan compilation and caching
+"""
+
+import asyncio
+import os
+import pickle
+
+from zv1 import create
+from zv1.plan import clear_plan_cache, compile_plan, compute_flow_hash, load_plan, read_plan
+from zv1.utilities.loaders import default_nodes_dir, load_nodes
+
+
+class _Loader:
+    nodes_dir = default_nodes_dir()
+
+    def log_debug(self, *args):
+        pass
+
+
+ADDITION_FLOW = {
+    "nodes": [
+        {"id": "a", "type": "input-data", "settings": {"key": "a", "type": "number"}},
+        {"id": "b", "type": "input-data", "settings": {"key": "b", "type": "number"}},
+        {"id": "sum", "type": "add"},
+        {"id": "out", "type": "output-data"},
+    ],
+    "links": [
+        {"from": {"node_id": "out", "port_name": "value"}, "to": {"node_id": "missing", "port_name": "value"}},
+        {"from": {"node_id": "sum", "port_name": "result"}, "to": {"node_id": "out", "port_name": "value"}},
+        {"from": {"node_id": "a", "port_name": "value"}, "to": {"node_id": "sum", "port_name": "a"}},
+        {"from": {"node_id": "b", "port_name": "value"}, "to": {"node_id": "sum", "port_name": "b"}},
+    ],
+}
+
+
+def _nodes(flow):
+    return load_nodes(_Loader(), flow)
+
+
+def test_compile_plan_tables():
+    plan = compile_plan(ADDITION_FLOW, _nodes(ADDITION_FLOW))
+
+    assert plan.order.index("sum") > plan.order.index("a")
+    assert plan.order.index("out") > plan.order.index("sum")
+    assert plan.input_nodes == ["a", "b"]
+    assert plan.output_nodes == ["out"]
+    assert plan.specs["sum"].required_count == 2
+    assert plan.counted_targets[("sum", "result")] == ["out"]
+    assert len(plan.graph.links) == 3
+
+
+def test_plan_round_trips_through_pickle():
+    plan = compile_plan(ADDITION_FLOW, _nodes(ADDITION_FLOW))
+    restored = pickle.loads(pickle.dumps(plan))
+
+    assert restored.flow_hash == plan.flow_hash
+    assert restored.order == plan.order
+    assert restored.counted_targets == plan.counted_targets
+    assert restored.specs["sum"].data_ports[0][2][0].source == plan.specs["sum"].data_ports[0][2][0].source
+
+
+def test_flow_hash_tracks_flow_content():
+    nodes = _nodes(ADDITION_FLOW)
+    changed = {**ADDITION_FLOW, "nodes": [*ADDITION_FLOW["nodes"][:3], {"id": "out", "type": "output-data", "settings": {"key": "total"}}]}
+
+    assert compute_flow_hash(ADDITION_FLOW, nodes) == compute_flow_hash(dict(ADDITION_FLOW), nodes)
+    assert compute_flow_hash(ADDITION_FLOW, nodes) != compute_flow_hash(changed, nodes)
+
+
+def test_load_plan_uses_disk_cache(tmp_path):
+    nodes = _nodes(ADDITION_FLOW)
+    clear_plan_cache()
+    plan = load_plan(ADDITION_FLOW, nodes, str(tmp_path))
+
+    assert os.listdir(tmp_path) == [f"{plan.flow_hash}.plan"]
+    assert read_plan(str(tmp_path), plan.flow_hash).order == plan.order
+
+    # A fresh process only has the disk copy
+    clear_plan_cache()
+    assert load_plan(ADDITION_FLOW, nodes, str(tmp_path)).order == plan.order
+
+
+def test_corrupt_plan_file_is_recompiled(tmp_path):
+    nodes = _nodes(ADDITION_FLOW)
+    flow_hash = compute_flow_hash(ADDITION_FLOW, nodes)
+    (tmp_path / f"{flow_hash}.plan").write_bytes(b"not a pickle")
+    clear_plan_cache()
+
+    assert read_plan(str(tmp_path), flow_hash) is None
+    assert load_plan(ADDITION_FLOW, nodes, str(tmp_path)).flow_hash == flow_hash
+    assert read_plan(str(tmp_path), flow_hash) is not None
+
+
+def test_engine_runs_from_cached_plan(tmp_path):
+    async def run():
+        engine = await create(ADDITION_FLOW, {"plan_cache_dir": str(tmp_path)})
+        return (await engine.run({"a": 3, "b": 2}))["outputs"]
+
+    clear_plan_cache()
+    assert asyncio.run(run()) == {"data": 5}
+    clear_plan_cache()
+    assert asyncio.run(run()) == {"data": 5}
@@ -0,0 +1,64 @@
+"""
+Engine pool: concurrent runs of one loaded flow
+"""
+
+import asyncio
+import time
+
+from zv1 import EnginePool
+
+ECHO_FLOW = {
+    "nodes": [
+        {"id": "in", "type": "input-data", "settings": {"key": "value", "type": "any"}},
+        {"id": "ms", "type": "number", "settings": {"value": 100, "max": 10000}},
+        {"id": "delay", "type": "delay"},
+        {"id": "out", "type": "output-data", "settings": {"key": "echo"}},
+    ],
+    "links": [
+        {"from": {"node_id": "in", "port_name": "value"}, "to": {"node_id": "delay", "port_name": "value"}},
+        {"from": {"node_id": "ms", "port_name": "value"}, "to": {"node_id": "delay", "port_name": "delay_ms"}},
+        {"from": {"node_id": "delay", "port_name": "result"}, "to": {"node_id": "out", "port_name": "value"}},
+    ],
+}
+
+
+def test_concurrent_runs_are_isolated():
+    async def main():
+        pool = await EnginePool.create(ECHO_FLOW)
+        start = time.perf_counter()
+        results = await asyncio.gather(*(pool.run({"value": index}) for index in range(20)))
+        return results, time.perf_counter() - start, pool
+
+    results, elapsed, pool = asyncio.run(main())
+
+    assert [result["outputs"] for result in results] == [{"echo": index} for index in range(20)]
+    assert all(len(result["timeline"]) == 4 for result in results)
+    assert elapsed < 1.0
+    assert pool.active_runs == 0
+
+
+def test_runs_share_loaded_state():
+    async def main():
+        pool = await EnginePool.create(ECHO_FLOW)
+        first = pool.engine.spawn()
+        second = pool.engine.spawn({"execution_id": "run-2"})
+        return pool, first, second
+
+    pool, first, second = asyncio.run(main())
+
+    assert first.plan is second.plan is pool.engine.plan
+    assert first.nodes["delay"] is second.nodes["delay"]
+    assert first.compiled_custom_types is second.compiled_custom_types
+    assert first.cache is not second.cache
+    assert second.error_manager.execution_id == "run-2"
+
+
+def test_max_concurrent_runs_queues_extra_runs():
+    async def main():
+        pool = await EnginePool.create(ECHO_FLOW, max_concurrent_runs=2)
+        start = time.perf_counter()
+        await asyncio.gather(*(pool.run({"value": index}) for index in range(4)))
+        return time.perf_counter() - start
+
+    # Two waves of 100ms delays
+    assert asyncio.run(main()) >= 0.2
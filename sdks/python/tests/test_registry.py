@@ -0,0 +1,103 @@
+"""
+Node registry: indexed config lookup and lazy, hash-keyed process imports
+"""
+
+import asyncio
+import hashlib
+import json
+import sys
+
+import pytest
+
+from zv1.registry import INDEX_FILE, INDEX_VERSION, LazyProcess, NodeRegistry
+
+PROCESS_SOURCE = "async def process(inputs, settings, config, nodeConfig):\n    return {'value': inputs.get('value')}\n"
+
+
+def _write_nodes_dir(root, node_types, with_index=True):
+    master = []
+    for node_type in node_types:
+        node_dir = root / node_type
+        node_dir.mkdir()
+        config = {"display_name": node_type.title(), "inputs": [], "outputs": []}
+        (node_dir / f"{node_type}.config.json").write_text(json.dumps(config))
+        (node_dir / f"{node_type}.process.py").write_text(PROCESS_SOURCE)
+        master.append({**config, "id": node_type})
+
+    if not with_index:
+        return
+
+    # Same layout as scripts/sync_sdks.py
+    spans = {}
+    data = b"["
+    for i, config in enumerate(master):
+        data += b",\n    " if i else b"\n    "
+        entry = json.dumps(config, indent=4).replace("\n", "\n    ").encode("utf-8")
+        spans[config["id"]] = [len(data), len(entry)]
+        data += entry
+    data += b"\n]"
+    (root / "all-nodes.config.json").write_bytes(data)
+
+    content_hash = hashlib.sha256(PROCESS_SOURCE.encode("utf-8")).hexdigest()[:16]
+    (root / INDEX_FILE).write_text(json.dumps({
+        "version": INDEX_VERSION,
+        "config_file": "all-nodes.config.json",
+        "config_size": len(data),
+        "nodes": {
+            node_type: {"config": span, "process": {"py": [f"{node_type}/{node_type}.process.py", content_hash]}}
+            for node_type, span in spans.items()
+        },
+    }))
+    return content_hash
+
+
+def test_indexed_config_is_read_from_its_span(tmp_path):
+    _write_nodes_dir(tmp_path, ["echo", "other"])
+    # Per-node files are not consulted when the index covers the node type
+    (tmp_path / "echo" / "echo.config.json").write_text("not json")
+
+    definition = NodeRegistry(str(tmp_path)).get("echo")
+
+    assert definition["config"] == {"display_name": "Echo", "inputs": [], "outputs": []}
+    assert isinstance(definition["process"], LazyProcess)
+
+
+def test_process_module_is_imported_on_first_call_and_once_per_hash(tmp_path):
+    first_dir = tmp_path / "first"
+    second_dir = tmp_path / "second"
+    first_dir.mkdir()
+    second_dir.mkdir()
+    content_hash = _write_nodes_dir(first_dir, ["lazyecho"])
+    _write_nodes_dir(second_dir, ["lazyecho"])
+    module_name = f"zv1_nodes.lazyecho_{content_hash}"
+    sys.modules.pop(module_name, None)
+
+    first = NodeRegistry(str(first_dir)).get("lazyecho")
+    assert module_name not in sys.modules
+
+    assert asyncio.run(first["process"]({"value": 1}, {}, {}, {})) == {"value": 1}
+    module = sys.modules[module_name]
+
+    second = NodeRegistry(str(second_dir)).get("lazyecho")
+    assert asyncio.run(second["process"]({"value": 2}, {}, {}, {})) == {"value": 2}
+    assert sys.modules[module_name] is module
+
+
+def test_stale_index_falls_back_to_node_directories(tmp_path, capsys):
+    _write_nodes_dir(tmp_path, ["echo"])
+    with open(tmp_path / "all-nodes.config.json", "ab") as f:
+        f.write(b"\n")
+
+    definition = NodeRegistry(str(tmp_path)).get("echo")
+
+    assert definition["config"]["display_name"] == "Echo"
+    assert "stale node registry index" in capsys.readouterr().out
+
+
+def test_registry_without_index(tmp_path):
+    _write_nodes_dir(tmp_path, ["echo"], with_index=False)
+    registry = NodeRegistry(str(tmp_path))
+
+    assert registry.get("echo")["config"]["display_name"] == "Echo"
+    with pytest.raises(FileNotFoundError):
+        registry.get("missing")
@@ -0,0 +1,109 @@
+"""
+Persistent cache for deterministic LLM responses
+"""
+
+import asyncio
+import time
+
+from zv1.integrations.openrouter import OpenRouterIntegration
+from zv1.integrations.response_cache import ResponseCache, get_response_cache, is_deterministic
+from zv1.timeline import Timeline
+
+RESPONSE = {
+    "content": "Hello!",
+    "role": "assistant",
+    "finish_reason": "",
+    "tool_calls": [],
+    "model": "openai/gpt-4o",
+    "usage": {"prompt_tokens": 1000, "completion_tokens": 500, "total_tokens": 1500},
+    "refusal": "",
+    "reasoning": "",
+    "annotations": [],
+}
+
+PRICING = {"items": [
+    {"key": "input_cost_per_million", "cost": 2.5},
+    {"key": "output_cost_per_million", "cost": 10},
+]}
+
+
+def test_only_deterministic_requests_are_cached():
+    assert is_deterministic({"temperature": 0})
+    assert is_deterministic({"seed": 7, "temperature": 1})
+    assert not is_deterministic({"temperature": 0.7})
+    assert not is_deterministic({})
+
+
+def test_round_trip_and_key_ignores_stream(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"))
+    key = cache.make_key({"model": "m", "messages": [], "temperature": 0, "stream": True})
+
+    assert key == cache.make_key({"temperature": 0, "messages": [], "model": "m"})
+    assert cache.get(key) is None
+    cache.set(key, RESPONSE)
+    assert cache.get(key) == RESPONSE
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), ttl=0.05)
+    cache.set("key", RESPONSE)
+    time.sleep(0.1)
+
+    assert cache.get("key") is None
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), max_bytes=500)
+    cache.set("first", RESPONSE)
+    cache.set("second", RESPONSE)
+    cache.get("first")
+    cache.set("third", RESPONSE)
+
+    assert cache.get_stats()["size"] <= 500
+    assert cache.get("second") is None
+    assert cache.get("first") == RESPONSE
+    assert cache.get("third") == RESPONSE
+
+
+def test_shared_per_path(tmp_path):
+    config = {"llm_cache": str(tmp_path / "responses.sqlite")}
+
+    assert get_response_cache(config) is get_response_cache(dict(config))
+    assert get_response_cache({}) is None
+
+
+def test_chat_completion_serves_hits_with_costs_and_marker(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"))
+    # The cache hit path never reaches the API client
+    integration = OpenRouterIntegration.__new__(OpenRouterIntegration)
+    messages = [{"role": "user", "content": "Hi", "id": "m1"}]
+    payload = integration.build_payload("openai/gpt-4o", messages=messages, temperature=0)
+    payload["stream"] = True
+    cache.set(cache.make_key(payload), RESPONSE)
+
+    updates = []
+    result = asyncio.run(integration.chat_completion(
+        "openai/gpt-4o",
+        messages=messages,
+        temperature=0,
+        nodeConfig={"id": "llm", "type": "openai-gpt-4o", "pricing": PRICING},
+        engineConfig={"llm_cache": cache, "on_node_update": updates.append},
+    ))
+
+    assert result["cache_hit"] is True
+    assert result["content"] == "Hello!"
+    assert result["usage"] == RESPONSE["usage"]
+    # A hit costs nothing; what the call would have cost is reported as saved
+    assert result["cost_total"] == 0
+    assert result["cost_saved"] == 0.0075
+    assert [(item["label"], item["cost"], item["saved"]) for item in result["cost_itemized"]] == [
+        ("Input Tokens", 0, 0.0025),
+        ("Output Tokens", 0, 0.005),
+    ]
+
+    timeline = Timeline()
+    timeline.finish(timeline.start("llm", "openai-gpt-4o"), "success", result)
+    assert timeline.cost_summary()["total"] == 0
+    assert timeline.cost_summary()["saved"] == 0.0075
+    assert updates[0]["data"]["content"] == "Hello!"
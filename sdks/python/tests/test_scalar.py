@@ -0,0 +1,195 @@
+"""
+Compiled groups of scalar nodes
+"""
+
+import asyncio
+
+import pytest
+
+from zv1 import create
+from zv1 import scalar
+from zv1.plan import compile_plan
+from zv1.utilities.loaders import default_nodes_dir, load_nodes
+
+
+class _Loader:
+    nodes_dir = default_nodes_dir()
+
+    def log_debug(self, *args):
+        pass
+
+
+def _link(source, source_port, target, target_port):
+    return {"from": {"node_id": source, "port_name": source_port}, "to": {"node_id": target, "port_name": target_port}}
+
+
+def _arithmetic_flow():
+    """if (x + y) * y > x then (x + y) * y else x; and-gate on the false path"""
+    nodes = [
+        {"id": "x", "type": "input-data", "settings": {"key": "x", "type": "any"}},
+        {"id": "y", "type": "input-data", "settings": {"key": "y", "type": "any"}},
+        {"id": "sum", "type": "add"},
+        {"id": "product", "type": "multiply"},
+        {"id": "compare", "type": "greater-than"},
+        {"id": "choose", "type": "if-else"},
+        {"id": "both", "type": "and-gate"},
+        {"id": "out", "type": "output-data", "settings": {"key": "result"}},
+        {"id": "flag", "type": "output-data", "settings": {"key": "flag"}},
+    ]
+    links = [
+        _link("x", "value", "sum", "a"),
+        _link("y", "value", "sum", "b"),
+        _link("sum", "result", "product", "a"),
+        _link("y", "value", "product", "b"),
+        _link("product", "result", "compare", "a"),
+        _link("x", "value", "compare", "b"),
+        _link("compare", "result", "choose", "condition"),
+        _link("product", "result", "choose", "if_true"),
+        _link("x", "value", "choose", "if_false"),
+        _link("choose", "false_path", "both", "input1"),
+        _link("compare", "result", "both", "input2"),
+        _link("choose", "result", "out", "value"),
+        _link("both", "value", "flag", "value"),
+    ]
+    return {"nodes": nodes, "links": links}
+
+
+def _plan(flow):
+    return compile_plan(flow, load_nodes(_Loader(), flow))
+
+
+async def _run(flow, inputs, config=None):
+    engine = await create(flow, config)
+    return await engine.run(inputs)
+
+
+def test_groups_split_around_other_nodes():
+    group = _plan(_arithmetic_flow()).scalar_groups["sum"]
+    assert group.members == ["sum", "product", "compare", "choose", "both"]
+    assert ("product", "result") not in group.outputs
+
+    # sum -> absolute-value -> multiply, next to sum -> multiply: one group would wait on itself
+    flow = {
+        "nodes": [
+            {"id": "x", "type": "input-data", "settings": {"key": "x", "type": "any"}},
+            {"id": "sum", "type": "add"},
+            {"id": "absolute", "type": "absolute-value"},
+            {"id": "product", "type": "multiply"},
+            {"id": "cube", "type": "multiply"},
+        ],
+        "links": [
+            _link("x", "value", "sum", "a"),
+            _link("x", "value", "sum", "b"),
+            _link("sum", "result", "absolute", "input"),
+            _link("sum", "result", "product", "a"),
+            _link("absolute", "output", "product", "b"),
+            _link("product", "result", "cube", "a"),
+            _link("x", "value", "cube", "b"),
+        ],
+    }
+    assert {head: group.members for head, group in _plan(flow).scalar_groups.items()} == {"product": ["product", "cube"]}
+
+
+def test_value_that_never_comes_holds_back_only_its_readers():
+    # case_0 only fires when x matches; otherwise the and-gate never runs, but sum and compare still do
+    flow = {
+        "nodes": [
+            {"id": "x", "type": "input-data", "settings": {"key": "x", "type": "any"}},
+            {"id": "y", "type": "input-data", "settings": {"key": "y", "type": "any"}},
+            {"id": "cases", "type": "input-data", "settings": {"key": "cases", "type": "any"}},
+            {"id": "route", "type": "switch"},
+            {"id": "sum", "type": "add"},
+            {"id": "compare", "type": "greater-than"},
+            {"id": "both", "type": "and-gate"},
+            {"id": "s", "type": "output-data", "settings": {"key": "s"}},
+            {"id": "flag", "type": "output-data", "settings": {"key": "flag"}},
+        ],
+        "links": [
+            _link("x", "value", "route", "value"),
+            _link("cases", "value", "route", "cases"),
+            _link("x", "value", "sum", "a"),
+            _link("y", "value", "sum", "b"),
+            _link("sum", "result", "compare", "a"),
+            _link("x", "value", "compare", "b"),
+            _link("compare", "result", "both", "input1"),
+            _link("route", "case_0", "both", "input2"),
+            _link("sum", "result", "s", "value"),
+            _link("both", "value", "flag", "value"),
+        ],
+    }
+    assert {head: group.members for head, group in _plan(flow).scalar_groups.items()} == {"sum": ["sum", "compare"]}
+
+    for inputs, outputs in [
+        ({"x": 1, "y": 2, "cases": [5]}, {"s": 3}),
+        ({"x": 1, "y": 2, "cases": [1]}, {"s": 3, "flag": True}),
+    ]:
+        fused = asyncio.run(_run(flow, inputs))
+        unfused = asyncio.run(_run(flow, inputs, {"fuse_nodes": False}))
+        assert fused["outputs"] == unfused["outputs"] == outputs
+
+
+def test_group_fed_by_several_nodes_of_another_runs_once():
+    # product waits on z, which sum and floor don't, so it heads a group of its own fed by both
+    flow = {
+        "nodes": [
+            {"id": "x", "type": "input-data", "settings": {"key": "x", "type": "any"}},
+            {"id": "z", "type": "input-data", "settings": {"key": "z", "type": "any"}},
+            {"id": "sum", "type": "add"},
+            {"id": "floor", "type": "floor"},
+            {"id": "product", "type": "multiply"},
+            {"id": "difference", "type": "subtract"},
+            {"id": "out", "type": "output-data", "settings": {"key": "result"}},
+        ],
+        "links": [
+            _link("x", "value", "sum", "a"),
+            _link("x", "value", "sum", "b"),
+            _link("sum", "result", "floor", "number"),
+            _link("z", "value", "product", "a"),
+            _link("floor", "result", "product", "b"),
+            _link("sum", "result", "difference", "a"),
+            _link("product", "result", "difference", "b"),
+            _link("difference", "result", "out", "value"),
+        ],
+    }
+    groups = _plan(flow).scalar_groups
+    assert {head: group.members for head, group in groups.items()} == {
+        "sum": ["sum", "floor"],
+        "product": ["product", "difference"],
+    }
+
+    result = asyncio.run(_run(flow, {"x": 1.25, "z": 2}))
+    assert result["outputs"] == {"result": -1.5}
+    assert [entry["node_id"] for entry in result["timeline"]].count("product") == 1
+
+
+@pytest.mark.parametrize("inputs, outputs", [
+    ({"x": 2, "y": 3}, {"result": 15}),
+    ({"x": 20, "y": 0.5}, {"result": 20, "flag": False}),
+])
+def test_group_matches_node_by_node(inputs, outputs):
+    fused = asyncio.run(_run(_arithmetic_flow(), inputs))
+    unfused = asyncio.run(_run(_arithmetic_flow(), inputs, {"fuse_nodes": False}))
+
+    assert fused["outputs"] == unfused["outputs"] == outputs
+    entries = {entry["node_id"]: entry for entry in fused["timeline"]}
+    assert entries["sum"]["fused_nodes"] == ["sum", "product", "compare", "choose", "both"]
+    assert not {"product", "compare", "choose", "both"} & set(entries)
+
+
+@pytest.mark.parametrize("inputs", [{"x": "2", "y": 3}, {"x": 2, "y": True}, {"x": 2, "y": None}])
+def test_unchecked_values_fall_back_to_node_by_node(inputs):
+    def outcome(config):
+        try:
+            result = asyncio.run(_run(_arithmetic_flow(), inputs, config))
+        except Exception as error:
+            return type(error), str(error)
+        return result["outputs"], sorted(entry["node_id"] for entry in result["timeline"])
+
+    assert outcome(None) == outcome({"fuse_nodes": False})
+
+
+def test_function_is_built_once_per_flow():
+    scalar._functions.clear()
+    for _ in range(3):
+        asyncio.run(_run(_arithmetic_flow(), {"x": 2, "y": 3}))
+    assert list(scalar._functions) == [(_plan(_arithmetic_flow()).flow_hash, "sum")]
@@ -0,0 +1,96 @@
+"""
+Mergeable histogram and quantile sketches, and the histogram-fixed node's sketch mode
+"""
+
+import asyncio
+import json
+import random
+
+import pytest
+
+from zv1.registry import load_process_module
+from zv1.utilities.loaders import default_nodes_dir
+from zv1.utilities.sketch import HistogramSketch, KLLSketch
+from zv1.utilities.stats import to_floats
+
+FRACTIONS = [0.01, 0.25, 0.5, 0.9, 0.99]
+
+
+def _rank_errors(sketch, values):
+    ordered = sorted(values)
+    errors = []
+    for fraction, estimate in zip(FRACTIONS, sketch.quantiles(FRACTIONS)):
+        rank = sum(1 for value in ordered if value <= estimate)
+        errors.append(abs(rank / len(ordered) - fraction))
+    return errors
+
+
+def test_kll_quantiles_are_close_and_bounded():
+    rng = random.Random(3)
+    values = [rng.lognormvariate(0, 1) for _ in range(50000)]
+    sketch = KLLSketch(k=200)
+    for offset in range(0, len(values), 7919):
+        sketch.update(values[offset:offset + 7919])
+    assert sketch.count == len(values)
+    assert sum(map(len, sketch.levels)) < 3 * 200
+    assert max(_rank_errors(sketch, values)) < 0.02
+    assert KLLSketch().quantiles([0.5]) == [None]
+
+
+def test_merged_sketches_match_one_stream():
+    rng = random.Random(5)
+    batches = [[rng.uniform(-10, 110) for _ in range(3000)] for _ in range(6)]
+    one = HistogramSketch(0, 10, 10)
+    parts = [HistogramSketch(0, 10, 10) for _ in range(3)]
+    for index, batch in enumerate(batches):
+        one.update(to_floats(batch))
+        parts[index % 3].update(to_floats(batch))
+
+    merged = HistogramSketch(0, 10, 10)
+    for part in parts:
+        # Sketches cross process and run boundaries as JSON
+        merged.merge(HistogramSketch.from_dict(json.loads(json.dumps(part.to_dict()))))
+
+    values = [value for batch in batches for value in batch]
+    assert merged.counts == one.counts
+    assert (merged.underflow, merged.overflow, merged.count) == (one.underflow, one.overflow, len(values))
+    assert (merged.min, merged.max) == (min(values), max(values))
+    assert merged.sum == pytest.approx(sum(values))
+    assert max(_rank_errors(merged, values)) < 0.02
+    assert merged.quantiles([0, 1]) == [min(values), max(values)]
+
+    with pytest.raises(ValueError, match="different bins"):
+        merged.merge(HistogramSketch(0, 5, 10))
+
+
+def test_sketches_are_deterministic():
+    values = to_floats(range(10000))
+    first, second = KLLSketch(k=50), KLLSketch(k=50)
+    first.update(values)
+    second.update(values)
+    assert first.to_dict() == second.to_dict()
+
+
+def _run_node(inputs, settings):
+    process = load_process_module(
+        "histogram-fixed", f"{default_nodes_dir()}/histogram-fixed/histogram-fixed.process.py", "test"
+    )
+    return asyncio.run(process(inputs, settings, {}, {}))
+
+
+def test_sketch_mode_accumulates_batches():
+    bins = {"start": 0, "bin_size": 1, "bin_count": 3}
+    first = _run_node({"numbers": [0.5, 1.5, "x", -1], **bins}, {"sketch": True})
+    assert first["counts"] == [1, 1, 0]
+    second = _run_node({"numbers": [2.5, 9], "sketch": first["sketch"], **bins}, {"sketch": True})
+    assert (second["counts"], second["underflow"], second["overflow"]) == ([1, 1, 1], 1, 1)
+    assert second["sketch"]["count"] == 5
+    assert second["quantiles"]["p50"] == 1.5
+
+    # Sketches from several workers merge at once
+    merged = _run_node({"numbers": [], "sketch": [first["sketch"], first["sketch"]], **bins}, {"sketch": True})
+    assert merged["counts"] == [2, 2, 0]
+
+    plain = _run_node({"numbers": [0.5, float("inf")], **bins}, {})
+    assert (plain["counts"], plain["overflow"]) == ([1, 0, 0], 1)
+    assert "sketch" not in plain
@@ -0,0 +1,132 @@
+"""
+Event-loop stall detection and learned offload of blocking node types
+"""
+
+import asyncio
+import json
+import shutil
+import time
+
+import pytest
+
+from zv1 import create
+from zv1.stalls import StallMonitor, TimedCoroutine
+from zv1.utilities.loaders import default_nodes_dir
+
+BLOCKING_SOURCE = '''import time
+
+
+async def process(inputs, settings, config, nodeConfig):
+    time.sleep(settings["ms"] / 1000)
+    return {"value": settings["ms"], "engine_config": sorted(config)}
+'''
+
+
+@pytest.fixture
+def nodes_dir(tmp_path):
+    shutil.copytree(f"{default_nodes_dir()}/output-data", tmp_path / "output-data")
+    # Only node types declaring themselves cpu_bound (or pure) may be offloaded
+    for node_type, cpu_bound in (("blocking", True), ("blocking-io", False)):
+        node_dir = tmp_path / node_type
+        node_dir.mkdir()
+        (node_dir / f"{node_type}.config.json").write_text(json.dumps({
+            "display_name": "Blocking",
+            "is_constant": True,
+            "cpu_bound": cpu_bound,
+            "inputs": [],
+            "outputs": [{"name": "value", "type": "number"}, {"name": "engine_config", "type": "array"}],
+            "settings": [{"name": "ms", "type": "number"}],
+        }))
+        (node_dir / f"{node_type}.process.py").write_text(BLOCKING_SOURCE)
+    return str(tmp_path)
+
+
+def _run_blocking(nodes_dir, monitor, node_type, durations, stalls=None):
+    async def scenario():
+        results = []
+        for ms in durations:
+            flow = {
+                "nodes": [
+                    {"id": "block", "type": node_type, "settings": {"ms": ms}},
+                    {"id": "out", "type": "output-data", "settings": {"key": "out"}},
+                    {"id": "config", "type": "output-data", "settings": {"key": "config"}},
+                ],
+                "links": [
+                    {"from": {"node_id": "block", "port_name": "value"}, "to": {"node_id": "out", "port_name": "value"}},
+                    {"from": {"node_id": "block", "port_name": "engine_config"}, "to": {"node_id": "config", "port_name": "value"}},
+                ],
+            }
+            engine = await create(flow, {
+                "nodes_dir": nodes_dir,
+                "stall_threshold_ms": 10,
+                "stall_offload": "thread",
+                "stall_monitor": monitor,
+                "on_node_stall": (stalls if stalls is not None else []).append,
+            })
+            try:
+                results.append(await engine.run())
+            finally:
+                await engine.cleanup()
+        return results
+
+    return asyncio.run(scenario())
+
+
+def test_timed_coroutine_measures_synchronous_slices():
+    async def work():
+        time.sleep(0.03)
+        await asyncio.sleep(0)
+        return "done"
+
+    async def scenario():
+        timed = TimedCoroutine(work())
+        return await timed, timed
+
+    result, timed = asyncio.run(scenario())
+    assert result == "done"
+    assert timed.slices == 2
+    assert timed.max_slice_ns >= 30_000_000
+
+
+def test_timed_coroutine_propagates_cancellation():
+    async def scenario():
+        task = asyncio.ensure_future(TimedCoroutine(asyncio.sleep(10)))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+
+
+def test_stalling_node_type_is_reported_then_offloaded(nodes_dir):
+    monitor = StallMonitor()
+    stalls = []
+    results = _run_blocking(nodes_dir, monitor, "blocking", [30, 30, 30], stalls)
+
+    assert all(result["outputs"]["out"] == 30 for result in results)
+    assert [event["node_type"] for event in stalls] == ["blocking", "blocking"]
+    assert stalls[0]["max_slice_ms"] >= 30
+    assert monitor.get_stats("blocking")["offloaded"] == 1
+    # The offloaded call is timed too, and sees no engine config from this loop
+    assert monitor.get_stats("blocking")["calls"] == 3
+    assert results[0]["outputs"]["config"] != []
+    assert results[2]["outputs"]["config"] == []
+    assert "output-data" in monitor.get_stats()
+
+
+def test_offloaded_type_returns_to_the_loop_once_it_stops_stalling(nodes_dir):
+    monitor = StallMonitor()
+    _run_blocking(nodes_dir, monitor, "blocking", [30, 30, 0, 0, 0, 0])
+
+    # Offloaded from the third call until the stalls drop under half of the calls
+    assert monitor.get_stats("blocking")["offloaded"] == 3
+    assert monitor.get_stats("blocking")["calls"] == 6
+
+
+def test_node_types_not_declared_safe_are_never_offloaded(nodes_dir):
+    monitor = StallMonitor()
+    _run_blocking(nodes_dir, monitor, "blocking-io", [30, 30, 30])
+
+    assert monitor.get_stats("blocking-io")["stalls"] == 3
+    assert monitor.get_stats("blocking-io")["offloaded"] == 0
@@ -0,0 +1,84 @@
+"""
+The shared statistics kernel and the describe node
+"""
+
+import asyncio
+import random
+import statistics
+
+import pytest
+
+from zv1.registry import load_process_module
+from zv1.utilities import stats
+from zv1.utilities.loaders import default_nodes_dir
+from zv1.utilities.stats import bin_counts, describe, histogram, input_floats, median, order_statistics, quartiles, to_floats
+from zv1.utilities.table import make_table
+
+
+def _run_node(node_type, inputs, settings=None):
+    process = load_process_module(node_type, f"{default_nodes_dir()}/{node_type}/{node_type}.process.py", "test")
+    return asyncio.run(process(inputs, settings or {}, {}, {}))
+
+
+def test_to_floats():
+    assert list(to_floats([1, "2.5", True])) == [1.0, 2.5, 1.0]
+    assert list(to_floats([1, None], skip_none=True)) == [1.0]
+    assert list(input_floats(3)) == [3.0]
+    assert list(input_floats(make_table({"x": [1, None, 2]}))) == [1.0, 2.0]
+    with pytest.raises(ValueError, match="non-numeric"):
+        to_floats([1, None])
+
+
+def test_order_statistics_match_sorting(monkeypatch):
+    monkeypatch.setattr(stats, "SORT_SIZE", 4)
+    rng = random.Random(7)
+    for length in (1, 2, 5, 64, 257):
+        values = [rng.choice([rng.randint(0, 9), rng.uniform(-5, 5)]) for _ in range(length)]
+        ranks = {0, length // 2, length - 1, rng.randrange(length)}
+        found = order_statistics(to_floats(values), ranks)
+        ordered = sorted(values)
+        assert found == {rank: ordered[rank] for rank in ranks}
+        assert median(to_floats(values)) == statistics.median(values)
+
+
+def test_sums_match_the_builtin_sum():
+    rng = random.Random(3)
+    values = [rng.uniform(-1, 1) * 10 ** rng.randint(-3, 3) for _ in range(1000)]
+    center = sum(values) / len(values)
+    assert stats.mean(to_floats(values)) == center
+    assert stats.variance(to_floats(values)) == sum((x - center) ** 2 for x in values) / len(values)
+
+
+def test_quartiles():
+    assert quartiles(to_floats(range(1, 10))) == (2.5, 5, 7.5)
+    assert quartiles(to_floats([4, 1, 3, 2])) == (1.5, 2.5, 3.5)
+    assert quartiles(to_floats([7])) == (7, 7, 7)
+
+
+def test_binning():
+    assert histogram(to_floats([1, 2, 2, 3, 10]), 3) == ([1.0, 4.0, 7.0, 10.0], [4, 0, 1])
+    # Values whose position rounds up to the end of the last bin stay in it
+    assert histogram(to_floats([0.0, 3, -1e308]), 3)[1] == [1, 0, 2]
+    assert bin_counts(to_floats([-1, 0, 0.5, 1, 2, float("inf")]), 0, 1, 2) == ([2, 1], 1, 2)
+    with pytest.raises(ValueError, match="NaN"):
+        bin_counts(to_floats([float("nan")]), 0, 1, 2)
+
+
+def test_describe_matches_the_nodes():
+    numbers = [3, 1, 4, 1, 5, 9, 2, 6, 5, 3, 5]
+    result = _run_node("describe", {"numbers": numbers, "bins": 3})
+    assert result == describe(to_floats(numbers), 3)
+    assert result["mean"] == _run_node("mean", {"numbers": numbers})["result"]
+    assert result["median"] == _run_node("median", {"numbers": numbers})["result"]
+    assert result["mode"] == _run_node("mode", {"numbers": numbers})["result"]
+    assert result["variance"] == _run_node("standard-deviation", {"numbers": numbers})["variance"]
+    quartile_outputs = _run_node("quartiles", {"numbers": numbers})
+    assert (result["q1"], result["q3"]) == (quartile_outputs["q1"], quartile_outputs["q3"])
+    histogram = _run_node("histogram", {"numbers": numbers, "bins": 3})
+    assert (result["bins"], result["counts"]) == (histogram["bins"], histogram["counts"])
+
+
+def test_describe_a_table_column():
+    table = make_table({"name": ["a", "b", "c"], "score": [2, None, 4]})
+    result = _run_node("describe", {"numbers": table}, {"column": "score"})
+    assert (result["count"], result["mean"], result["range"]) == (2, 3.0, 2.0)
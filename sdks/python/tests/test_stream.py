@@ -0,0 +1,162 @@
+"""
+Streaming port values
+
+A node's can_stream output is published as a StreamValue while the node
+runs: inputs that accept streams iterate the chunks as they arrive, other
+inputs receive the final value, and run_stream() reports the chunks headed
+for output nodes.
+"""
+
+import asyncio
+import json
+import shutil
+
+import pytest
+
+from zv1 import create
+from zv1.stream import StreamValue, materialize, settled
+from zv1.utilities.loaders import default_nodes_dir
+
+TOKENS_SOURCE = '''import asyncio
+
+
+async def process(inputs, settings, config, nodeConfig):
+    for token in settings["tokens"]:
+        await asyncio.sleep(0.01)
+        config["on_node_update"]({"data": {"content": token, "role": "assistant"}})
+    return {"content": None if settings.get("empty") else "".join(settings["tokens"]), "role": "assistant"}
+'''
+
+CHUNKS_SOURCE = '''async def process(inputs, settings, config, nodeConfig):
+    return {"chunks": [chunk async for chunk in inputs["text"]]}
+'''
+
+
+def _write_node(root, node_type, config, source):
+    node_dir = root / node_type
+    node_dir.mkdir()
+    (node_dir / f"{node_type}.config.json").write_text(json.dumps(config))
+    (node_dir / f"{node_type}.process.py").write_text(source)
+
+
+@pytest.fixture
+def nodes_dir(tmp_path):
+    for node_type in ("output-data", "string-length"):
+        shutil.copytree(f"{default_nodes_dir()}/{node_type}", tmp_path / node_type)
+    _write_node(tmp_path, "tokens", {
+        "display_name": "Tokens",
+        "category": "llm",
+        "is_constant": True,
+        "inputs": [],
+        "outputs": [
+            {"name": "content", "type": "string", "can_stream": True},
+            {"name": "role", "type": "string", "can_stream": True},
+        ],
+        "settings": [{"name": "tokens", "type": "array"}, {"name": "empty", "type": "boolean"}],
+    }, TOKENS_SOURCE)
+    _write_node(tmp_path, "chunks", {
+        "display_name": "Chunks",
+        "inputs": [{"name": "text", "type": "string", "required": True, "accepts_stream": True}],
+        "outputs": [{"name": "chunks", "type": "array"}],
+    }, CHUNKS_SOURCE)
+    return str(tmp_path)
+
+
+def _flow(tokens, empty=False):
+    return {
+        "nodes": [
+            {"id": "llm", "type": "tokens", "settings": {"tokens": tokens, "empty": empty}},
+            {"id": "out-role", "type": "output-data", "settings": {"key": "role"}},
+            {"id": "chunks", "type": "chunks"},
+            {"id": "length", "type": "string-length"},
+            {"id": "out-text", "type": "output-data", "settings": {"key": "text"}},
+            {"id": "out-chunks", "type": "output-data", "settings": {"key": "chunks"}},
+            {"id": "out-length", "type": "output-data", "settings": {"key": "length"}},
+        ],
+        "links": [
+            {"from": {"node_id": "llm", "port_name": "content"}, "to": {"node_id": "out-text", "port_name": "value"}},
+            {"from": {"node_id": "llm", "port_name": "role"}, "to": {"node_id": "out-role", "port_name": "value"}},
+            {"from": {"node_id": "llm", "port_name": "content"}, "to": {"node_id": "chunks", "port_name": "text"}},
+            {"from": {"node_id": "llm", "port_name": "content"}, "to": {"node_id": "length", "port_name": "text"}},
+            {"from": {"node_id": "chunks", "port_name": "chunks"}, "to": {"node_id": "out-chunks", "port_name": "value"}},
+            {"from": {"node_id": "length", "port_name": "length"}, "to": {"node_id": "out-length", "port_name": "value"}},
+        ],
+    }
+
+
+def test_stream_value_replays_chunks_to_every_consumer():
+    async def scenario():
+        stream = StreamValue()
+
+        async def consume():
+            return [chunk async for chunk in stream]
+
+        first = asyncio.ensure_future(consume())
+        stream.push("a")
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(consume())
+        stream.push("b")
+        stream.close()
+        return await first, await second, await materialize(stream)
+
+    first, second, value = asyncio.run(scenario())
+    assert first == second == ["a", "b"]
+    assert value == "ab"
+
+
+def test_stream_value_close_and_fail():
+    stream = StreamValue()
+    stream.push({"x": 1})
+    assert settled(stream) is None
+    stream.close()
+    assert settled(stream) == [{"x": 1}]
+
+    failed = StreamValue()
+    failed.fail(ValueError("boom"))
+    with pytest.raises(ValueError):
+        asyncio.run(materialize(failed))
+
+
+def test_streamed_output_reaches_consumers(nodes_dir):
+    async def scenario():
+        engine = await create(_flow(["Hel", "lo"]), {"nodes_dir": nodes_dir})
+        try:
+            return await engine.run()
+        finally:
+            await engine.cleanup()
+
+    result = asyncio.run(scenario())
+    assert result["outputs"] == {"text": "Hello", "chunks": ["Hel", "lo"], "length": 5, "role": "assistant"}
+
+
+def test_stream_ending_without_a_value_skips_waiting_consumers(nodes_dir):
+    async def scenario():
+        engine = await create(_flow(["Hel", "lo"], empty=True), {"nodes_dir": nodes_dir})
+        try:
+            return await engine.run()
+        finally:
+            await engine.cleanup()
+
+    result = asyncio.run(scenario())
+    # Node by node, a None content is never propagated, so neither consumer runs
+    assert result["outputs"] == {"role": "assistant"}
+    assert not {"chunks", "length"} & {entry["node_id"] for entry in result["timeline"]}
+
+
+def test_run_stream_yields_deltas_before_result(nodes_dir):
+    async def scenario():
+        engine = await create(_flow(["a", "b", "c"]), {"nodes_dir": nodes_dir})
+        try:
+            return [event async for event in engine.run_stream()]
+        finally:
+            await engine.cleanup()
+
+    events = asyncio.run(scenario())
+    deltas = [event["delta"] for event in events if event["type"] == "delta"]
+    outputs = {event["key"]: event["value"] for event in events if event["type"] == "output"}
+
+    # role is sent whole with every update, so only content streams
+    assert deltas == ["a", "b", "c"]
+    assert outputs == {"text": "abc", "chunks": ["a", "b", "c"], "length": 3, "role": "assistant"}
+    assert events[-1]["type"] == "result"
+    assert events[-1]["result"]["outputs"]["text"] == "abc"
@@ -0,0 +1,86 @@
+"""
+Columnar tables and the data-processing nodes that accept them
+"""
+
+import asyncio
+from array import array
+
+import pytest
+
+from zv1.registry import load_process_module
+from zv1.utilities.loaders import default_nodes_dir
+from zv1.utilities.table import from_rows, get_column, is_table, make_table, row_count, take, to_rows
+from zv1.utilities.typers import load_custom_types
+
+ROWS = [
+    {"id": 3, "name": "Cy", "score": 7.0},
+    {"id": 1, "name": "ann", "score": None},
+    {"id": 2, "name": "Bob", "score": 9.5},
+    {"id": 1, "name": "Ann", "score": None},
+]
+
+
+def _run_node(node_type, inputs, settings=None):
+    process = load_process_module(node_type, f"{default_nodes_dir()}/{node_type}/{node_type}.process.py", "test")
+    return asyncio.run(process(inputs, settings or {}, {}, {}))
+
+
+@pytest.fixture
+def table():
+    return make_table(from_rows(ROWS)["columns"], {"id": "integer", "name": "string", "score": "number"})
+
+
+def test_rows_round_trip(table):
+    assert is_table(table) and not is_table({"columns": [1]})
+    assert load_custom_types()["table"](table)
+    assert table["columns"]["id"] == (3, 1, 2, 1)
+    assert row_count(table) == 4
+    assert to_rows(table) == ROWS
+    assert to_rows(take(table, [2]))[0] == ROWS[2]
+    assert take(table, [2])["types"] == table["types"]
+
+
+def test_columns():
+    table = make_table({"n": array("q", [1, 2])})
+    assert table["columns"]["n"] == (1, 2)
+    assert get_column(table) == (1, 2)
+    with pytest.raises(ValueError, match="Unknown column"):
+        get_column(table, "m")
+    with pytest.raises(ValueError, match="Choose a column"):
+        get_column(make_table({"a": [], "b": []}))
+
+
+def test_array_nodes(table):
+    result = _run_node("array-filter", {"array": table, "value": 1}, {"condition": "greater_than", "property": "id"})
+    assert to_rows(result["array"]) == [ROWS[0], ROWS[2]]
+
+    result = _run_node("array-sort", {"array": table}, {"property": "name", "case_sensitive": False})
+    assert result["array"]["columns"]["id"] == (1, 1, 2, 3)
+
+    result = _run_node("array-sort", {"array": table}, {"property": "score", "type": "number", "order": "descending"})
+    assert result["array"]["columns"]["score"] == (None, None, 9.5, 7.0)
+
+    result = _run_node("array-unique", {"array": table}, {"mode": "property", "property": "name", "case_sensitive": False})
+    assert result["count"] == 3
+    assert result["indices"] == [0, 1, 2]
+    assert to_rows(result["duplicates"]) == [ROWS[3]]
+
+    result = _run_node("array-unique", {"array": make_table({"a": [1, 1, 2], "b": ["x", "x", "x"]})})
+    assert result["indices"] == [0, 2]
+
+    assert _run_node("array-map", {"array": table, "property": "name"})["array"] == ["Cy", "ann", "Bob", "Ann"]
+
+
+def test_math_nodes(table):
+    assert _run_node("mean", {"numbers": table}, {"column": "score"})["result"] == 8.25
+    assert _run_node("median", {"numbers": table}, {"column": "id"})["result"] == 1.5
+    assert _run_node("mean", {"numbers": make_table({"x": [None]})})["result"] == 0
+    result = _run_node("histogram", {"numbers": table, "bins": 2}, {"column": "id"})
+    assert result["counts"] == [2, 2]
+
+
+def test_csv_round_trip():
+    result = _run_node("csv-parser", {"csv": "a,b\n1,x\n2,\n"}, {"output": "table"})
+    assert result["data"] == {"columns": {"a": (1, 2), "b": ("x", "")}, "types": {"a": "integer", "b": "string"}}
+    result = _run_node("csv-stringifier", {"data": result["data"]}, {"quote_strings": False})
+    assert result["csv"] == "a,b\n1,x\n2,"
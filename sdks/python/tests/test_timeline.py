@@ -0,0 +1,83 @@
+"""
+Timeline recorder: compact records, capture modes and run sampling
+"""
+
+import asyncio
+
+import pytest
+
+from zv1 import create
+from zv1.timeline import Timeline, preview
+
+FLOW = {
+    "nodes": [
+        {"id": "in", "type": "input-data", "settings": {"key": "value", "type": "any"}},
+        {"id": "out", "type": "output-data", "settings": {"key": "out"}},
+    ],
+    "links": [
+        {"from": {"node_id": "in", "port_name": "value"}, "to": {"node_id": "out", "port_name": "value"}},
+    ],
+}
+
+
+def _run(config, value):
+    async def scenario():
+        engine = await create(FLOW, config)
+        try:
+            return await engine.run({"value": value})
+        finally:
+            await engine.cleanup()
+
+    return asyncio.run(scenario())
+
+
+def test_record_converts_to_result_format():
+    timeline = Timeline()
+    record = timeline.start("a", "add", {"x": 1}, {"mode": "fast"})
+    timeline.finish(record, "success", {"sum": 2, "cost_total": 0.5})
+
+    entry = timeline.to_list()[0]
+    assert entry["node_id"] == "a" and entry["status"] == "success"
+    assert entry["inputs"] == {"x": 1} and entry["outputs"]["sum"] == 2
+    assert entry["start_time"].endswith("Z") and entry["duration_ms"] >= 0
+    assert timeline.cost_summary()["total"] == 0.5
+
+
+def test_preview_caps_values():
+    value = {"text": "x" * 1000, "items": list(range(50))}
+    capped = preview(value, chars=10)
+
+    assert capped["text"] == "x" * 10 + "... (1000 chars)"
+    assert len(capped["items"]) == 11
+    assert preview("short") == "short"
+
+
+def test_capture_off_keeps_timings_and_costs():
+    timeline = Timeline(capture="off")
+    record = timeline.start("a", "llm", {"messages": ["hi"]})
+    timeline.finish(record, "success", {"content": "hello", "cost_total": 1})
+
+    entry = timeline.to_list()[0]
+    assert "inputs" not in entry and "outputs" not in entry
+    assert "duration_ms" in entry
+    assert timeline.cost_summary()["total"] == 1
+
+
+def test_invalid_capture_mode():
+    with pytest.raises(ValueError):
+        Timeline(capture="verbose")
+
+
+def test_engine_preview_capture():
+    result = _run({"timeline_capture": "preview", "timeline_preview_chars": 5}, "abcdefghij")
+    entry = next(entry for entry in result["timeline"] if entry["node_id"] == "out")
+
+    assert entry["inputs"]["value"] == "abcde... (10 chars)"
+    assert result["outputs"]["out"] == "abcdefghij"
+
+
+def test_unsampled_runs_record_without_values():
+    result = _run({"timeline_sample_rate": 0}, "abc")
+
+    assert {entry["node_id"] for entry in result["timeline"]} == {"in", "out"}
+    assert all("inputs" not in entry for entry in result["timeline"])
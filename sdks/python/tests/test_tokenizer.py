@@ -0,0 +1,226 @@
+"""
+Shared tokenizer service and token-budget truncation, exercised with a
+stand-in encoding
+"""
+
+import asyncio
+import base64
+
+import pytest
+
+from zv1.registry import load_process_module
+from zv1.utilities import tokenizer, truncation
+from zv1.utilities.loaders import default_nodes_dir
+from zv1.utilities.tokenizer import TokenizerService, message_text, read_bpe_ranks, resolve_encoding_name
+from zv1.utilities.truncation import keep_head, keep_tail
+
+
+class WordEncoding:
+    """Splits on whitespace and counts how often it was asked to encode."""
+
+    def __init__(self):
+        self.encoded = 0
+        self.batches = 0
+
+    def encode(self, text):
+        self.encoded += 1
+        return text.split()
+
+    def encode_batch(self, texts, num_threads=1):
+        self.batches += 1
+        self.encoded += len(texts)
+        return [text.split() for text in texts]
+
+
+@pytest.fixture
+def service():
+    service = TokenizerService(cache_size=3)
+    service._encodings["cl100k_base"] = WordEncoding()
+    return service
+
+
+def test_resolve_encoding_name():
+    assert resolve_encoding_name("cl200k_base") == "o200k_base"
+    assert resolve_encoding_name("cl100k_base") == "cl100k_base"
+    with pytest.raises(ValueError, match="Unsupported tokenizer: gpt2"):
+        resolve_encoding_name("gpt2")
+
+
+def test_read_bpe_ranks(tmp_path):
+    path = tmp_path / "test.tiktoken"
+    lines = [f"{base64.b64encode(token).decode()} {rank}" for rank, token in enumerate([b"a", b"b", b"ab", b" \n"])]
+    path.write_text("\n".join(lines) + "\n")
+    assert read_bpe_ranks(path) == {b"a": 0, b"b": 1, b"ab": 2, b" \n": 3}
+
+
+def test_rank_files_are_found_locally(tmp_path, monkeypatch):
+    monkeypatch.setenv("TIKTOKEN_CACHE_DIR", str(tmp_path / "cache"))
+    (tmp_path / "cache").mkdir()
+    (tmp_path / "cl100k_base.tiktoken").write_text("")
+    cached = tokenizer._tiktoken_cache_path("o200k_base")
+    open(cached, "w").close()
+
+    service = TokenizerService(bpe_dir=str(tmp_path))
+    assert service.rank_file("cl100k_base") == str(tmp_path / "cl100k_base.tiktoken")
+    assert service.rank_file("o200k_base") == cached
+    assert TokenizerService().rank_file("cl100k_base") is None
+
+
+def test_token_node_runs_with_the_default_tokenizer(tmp_path, monkeypatch):
+    tiktoken = pytest.importorskip("tiktoken")
+    monkeypatch.delenv("ZV1_TIKTOKEN_DIR", raising=False)
+    monkeypatch.delenv("ZV1_TIKTOKEN_OFFLINE", raising=False)
+    monkeypatch.setenv("TIKTOKEN_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(tokenizer, "_service", None)
+    # Without a local rank file the encoding comes from tiktoken's own fetch, replaced here to run offline
+    fetched = []
+    monkeypatch.setattr(tiktoken, "get_encoding", lambda name: fetched.append(name) or WordEncoding())
+
+    process = load_process_module("token-count", f"{default_nodes_dir()}/token-count/token-count.process.py", "test")
+    result = asyncio.run(process({"input": "one two three"}, {"tokenizer": "cl200k_base"}, {}, {}))
+    assert result == {"tokens": 3}
+    assert fetched == ["o200k_base"]
+
+    monkeypatch.setenv("ZV1_TIKTOKEN_OFFLINE", "1")
+    monkeypatch.setattr(tokenizer, "_service", None)
+    with pytest.raises(Exception, match="ZV1_TIKTOKEN_OFFLINE"):
+        asyncio.run(process({"input": "one two three"}, {"tokenizer": "cl200k_base"}, {}, {}))
+    assert fetched == ["o200k_base"]
+
+
+def test_count_batch_encodes_misses_together(service):
+    encoding = service.encoding("cl100k_base")
+    long_text = "word " * 40
+    assert service.count_batch(["a b", "c", "a b", long_text], "cl100k_base") == [2, 1, 2, 40]
+    assert encoding.batches == 1
+    assert encoding.encoded == 3
+
+    assert service.count_batch(["c", long_text], "cl100k_base") == [1, 40]
+    assert encoding.encoded == 3
+    assert service.get_stats()["hits"] == 2
+
+
+def test_count_lru_evicts_oldest(service):
+    encoding = service.encoding("cl100k_base")
+    for text in ["one", "two", "three"]:
+        service.count(text, "cl100k_base")
+    service.count("one", "cl100k_base")
+    service.count("four", "cl100k_base")
+    assert service.get_stats()["cached_counts"] == 3
+
+    encoded = encoding.encoded
+    service.count("one", "cl100k_base")
+    assert encoding.encoded == encoded
+    service.count("two", "cl100k_base")
+    assert encoding.encoded == encoded + 1
+
+
+def _messages(word_counts):
+    return [{"role": "user", "content": " ".join(["w"] * count)} for count in word_counts]
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_keep_tail_and_head(service, lazy):
+    messages = _messages([5, 1, 0, 3, 2])
+    assert keep_tail(service, messages, "cl100k_base", 5, lazy=lazy) == (range(2, 5), 5)
+    assert keep_tail(service, messages, "cl100k_base", 100, lazy=lazy) == (range(0, 5), 11)
+    assert keep_tail(service, messages, "cl100k_base", 1, lazy=lazy) == (range(5, 5), 0)
+    assert keep_head(service, messages, "cl100k_base", 6, lazy=lazy) == (range(0, 3), 6)
+    assert keep_head(service, messages, "cl100k_base", 4, lazy=lazy) == (range(0, 0), 0)
+    assert keep_tail(service, messages, "cl100k_base", 4, indexes=[0, 1, 3], lazy=lazy) == ([1, 3], 4)
+    assert keep_tail(service, messages, "cl100k_base", -1, lazy=lazy) == (range(5, 5), 0)
+
+
+def test_keep_tail_counts_lazily_from_the_end(service, monkeypatch):
+    monkeypatch.setattr(truncation, "FIRST_BATCH", 2)
+    encoding = service.encoding("cl100k_base")
+    messages = [{"role": "user", "content": f"message {index}"} for index in range(1000)]
+    kept, total = keep_tail(service, messages, "cl100k_base", 9)
+    assert kept == range(996, 1000)
+    assert total == 8
+    # Batches of 2 and 4 messages reach the cut point
+    assert encoding.encoded == 6
+
+
+def test_message_text():
+    assert message_text({"content": "hi"}) == "hi"
+    assert message_text({"content": [{"type": "text", "text": "a"}, {"type": "image_url"}, {"type": "text", "text": "b"}]}) == "a b"
+    assert message_text("raw") == ""
+
+
+def test_count_messages_reads_annotations(service):
+    encoding = service.encoding("cl100k_base")
+    history = service.annotate(_messages([3, 2]), "cl100k_base")
+    assert history[0]["_token_counts"] == {"digest": tokenizer.content_digest("w w w"), "cl100k_base": 3}
+    service.clear()
+
+    encoded = encoding.encoded
+    messages = history + _messages([4])
+    assert service.count_messages(messages, "cl100k_base") == [3, 2, 4]
+    # Only the new message was tokenized
+    assert encoding.encoded == encoded + 1
+
+    # Counts of another tokenizer and multi-modal messages are not taken from the annotation
+    multi_modal = {"role": "user", "content": [{"type": "text", "text": "a b"}], "_token_counts": {"cl100k_base": 9}}
+    other = {"role": "user", "content": "a", "_token_counts": {"digest": tokenizer.content_digest("a"), "cl200k_base": 9}}
+    assert service.count_messages([multi_modal, other], "cl100k_base") == [2, 1]
+
+
+def test_annotations_of_edited_messages_are_ignored(service):
+    history = service.annotate(_messages([3]), "cl100k_base")
+    edited = {**history[0], "content": "w"}
+    unsigned = {"role": "user", "content": "w", "_token_counts": {"cl100k_base": 3}}
+    assert service.count_messages([edited, unsigned], "cl100k_base") == [1, 1]
+    # Re-annotating drops the counts of the old content
+    assert service.annotate([edited], "cl100k_base")[0]["_token_counts"] == {"digest": tokenizer.content_digest("w"), "cl100k_base": 1}
+
+
+def test_estimate_does_not_depend_on_earlier_counts(service):
+    assert service.estimate_batch(["abcdefgh", "", "é"], "cl100k_base") == [2, 0, 1]
+    # The stand-in encoding makes a token of every 2-byte word
+    service.count_batch([" ".join(["ab"] * 20000)], "cl100k_base")
+    assert service.estimate_batch(["abcdefgh", "x" * 59], "cl100k_base") == [2, 15]
+    with pytest.raises(ValueError, match="Unsupported precision: rough"):
+        service.count_messages(_messages([1]), "cl100k_base", precision="rough")
+
+
+class ByteEncoding(WordEncoding):
+    """A token per byte, the most tokens a byte-level BPE can produce."""
+
+    def encode(self, text):
+        self.encoded += 1
+        return list(text.encode())
+
+    def encode_batch(self, texts, num_threads=1):
+        self.batches += 1
+        self.encoded += len(texts)
+        return [list(text.encode()) for text in texts]
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_keep_tail_estimate_tokenizes_only_near_the_cut(service, lazy):
+    encoding = service.encoding("cl100k_base")
+    messages = [{"role": "user", "content": f"m{index:04d} w w w"} for index in range(200)]
+    assert keep_tail(service, messages, "cl100k_base", 400, lazy=lazy) == (range(100, 200), 400)
+    exact_encoded = encoding.encoded
+    service.clear()
+
+    encoding.encoded = 0
+    kept, total = keep_tail(service, messages, "cl100k_base", 400, lazy=lazy, precision="estimate")
+    # 36 messages of 11 bytes fit on their size; of the 16 tokenized after them, one fits the 4 tokens left
+    assert (kept, total) == (range(163, 200), 400)
+    assert encoding.encoded == truncation.EXACT_WINDOW < exact_encoded
+    assert sum(service.count_messages([messages[i] for i in kept], "cl100k_base")) <= total
+
+
+def test_keep_head_estimate_extends_over_the_window(service):
+    # Sizes 1, 1 and 5 fit on their bounds; the next message's 5 bytes don't, but its 3 tokens do
+    messages = _messages([1, 1, 3, 3, 3])
+    assert keep_head(service, messages, "cl100k_base", 10, precision="estimate") == (range(0, 4), 10)
+    assert keep_head(service, messages, "cl100k_base", 10) == (range(0, 4), 8)
+
+
+def test_bound_messages_never_undercounts(service):
+    service._encodings["cl100k_base"] = ByteEncoding()
+    messages = _messages([3, 0]) + [{"role": "user", "content": "日本"}]
+    assert service.bound_messages(messages, "cl100k_base") == service.count_messages(messages, "cl100k_base") == [5, 0, 6]
@@ -0,0 +1,9 @@
+"""
+zv1 - The Python SDK for running processing flows created via zv1.ai, by ZeroWidth
+"""
+
+from .engine import Zv1, create
+from .error_manager import ErrorManager, Zv1Error
+from .pool import EnginePool
+
+__all__ = ["Zv1", "create", "EnginePool", "ErrorManager", "Zv1Error"]
@@ -0,0 +1,1548 @@
+import asyncio
+import inspect
+import json
+import time
+import uuid
+
+from .error_manager import ErrorManager
+from .fusion import FUSED_PORT, Stage, run_chain
+from .offload import ProcessOffloader, get_offloader
+from .plan import apply_setting_defaults, load_plan, output_key
+from .registry import process_module
+from .scalar import MISSING, build_function
+from .stalls import DEFAULT_THRESHOLD_MS, TimedCoroutine, get_stall_monitor, run_timed
+from .stream import EmptyStream, StreamValue, materialize, settled
+from .timeline import Timeline, TimelineRecord
+from .utilities import mcp, typers, validators
+from .utilities.cache import DEFAULT_CAPACITY, CacheManager
+from .utilities.frozen import freeze, thaw
+from .utilities.helpers import (
+    create_safe_tool_name,
+    is_manual_tool_node,
+    is_remote_mcp_tool,
+    json_dumps,
+    map_type_to_json_schema,
+)
+from .utilities.loaders import (
+    default_nodes_dir,
+    detect_and_load_flow,
+    load_import_nodes,
+    load_integrations,
+    load_nodes,
+)
+from .utilities.memo import get_shared_memo
+from .utilities.typers import load_custom_types
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+class Zv1:
+    """
+    Core class for executing node-based flows
+    Handles node loading, input/output validation, and flow execution
+
+    Nodes run as asyncio tasks as soon as their inputs are ready, so
+    independent branches of a flow execute concurrently.
+    """
+
+    type_check = typers.type_check
+    convert_import_to_node_type = typers.convert_import_to_node_type
+    validate_keys = validators.validate_keys
+    validate_flow = validators.validate_flow
+    validate_inputs = validators.validate_inputs
+    fetch_mcp_tool_schema = mcp.fetch_mcp_tool_schema
+
+    def __init__(self, flow, config=None):
+        """
+        Create a new engine instance
+
+        Args:
+            flow: The flow definition containing nodes and links
+            config: Configuration options and context for the engine
+        """
+        config = config or {}
+        self.flow = flow
+
+        self.debug = config.get("debug", False)
+        self.keys = config.get("keys") or {}
+        self.max_plugin_calls = config.get("max_plugin_calls") or 10
+        self.nodes_dir = config.get("nodes_dir") or default_nodes_dir()
+        # Outputs of pure nodes are memoized across runs unless disabled
+        self.memo = (config.get("memo_cache") or get_shared_memo()) if config.get("memoize", True) else None
+
+        self.config = dict(config)
+
+        self._mcp_schema_cache = {}
+        self._conversation_state = {}
+        # Queue of run_stream() events, set only while run_stream() is consuming
+        self._events = None
+        cpu_workers = self.config.get("cpu_workers")
+        self.offloader = get_offloader(None if cpu_workers == "auto" else cpu_workers) if cpu_workers else None
+        stall_threshold_ms = self.config.get("stall_threshold_ms", DEFAULT_THRESHOLD_MS)
+        self.stall_threshold_ns = int(stall_threshold_ms * 1e6) if stall_threshold_ms else None
+        self.stall_monitor = self.config.get("stall_monitor") or get_stall_monitor()
+
+    async def initialize(self):
+        self.nodes = load_nodes(self, self.flow)
+        self.compiled_custom_types = load_custom_types(self.config.get("types_dir"))
+
+        if not self.config.get("integrations"):
+            self.config["integrations"] = load_integrations(self.config, self.flow)
+
+        self.plan = load_plan(self.flow, self.nodes, self.config.get("plan_cache_dir"))
+        self._prepare()
+
+        self.log_debug(f"Loaded {len(self.nodes)} node types")
+        self.log_debug(f"Loaded {len(self.compiled_custom_types)} custom types")
+        self.log_debug(f"Using execution plan {self.plan.flow_hash[:12]}")
+
+        removed = len(self.flow.get("links", [])) - len(self.graph.links)
+        if removed > 0:
+            self.log_debug(f"Removed {removed} invalid link(s) referencing non-existent nodes")
+
+        self.validate_keys()
+        self.validate_flow(self.plan)
+
+    def spawn(self, config=None):
+        """
+        Create an engine for a single run that shares everything this engine loaded
+
+        Node definitions, custom type validators, integrations, the MCP schema
+        cache and the execution plan are shared; the cache, timeline, settings
+        and scheduling state are the new engine's own. Import nodes are rebound
+        so their sub-runs are recorded on the new engine.
+
+        Args:
+            config: Per-run config merged over this engine's config (callbacks, execution_id)
+
+        Returns:
+            Zv1: Initialized engine instance
+        """
+        engine = type(self)(self.flow, {**self.config, **(config or {})})
+        engine.nodes = {**self.nodes, **load_import_nodes(engine, self.flow)}
+        engine.compiled_custom_types = self.compiled_custom_types
+        engine._mcp_schema_cache = self._mcp_schema_cache
+        engine.plan = self.plan
+        engine._prepare()
+        engine._group_functions = self._group_functions
+        return engine
+
+    def _prepare(self):
+        self.graph = self.plan.graph
+        self._specs = self.plan.specs
+        self.timeline = Timeline.from_config(self.config)
+
+        self.error_manager = ErrorManager(
+            on_error=self.config.get("on_error"),
+            execution_id=self.config.get("execution_id") or str(uuid.uuid4()),
+            execution_context={
+                "timeline": [],
+                "node_count": len(self.graph.nodes),
+            },
+        )
+        # Chains of array nodes run as one operator, unless callbacks or debug
+        # logging watch their nodes, or a cpu_bound member should be offloaded
+        fuse = self.config.get("fuse_nodes", True) and not self.debug
+        fuse = fuse and not self.config.get("on_node_start") and not self.config.get("on_node_complete")
+        self._chains = {
+            head: chain
+            for head, chain in self.plan.fused_chains.items()
+            if fuse and not (self.offloader and any(self._specs[node_id].config.get("cpu_bound") for node_id in chain))
+        }
+        self._chain_heads = {node_id: head for head, chain in self._chains.items() for node_id in chain[1:]}
+        # Groups of scalar nodes run as one compiled function, under the same conditions
+        self._groups = self.plan.scalar_groups if fuse else {}
+        self._group_of = {node_id: head for head, group in self._groups.items() for node_id in group.members}
+        self._group_functions = {}
+        self._reset_run_state()
+
+    def _reset_run_state(self):
+        cache_history = self.config.get("cache_history", DEFAULT_CAPACITY)
+        self.cache = CacheManager(None if cache_history == "full" else cache_history)
+        self._satisfied = dict.fromkeys(self._specs, 0)
+        self._consumed = {}
+        self._node_settings = {node_id: dict(spec.settings) for node_id, spec in self._specs.items()}
+        self._running = set()
+        self._recheck = set()
+        self._tasks = set()
+        self._streams = {}
+        # Heads of chains and groups that fell back to running node by node in this run
+        self._unfused = set()
+        # Heads of chains that are ready but wait on inputs of their later nodes
+        self._waiting = set()
+
+    @classmethod
+    async def create(cls, flow, config=None):
+        """
+        Create and initialize a new engine instance
+        Supports flow dicts, .json / .zv1 file paths and raw .zv1 bytes
+
+        Args:
+            flow: File path, flow definition dict or .zv1 bytes
+            config: Configuration options and context for the engine
+
+        Returns:
+            Zv1: Fully initialized engine instance
+        """
+        try:
+            loaded_flow = detect_and_load_flow(flow)
+            engine = cls(loaded_flow, config)
+            await engine.initialize()
+            return engine
+        except Exception as error:
+            message = str(error)
+            if "not found" in message:
+                raise RuntimeError(f"Flow file not found: {message}") from error
+            if "Invalid JSON" in message:
+                raise RuntimeError(f"Invalid JSON in flow file: {message}") from error
+            if "Missing required" in message:
+                raise RuntimeError(f"Invalid flow structure: {message}") from error
+            raise RuntimeError(f"Failed to create zv1 instance: {message}") from error
+
+    def log_debug(self, *args):
+        """Log debug information when debug mode is enabled."""
+        if self.debug:
+            print("[DEBUG]", *args)
+
+    def update_error_context(self, context):
+        """Update execution context for the ErrorManager."""
+        self.error_manager.update_execution_context(context)
+
+    async def _emit(self, event_name, payload):
+        callback = self.config.get(event_name)
+        if not callback:
+            return
+        result = callback(payload)
+        if inspect.isawaitable(result):
+            await result
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def _store_outputs(self, node_id, outputs):
+        """Write node outputs to the cache and advance readiness counters of downstream nodes."""
+        woken = {}
+        for port_name, value in outputs.items():
+            first_value = not self.cache.has(node_id, port_name)
+            self.cache.set(node_id, port_name, freeze(value))
+            if first_value:
+                for target in self.plan.counted_targets.get((node_id, port_name), ()):
+                    self._satisfied[target] += 1
+                    if self._chain_heads.get(target) in self._waiting:
+                        woken[self._chain_heads[target]] = None
+                    elif value is None and target in self._group_of:
+                        head = self._group_of[target]
+                        if head not in self._unfused and self._group_of.get(node_id) != head:
+                            woken[head] = None
+        # A fused chain waiting on its later nodes' inputs re-checks as each
+        # arrives, as those nodes would when the chained array reached them.
+        # None values aren't propagated, so a scalar group re-checks here when
+        # one completes its inputs, and falls back to its nodes.
+        for head in woken:
+            self._activate(head)
+
+    def _fused_chain(self, node_id):
+        if node_id in self._unfused:
+            return None
+        return self._chains.get(node_id)
+
+    def _scalar_group(self, node_id):
+        if node_id in self._unfused:
+            return None
+        return self._groups.get(node_id)
+
+    def _is_ready(self, node_id):
+        # A scalar group waits for the links into it from outside
+        group = self._scalar_group(node_id)
+        if group is not None:
+            return all(self._satisfied[member] >= needed for member, needed in group.needed)
+        spec = self._specs[node_id]
+        # Every non-refiring link must have delivered a value (None counts)
+        if self._satisfied[node_id] < spec.required_count:
+            return False
+        # A fused chain also waits for the other inputs of its later nodes
+        chain = self._fused_chain(node_id)
+        if chain is not None:
+            for member in chain[1:]:
+                if self._satisfied[member] < self._specs[member].required_count - 1:
+                    self._waiting.add(node_id)
+                    return False
+        # Refiring inputs need a value newer than the last one consumed
+        for port_name, links in spec.refiring_ports:
+            consumed = self._consumed.get((node_id, port_name), 0)
+            if not any(self.cache.get_latest_sequence(link.source, link.source_port) > consumed for link in links):
+                return False
+        return True
+
+    def _start(self, node_id, settings_override=None):
+        self._running.add(node_id)
+        task = asyncio.ensure_future(self._run_node(node_id, settings_override))
+        self._tasks.add(task)
+
+    def _activate(self, node_id):
+        # Later nodes of a fused chain run with its head (see _store_outputs)
+        head = self._chain_heads.get(node_id)
+        if head is not None and head not in self._unfused:
+            return
+        # Nodes of a scalar group run with the group, as its head
+        head = self._group_of.get(node_id)
+        if head is not None and head not in self._unfused:
+            node_id = head
+        # A node never runs concurrently with itself; re-check once the current run finishes
+        if node_id in self._running:
+            self._recheck.add(node_id)
+            return
+        if self._is_ready(node_id):
+            self.log_debug(f"Node [{node_id}] is ready. Processing...")
+            self._waiting.discard(node_id)
+            self._start(node_id)
+
+    async def _run_node(self, node_id, settings_override=None):
+        propagate_from = (node_id,)
+        try:
+            if self._fused_chain(node_id) is not None:
+                propagate_from = (await self._run_chain(node_id),)
+            elif self._scalar_group(node_id) is not None:
+                propagate_from = await self._run_group(node_id)
+            else:
+                await self.process_node(self.graph.nodes[node_id], settings_override)
+        except EmptyStream:
+            self.log_debug(f"Node [{node_id}] skipped: a streamed input ended without a value")
+            for port_name, stream in (self._streams.pop(node_id, None) or {}).items():
+                self._end_stream_empty(node_id, port_name, stream)
+            propagate_from = ()
+        except BaseException as error:
+            self._fail_streams(node_id, error)
+            raise
+        finally:
+            self._running.discard(node_id)
+        # A group's nodes propagate together, so a node they feed through
+        # several of them is activated once
+        targets = {}
+        for source in propagate_from:
+            self._propagation_targets(source, None, targets)
+        self._activate_targets(targets)
+        if node_id in self._recheck:
+            self._recheck.discard(node_id)
+            self._activate(node_id)
+
+    def propagate(self, node_id, ports=None):
+        """
+        Schedule every downstream node that became ready
+        Only links whose source port holds a non-None value are followed
+
+        Args:
+            node_id: The ID of the node to propagate from
+            ports: Only follow links from these output ports
+        """
+        targets = {}
+        self._propagation_targets(node_id, ports, targets)
+        self._activate_targets(targets)
+
+    def _propagation_targets(self, node_id, ports, targets):
+        outbound = self.graph.outbound[node_id]
+        # Links inside a scalar group were followed when the group ran
+        group = self._group_of.get(node_id)
+        if group in self._unfused:
+            group = None
+        for port_name in outbound if ports is None else ports:
+            value = self.cache.get(node_id, port_name)
+            if value is None:
+                continue
+            # Streamed ports were propagated when their stream opened
+            if ports is None and isinstance(value, StreamValue):
+                continue
+            for link in outbound.get(port_name, ()):
+                target_group = self._group_of.get(link.target)
+                if target_group is None or target_group in self._unfused:
+                    targets[link.target] = None
+                # A group is activated once, however many of its nodes the links reach
+                elif target_group != group:
+                    targets[target_group] = None
+
+    def _activate_targets(self, targets):
+        for target in targets:
+            if self._specs[target].skip_propagation:
+                self.log_debug(f"Skipping plugin node [{target}] during propagation - will only run when called by LLM")
+                continue
+            self._activate(target)
+
+    async def _drain(self):
+        try:
+            while self._tasks:
+                done, _ = await asyncio.wait(self._tasks, return_when=asyncio.FIRST_EXCEPTION)
+                self._tasks.difference_update(done)
+                for task in done:
+                    if task.exception() is not None:
+                        raise task.exception()
+        finally:
+            if self._tasks:
+                for task in self._tasks:
+                    task.cancel()
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+                self._tasks.clear()
+
+    # ------------------------------------------------------------------
+    # Node execution
+    # ------------------------------------------------------------------
+
+    def _settings_for(self, node_id, settings_override=None):
+        settings = apply_setting_defaults(self._node_settings[node_id], self._specs[node_id].setting_defaults)
+        if settings_override:
+            return {**settings, **settings_override}
+        return settings
+
+    def _collect_inputs(self, node_id):
+        """
+        Collect inputs for a node from the cache
+
+        Returns:
+            tuple: (inputs, consumption) where consumption maps refiring ports
+            to the latest sequence read from them
+        """
+        spec = self._specs[node_id]
+        cache = self.cache
+        inputs = {}
+        consumption = {}
+
+        for port_name, input_def, links in spec.data_ports:
+            if input_def.get("allow_multiple") and input_def.get("refires"):
+                # Refiring input: use the first value not yet consumed
+                last_consumed = self._consumed.get((node_id, port_name), 0)
+                latest = last_consumed
+                for link in links:
+                    entry = cache.get_entry(link.source, link.source_port)
+                    if entry is None:
+                        continue
+                    latest = max(latest, entry.sequence)
+                    if last_consumed == 0:
+                        inputs[port_name] = entry.value
+                    else:
+                        next_entry = cache.get_next(link.source, link.source_port, last_consumed)
+                        if next_entry is not None:
+                            inputs[port_name] = next_entry.value
+                if latest > last_consumed:
+                    consumption[port_name] = latest
+            elif input_def.get("allow_multiple"):
+                # Non-refiring multiple input: collect the current value of every link
+                item_type = input_def.get("type") or "any"
+                for link in links:
+                    if not cache.has(link.source, link.source_port):
+                        continue
+                    values = inputs.setdefault(port_name, [])
+                    value = cache.get(link.source, link.source_port)
+                    if isinstance(value, StreamValue) or self.type_check(value, item_type):
+                        values.append(value)
+                    else:
+                        self.log_debug(f"Type mismatch for item in multiple-input [{port_name}]: Expected {item_type}")
+            else:
+                # Single value input: always use the latest value
+                for link in links:
+                    if cache.has(link.source, link.source_port):
+                        inputs[port_name] = cache.get(link.source, link.source_port)
+                    elif not input_def.get("required") and "default" in input_def:
+                        inputs[port_name] = freeze(input_def["default"])
+
+        # Apply defaults for unconnected inputs
+        for input_name, default in spec.input_defaults:
+            inputs.setdefault(input_name, default)
+
+        return inputs, consumption
+
+    def _finish_node(self, node_id, outputs, consumption, settings_override=None):
+        """Apply consumption tracking and updated settings, close open streams, then store outputs."""
+        streams = self._streams.pop(node_id, None)
+        if streams:
+            # The streams already sit in the cache; they resolve to the node's final values
+            for port_name, stream in streams.items():
+                value = outputs.get(port_name)
+                if value is None:
+                    self._end_stream_empty(node_id, port_name, stream)
+                else:
+                    stream.close(value)
+            outputs = {port_name: value for port_name, value in outputs.items() if port_name not in streams}
+
+        for port_name, sequence in consumption.items():
+            self._consumed[(node_id, port_name)] = sequence
+
+        updated_settings = outputs.pop("__updated_settings", None)
+        if updated_settings and not settings_override:
+            self._node_settings[node_id].update(updated_settings)
+            self.log_debug(f"Node [{node_id}] updated settings:", self._node_settings[node_id])
+
+        self._store_outputs(node_id, outputs)
+
+    async def _run_chain(self, head_id):
+        """
+        Run a fused chain of array nodes as one operator (zv1.fusion)
+        When the input isn't a list or the chain raises, the head runs on its
+        own instead and the rest of the chain follows node by node
+
+        Returns:
+            str: The node whose outputs were stored, to propagate from
+        """
+        chain = self._chains[head_id]
+        inputs, _ = self._collect_inputs(head_id)
+        inputs = await self._materialize_inputs(head_id, inputs)
+
+        outputs = None
+        if isinstance(inputs.get(FUSED_PORT), list):
+            try:
+                outputs = self._execute_chain(chain, inputs)
+            except Exception:
+                outputs = None
+
+        if outputs is None:
+            self._unfused.add(head_id)
+            await self.process_node(self.graph.nodes[head_id])
+            return head_id
+
+        self._store_outputs(chain[-1], outputs)
+        return chain[-1]
+
+    def _execute_chain(self, chain, inputs):
+        stages = []
+        code_versions = []
+        for node_id in chain:
+            node = self.graph.nodes[node_id]
+            spec = self._specs[node_id]
+            if node_id == chain[0]:
+                stage_inputs = inputs
+                self.validate_inputs(spec.config, stage_inputs)
+            else:
+                # The chained array comes from the stage before
+                stage_inputs, _ = self._collect_inputs(node_id)
+                self.validate_inputs(spec.config, {**stage_inputs, FUSED_PORT: []})
+            process = self._get_definition(node)["process"]
+            code_versions.append(getattr(process, "content_hash", None))
+            stages.append(Stage(node_id, node["type"], process_module(process), stage_inputs, self._settings_for(node_id)))
+
+        tail = self.graph.nodes[chain[-1]]
+        record = self.timeline.start(tail["id"], tail["type"], inputs, stages[-1].settings)
+        self.timeline.set_extra(record, "fused_nodes", list(chain))
+
+        memo_key = None
+        outputs = None
+        if self.memo is not None and all(self._specs[node_id].config.get("pure") for node_id in chain):
+            memo_key = self.memo.make_key(
+                "+".join(stage.node_type for stage in stages),
+                code_versions,
+                [stage.inputs for stage in stages],
+                [stage.settings for stage in stages],
+            )
+            if memo_key is not None:
+                outputs = self.memo.get(memo_key)
+
+        if outputs is not None:
+            self.timeline.set_extra(record, "memoized", True)
+        else:
+            outputs = run_chain(stages, inputs[FUSED_PORT])
+            if memo_key is not None:
+                self.memo.set(memo_key, outputs)
+
+        outputs = {name: freeze(value) for name, value in outputs.items()}
+        self.timeline.finish(record, "success", outputs)
+        return outputs
+
+    async def _run_group(self, head_id):
+        """
+        Run a compiled group of scalar nodes as one function (zv1.scalar)
+        When the function raises Fallback or a node fails, the group's nodes
+        run one by one instead, started from its nodes without inputs from
+        inside the group
+
+        Returns:
+            list: The nodes whose outputs were stored, to propagate from
+        """
+        group = self._groups[head_id]
+        values = []
+        for source, port_name in group.externals:
+            value = self.cache.get(source, port_name)
+            if isinstance(value, StreamValue):
+                value = await value.materialize()
+            values.append(value)
+
+        try:
+            stored = self._execute_group(group, values)
+        except Exception:
+            stored = None
+
+        if stored is None:
+            self._unfused.add(head_id)
+            run_head = False
+            for node_id, sources in group.roots:
+                # Node by node, a node runs when the last of its inputs to arrive isn't None
+                entries = [self.cache.get_entry(source, port_name) for source, port_name in sources]
+                if not entries or max(entries, key=lambda entry: entry.sequence).value is None:
+                    continue
+                if node_id == head_id:
+                    run_head = True
+                else:
+                    self._activate(node_id)
+            if run_head:
+                await self.process_node(self.graph.nodes[head_id])
+            return [head_id]
+
+        for node_id, outputs in stored.items():
+            self._store_outputs(node_id, outputs)
+        return list(stored)
+
+    def _execute_group(self, group, values):
+        run = self._group_functions.get(group.head)
+        if run is None:
+            nodes = [self.graph.nodes[node_id] for node_id in group.members]
+            run = build_function(self.plan.flow_hash, group)(
+                [process_module(self._get_definition(node)["process"]).compute for node in nodes],
+                [dict(self._specs[node_id].settings) for node_id in group.members],
+                group.defaults,
+                self.type_check,
+                freeze,
+            )
+            self._group_functions[group.head] = run
+
+        head = self.graph.nodes[group.head]
+        record = self.timeline.start(head["id"], head["type"], dict(zip(group.input_names, values)), {})
+        self.timeline.set_extra(record, "fused_nodes", list(group.members))
+
+        stored = {}
+        for (node_id, port_name), value in zip(group.outputs, run(values)):
+            if value is not MISSING:
+                stored.setdefault(node_id, {})[port_name] = value
+
+        self.timeline.finish(record, "success", {
+            f"{node_id}.{port_name}": value
+            for node_id, outputs in stored.items()
+            for port_name, value in outputs.items()
+        })
+        return stored
+
+    async def _execute_node_core(self, node, inputs, settings, node_definition, node_config):
+        """
+        Core execution logic shared between process_node and process_node_with_args
+        """
+        record = self.timeline.start(node["id"], node["type"], inputs, settings)
+
+        try:
+            await self._emit("on_node_start", {
+                "node_id": node["id"],
+                "node_type": node["type"],
+                "timestamp": _now_ms(),
+                "inputs": inputs,
+                "settings": settings,
+            })
+
+            memo_key = None
+            outputs = None
+            if self.memo is not None and node_config.get("pure"):
+                code_version = getattr(node_definition["process"], "content_hash", None)
+                memo_key = self.memo.make_key(node["type"], code_version, inputs, settings)
+                if memo_key is not None:
+                    outputs = self.memo.get(memo_key)
+
+            if outputs is not None:
+                self.timeline.set_extra(record, "memoized", True)
+            else:
+                # Nodes that mutate their inputs in place opt into private copies
+                node_inputs = thaw(inputs) if node_config.get("mutates_inputs") else inputs
+                outputs = await self._call_process(node, node_definition["process"], node_inputs, settings, node_config)
+                if outputs is None:
+                    outputs = {}
+                if memo_key is not None and "__updated_settings" not in outputs:
+                    self.memo.set(memo_key, outputs)
+
+            outputs = {name: value if name == "__updated_settings" else freeze(value) for name, value in outputs.items()}
+            self.timeline.finish(record, "success", outputs)
+
+            await self._emit("on_node_complete", {
+                "node_id": node["id"],
+                "node_type": node["type"],
+                "timestamp": _now_ms(),
+                "inputs": inputs,
+                "outputs": outputs,
+                "settings": settings,
+            })
+
+            return outputs
+        except Exception as error:
+            self.timeline.finish(record, "error", error=error)
+
+            self.error_manager.update_execution_context({
+                "timeline": self.timeline.to_list(),
+                "node_count": len(self.graph.nodes),
+                "nodes_executed": len(self.timeline),
+                "cost_summary": self._get_cost_summary_from_timeline(),
+            })
+
+            self.error_manager.throw_node_error(
+                node["id"],
+                node["type"],
+                f"Node execution failed: {error}",
+                error,
+            )
+
+    async def _call_process(self, node, process, inputs, settings, node_config):
+        """
+        Call a node's process function where it won't block the event loop
+        cpu_bound nodes go to the process pool and node types learned to stall
+        are offloaded; other nodes run on the loop with their synchronous
+        slices measured.
+        """
+        node_type = node["type"]
+        if self.offloader is not None and node_config.get("cpu_bound") and ProcessOffloader.can_offload(process):
+            return await self.offloader.run(process, inputs, settings, node_config)
+
+        engine_config = self._engine_config_for(node["id"])
+        stall_offload = self.config.get("stall_offload")
+        if (
+            stall_offload
+            and (node_config.get("cpu_bound") or node_config.get("pure"))
+            and node["id"] not in self._streams
+            and self.stall_monitor.should_offload(node_type)
+        ):
+            # Off the loop the node gets no engine config: integrations,
+            # callbacks and streams belong to this event loop
+            self.stall_monitor.record_offload(node_type)
+            if stall_offload == "process" and ProcessOffloader.can_offload(process):
+                outputs, timed = await (self.offloader or get_offloader()).run_timed(process, inputs, settings, node_config)
+            else:
+                outputs, timed = await asyncio.to_thread(asyncio.run, run_timed(process(inputs, settings, {}, node_config)))
+            # Timed there too, so a node type whose calls stop stalling returns to the loop
+            if self.stall_threshold_ns is not None:
+                self.stall_monitor.record(node_type, timed, self.stall_threshold_ns)
+            return outputs
+
+        if self.stall_threshold_ns is None:
+            return await process(inputs, settings, engine_config, node_config)
+
+        timed = TimedCoroutine(process(inputs, settings, engine_config, node_config))
+        outputs = await timed
+        if self.stall_monitor.record(node_type, timed, self.stall_threshold_ns):
+            max_slice_ms = round(timed.max_slice_ns / 1e6, 3)
+            self.log_debug(f"Node [{node['id']}] of type [{node_type}] blocked the event loop for {max_slice_ms}ms")
+            await self._emit("on_node_stall", {
+                "node_id": node["id"],
+                "node_type": node_type,
+                "timestamp": _now_ms(),
+                "max_slice_ms": max_slice_ms,
+                "blocking_ms": round(timed.blocking_ns / 1e6, 3),
+                "threshold_ms": self.stall_threshold_ns / 1e6,
+                "stats": self.stall_monitor.get_stats(node_type),
+            })
+        return outputs
+
+    def get_stall_stats(self):
+        """Event-loop stall statistics per node type, shared by the engines of the process."""
+        return self.stall_monitor.get_stats()
+
+    # ------------------------------------------------------------------
+    # Streaming
+    # ------------------------------------------------------------------
+
+    def _open_streams(self, node_id):
+        """
+        Publish a stream on each linked can_stream port of a node that is about to run
+        Downstream nodes are scheduled right away; unless their input accepts
+        streams they wait for the materialized value.
+        """
+        spec = self._specs[node_id]
+        if not spec.stream_ports:
+            return
+        streams = {port_name: StreamValue() for port_name in spec.stream_ports}
+        self._streams[node_id] = streams
+        self._store_outputs(node_id, streams)
+        self.propagate(node_id, spec.stream_ports)
+
+    def _end_stream_empty(self, node_id, port_name, stream):
+        """
+        Finish a stream whose node produced no value for its port
+        Node by node, None is stored and not propagated. Consumers already
+        holding the stream got it early, so they are skipped (EmptyStream);
+        later readers find None in the cache, as they would have.
+        """
+        stream.fail(EmptyStream())
+        self.cache.set(node_id, port_name, None)
+
+    def _fail_streams(self, node_id, error):
+        for stream in (self._streams.pop(node_id, None) or {}).values():
+            stream.fail(error)
+
+    def _engine_config_for(self, node_id):
+        """
+        The engine config passed to a node's process function
+        While the node streams, the on_node_update calls of its integration
+        also push chunks into its open streams and report them to run_stream().
+        """
+        streams = self._streams.get(node_id)
+        if not streams:
+            return self.config
+
+        spec = self._specs[node_id]
+        on_node_update = self.config.get("on_node_update")
+
+        def stream_update(update):
+            # Each update carries the new chunk of a port under the port's name
+            data = update.get("data") or {}
+            for port_name, stream in streams.items():
+                delta = data.get(port_name)
+                if delta is None or delta == "":
+                    continue
+                stream.push(delta)
+                for key in spec.stream_output_keys.get(port_name, ()):
+                    self._emit_stream_event({"type": "delta", "key": key, "node_id": node_id, "delta": delta})
+            if on_node_update:
+                return on_node_update(update)
+            return None
+
+        return {**self.config, "on_node_update": stream_update}
+
+    async def _materialize_inputs(self, node_id, inputs):
+        """Resolve streamed inputs to their final values, except on ports that accept streams."""
+        stream_inputs = self._specs[node_id].stream_inputs
+        for input_name, value in inputs.items():
+            if input_name not in stream_inputs:
+                inputs[input_name] = await materialize(value)
+        return inputs
+
+    def _emit_stream_event(self, event):
+        if self._events is not None:
+            self._events.put_nowait(event)
+
+    def _get_definition(self, node):
+        node_definition = self.nodes.get(node["type"])
+        if not node_definition:
+            raise ValueError(f'Node type "{node["type"]}" not found.')
+        return node_definition
+
+    async def process_node(self, node, settings_override=None):
+        """
+        Process a single node
+
+        Args:
+            node: The node to process
+            settings_override: Settings merged over the node's settings for this execution only
+
+        Returns:
+            dict: The outputs from the node
+        """
+        node_id = node["id"]
+        self.log_debug(f"Processing node [{node_id}] of type [{node['type']}]")
+
+        node_definition = self._get_definition(node)
+        spec = self._specs[node_id]
+
+        if spec.config.get("is_macro"):
+            return await self.process_macro_node(node)
+
+        if spec.config.get("accepts_plugins"):
+            return await self.process_llm_node(node)
+
+        settings = self._settings_for(node_id, settings_override)
+        inputs, consumption = self._collect_inputs(node_id)
+        inputs = await self._materialize_inputs(node_id, inputs)
+
+        if self.debug:
+            self.log_debug(f"Node [{node_id}] of type [{node['type']}] inputs:", json_dumps(inputs))
+
+        self.validate_inputs(spec.config, inputs)
+
+        self._open_streams(node_id)
+        outputs = await self._execute_node_core(node, inputs, settings, node_definition, spec.node_config)
+
+        if self.debug:
+            self.log_debug(f"Node [{node_id}] outputs:", json_dumps(outputs))
+
+        self._finish_node(node_id, outputs, consumption, settings_override)
+
+        if spec.config.get("is_output"):
+            port_name = "chat" if node["type"] == "output-chat" else "value"
+            if outputs.get(port_name) is not None:
+                self._emit_stream_event({"type": "output", "key": output_key(node), "node_id": node_id, "value": outputs[port_name]})
+        return outputs
+
+    # ------------------------------------------------------------------
+    # Running
+    # ------------------------------------------------------------------
+
+    def _input_override(self, input_node, input_data):
+        settings = input_node.get("settings") or {}
+        node_type = input_node["type"]
+
+        if node_type == "input-data":
+            input_key = settings.get("key") or "data"
+            if input_key in input_data:
+                return {"value": input_data[input_key]}
+            # Map the main 'data' key onto input-data nodes with a specific key
+            if input_key != "data" and "data" in input_data:
+                return {"value": input_data["data"]}
+            if "default_value" in settings:
+                return {"value": settings["default_value"]}
+            return None
+
+        if node_type == "input-chat":
+            input_key = settings.get("key") or "chat"
+            return {"messages": input_data[input_key]} if input_key in input_data else None
+
+        if node_type == "input-prompt":
+            input_key = settings.get("key") or "prompt"
+            return {"prompt": input_data[input_key]} if input_key in input_data else None
+
+        return False
+
+    async def _execute(self, input_data, inputs_missing_values):
+        # Entry nodes (constants without inputs) and input nodes all start immediately
+        for node_id in self.plan.entry_nodes:
+            node = self.graph.nodes[node_id]
+            self.log_debug(f"Processing entry node [{node['id']}] of type [{node['type']}]")
+            self._start(node["id"])
+
+        for node_id in self.plan.input_nodes:
+            input_node = self.graph.nodes[node_id]
+            override = self._input_override(input_node, input_data)
+            if override is False:
+                continue
+            if override is None:
+                default_key = {"input-data": "data", "input-chat": "chat"}.get(input_node["type"], "prompt")
+                inputs_missing_values.append({
+                    "id": input_node["id"],
+                    "type": input_node["type"],
+                    "key": (input_node.get("settings") or {}).get("key") or default_key,
+                })
+                continue
+            self.log_debug(f"Injecting input data into input node [{input_node['id']}]")
+            self._start(input_node["id"], override)
+
+        await self._drain()
+
+    async def run(self, input_data=None, timeout=60.0):
+        """
+        Run the flow and return the final output of the flow
+
+        Args:
+            input_data: Data to inject into input nodes
+            timeout: Maximum execution time in seconds
+
+        Returns:
+            dict: The final output from output nodes
+        """
+        input_data = input_data or {}
+        self.log_debug(f"Starting flow execution with timeout: {timeout}s")
+
+        self._reset_run_state()
+        self.timeline.begin_run()
+        start_ns = time.perf_counter_ns()
+        start_time = _now_ms()
+        self.error_manager.update_execution_context({
+            "timeout": timeout,
+            "start_time": start_time,
+        })
+
+        inputs_missing_values = []
+
+        try:
+            await asyncio.wait_for(self._execute(input_data, inputs_missing_values), timeout)
+        except asyncio.TimeoutError:
+            self.log_debug("Flow execution timed out")
+            record = TimelineRecord("system", "timeout", start_ns)
+            record.inputs = {}
+            record.settings = {}
+            self.timeline.finish(record, "error", error="Flow execution timed out.")
+            self.error_manager.update_execution_context({
+                "timeline": self.timeline.to_list(),
+                "nodes_executed": len(self.timeline),
+            })
+            self.error_manager.throw_timeout_error("Flow execution timed out.")
+
+        return self._collect_results(inputs_missing_values)
+
+    async def run_stream(self, input_data=None, timeout=60.0):
+        """
+        Run the flow and yield events while it executes
+
+        Yields:
+            dict: {"type": "delta", "key", "node_id", "delta"} for each chunk
+            streamed towards an output node, {"type": "output", "key", "node_id",
+            "value"} when an output node completes, and finally
+            {"type": "result", "result"} with the dict returned by run()
+        """
+        events = self._events = asyncio.Queue()
+        task = asyncio.ensure_future(self.run(input_data, timeout))
+        task.add_done_callback(lambda _: events.put_nowait(None))
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+            yield {"type": "result", "result": task.result()}
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+            self._events = None
+
+    def _collect_results(self, inputs_missing_values):
+        output_nodes = [self.graph.nodes[node_id] for node_id in self.plan.output_nodes]
+
+        # Without output nodes, return partial completion from terminal nodes
+        if not output_nodes:
+            terminal_outputs = []
+            for node in self.graph.terminal_nodes():
+                node_config = self.nodes.get(node["type"], {}).get("config")
+                if not node_config:
+                    continue
+                outputs = {}
+                for output in node_config.get("outputs", []):
+                    value = settled(self.cache.get(node["id"], output["name"]))
+                    if value is not None:
+                        outputs[output["name"]] = value
+                # Import nodes also expose their terminal outputs under prefixed keys
+                if node["type"].startswith("imported-"):
+                    for output_name, value in self.cache.get_node_outputs(node["id"]).items():
+                        outputs.setdefault(output_name, value)
+                if outputs:
+                    terminal_outputs.append({"node_id": node["id"], "type": node["type"], "outputs": outputs})
+
+            return {
+                "partial": True,
+                "message": "Completed with missing input values and output nodes, results may be partial." if inputs_missing_values else "Completed without output nodes.",
+                "terminal_nodes": terminal_outputs,
+                "timeline": self.timeline.to_list(),
+                "inputs_missing_values": inputs_missing_values,
+                "cost_summary": self._get_cost_summary_from_timeline(),
+            }
+
+        final_outputs = {}
+        for node in output_nodes:
+            node_outputs = self.nodes[node["type"]]["config"].get("outputs", [])
+            output_key = (node.get("settings") or {}).get("key")
+            has_key = output_key not in (None, "")
+
+            number_of_data_outputs = sum(1 for output in node_outputs if output["name"] == "value")
+            number_of_chat_outputs = sum(1 for output in node_outputs if output["name"] == "chat")
+            data_index = 0
+            chat_index = 0
+
+            for output in node_outputs:
+                value = self.cache.get(node["id"], output["name"])
+                if value is None:
+                    continue
+
+                if node["type"] == "output-data":
+                    if has_key:
+                        final_outputs[output_key] = value
+                    elif number_of_data_outputs > 1:
+                        final_outputs[f"data_{data_index}"] = value
+                        data_index += 1
+                    else:
+                        final_outputs["data"] = value
+                elif node["type"] == "output-chat":
+                    if has_key:
+                        final_outputs[output_key] = value
+                    elif number_of_chat_outputs > 1:
+                        final_outputs[f"chat_{chat_index}"] = value
+                        chat_index += 1
+                    else:
+                        final_outputs["chat"] = value
+
+        self.log_debug("Flow execution complete. Final outputs:", final_outputs)
+
+        return {
+            "outputs": final_outputs,
+            "timeline": self.timeline.to_list(),
+            "cost_summary": self._get_cost_summary_from_timeline(),
+            "inputs_missing_values": inputs_missing_values,
+            "message": "Completed with missing input values, results may be partial." if inputs_missing_values else "Completed.",
+        }
+
+    async def cleanup(self):
+        """
+        Release per-run state held by the engine
+        """
+        self.log_debug("Starting cleanup process...")
+        self.cache.clear()
+        self.timeline.clear()
+        self._conversation_state = {}
+
+    # ------------------------------------------------------------------
+    # LLM nodes and plugins
+    # ------------------------------------------------------------------
+
+    def is_local_node_plugin(self, node):
+        node_config = self.nodes.get(node["type"], {}).get("config", {})
+        return bool(node_config.get("is_plugin") or node_config.get("is_macro"))
+
+    def _plugin_runner(self, plugin_node):
+        node_config = self.nodes.get(plugin_node["type"], {}).get("config", {})
+
+        if node_config.get("is_macro"):
+            async def run_macro(args):
+                merged_inputs = {**self.collect_static_inputs(plugin_node), **args}
+                outputs = await self.process_macro_node(plugin_node, merged_inputs)
+                self.propagate(plugin_node["id"])
+                return outputs
+            return run_macro
+
+        if node_config.get("is_import") and any(i.get("is_chat_input") for i in node_config.get("inputs", [])):
+            async def run_imported_chat(args):
+                merged_inputs = {**self.collect_static_inputs(plugin_node), **args}
+                outputs = await self.process_imported_chat_node(plugin_node, merged_inputs)
+                self._store_outputs(plugin_node["id"], outputs)
+                self.propagate(plugin_node["id"])
+                return outputs
+            return run_imported_chat
+
+        async def run_plugin(args):
+            merged_inputs = {**self.collect_static_inputs(plugin_node), **args}
+            outputs = await self.process_node_with_args(plugin_node, merged_inputs)
+            self._store_outputs(plugin_node["id"], outputs)
+            self.propagate(plugin_node["id"])
+            return outputs
+        return run_plugin
+
+    async def process_llm_node(self, node):
+        """
+        Main entry for processing LLM nodes with plugins/tools
+        """
+        node_id = node["id"]
+        self.log_debug(f"Processing LLM node [{node_id}] of type [{node['type']}]")
+
+        spec = self._specs[node_id]
+        settings = self._settings_for(node_id)
+        inputs, consumption = self._collect_inputs(node_id)
+        inputs = await self._materialize_inputs(node_id, inputs)
+        self.validate_inputs(spec.config, inputs)
+        self._open_streams(node_id)
+
+        # 1. Gather plugin/tool schemas and runners
+        tool_schemas = []
+        tool_runners = {}
+
+        config_tools = self.config.get("tools")
+        if isinstance(config_tools, dict):
+            for tool_name, tool_def in config_tools.items():
+                if tool_def.get("schema"):
+                    tool_schemas.append(tool_def["schema"])
+                if tool_def.get("process"):
+                    tool_runners[tool_name] = tool_def["process"]
+
+        for plugin_node_id in self.plan.llm_plugins.get(node_id, ()):
+            plugin_node = self.graph.nodes.get(plugin_node_id)
+            if plugin_node is None:
+                continue
+
+            if self.is_local_node_plugin(plugin_node):
+                schema = self.generate_tool_schema(plugin_node)
+                tool_schemas.append(schema)
+                tool_runners[schema["name"]] = self._plugin_runner(plugin_node)
+            elif is_remote_mcp_tool(plugin_node):
+                url = (plugin_node.get("settings") or {}).get("url")
+                if not url:
+                    continue
+                try:
+                    for tool in await mcp.list_mcp_tools(url):
+                        tool_schemas.append(tool)
+
+                        async def run_mcp_tool(args, plugin_node=plugin_node, tool_name=tool["name"]):
+                            return await mcp.call_mcp_tool(plugin_node, {**args, "name": tool_name})
+
+                        tool_runners[tool["name"]] = run_mcp_tool
+                except Exception as error:
+                    self.log_debug(f"Failed to fetch MCP tools from {url}: {error}")
+            elif is_manual_tool_node(plugin_node):
+                # Manual tools: no runner, just pass through
+                tool_schemas.append(self.generate_tool_schema(plugin_node))
+
+        # Also gather manual tool nodes connected to the LLM's 'tools' input port
+        for link in self.graph.inbound_links(node_id, "tools"):
+            tool_schema = self.cache.get(link.source, "tool")
+            if tool_schema:
+                config_tool = (config_tools or {}).get(tool_schema.get("name")) if isinstance(config_tools, dict) else None
+                if not config_tool or not config_tool.get("schema"):
+                    tool_schemas.append(tool_schema)
+
+        # 2. Call the LLM, running requested tools until it stops calling them
+        tool_results = []
+        tool_call_message = None
+        tool_call_count = 0
+
+        while True:
+            llm_result = await self.call_llm_with_tools(node, inputs, settings, tool_schemas, tool_call_message, tool_results)
+            tool_results = []
+            tool_call_message = None
+
+            tool_calls = llm_result.get("tool_calls")
+            if not tool_calls:
+                break
+
+            for tool_call in tool_calls:
+                if tool_call.get("type") != "function":
+                    continue
+                tool_name = tool_call["function"]["name"]
+                runner = tool_runners.get(tool_name)
+                if not runner:
+                    print("No runner found for tool", tool_name)
+                    continue
+                try:
+                    tool_arguments = json.loads(tool_call["function"]["arguments"])
+                    tool_result = await runner(tool_arguments)
+                    tool_results.append({
+                        "original_tool_call": tool_call,
+                        "tool_call_id": tool_call.get("id"),
+                        "name": tool_name,
+                        "result": tool_result,
+                    })
+                except Exception as error:
+                    print(f"Tool call [{tool_name}] failed:", error)
+
+            tool_call_message = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": tool_calls,
+            }
+            tool_call_count += 1
+
+            if not tool_results or tool_call_count >= self.max_plugin_calls:
+                break
+
+        # 3. Store declared outputs in the cache
+        llm_outputs = {
+            output["name"]: llm_result[output["name"]]
+            for output in spec.config.get("outputs") or []
+            if output["name"] in llm_result
+        }
+        if "__updated_settings" in llm_result:
+            llm_outputs["__updated_settings"] = llm_result.pop("__updated_settings")
+        self._finish_node(node_id, llm_outputs, consumption)
+
+        return llm_result
+
+    async def call_llm_with_tools(self, node, inputs, settings, tool_schemas, tool_call_message, tool_results):
+        spec = self._specs[node["id"]]
+
+        llm_inputs = dict(inputs)
+        llm_inputs["tools"] = tool_schemas
+
+        # Append the tool call and its results to the conversation (OpenAI style)
+        if tool_call_message and tool_results and isinstance(llm_inputs.get("messages"), list):
+            messages = [*llm_inputs["messages"], tool_call_message]
+            for tool_result in tool_results:
+                result = tool_result["result"]
+                messages.append({
+                    "role": "tool",
+                    "tool_call_id": tool_result["tool_call_id"],
+                    "name": tool_result["name"],
+                    "content": result if isinstance(result, str) else json_dumps(result),
+                })
+            llm_inputs["messages"] = messages
+
+        return await self._execute_node_core(node, llm_inputs, settings, self._get_definition(node), spec.node_config)
+
+    async def process_macro_node(self, node, inputs=None):
+        """
+        Process a macro node by executing its internal flow
+
+        Args:
+            node: The macro node to process
+            inputs: Explicit inputs (plugin calls); read from the cache when omitted
+
+        Returns:
+            dict: The outputs from the macro
+        """
+        node_id = node["id"]
+        self.log_debug(f"Processing macro node [{node_id}] of type [{node['type']}]")
+
+        macro_config = self._get_definition(node)["config"]
+
+        # Macros are recorded when they start, ahead of their internal nodes
+        record = self.timeline.add(self.timeline.start(node_id, node["type"]))
+
+        await self._emit("on_node_start", {
+            "node_id": node_id,
+            "node_type": node["type"],
+            "timestamp": _now_ms(),
+        })
+
+        try:
+            internal_flow = {
+                "nodes": list(macro_config["macro_flow"]["nodes"]),
+                "links": list(macro_config["macro_flow"]["links"]),
+            }
+
+            # Plugins connected to the macro in this flow run in this (parent) context
+            tools = {}
+            if macro_config.get("accepts_plugins") and macro_config.get("plugins"):
+                for plugin_node_id in self.graph.plugin_sources.get(node_id, ()):
+                    plugin_node = self.graph.nodes[plugin_node_id]
+                    schema = self.generate_tool_schema(plugin_node)
+
+                    async def tool_runner(args, plugin_node=plugin_node):
+                        return await self.execute_plugin_in_parent_context(plugin_node, args)
+
+                    tools[schema["name"]] = {"schema": schema, "process": tool_runner}
+
+            include_internal_events = self.config.get("include_internal_events")
+            internal_engine = type(self)(internal_flow, {
+                **self.config,
+                "tools": tools or None,
+                "on_node_start": self.config.get("on_node_start") if include_internal_events else None,
+                "on_node_complete": self.config.get("on_node_complete") if include_internal_events else None,
+                "on_node_error": self.config.get("on_node_error") if include_internal_events else None,
+            })
+            await internal_engine.initialize()
+
+            internal_inputs = {}
+            for input_def in macro_config.get("inputs", []):
+                input_name = input_def["name"]
+                if inputs is not None:
+                    if input_name in inputs:
+                        internal_inputs[input_name] = inputs[input_name]
+                    continue
+                links = self.graph.inbound_links(node_id, input_name)
+                if links and self.cache.has(links[0].source, links[0].source_port):
+                    internal_inputs[input_name] = await materialize(self.cache.get(links[0].source, links[0].source_port))
+
+            await internal_engine.run(internal_inputs)
+
+            # output-data nodes named output_<name> hold the macro's outputs
+            macro_outputs = {}
+            for output_def in macro_config.get("outputs", []):
+                output_node_id = f"output_{output_def['name']}"
+                if internal_engine.cache.has(output_node_id, "value"):
+                    macro_outputs[output_def["name"]] = internal_engine.cache.get(output_node_id, "value")
+
+            self._store_outputs(node_id, macro_outputs)
+
+            self.timeline.finish(record, "completed", macro_outputs, append=False)
+            duration_ms = round(record.duration_ns / 1e6)
+
+            await self._emit("on_node_complete", {
+                "node_id": node_id,
+                "node_type": node["type"],
+                "timestamp": _now_ms(),
+                "outputs": dict(macro_outputs),
+                "duration_ms": duration_ms,
+            })
+
+            return macro_outputs
+        except Exception as error:
+            self.timeline.finish(record, "error", error=error, append=False)
+            duration_ms = round(record.duration_ns / 1e6)
+
+            await self._emit("on_node_error", {
+                "node_id": node_id,
+                "node_type": node["type"],
+                "timestamp": _now_ms(),
+                "error": str(error),
+                "duration_ms": duration_ms,
+            })
+            raise
+
+    def get_node_input_value(self, node, input_name):
+        """
+        Get the current value feeding a node's input port, or None
+        """
+        links = self.graph.inbound_links(node["id"], input_name)
+        if not links:
+            return None
+        return self.cache.get(links[0].source, links[0].source_port)
+
+    async def execute_plugin_in_parent_context(self, plugin_node, args):
+        """
+        Execute a plugin node in this (parent) context with all its dependencies
+        This allows plugins to be called from internal engines (macros/imports)
+        while maintaining their connections in the parent flow
+
+        Args:
+            plugin_node: The plugin node to execute
+            args: Arguments from the tool call
+
+        Returns:
+            dict: The outputs from the plugin
+        """
+        node_definition = self._get_definition(plugin_node)
+
+        if node_definition["config"].get("is_macro"):
+            return await self.process_macro_node(plugin_node, args)
+
+        merged_inputs = {**self.collect_static_inputs(plugin_node), **args}
+        outputs = await self.process_node_with_args(plugin_node, merged_inputs)
+        self._store_outputs(plugin_node["id"], outputs)
+        self.propagate(plugin_node["id"])
+        return outputs
+
+    def collect_static_inputs(self, node):
+        """
+        Collect statically connected inputs for a plugin node
+
+        Returns:
+            dict: The statically connected inputs
+        """
+        node_config = self.nodes.get(node["type"], {}).get("config", {})
+        input_defs = {input_def["name"]: input_def for input_def in node_config.get("inputs", [])}
+        static_inputs = {}
+
+        for link in self.graph.inbound_links(node["id"]):
+            input_def = input_defs.get(link.target_port)
+            if input_def is None:
+                continue
+            if not self.cache.has(link.source, link.source_port):
+                continue
+            value = self.cache.get(link.source, link.source_port)
+            if input_def.get("allow_multiple"):
+                item_type = input_def.get("type") or "any"
+                values = static_inputs.setdefault(link.target_port, [])
+                if self.type_check(value, item_type):
+                    values.append(value)
+            else:
+                static_inputs[link.target_port] = value
+
+        for input_name, input_def in input_defs.items():
+            if input_name not in static_inputs and "default" in input_def:
+                static_inputs[input_name] = input_def["default"]
+
+        return static_inputs
+
+    def generate_tool_schema(self, node):
+        node_config = self.nodes.get(node["type"], {}).get("config", {})
+        settings = node.get("settings") or {}
+
+        name = create_safe_tool_name(settings.get("name") or node_config.get("display_name") or node["type"])
+        description = settings.get("description") or node_config.get("description") or ""
+
+        # Statically connected inputs are not exposed to the LLM
+        statically_connected = self.graph.inbound[node["id"]]
+
+        properties = {}
+        required = []
+        for input_def in node_config.get("inputs", []):
+            input_name = input_def["name"]
+            if input_name in statically_connected:
+                continue
+
+            if node_config.get("is_import"):
+                if input_def.get("is_data_input"):
+                    properties[input_name] = {
+                        "type": input_def.get("type") or "object",
+                        "description": input_def.get("description") or "",
+                    }
+                elif input_def.get("is_chat_input"):
+                    properties[input_name] = {
+                        "type": "string",
+                        "description": "A conversational chat message to send to this agent.",
+                    }
+                elif input_def.get("is_prompt_input"):
+                    properties[input_name] = {
+                        "type": "string",
+                        "description": input_def.get("description") or "",
+                    }
+            else:
+                properties[input_name] = {
+                    "type": map_type_to_json_schema(input_def.get("type")),
+                    "description": input_def.get("description") or "",
+                }
+                if "default" in input_def:
+                    properties[input_name]["default"] = input_def["default"]
+
+            if input_def.get("required"):
+                required.append(input_name)
+
+        return {
+            "name": name,
+            "description": description,
+            "parameters": {
+                "type": "object",
+                "properties": properties,
+                "required": required,
+            },
+        }
+
+    async def process_imported_chat_node(self, node, args):
+        """
+        Process imported nodes with chat inputs, maintaining conversation state per chat key
+
+        Args:
+            node: The imported node to process
+            args: Arguments from the LLM tool call
+
+        Returns:
+            dict: The outputs from the node
+        """
+        node_definition = self._get_definition(node)
+        if not node_definition["config"].get("is_import"):
+            raise ValueError(f"Node {node['id']} is not an imported node")
+
+        import_def = node_definition["config"]["importDefinition"]
+        input_chat_nodes = [n for n in import_def["nodes"] if n.get("type") == "input-chat"]
+
+        transformed_args = dict(args)
+        for chat_input in node_definition["config"]["inputs"]:
+            if not chat_input.get("is_chat_input"):
+                continue
+            input_value = args.get(chat_input["name"])
+            if not isinstance(input_value, str):
+                continue
+
+            input_chat_node = next(
+                (n for n in input_chat_nodes
+                 if n["id"] == chat_input["name"] or ((n.get("settings") or {}).get("key") or "chat") == chat_input["name"]),
+                None,
+            )
+            chat_key = ((input_chat_node or {}).get("settings") or {}).get("key") or "chat"
+            conversation = self._conversation_state.setdefault(f"{node['id']}_{chat_key}", [])
+            conversation.append({"role": "user", "content": input_value})
+            transformed_args[chat_input["name"]] = list(conversation)
+
+        outputs = await self.process_node_with_args(node, transformed_args)
+
+        # Append responses from output-chat nodes to their conversation streams
+        for output_chat_node in (n for n in import_def["nodes"] if n.get("type") == "output-chat"):
+            chat_key = (output_chat_node.get("settings") or {}).get("key") or "chat"
+            chat_output = outputs.get(output_chat_node["id"])
+            if isinstance(chat_output, list) and chat_output:
+                self._conversation_state.setdefault(f"{node['id']}_{chat_key}", []).extend(chat_output)
+
+        return outputs
+
+    def reset_conversation_state(self, node_id=None, chat_key=None):
+        """
+        Reset conversation state for specific chat streams or all conversations
+
+        Args:
+            node_id: Optional node ID to reset conversations for
+            chat_key: Optional chat key to reset a specific chat stream
+        """
+        if node_id and chat_key:
+            self._conversation_state.pop(f"{node_id}_{chat_key}", None)
+        elif node_id:
+            for key in [key for key in self._conversation_state if key.startswith(f"{node_id}_")]:
+                del self._conversation_state[key]
+        else:
+            self._conversation_state = {}
+
+    async def process_node_with_args(self, node, args):
+        node_definition = self._get_definition(node)
+        settings = self._settings_for(node["id"])
+
+        self.validate_inputs(node_definition["config"], args)
+
+        return await self._execute_node_core(node, args, settings, node_definition, self._specs[node["id"]].node_config)
+
+    def _get_cost_summary_from_timeline(self):
+        return self.timeline.cost_summary()
+
+
+async def create(flow, config=None):
+    """
+    Create and initialize an engine instance
+
+    Args:
+        flow: File path, flow definition dict or .zv1 bytes
+        config: Configuration options and context for the engine
+
+    Returns:
+        Zv1: Fully initialized engine instance
+    """
+    return await Zv1.create(flow, config)
@@ -0,0 +1,201 @@
+"""
+ErrorManager - Centralized error handling utility for the flow engine
+
+This utility handles:
+- Creating consistent error structures
+- Invoking on_error callbacks
+- Enriching errors with execution context
+- Managing error types and severity levels
+"""
+
+import asyncio
+import inspect
+import time
+
+
+class Zv1Error(Exception):
+    """Error raised by the engine, enriched with the execution context it happened in."""
+
+    def __init__(self, message, error_type=None, error_details=None, execution_id=None, context=None):
+        super().__init__(message)
+        self.message = message
+        self.error_type = error_type
+        self.error_details = error_details or {}
+        self.execution_id = execution_id
+        self.context = context or {}
+        self.original_message = None
+
+    def __str__(self):
+        return self.message
+
+
+class ErrorManager:
+    RECOVERABLE_TYPES = ("node", "validation")
+    FATAL_TYPES = ("flow", "system", "timeout", "resource")
+
+    def __init__(self, on_error=None, execution_id=None, execution_context=None):
+        self.on_error = on_error
+        self.execution_id = execution_id
+        self.execution_context = dict(execution_context or {})
+
+    def throw_error(self, error_type, error_details, original_error=None):
+        """
+        Main method to raise errors with full context
+
+        Args:
+            error_type: Type of error ('node', 'flow', 'system', etc.)
+            error_details: Specific details about the error
+            original_error: Original exception if one exists
+        """
+        error_event = self.create_error_event(error_type, error_details, original_error)
+
+        self._invoke_callback(error_event)
+
+        raise self.create_enriched_error(error_event) from original_error
+
+    def create_error_event(self, error_type, error_details, original_error=None):
+        """
+        Create the error event structure for callbacks
+
+        Args:
+            error_type: Type of error
+            error_details: Error details
+            original_error: Original exception
+
+        Returns:
+            dict: Formatted error event
+        """
+        return {
+            "event": "error",
+            "type": error_type,
+            "error": original_error or Exception(error_details.get("message") or "Unknown error"),
+            "error_details": {
+                **error_details,
+                "timestamp": int(time.time() * 1000),
+                "execution_id": self.execution_id,
+            },
+            "execution_id": self.execution_id,
+            "context": dict(self.execution_context),
+        }
+
+    def create_enriched_error(self, error_event):
+        """
+        Create the actual exception to raise
+
+        Args:
+            error_event: The error event structure
+
+        Returns:
+            Zv1Error: Enriched error object
+        """
+        error = error_event["error"]
+        error_details = error_event["error_details"]
+        message = error_details.get("message") or str(error) or "Flow execution error"
+
+        # The original exception is chained as __cause__ by throw_error
+        enriched = Zv1Error(
+            message,
+            error_type=error_event["type"],
+            error_details=error_details,
+            execution_id=self.execution_id,
+            context=self.execution_context,
+        )
+        if str(error) != message:
+            enriched.original_message = str(error)
+        return enriched
+
+    def update_execution_context(self, context):
+        """
+        Update execution context (called during flow execution)
+
+        Args:
+            context: New execution context values
+        """
+        self.execution_context = {**self.execution_context, **context}
+
+    # Convenience methods for common error types
+
+    def throw_node_error(self, node_id, node_type, message, original_error=None):
+        """Raise a node-specific error."""
+        return self.throw_error("node", {
+            "node_id": node_id,
+            "node_type": node_type,
+            "message": message,
+            "severity": "recoverable",  # Most node errors are recoverable
+        }, original_error)
+
+    def throw_flow_error(self, message, original_error=None):
+        """Raise a flow-level error."""
+        return self.throw_error("flow", {
+            "message": message,
+            "severity": "fatal",
+        }, original_error)
+
+    def throw_system_error(self, message, original_error=None):
+        """Raise a system-level error."""
+        return self.throw_error("system", {
+            "message": message,
+            "severity": "fatal",
+        }, original_error)
+
+    def throw_validation_error(self, field, message, original_error=None):
+        """Raise a validation error."""
+        return self.throw_error("validation", {
+            "field": field,
+            "message": message,
+            "severity": "fatal",
+        }, original_error)
+
+    def throw_timeout_error(self, message="Flow execution timed out"):
+        """Raise a timeout error."""
+        return self.throw_error("timeout", {
+            "message": message,
+            "severity": "fatal",
+            "timeout": self.execution_context.get("timeout"),
+        })
+
+    def throw_resource_error(self, resource_type, message):
+        """Raise a resource exhaustion error."""
+        return self.throw_error("resource", {
+            "resource_type": resource_type,
+            "message": message,
+            "severity": "fatal",
+        })
+
+    def create_error_event_only(self, error_type, error_details, original_error=None):
+        """
+        Create an error event without raising (useful for logging/monitoring)
+
+        Returns:
+            dict: Error event object
+        """
+        error_event = self.create_error_event(error_type, error_details, original_error)
+        self._invoke_callback(error_event)
+        return error_event
+
+    def is_recoverable_error(self, error_type):
+        """
+        Check if an error is recoverable based on its type
+
+        Returns:
+            bool: True if error is recoverable
+        """
+        if error_type in self.RECOVERABLE_TYPES:
+            return True
+        if error_type in self.FATAL_TYPES:
+            return False
+
+        # Default to recoverable for unknown types
+        return True
+
+    def _invoke_callback(self, error_event):
+        if not self.on_error:
+            return
+        try:
+            result = self.on_error(error_event)
+            if inspect.isawaitable(result):
+                # Callbacks may be coroutines; fire them without blocking the raise
+                asyncio.ensure_future(result)
+        except Exception as callback_error:
+            # Don't let callback errors interfere with main error
+            print("Error in on_error callback:", callback_error)
@@ -0,0 +1,176 @@
+"""
+Fused chains of array nodes
+
+A run of array nodes such as array-filter -> array-sort -> array-slice ->
+array-map is compiled into the plan as one chain and executed as a single
+operator: the elements stream through lazy iterators from the head to the
+tail, no intermediate list is built (a sort buffers its input, as it must),
+and only the tail's outputs reach the cache.
+
+A node type joins chains when its config sets "fusable": true and its
+process module defines the hooks:
+
+- stage(items, inputs, settings): an iterable of the node's `array`
+  output for an iterable of input elements, lazy where the node allows
+- summarize(items, inputs, settings): the node's outputs dict for an
+  iterable of input elements, for nodes with outputs besides `array`;
+  only used when the node is the tail of a chain
+
+A chain link carries `array` into `array`, and the upstream node has no
+other outbound link, so no intermediate port is observed. Nodes on cycles
+and plugin nodes are left alone. Before running, a chain is rewritten:
+filters move ahead of sorts without a limit (predicate pushdown), and a
+slice's end becomes the limit of the sort before it (top-k), through any
+array-map in between.
+
+The engine runs the nodes one by one instead whenever fusion could change
+what is seen: with on_node_start / on_node_complete callbacks or debug
+logging, for inputs that aren't lists (tables), and when the chain raises,
+so the error comes from the node that fails. Elements after an early exit
+(a slice's end, find's first match) are still drained through the stages
+before it, so the chain raises whenever node-by-node execution would.
+"""
+
+from collections import deque
+
+FUSED_PORT = "array"
+
+# Stages a filter can move ahead of, and stages a top-k limit passes through
+_ORDERING = "array-sort"
+_ONE_TO_ONE = ("array-map",)
+
+
+def _fusable(spec):
+    return bool(spec.config.get("fusable")) and not spec.refiring_ports and not spec.skip_propagation
+
+
+def find_array_chains(graph, specs, acyclic):
+    """
+    Chains of fusable nodes whose intermediate ports have no other consumers
+
+    Args:
+        graph: The FlowGraph
+        specs: node id -> NodeSpec
+        acyclic: Ids of the nodes that are not on a cycle
+
+    Returns:
+        dict: head node id -> [node ids of the chain, head first]
+    """
+    successor = {}
+    for node_id, spec in specs.items():
+        if node_id not in acyclic or not _fusable(spec) or node_id in graph.plugin_linked:
+            continue
+        links = graph.outbound_links(node_id)
+        if len(links) != 1:
+            continue
+        link = links[0]
+        if link.source_port != FUSED_PORT or link.target_port != FUSED_PORT:
+            continue
+        target = link.target
+        if target not in acyclic or not _fusable(specs[target]) or len(graph.inbound_links(target, FUSED_PORT)) != 1:
+            continue
+        successor[node_id] = target
+
+    chains = {}
+    successors = set(successor.values())
+    for node_id in specs:
+        if node_id not in successor or node_id in successors:
+            continue
+        chain = [node_id]
+        while chain[-1] in successor:
+            chain.append(successor[chain[-1]])
+        chains[node_id] = chain
+    return chains
+
+
+class Stage:
+    """One node of a chain, with its hooks and its inputs and settings for this run"""
+
+    __slots__ = ("node_id", "node_type", "module", "inputs", "settings")
+
+    def __init__(self, node_id, node_type, module, inputs, settings):
+        self.node_id = node_id
+        self.node_type = node_type
+        self.module = module
+        self.inputs = inputs
+        self.settings = settings
+
+
+def _slice_end(stage):
+    try:
+        start = int(stage.inputs.get("start", 0))
+        end = stage.inputs.get("end")
+        end = int(end) if end is not None else None
+    except (TypeError, ValueError):
+        return None
+    if start < 0 or end is None or end < 0:
+        return None
+    return end
+
+
+def rewrite(stages):
+    """
+    Reorder a chain's stages and push limits down; the result is the same
+
+    Filters run before sorts without a limit, so fewer elements are sorted
+    (a stable sort and an element-wise filter commute), and a slice with a
+    non-negative end caps the sort before it at that many elements.
+    """
+    stages = list(stages)
+    moved = True
+    while moved:
+        moved = False
+        for index in range(len(stages) - 1):
+            current, following = stages[index], stages[index + 1]
+            if current.node_type == _ORDERING and following.node_type == "array-filter" and current.settings.get("limit") is None:
+                stages[index], stages[index + 1] = following, current
+                moved = True
+
+    for index, stage in enumerate(stages):
+        if stage.node_type != "array-slice":
+            continue
+        end = _slice_end(stage)
+        if end is None:
+            continue
+        before = index - 1
+        while before >= 0 and stages[before].node_type in _ONE_TO_ONE:
+            before -= 1
+        if before >= 0 and stages[before].node_type == _ORDERING:
+            sort = stages[before]
+            limit = sort.settings.get("limit")
+            limit = end if limit is None else min(int(limit), end)
+            stages[before] = Stage(sort.node_id, sort.node_type, sort.module, sort.inputs, {**sort.settings, "limit": limit})
+    return stages
+
+
+def run_chain(stages, items):
+    """
+    Stream the elements through the stages
+
+    Rewriting only swaps sorts and filters, which both output just `array`,
+    so the last stage's outputs stand for the chain's tail. Once the tail
+    is done, whatever a slice or find left unread is drained through the
+    stages before it, so an element that raises in node-by-node execution
+    still raises (and the engine falls back to it).
+
+    Returns:
+        dict: The outputs of the chain's last node
+    """
+    stages = rewrite(stages)
+    streams = []
+    items = iter(items)
+    for stage in stages[:-1]:
+        streams.append(items)
+        items = iter(stage.module.stage(items, stage.inputs, stage.settings))
+    streams.append(items)
+
+    tail = stages[-1]
+    summarize = getattr(tail.module, "summarize", None)
+    if summarize is not None:
+        outputs = summarize(items, tail.inputs, tail.settings)
+    else:
+        outputs = {FUSED_PORT: list(tail.module.stage(items, tail.inputs, tail.settings))}
+
+    for stream in reversed(streams):
+        deque(stream, maxlen=0)
+    return outputs
@@ -0,0 +1,87 @@
+"""
+Indexed view of a flow's nodes and links
+
+The engine resolves every link lookup through these indexes instead of
+scanning the flow's link list:
+
+- nodes: node id -> node dict
+- inbound: node id -> {input port -> [Link]}
+- outbound: node id -> {output port -> [Link]}
+- plugin_sources: node id -> [ids of nodes linked into it as plugins]
+- plugin_linked: ids of nodes that are linked somewhere as a plugin
+
+Plugin links carry no port names and never transport values, so they are
+kept out of the data indexes.
+"""
+
+
+class Link:
+    __slots__ = ("source", "source_port", "target", "target_port", "type")
+
+    def __init__(self, source, source_port, target, target_port, type=None):
+        self.source = source
+        self.source_port = source_port
+        self.target = target
+        self.target_port = target_port
+        self.type = type
+
+    @classmethod
+    def from_dict(cls, link):
+        return cls(
+            link["from"]["node_id"],
+            link["from"].get("port_name"),
+            link["to"]["node_id"],
+            link["to"].get("port_name"),
+            link.get("type"),
+        )
+
+    def __repr__(self):
+        return f"Link({self.source}:{self.source_port} -> {self.target}:{self.target_port})"
+
+
+class FlowGraph:
+    def __init__(self, flow):
+        self.nodes = {node["id"]: node for node in flow.get("nodes", [])}
+        self.inbound = {node_id: {} for node_id in self.nodes}
+        self.outbound = {node_id: {} for node_id in self.nodes}
+        self.plugin_sources = {}
+        self.plugin_linked = set()
+        self.links = []
+
+        for link_dict in flow.get("links", []):
+            link = Link.from_dict(link_dict)
+            if link.source not in self.nodes or link.target not in self.nodes:
+                continue
+            self.links.append(link)
+            if link.type == "plugin":
+                self.plugin_sources.setdefault(link.target, []).append(link.source)
+                self.plugin_linked.add(link.source)
+                continue
+            self.inbound[link.target].setdefault(link.target_port, []).append(link)
+            self.outbound[link.source].setdefault(link.source_port, []).append(link)
+
+    def has_inbound_links(self, node_id):
+        """Whether any link (data or plugin) points at the node."""
+        return bool(self.inbound[node_id]) or node_id in self.plugin_sources
+
+    def has_outbound_links(self, node_id):
+        """Whether any link (data or plugin) leaves the node."""
+        return bool(self.outbound[node_id]) or node_id in self.plugin_linked
+
+    def inbound_links(self, node_id, port_name=None):
+        """Data links into a node, optionally limited to one input port."""
+        ports = self.inbound[node_id]
+        if port_name is not None:
+            return ports.get(port_name, [])
+        return [link for links in ports.values() for link in links]
+
+    def outbound_links(self, node_id, port_name=None):
+        """Data links out of a node, optionally limited to one output port."""
+        ports = self.outbound[node_id]
+        if port_name is not None:
+            return ports.get(port_name, [])
+        return [link for links in ports.values() for link in links]
+
+    def terminal_nodes(self):
+        """Nodes without any outgoing link."""
+        return [node for node_id, node in self.nodes.items() if not self.has_outbound_links(node_id)]
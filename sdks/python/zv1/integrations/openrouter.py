@@ -0,0 +1,267 @@
+import inspect
+import time
+
+from .response_cache import get_response_cache, is_deterministic
+
+
+class OpenRouterIntegration:
+    def __init__(self, api_key, options=None):
+        options = options or {}
+        try:
+            from openai import AsyncOpenAI
+        except ImportError as error:
+            raise ImportError("The OpenRouter integration requires openai: pip install zv1[openrouter]") from error
+
+        self.client = AsyncOpenAI(
+            base_url=options.get("base_url") or "https://openrouter.ai/api/v1",
+            api_key=api_key,
+            default_headers={
+                "HTTP-Referer": options.get("referer") or "https://zv1.ai",
+                "X-Title": options.get("title") or "zv1 by ZeroWidth",
+            },
+        )
+
+    def build_payload(self, model, messages=None, prompt=None, **params):
+        """
+        Build the chat completion request body
+
+        Returns:
+            dict: The request payload
+        """
+        payload = {
+            "model": model,
+            "provider": {
+                "data_collection": "deny",
+                "require_parameters": True,
+            },
+        }
+
+        if messages:
+            # Remove fields that we add ourselves
+            payload["messages"] = []
+            for message in messages:
+                message = {
+                    key: value for key, value in message.items()
+                    if key not in ("id", "participant_id", "timestamp", "_token_counts")
+                }
+                if message.get("tool_calls") == []:
+                    del message["tool_calls"]
+                payload["messages"].append(message)
+        elif prompt:
+            payload["prompt"] = prompt
+        else:
+            raise ValueError("Either messages or prompt must be provided")
+
+        # Tools are wrapped as {type: 'function', function: {...}}
+        if params.get("tools"):
+            params["tools"] = [
+                {
+                    "type": "function",
+                    "function": {
+                        "name": tool.get("name"),
+                        "description": tool.get("description"),
+                        "parameters": tool.get("parameters"),
+                    },
+                }
+                for tool in params["tools"]
+            ]
+
+        for key, value in params.items():
+            if value is None:
+                continue
+            if key == "reasoning":
+                # Can be boolean or object
+                if isinstance(value, bool):
+                    payload["reasoning"] = {"enabled": value}
+                elif isinstance(value, dict):
+                    payload["reasoning"] = value
+            elif key == "include_reasoning":
+                if isinstance(value, bool):
+                    payload.setdefault("reasoning", {"enabled": True})
+                    payload["reasoning"]["exclude"] = not value
+            else:
+                payload[key] = value
+
+        payload.pop("system_prompt", None)
+        if not payload.get("tools"):
+            payload.pop("tools", None)
+
+        return payload
+
+    async def chat_completion(self, model, messages=None, prompt=None, nodeConfig=None, engineConfig=None, **params):
+        payload = self.build_payload(model, messages=messages, prompt=prompt, **params)
+        payload["stream"] = True
+        engine_config = engineConfig or {}
+        on_node_update = engine_config.get("on_node_update")
+
+        response_cache = get_response_cache(engine_config) if is_deterministic(payload) else None
+        if response_cache is not None:
+            cache_key = response_cache.make_key(payload)
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                return await self._cached_result(cached, nodeConfig, on_node_update)
+
+        try:
+            # Port values are frozen, so the payload is passed on without a defensive copy
+            stream = await self.client.chat.completions.create(**payload)
+
+            content = ""
+            role = ""
+            reasoning = ""
+            tool_calls = []
+            usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+            count = 0
+            async for chunk in stream:
+                if chunk.object != "chat.completion.chunk":
+                    continue
+
+                data = {}
+                if chunk.choices:
+                    choice = chunk.choices[0]
+                    delta = getattr(choice, "delta", None)
+                    if delta is not None:
+                        data = {
+                            "content": delta.content,
+                            "reasoning": getattr(delta, "reasoning", None),
+                            "role": delta.role,
+                            "tool_calls": delta.tool_calls,
+                            "finish_reason": getattr(choice, "finish_reason", None),
+                        }
+                    elif getattr(choice, "text", None):
+                        data = {"content": choice.text}
+
+                if data.get("content") is not None:
+                    content += data["content"]
+                if data.get("reasoning") is not None:
+                    reasoning += data["reasoning"]
+
+                if not data.get("role"):
+                    data["role"] = "assistant"
+                role = data["role"]
+
+                if data.get("tool_calls"):
+                    tool_call = data["tool_calls"][0]
+                    if tool_call.id:
+                        tool_calls.append({
+                            "id": tool_call.id,
+                            "index": tool_call.index,
+                            "type": tool_call.type,
+                            "function": {
+                                "name": tool_call.function.name,
+                                "arguments": tool_call.function.arguments or "",
+                            },
+                        })
+                    elif tool_calls:
+                        # Continuation chunk: append arguments to the most recent tool call
+                        tool_calls[-1]["function"]["arguments"] += tool_call.function.arguments or ""
+                    data["tool_calls"] = [
+                        {"id": tool_call.id, "index": tool_call.index} for tool_call in data["tool_calls"]
+                    ]
+
+                if chunk.usage:
+                    usage["prompt_tokens"] += chunk.usage.prompt_tokens or 0
+                    usage["completion_tokens"] += chunk.usage.completion_tokens or 0
+                    usage["total_tokens"] += chunk.usage.total_tokens or 0
+
+                if on_node_update:
+                    result = on_node_update({
+                        "count": count,
+                        "node_type": (nodeConfig or {}).get("type"),
+                        "node_id": (nodeConfig or {}).get("id"),
+                        "timestamp": int(time.time() * 1000),
+                        "data": data,
+                    })
+                    if inspect.isawaitable(result):
+                        await result
+
+                count += 1
+        except Exception as error:
+            status = getattr(error, "status_code", None)
+            if status is not None:
+                message = f"OpenRouter API Error ({status}): {getattr(error, 'message', error)}"
+            else:
+                message = f"OpenRouter API Error: {error}"
+            raise RuntimeError(message) from error
+
+        result = {
+            "content": content,
+            "role": role,
+            "finish_reason": "",
+            "tool_calls": tool_calls,
+            "model": model,
+            "usage": usage,
+            "refusal": "",
+            "reasoning": reasoning,
+            "annotations": [],
+        }
+
+        if response_cache is not None:
+            response_cache.set(cache_key, result)
+
+        self._add_costs(result, nodeConfig)
+        return result
+
+    async def _cached_result(self, result, nodeConfig, on_node_update):
+        # Replay the response as a single update so streaming consumers still see it
+        if on_node_update:
+            update = on_node_update({
+                "count": 0,
+                "node_type": (nodeConfig or {}).get("type"),
+                "node_id": (nodeConfig or {}).get("id"),
+                "timestamp": int(time.time() * 1000),
+                "data": {
+                    "content": result["content"],
+                    "reasoning": result["reasoning"] or None,
+                    "role": result["role"],
+                    "tool_calls": [
+                        {"id": tool_call.get("id"), "index": tool_call.get("index")}
+                        for tool_call in result["tool_calls"]
+                    ] or None,
+                    "finish_reason": result["finish_reason"],
+                },
+            })
+            if inspect.isawaitable(update):
+                await update
+
+        # Nothing was spent: the cost a live call would have had, at the node's
+        # current pricing, is reported as saved
+        self._add_costs(result, nodeConfig, cached=True)
+        return result
+
+    def _add_costs(self, result, nodeConfig, cached=False):
+        if nodeConfig and nodeConfig.get("pricing"):
+            cost_data = self.calculate_costs(result["usage"], nodeConfig["pricing"])
+            if cached:
+                result["cost_total"] = 0
+                result["cost_saved"] = cost_data["total_cost"]
+                result["cost_itemized"] = [
+                    {**item, "cost": 0, "saved": item["cost"]} for item in cost_data["itemized_costs"]
+                ]
+            else:
+                result["cost_total"] = cost_data["total_cost"]
+                result["cost_itemized"] = cost_data["itemized_costs"]
+        result["cache_hit"] = cached
+
+    def calculate_costs(self, usage, pricing):
+        """
+        Calculate costs based on usage and pricing
+        """
+        items = pricing.get("items") or []
+        input_cost_obj = next((p for p in items if p.get("key") == "input_cost_per_million"), {})
+        output_cost_obj = next((p for p in items if p.get("key") == "output_cost_per_million"), {})
+
+        prompt_tokens = usage.get("prompt_tokens") or 0
+        completion_tokens = usage.get("completion_tokens") or 0
+
+        input_cost = round(prompt_tokens * (input_cost_obj.get("cost") or 0) / 1_000_000, 8)
+        output_cost = round(completion_tokens * (output_cost_obj.get("cost") or 0) / 1_000_000, 8)
+        total_cost = round(input_cost + output_cost, 8)
+
+        return {
+            "total_cost": total_cost,
+            "itemized_costs": [
+                {"label": "Input Tokens", "cost": input_cost, "tokens": prompt_tokens},
+                {"label": "Output Tokens", "cost": output_cost, "tokens": completion_tokens},
+            ],
+        }
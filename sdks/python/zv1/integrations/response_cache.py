@@ -0,0 +1,161 @@
+"""
+Persistent cache for deterministic LLM responses
+
+Chat completions requested with temperature 0 or a fixed seed are stored
+in a SQLite database keyed by a hash of the canonical request payload
+(model, messages, tools and parameters). Entries expire after a TTL, and
+the least recently used entries are evicted once the stored responses
+exceed a size budget.
+
+The cache is opt-in through the engine config:
+
+    {"llm_cache": "/path/to/responses.sqlite"}   # or a ResponseCache instance
+    {"llm_cache_ttl": 86400}                      # seconds, None keeps entries forever
+    {"llm_cache_max_bytes": 256 * 1024 * 1024}
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_TTL = 7 * 24 * 60 * 60
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_caches = {}
+
+
+def is_deterministic(payload):
+    """Whether a request asks for reproducible output (temperature 0 or a fixed seed)."""
+    return payload.get("temperature") == 0 or payload.get("seed") is not None
+
+
+class ResponseCache:
+    def __init__(self, path, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            path: SQLite database file, created if missing
+            ttl: Seconds an entry stays valid, or None for no expiry
+            max_bytes: Budget for the stored responses; older entries are evicted beyond it
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+    @staticmethod
+    def make_key(payload):
+        """Hash the canonical JSON of a request payload."""
+        canonical = json.dumps(
+            {key: value for key, value in payload.items() if key != "stream"},
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Get a cached response
+
+        Returns:
+            dict or None: The response, or None when missing or expired
+        """
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    def set(self, key, response):
+        """Store a response, then evict expired and least recently used entries."""
+        value = json.dumps(response, separators=(",", ":"), ensure_ascii=False, default=str)
+        size = len(value.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        if self.ttl is not None:
+            self._connection.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        if self.max_bytes is None:
+            return
+
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Walk entries from least recently used and drop them until the rest fit
+        excess = total - self.max_bytes
+        evicted = []
+        for key, size in self._connection.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            evicted.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+
+    def get_stats(self):
+        with self._lock:
+            entries, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"entries": entries, "size": size, "max_bytes": self.max_bytes, "ttl": self.ttl}
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def get_response_cache(engine_config):
+    """
+    Resolve the response cache configured for an engine
+
+    Returns:
+        ResponseCache or None: The cache, shared process-wide per database path
+    """
+    llm_cache = (engine_config or {}).get("llm_cache")
+    if not llm_cache:
+        return None
+    if isinstance(llm_cache, ResponseCache):
+        return llm_cache
+
+    path = os.path.abspath(os.fspath(llm_cache))
+    cache = _caches.get(path)
+    if cache is None:
+        cache = _caches[path] = ResponseCache(
+            path,
+            ttl=engine_config.get("llm_cache_ttl", DEFAULT_TTL),
+            max_bytes=engine_config.get("llm_cache_max_bytes", DEFAULT_MAX_BYTES),
+        )
+    return cache
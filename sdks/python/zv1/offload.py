@@ -0,0 +1,192 @@
+"""
+Process pool for CPU-bound nodes
+
+Nodes whose config sets `"cpu_bound": true` (tokenizers, CSV parsing,
+histograms, ...) do pure CPU work that would otherwise block the event
+loop, and with it every concurrent run in the process. The engine sends
+them to a warm, process-wide pool of worker processes instead. Workers
+import a node's process module once per content hash, like the registry
+does in the engine process, and keep it for later calls.
+
+Inputs and outputs are pickled with protocol 5. Payloads up to
+SHARED_MEMORY_THRESHOLD go through the pool's pipe. Larger ones are
+written once into a multiprocessing.shared_memory block, and the other
+side unpickles straight from a view of it, so the pickle itself is never
+copied again. Out-of-band buffers (bytes-like values) are placed in the
+same block and copied out once, since objects rebuilt from them (NumPy
+arrays) keep referencing them. The receiving side unlinks the block.
+
+The pool is opt-in through the engine config:
+
+    {"cpu_workers": 8}        # worker processes
+    {"cpu_workers": "auto"}   # one per CPU
+
+Workers are spawned, so scripts that enable the pool must guard their
+entry point with `if __name__ == "__main__":`. cpu_bound nodes receive an
+empty engine config, since integrations and callbacks can't cross
+process boundaries.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+from .registry import LazyProcess, load_process_module
+from .stalls import SliceTimes, run_timed
+
+SHARED_MEMORY_THRESHOLD = 1024 * 1024
+
+_offloaders = {}
+_worker_loop = None
+
+
+def _pack(value):
+    """
+    Serialize a value for another process
+
+    Returns:
+        tuple: (payload, block) where block is the SharedMemory holding the
+        data, or None when the payload carries it inline
+    """
+    buffers = []
+    data = pickle.dumps(value, protocol=5, buffer_callback=buffers.append)
+    views = [buffer.raw() for buffer in buffers]
+    size = len(data) + sum(view.nbytes for view in views)
+
+    if size < SHARED_MEMORY_THRESHOLD:
+        return ("inline", data, [bytes(view) for view in views]), None
+
+    block = shared_memory.SharedMemory(create=True, size=size)
+    sizes = []
+    offset = 0
+    for chunk in (memoryview(data), *views):
+        block.buf[offset:offset + chunk.nbytes] = chunk.cast("B")
+        offset += chunk.nbytes
+        sizes.append(chunk.nbytes)
+    return ("shared", block.name, sizes), block
+
+
+def _unpack(payload, unlink=False):
+    """Deserialize a payload made by _pack, unlinking its shared memory block when asked."""
+    if payload[0] == "inline":
+        _, data, buffers = payload
+        return pickle.loads(data, buffers=buffers)
+
+    _, name, sizes = payload
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        buffers = []
+        offset = sizes[0]
+        for size in sizes[1:]:
+            with block.buf[offset:offset + size] as chunk:
+                buffers.append(bytearray(chunk))
+            offset += size
+        # Every view of the block must be released before it can be closed
+        with block.buf[:sizes[0]] as data:
+            return pickle.loads(data, buffers=buffers)
+    finally:
+        block.close()
+        if unlink:
+            block.unlink()
+
+
+def _run_in_worker(node_type, process_path, content_hash, payload):
+    """
+    Entry point in the worker process: run a node's process function and pack its outputs
+
+    Returns:
+        tuple: (packed outputs, longest synchronous slice in ns, total blocking ns)
+    """
+    global _worker_loop
+    inputs, settings, node_config = _unpack(payload)
+    process = load_process_module(node_type, process_path, content_hash)
+
+    if _worker_loop is None:
+        _worker_loop = asyncio.new_event_loop()
+    outputs, timed = _worker_loop.run_until_complete(run_timed(process(inputs, settings, {}, node_config)))
+
+    result, block = _pack(outputs)
+    if block is not None:
+        # The engine process unlinks the block once it has read it
+        block.close()
+    return result, timed.max_slice_ns, timed.blocking_ns
+
+
+class ProcessOffloader:
+    def __init__(self, max_workers=None):
+        """
+        Args:
+            max_workers: Worker processes, defaults to os.cpu_count()
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            # Spawned workers don't inherit the event loop or threads of this process
+            self._executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    @staticmethod
+    def can_offload(process):
+        """Whether a process function can be imported by a worker."""
+        return isinstance(process, LazyProcess)
+
+    async def run(self, process, inputs, settings, node_config):
+        """
+        Run a node's process function in the pool
+
+        Args:
+            process: The node's LazyProcess
+            inputs, settings, node_config: As passed to the process function
+
+        Returns:
+            dict: The node's outputs
+        """
+        outputs, _ = await self.run_timed(process, inputs, settings, node_config)
+        return outputs
+
+    async def run_timed(self, process, inputs, settings, node_config):
+        """
+        Run a node's process function in the pool, timing its synchronous slices there
+
+        Returns:
+            tuple: (the node's outputs, SliceTimes)
+        """
+        payload, block = _pack((inputs, settings, node_config))
+        loop = asyncio.get_running_loop()
+        try:
+            result, max_slice_ns, blocking_ns = await loop.run_in_executor(
+                self._get_executor(),
+                _run_in_worker,
+                process.node_type,
+                process.process_path,
+                process.content_hash,
+                payload,
+            )
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool for later calls
+            self._executor = None
+            raise
+        finally:
+            if block is not None:
+                block.close()
+                block.unlink()
+        return _unpack(result, unlink=True), SliceTimes(max_slice_ns, blocking_ns)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def get_offloader(max_workers=None):
+    """Get the process-wide offloader with the given number of workers."""
+    offloader = _offloaders.get(max_workers)
+    if offloader is None:
+        offloader = _offloaders[max_workers] = ProcessOffloader(max_workers)
+    return offloader
@@ -0,0 +1,364 @@
+"""
+Compiled execution plans
+
+Everything the engine derives from a flow's nodes and links before it can
+run - the indexed graph, readiness counters, fan-out tables, entry/input/
+output nodes, plugin wiring and the settings/input default tables - is
+compiled once into an ExecutionPlan.
+
+Plans contain only plain data (no process functions), so they can be
+pickled. They are keyed by a content hash of the flow and the configs of
+the node types it uses, kept in a per-process LRU and, when a cache
+directory is configured, written to <cache_dir>/<hash>.plan so that other
+workers and cold starts can skip graph analysis entirely.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from collections import OrderedDict, deque
+
+from .fusion import find_array_chains
+from .graph import FlowGraph
+from .scalar import find_scalar_groups
+from .stream import streams_deltas
+from .utilities.frozen import freeze
+
+# Bump whenever the layout of ExecutionPlan or NodeSpec changes
+PLAN_VERSION = 6
+
+MEMORY_CACHE_SIZE = 128
+
+_memory_plans = OrderedDict()
+
+
+class NodeSpec:
+    """
+    Per-node tables
+
+    - input_defs: input port name -> input definition
+    - data_ports: [(port name, input definition, [Link])] for connected, defined ports
+    - refiring_ports: [(port name, [Link])] for allow_multiple + refires ports
+    - required_count: number of non-refiring links that must carry a value before the node is ready
+    - input_defaults: [(port name, default)] for unconnected inputs that declare a default
+    - settings: the node's settings with setting defaults applied
+    - setting_defaults: [(setting name, default)] re-applied when a setting is cleared at runtime
+    - skip_propagation: plugin nodes linked as plugins only run when called by an LLM
+    - stream_ports: linked can_stream output ports that receive chunks (streams_deltas), published as streams while the node runs
+    - stream_inputs: input ports marked accepts_stream, which receive streams unmaterialized
+    - stream_output_keys: stream port -> output keys of the output nodes it feeds
+    """
+
+    __slots__ = (
+        "node", "config", "node_config", "input_defs", "data_ports", "refiring_ports",
+        "required_count", "input_defaults", "settings", "setting_defaults", "skip_propagation",
+        "stream_ports", "stream_inputs", "stream_output_keys",
+    )
+
+    def __init__(self, node, config, graph):
+        self.node = node
+        self.config = config
+        # Each node gets its own copy so the shared config is never mutated
+        self.node_config = {**config, "type": node["type"], "id": node["id"]}
+        self.input_defs = {input_def["name"]: input_def for input_def in config.get("inputs", [])}
+        self.data_ports = []
+        self.refiring_ports = []
+        self.required_count = 0
+
+        connected = graph.inbound[node["id"]]
+        for port_name, links in connected.items():
+            input_def = self.input_defs.get(port_name)
+            if input_def is None:
+                continue
+            self.data_ports.append((port_name, input_def, links))
+            if input_def.get("allow_multiple") and input_def.get("refires"):
+                self.refiring_ports.append((port_name, links))
+            else:
+                self.required_count += len(links)
+
+        self.input_defaults = [
+            (input_name, freeze(input_def["default"]))
+            for input_name, input_def in self.input_defs.items()
+            if input_name not in connected and "default" in input_def
+        ]
+
+        self.setting_defaults = [
+            (setting_def["name"], setting_def["default"])
+            for setting_def in config.get("settings") or []
+            if "default" in setting_def
+        ]
+        self.settings = dict(node.get("settings") or {})
+        apply_setting_defaults(self.settings, self.setting_defaults)
+
+        self.skip_propagation = bool(config.get("is_plugin")) and node["id"] in graph.plugin_linked
+
+        self.stream_ports = [
+            output_def["name"]
+            for output_def in config.get("outputs", [])
+            if streams_deltas(config, output_def) and graph.outbound[node["id"]].get(output_def["name"])
+        ]
+        self.stream_inputs = frozenset(
+            input_name for input_name, input_def in self.input_defs.items() if input_def.get("accepts_stream")
+        )
+        self.stream_output_keys = {}
+
+
+class ExecutionPlan:
+    """
+    Immutable, picklable result of compiling a flow
+
+    - flow_hash: content hash the plan is cached under
+    - graph: the indexed FlowGraph
+    - order: node ids in topological order (nodes on cycles follow in flow order)
+    - specs: node id -> NodeSpec
+    - counted_targets: (source node, output port) -> targets whose readiness counter it feeds
+    - entry_nodes / input_nodes / output_nodes: node ids, in topological order
+    - llm_plugins: LLM node id -> ids of the plugin nodes linked into it
+    - fused_chains: head node id -> ids of a chain of array nodes run as one (zv1.fusion)
+    - scalar_groups: head node id -> ScalarGroup of scalar nodes compiled into one function (zv1.scalar)
+    """
+
+    __slots__ = (
+        "version", "flow_hash", "graph", "order", "specs", "counted_targets",
+        "entry_nodes", "input_nodes", "output_nodes", "llm_plugins", "fused_chains",
+        "scalar_groups",
+    )
+
+    def __init__(self, flow_hash, graph, order, specs, counted_targets, entry_nodes, input_nodes, output_nodes, llm_plugins, fused_chains, scalar_groups):
+        self.version = PLAN_VERSION
+        self.flow_hash = flow_hash
+        self.graph = graph
+        self.order = order
+        self.specs = specs
+        self.counted_targets = counted_targets
+        self.entry_nodes = entry_nodes
+        self.input_nodes = input_nodes
+        self.output_nodes = output_nodes
+        self.llm_plugins = llm_plugins
+        self.fused_chains = fused_chains
+        self.scalar_groups = scalar_groups
+
+
+def apply_setting_defaults(settings, setting_defaults):
+    """Fill settings that are missing, None or empty with their defaults."""
+    for name, default in setting_defaults:
+        if settings.get(name) in (None, ""):
+            settings[name] = default
+    return settings
+
+
+def output_key(node):
+    """The key an output node's value is reported under."""
+    settings = node.get("settings") or {}
+    if settings.get("key") not in (None, ""):
+        return settings["key"]
+    return "chat" if node["type"] == "output-chat" else "data"
+
+
+def _node_type_configs(nodes):
+    return {node_type: definition["config"] for node_type, definition in nodes.items()}
+
+
+def compute_flow_hash(flow, nodes):
+    """
+    Hash a flow together with the configs of the node types it was loaded with
+
+    Args:
+        flow: The flow definition
+        nodes: Map of node types to their definitions, as returned by load_nodes
+
+    Returns:
+        str: Hex digest identifying the compiled plan
+    """
+    payload = json.dumps(
+        {"version": PLAN_VERSION, "flow": flow, "configs": _node_type_configs(nodes)},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _topological_order(graph):
+    in_degree = dict.fromkeys(graph.nodes, 0)
+    for link in graph.links:
+        if link.type != "plugin":
+            in_degree[link.target] += 1
+
+    ready = deque(node_id for node_id, degree in in_degree.items() if degree == 0)
+    order = []
+    while ready:
+        node_id = ready.popleft()
+        order.append(node_id)
+        for link in graph.outbound_links(node_id):
+            in_degree[link.target] -= 1
+            if in_degree[link.target] == 0:
+                ready.append(link.target)
+
+    # Nodes on cycles (loops) never reach zero in-degree
+    placed = set(order)
+    order.extend(node_id for node_id in graph.nodes if node_id not in placed)
+    return order, placed
+
+
+def compile_plan(flow, nodes, flow_hash=None):
+    """
+    Compile a flow into an ExecutionPlan
+
+    Args:
+        flow: The flow definition containing nodes and links
+        nodes: Map of node types to their definitions, as returned by load_nodes
+        flow_hash: Precomputed compute_flow_hash(flow, nodes)
+
+    Returns:
+        ExecutionPlan: The compiled plan
+    """
+    graph = FlowGraph(flow)
+    order, acyclic = _topological_order(graph)
+    configs = _node_type_configs(nodes)
+
+    specs = {
+        node_id: NodeSpec(graph.nodes[node_id], configs.get(graph.nodes[node_id]["type"]) or {}, graph)
+        for node_id in order
+    }
+
+    counted_targets = {}
+    for spec in specs.values():
+        for port_name, input_def, links in spec.data_ports:
+            if input_def.get("allow_multiple") and input_def.get("refires"):
+                continue
+            for link in links:
+                counted_targets.setdefault((link.source, link.source_port), []).append(link.target)
+
+    for spec in specs.values():
+        for port_name in spec.stream_ports:
+            spec.stream_output_keys[port_name] = [
+                output_key(graph.nodes[link.target])
+                for link in graph.outbound_links(spec.node["id"], port_name)
+                if specs[link.target].config.get("is_output")
+            ]
+
+    entry_nodes = []
+    input_nodes = []
+    output_nodes = []
+    for node_id, spec in specs.items():
+        if spec.config.get("is_input"):
+            input_nodes.append(node_id)
+        if spec.config.get("is_output"):
+            output_nodes.append(node_id)
+        # Entry nodes are constants without inbound links that are not wired up as plugins
+        if spec.config.get("is_constant") and not graph.has_inbound_links(node_id) and not spec.skip_propagation:
+            entry_nodes.append(node_id)
+
+    llm_plugins = {
+        node_id: list(graph.plugin_sources.get(node_id, ()))
+        for node_id, spec in specs.items()
+        if spec.config.get("accepts_plugins")
+    }
+
+    return ExecutionPlan(
+        flow_hash or compute_flow_hash(flow, nodes),
+        graph,
+        order,
+        specs,
+        counted_targets,
+        entry_nodes,
+        input_nodes,
+        output_nodes,
+        llm_plugins,
+        find_array_chains(graph, specs, acyclic),
+        find_scalar_groups(graph, specs, order, acyclic),
+    )
+
+
+def _plan_path(cache_dir, flow_hash):
+    return os.path.join(cache_dir, f"{flow_hash}.plan")
+
+
+def read_plan(cache_dir, flow_hash):
+    """
+    Read a plan from the disk cache
+
+    Returns:
+        ExecutionPlan or None: The cached plan, or None when it is missing, stale or unreadable
+    """
+    try:
+        with open(_plan_path(cache_dir, flow_hash), "rb") as f:
+            plan = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # Corrupt or written by an incompatible version: recompile
+        return None
+    if not isinstance(plan, ExecutionPlan) or plan.version != PLAN_VERSION or plan.flow_hash != flow_hash:
+        return None
+    return plan
+
+
+def write_plan(cache_dir, plan):
+    """
+    Write a plan to the disk cache
+    The file is written to a temporary name first so readers never see a partial plan
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(plan, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, _plan_path(cache_dir, plan.flow_hash))
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_plan(flow, nodes, cache_dir=None):
+    """
+    Get the plan for a flow, compiling it only on a cache miss
+
+    Looks in the per-process cache first, then in cache_dir when given.
+    Freshly compiled plans are stored in both.
+
+    Args:
+        flow: The flow definition containing nodes and links
+        nodes: Map of node types to their definitions, as returned by load_nodes
+        cache_dir: Optional directory for the on-disk plan cache
+
+    Returns:
+        ExecutionPlan: The plan for the flow
+    """
+    flow_hash = compute_flow_hash(flow, nodes)
+
+    plan = _memory_plans.get(flow_hash)
+    if plan is not None:
+        _memory_plans.move_to_end(flow_hash)
+        return plan
+
+    if cache_dir:
+        plan = read_plan(cache_dir, flow_hash)
+
+    if plan is None:
+        plan = compile_plan(flow, nodes, flow_hash)
+        if cache_dir:
+            try:
+                write_plan(cache_dir, plan)
+            except OSError as error:
+                print(f"[WARN] Failed to write plan cache to {cache_dir}: {error}")
+
+    _memory_plans[flow_hash] = plan
+    if len(_memory_plans) > MEMORY_CACHE_SIZE:
+        _memory_plans.popitem(last=False)
+    return plan
+
+
+def clear_plan_cache(cache_dir=None):
+    """Clear the per-process plan cache and, when given, the plan files in cache_dir."""
+    _memory_plans.clear()
+    if cache_dir and os.path.isdir(cache_dir):
+        for file_name in os.listdir(cache_dir):
+            if file_name.endswith(".plan"):
+                os.unlink(os.path.join(cache_dir, file_name))
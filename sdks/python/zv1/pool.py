@@ -0,0 +1,66 @@
+"""
+Warm engine pool for concurrent runs of one flow
+
+An engine instance holds per-run state (cache, timeline, scheduling
+counters), so a single instance can't serve overlapping runs. The pool
+loads the flow once and gives every run its own engine via Zv1.spawn,
+which shares the loaded node modules, integrations (and their HTTP
+clients), type validators and execution plan.
+"""
+
+import asyncio
+
+from .engine import Zv1
+
+
+class EnginePool:
+    def __init__(self, engine, max_concurrent_runs=None):
+        """
+        Args:
+            engine: An initialized engine used as the template for every run
+            max_concurrent_runs: Optional cap on runs executing at once; extra runs wait
+        """
+        self.engine = engine
+        self.max_concurrent_runs = max_concurrent_runs
+        self._semaphore = asyncio.Semaphore(max_concurrent_runs) if max_concurrent_runs else None
+        self.active_runs = 0
+
+    @classmethod
+    async def create(cls, flow, config=None, max_concurrent_runs=None):
+        """
+        Load a flow once and create a pool serving runs of it
+        Accepts the same flow sources and config as zv1.create
+
+        Returns:
+            EnginePool: The pool
+        """
+        engine = await Zv1.create(flow, config)
+        return cls(engine, max_concurrent_runs)
+
+    async def run(self, input_data=None, timeout=60.0, config=None):
+        """
+        Run the flow in an isolated run context
+
+        Args:
+            input_data: Data to inject into input nodes
+            timeout: Maximum execution time in seconds
+            config: Per-run config merged over the pool's config, e.g. event
+                callbacks or execution_id. Keys and integrations are shared
+                and can't be changed per run.
+
+        Returns:
+            dict: The run result, as returned by Zv1.run
+        """
+        if self._semaphore is None:
+            return await self._run(input_data, timeout, config)
+        async with self._semaphore:
+            return await self._run(input_data, timeout, config)
+
+    async def _run(self, input_data, timeout, config):
+        engine = self.engine.spawn(config)
+        self.active_runs += 1
+        try:
+            return await engine.run(input_data, timeout)
+        finally:
+            self.active_runs -= 1
+            await engine.cleanup()
@@ -0,0 +1,181 @@
+"""
+Node type registry
+
+Resolves node types to their definitions without scanning the nodes
+directory. When scripts/sync_sdks.py has generated all-nodes.index.json,
+a node's config is read from its byte span in all-nodes.config.json and
+its process module is identified by the content hash recorded in the
+index. Otherwise the registry falls back to nodes/<type>/<type>.config.json.
+
+Process modules are imported on the first call of the node, and only once
+per content hash: an unchanged node is never re-imported, even when the
+registry is rebuilt.
+"""
+
+import importlib.util
+import json
+import os
+import re
+import sys
+
+INDEX_FILE = "all-nodes.index.json"
+INDEX_VERSION = 1
+
+_MODULE_NAME_CHARS = re.compile(r"[^0-9a-zA-Z_]")
+
+# Process-wide caches shared by every engine in the interpreter
+_registries = {}
+_definitions = {}
+
+
+def load_process_module(node_type, process_path, content_hash=None):
+    """
+    Import a node's process file once per interpreter
+    Modules are registered in sys.modules so every engine shares them. With a
+    content hash, the module name includes it and an existing module is reused
+    as is; without one, the module is reloaded when its path changes.
+
+    Returns:
+        The process coroutine function of the module
+    """
+    module_name = "zv1_nodes." + _MODULE_NAME_CHARS.sub("_", node_type)
+    if content_hash:
+        module_name += f"_{content_hash}"
+    module = sys.modules.get(module_name)
+    if module is None or (not content_hash and getattr(module, "__file__", None) != process_path):
+        spec = importlib.util.spec_from_file_location(module_name, process_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules[module_name] = module
+    return module.process
+
+
+class LazyProcess:
+    """
+    Stands in for a node's process function and imports its module on first call
+    """
+
+    __slots__ = ("node_type", "process_path", "content_hash", "_process")
+
+    def __init__(self, node_type, process_path, content_hash=None):
+        self.node_type = node_type
+        self.process_path = process_path
+        self.content_hash = content_hash
+        self._process = None
+
+    def __call__(self, inputs, settings, config, nodeConfig):
+        process = self._process
+        if process is None:
+            process = self._process = load_process_module(self.node_type, self.process_path, self.content_hash)
+        return process(inputs, settings, config, nodeConfig)
+
+
+def process_module(process):
+    """
+    The module a node's process function comes from, for its optional hooks
+
+    Args:
+        process: A process coroutine function or a LazyProcess
+    """
+    if isinstance(process, LazyProcess):
+        if process._process is None:
+            process._process = load_process_module(process.node_type, process.process_path, process.content_hash)
+        process = process._process
+    return sys.modules.get(getattr(process, "__module__", None))
+
+
+class NodeRegistry:
+    def __init__(self, nodes_dir):
+        self.nodes_dir = nodes_dir
+        self._index = None
+        self._index_loaded = False
+
+    def _load_index(self):
+        if self._index_loaded:
+            return self._index
+        self._index_loaded = True
+
+        index_path = os.path.join(self.nodes_dir, INDEX_FILE)
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            config_path = os.path.join(self.nodes_dir, index["config_file"])
+            # An index is only valid for the master config it was generated with
+            if index.get("version") != INDEX_VERSION or os.path.getsize(config_path) != index["config_size"]:
+                print(f"[WARN] Ignoring stale node registry index {index_path}, run scripts/sync_sdks.py to regenerate it")
+                return None
+        except (OSError, ValueError, KeyError):
+            return None
+
+        index["config_path"] = config_path
+        self._index = index
+        return index
+
+    def _read_indexed_config(self, index, span):
+        offset, length = span
+        with open(index["config_path"], "rb") as f:
+            f.seek(offset)
+            config = json.loads(f.read(length))
+        # The master config adds the node id; per-node config files don't have it
+        config.pop("id", None)
+        return config
+
+    def get(self, node_type):
+        """
+        Get the definition of a node type
+
+        Returns:
+            dict or None: {"config", "process"}, with process None for macro nodes.
+            None when the node type or its Python process file doesn't exist.
+
+        Raises:
+            FileNotFoundError: The node type has no config
+        """
+        index = self._load_index()
+        entry = index["nodes"].get(node_type) if index else None
+
+        if entry is not None:
+            process_path, content_hash = entry["process"].get("py") or (None, None)
+            if process_path:
+                process_path = os.path.join(self.nodes_dir, process_path)
+            cache_key = (self.nodes_dir, node_type, content_hash, tuple(entry["config"]))
+            definition = _definitions.get(cache_key)
+            if definition is None:
+                definition = _definitions[cache_key] = self._build(
+                    node_type, self._read_indexed_config(index, entry["config"]), process_path, content_hash
+                )
+            return definition
+
+        node_path = os.path.join(self.nodes_dir, node_type)
+        config_path = os.path.join(node_path, f"{node_type}.config.json")
+        process_path = os.path.join(node_path, f"{node_type}.process.py")
+        if not os.path.exists(config_path):
+            raise FileNotFoundError(f"Missing config file for node {node_type}: {config_path}")
+
+        # Without an index, reload when the config file changes on disk
+        cache_key = (self.nodes_dir, node_type, os.stat(config_path).st_mtime_ns)
+        definition = _definitions.get(cache_key)
+        if definition is None:
+            with open(config_path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+            definition = _definitions[cache_key] = self._build(
+                node_type, config, process_path if os.path.exists(process_path) else None
+            )
+        return definition
+
+    def _build(self, node_type, config, process_path, content_hash=None):
+        if config.get("is_macro"):
+            # Macro nodes don't have process functions
+            return {"config": config, "process": None}
+        if not process_path:
+            return None
+        return {"config": config, "process": LazyProcess(node_type, process_path, content_hash)}
+
+
+def get_registry(nodes_dir):
+    """Get the shared registry for a nodes directory."""
+    nodes_dir = os.path.abspath(nodes_dir)
+    registry = _registries.get(nodes_dir)
+    if registry is None:
+        registry = _registries[nodes_dir] = NodeRegistry(nodes_dir)
+    return registry
@@ -0,0 +1,371 @@
+"""
+Compiled groups of scalar nodes
+
+Flows built in the designer often wire dozens of tiny math and logic
+nodes (add, multiply, greater-than, if-else, ...) together. Run one by
+one, each costs a task, a cache write, a timeline entry and readiness
+checks. Connected nodes of this kind are compiled into the plan as a
+group instead: a generated Python function that calls each node's
+compute hook in topological order, passing values between them in local
+variables. The engine runs the group like a single node, when the inputs
+from outside it are ready.
+
+A node type joins groups when its config sets "inlinable": true and its
+process module defines compute(inputs, settings), the synchronous body
+of process(). Since the hooks are the nodes' own code, coercion is
+unchanged. Nodes on cycles, plugin nodes and ports with several links
+stay out. Two groups are not merged when a path through other nodes
+connects them, so no group waits on its own outputs, or when their nodes
+would wait on different outside values: once the outside inputs of any
+node of a group have arrived, through the group or ahead of the nodes
+producing them, so have those of every other. The group then becomes
+ready exactly when each of its nodes would have, and a node fed by a
+value that may never come (a switch's unused case) doesn't hold back
+nodes that don't read it.
+
+The generated source is part of the plan; the function built from it is
+cached per flow hash. Inputs are checked the way validate_inputs would
+accept them, conservatively: a value that isn't a plain int / float for
+a number input, a bool for a boolean input, or that is None, makes the
+run raise Fallback, as does any error of a node. The engine then runs
+the group's nodes one by one, so numeric strings, None handling and
+errors behave, and are reported, exactly as before. Nodes after an
+output port a node leaves out (if-else's unused path) are skipped, as
+they would never become ready.
+"""
+
+from collections import OrderedDict
+
+FUNCTION_CACHE_SIZE = 256
+
+_functions = OrderedDict()
+
+NUMBERS = frozenset({int, float})
+
+# Output types whose values are never containers, so need no freezing
+_SCALAR_TYPES = frozenset({"number", "boolean", "string"})
+
+
+class Fallback(Exception):
+    """Raised by a compiled group when its nodes must run one by one."""
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self):
+        return "MISSING"
+
+
+# Value of an output port a node left out, or of the ports of a skipped node
+MISSING = _Missing()
+
+
+class ScalarGroup:
+    """
+    One compiled group, as plain data
+
+    - head: the first member; the group runs as this node
+    - members: node ids in topological order
+    - needed: [(member, links from outside the group it waits for)]
+    - externals: [(source node, source port)] read from the cache, in argument order
+    - input_names: "member.port" for each external, for the timeline
+    - defaults: defaults of unconnected inputs, in argument order
+    - outputs: [(member, port)] stored after a run, in result order: ports
+      read outside the group, and every output of members without links out
+    - roots: [(member, externals it reads)] for the members with no inputs
+      from inside the group, which start the group's nodes when it falls back
+    - source: the generated build() function
+    """
+
+    __slots__ = (
+        "head", "members", "needed", "externals", "input_names", "defaults",
+        "outputs", "roots", "source",
+    )
+
+    def __init__(self, members):
+        self.head = members[0]
+        self.members = members
+        self.needed = []
+        self.externals = []
+        self.input_names = []
+        self.defaults = []
+        self.outputs = []
+        self.roots = []
+        self.source = ""
+
+
+def _inlinable(graph, spec, acyclic):
+    node_id = spec.node["id"]
+    if not spec.config.get("inlinable") or node_id not in acyclic or node_id in graph.plugin_linked:
+        return False
+    if spec.refiring_ports or spec.stream_ports or spec.stream_inputs:
+        return False
+    connected = set()
+    for port_name, input_def, links in spec.data_ports:
+        if len(links) != 1 or input_def.get("allow_multiple"):
+            return False
+        connected.add(port_name)
+    defaults = {name for name, _ in spec.input_defaults}
+    # A required input left unconnected fails validation on every run
+    return all(
+        name in connected or name in defaults or not input_def.get("required")
+        for name, input_def in spec.input_defs.items()
+    )
+
+
+def _find(parent, node_id):
+    while parent[node_id] != node_id:
+        parent[node_id] = parent[parent[node_id]]
+        node_id = parent[node_id]
+    return node_id
+
+
+def _contracted_acyclic(graph, parent):
+    """Whether the flow stays acyclic with every group collapsed into one node."""
+    def group(node_id):
+        return _find(parent, node_id) if node_id in parent else node_id
+
+    successors = {}
+    in_degree = {}
+    for link in graph.links:
+        if link.type == "plugin":
+            continue
+        source, target = group(link.source), group(link.target)
+        if source == target:
+            continue
+        edges = successors.setdefault(source, set())
+        if target not in edges:
+            edges.add(target)
+            in_degree[target] = in_degree.get(target, 0) + 1
+
+    nodes = {group(node_id) for node_id in graph.nodes}
+    ready = [node_id for node_id in nodes if not in_degree.get(node_id)]
+    visited = 0
+    while ready:
+        node_id = ready.pop()
+        visited += 1
+        for target in successors.get(node_id, ()):
+            in_degree[target] -= 1
+            if not in_degree[target]:
+                ready.append(target)
+    return visited == len(nodes)
+
+
+def _delivered_before(specs, node_id, cache):
+    """The output ports that must have carried a value before a node runs: its counted inputs, transitively."""
+    if node_id not in cache:
+        ports = set()
+        pending = [node_id]
+        seen = {node_id}
+        while pending:
+            for _, input_def, links in specs[pending.pop()].data_ports:
+                if input_def.get("allow_multiple") and input_def.get("refires"):
+                    continue
+                for link in links:
+                    ports.add((link.source, link.source_port))
+                    if link.source not in seen:
+                        seen.add(link.source)
+                        pending.append(link.source)
+        cache[node_id] = ports
+    return cache[node_id]
+
+
+def _same_outside_inputs(specs, order, members, cache):
+    """
+    Whether every member, once its own outside inputs have arrived, implies
+    that those of the whole group have: each outside port the group reads is
+    one the member reads through the others, or one that fed the node behind
+    such a port before it ran
+    """
+    reaches = {}
+    for node_id in order:
+        if node_id not in members:
+            continue
+        sources = set()
+        for _, _, links in specs[node_id].data_ports:
+            for link in links:
+                if link.source in members:
+                    sources |= reaches[link.source]
+                else:
+                    sources.add((link.source, link.source_port))
+        reaches[node_id] = sources
+    needed = set().union(*reaches.values())
+    for sources in reaches.values():
+        delivered = set(sources)
+        for source, _ in sources:
+            delivered |= _delivered_before(specs, source, cache)
+        if not needed <= delivered:
+            return False
+    return True
+
+
+def find_scalar_groups(graph, specs, order, acyclic):
+    """
+    Compile the connected groups of inlinable nodes
+
+    Args:
+        graph: The FlowGraph
+        specs: node id -> NodeSpec
+        order: Node ids in topological order
+        acyclic: Ids of the nodes that are not on a cycle
+
+    Returns:
+        dict: head node id -> ScalarGroup
+    """
+    parent = {node_id: node_id for node_id in order if _inlinable(graph, specs[node_id], acyclic)}
+    if len(parent) < 2:
+        return {}
+
+    delivered = {}
+    for link in graph.links:
+        if link.type == "plugin" or link.source not in parent or link.target not in parent:
+            continue
+        if link.target_port not in specs[link.target].input_defs:
+            continue
+        source, target = _find(parent, link.source), _find(parent, link.target)
+        if source == target:
+            continue
+        # Merging groups that a path through other nodes connects would make
+        # them wait on each other, and merging nodes fed by different outside
+        # values would hold each back until the other's inputs arrive
+        saved = dict(parent)
+        parent[target] = source
+        merged = {node_id for node_id in parent if _find(parent, node_id) == source}
+        if not _contracted_acyclic(graph, parent) or not _same_outside_inputs(specs, order, merged, delivered):
+            parent = saved
+
+    members = {}
+    for node_id in order:
+        if node_id in parent:
+            members.setdefault(_find(parent, node_id), []).append(node_id)
+
+    return {
+        group_members[0]: _compile(graph, specs, group_members)
+        for group_members in members.values()
+        if len(group_members) > 1
+    }
+
+
+def _check(expression, input_def):
+    """Condition under which a value isn't certain to pass validate_inputs."""
+    type_name = (input_def.get("type") or "any").lower().strip()
+    if type_name == "number":
+        return f"type({expression}) not in _NUMBERS"
+    if type_name == "boolean":
+        return f"type({expression}) is not bool"
+    if type_name == "any":
+        return f"{expression} is None"
+    return f"{expression} is None or not _type_check({expression}, {type_name!r})"
+
+
+def _compile(graph, specs, members):
+    group = ScalarGroup(members)
+    index = {node_id: position for position, node_id in enumerate(members)}
+
+    # Ports read by other members become locals; ports read outside are returned
+    local_ports = {}
+    for node_id in members:
+        outbound = graph.outbound[node_id]
+        if not graph.has_outbound_links(node_id):
+            for output_def in specs[node_id].config.get("outputs", []):
+                group.outputs.append((node_id, output_def["name"]))
+        for port_name, links in outbound.items():
+            if any(link.target in index for link in links):
+                local_ports[(node_id, port_name)] = None
+            if any(link.target not in index for link in links):
+                group.outputs.append((node_id, port_name))
+    for node_id, port_name in group.outputs:
+        local_ports[(node_id, port_name)] = None
+    for position, key in enumerate(local_ports):
+        local_ports[key] = f"p{index[key[0]]}_{position}"
+
+    body = []
+    for position, node_id in enumerate(members):
+        spec = specs[node_id]
+        arguments = []
+        checks = []
+        waits_on = []
+        internal = 0
+        for port_name, input_def, links in spec.data_ports:
+            link = links[0]
+            if link.source in index:
+                expression = local_ports[(link.source, link.source_port)]
+                waits_on.append(expression)
+                internal += 1
+            else:
+                expression = f"x{len(group.externals)}"
+                group.externals.append((link.source, link.source_port))
+                group.input_names.append(f"{node_id}.{port_name}")
+            arguments.append((port_name, expression))
+            checks.append(_check(expression, input_def))
+        for port_name, default in spec.input_defaults:
+            expression = f"d{len(group.defaults)}"
+            group.defaults.append(default)
+            arguments.append((port_name, expression))
+            checks.append(_check(expression, spec.input_defs[port_name]))
+        group.needed.append((node_id, spec.required_count - internal))
+        if not waits_on:
+            group.roots.append((node_id, [(link.source, link.source_port) for _, _, (link,) in spec.data_ports]))
+
+        output_types = {output_def["name"]: output_def.get("type") for output_def in spec.config.get("outputs", [])}
+        produced = [(port_name, name) for (source, port_name), name in local_ports.items() if source == node_id]
+
+        body.append(f"# {node_id!r} ({spec.node['type']!r})")
+        indent = ""
+        if waits_on:
+            # A port an earlier node left out never reaches this node
+            body.append(f"if {' or '.join(f'{name} is _MISSING' for name in waits_on)}:")
+            body.append(f"    {' = '.join(name for _, name in produced) or '_'} = _MISSING")
+            body.append("else:")
+            indent = "    "
+        for condition in checks:
+            body.append(f"{indent}if {condition}: raise Fallback")
+        inputs = ", ".join(f"{port_name!r}: {expression}" for port_name, expression in arguments)
+        body.append(f"{indent}o = c{position}({{{inputs}}}, s{position})")
+        for port_name, name in produced:
+            value = f"o.get({port_name!r}, _MISSING)"
+            if output_types.get(port_name) not in _SCALAR_TYPES:
+                value = f"_freeze({value})"
+            body.append(f"{indent}{name} = {value}")
+
+    results = "".join(f"{local_ports[key]}, " for key in group.outputs)
+    lines = [
+        "def build(compute, settings, defaults, _type_check, _freeze):",
+        f"    {''.join(f'c{i}, ' for i in range(len(members)))}= compute",
+        f"    {''.join(f's{i}, ' for i in range(len(members)))}= settings",
+    ]
+    if group.defaults:
+        lines.append(f"    {''.join(f'd{i}, ' for i in range(len(group.defaults)))}= defaults")
+    lines.append("    def run(x):")
+    if group.externals:
+        lines.append(f"        {''.join(f'x{i}, ' for i in range(len(group.externals)))}= x")
+    lines.extend(f"        {line}" for line in body)
+    lines.append(f"        return ({results})")
+    lines.append("    return run")
+    group.source = "\n".join(lines) + "\n"
+    return group
+
+
+def build_function(flow_hash, group):
+    """
+    The build() function of a group, compiled once per flow hash
+
+    build(compute, settings, defaults, type_check, freeze) binds the
+    members' compute hooks and settings and returns run(values), which
+    takes the external values in group.externals order and returns the
+    values of group.outputs, MISSING where a port wasn't produced.
+    """
+    key = (flow_hash, group.head)
+    build = _functions.get(key)
+    if build is not None:
+        _functions.move_to_end(key)
+        return build
+
+    namespace = {"_NUMBERS": NUMBERS, "_MISSING": MISSING, "Fallback": Fallback}
+    exec(compile(group.source, f"<scalar group {group.head!r}>", "exec"), namespace)
+    build = namespace["build"]
+    _functions[key] = build
+    if len(_functions) > FUNCTION_CACHE_SIZE:
+        _functions.popitem(last=False)
+    return build
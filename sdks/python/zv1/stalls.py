@@ -0,0 +1,177 @@
+"""
+Event-loop stall detection
+
+A node's process coroutine only yields the event loop at its awaits; the
+code between two awaits runs synchronously and blocks every other task,
+including concurrent runs. TimedCoroutine drives a coroutine step by step
+and measures each of these synchronous slices.
+
+StallMonitor keeps per-node-type statistics across every engine in the
+process. A node execution whose longest slice exceeds the threshold is a
+stall, reported to the engine's on_node_stall hook. With stall_offload
+set, node types that stall repeatedly are learned and later executions
+run off the event loop:
+
+    {"stall_threshold_ms": 50}         # default 100; 0 disables detection
+    {"stall_offload": "thread"}        # or "process" for nodes with a process file
+
+Only node types whose config declares them self-contained ("cpu_bound"
+or "pure") are offloaded. They run on another event loop (a worker
+thread's or a worker process's) with an empty engine config, so no
+integration, callback or stream bound to the engine's loop crosses over.
+Offloaded executions are timed as well, so a node type whose calls stop
+stalling goes back to the event loop.
+"""
+
+import time
+
+DEFAULT_THRESHOLD_MS = 100
+# A node type is offloaded once it stalled this often, in at least this share of its measured calls
+OFFLOAD_MIN_STALLS = 2
+OFFLOAD_MIN_RATIO = 0.5
+
+
+class TimedCoroutine:
+    """
+    Awaitable that runs a coroutine and times each synchronous slice of it
+    """
+
+    __slots__ = ("coroutine", "max_slice_ns", "blocking_ns", "slices")
+
+    def __init__(self, coroutine):
+        self.coroutine = coroutine
+        self.max_slice_ns = 0
+        self.blocking_ns = 0
+        self.slices = 0
+
+    def _record(self, start):
+        elapsed = time.perf_counter_ns() - start
+        self.slices += 1
+        self.blocking_ns += elapsed
+        if elapsed > self.max_slice_ns:
+            self.max_slice_ns = elapsed
+
+    def __await__(self):
+        coroutine = self.coroutine
+        value = None
+        error = None
+        while True:
+            start = time.perf_counter_ns()
+            try:
+                if error is None:
+                    yielded = coroutine.send(value)
+                else:
+                    yielded = coroutine.throw(error)
+            except StopIteration as stop:
+                self._record(start)
+                return stop.value
+            except BaseException:
+                self._record(start)
+                raise
+            self._record(start)
+
+            try:
+                value = yield yielded
+                error = None
+            except GeneratorExit:
+                coroutine.close()
+                raise
+            except BaseException as exception:
+                value = None
+                error = exception
+
+
+class SliceTimes:
+    """Slice timings measured in a worker process, in the shape StallMonitor.record reads"""
+
+    __slots__ = ("max_slice_ns", "blocking_ns")
+
+    def __init__(self, max_slice_ns, blocking_ns):
+        self.max_slice_ns = max_slice_ns
+        self.blocking_ns = blocking_ns
+
+
+async def run_timed(coroutine):
+    """Run a coroutine under TimedCoroutine; returns (result, timings)."""
+    timed = TimedCoroutine(coroutine)
+    result = await timed
+    return result, timed
+
+
+class NodeTypeStalls:
+    __slots__ = ("calls", "stalls", "offloaded", "max_slice_ns", "blocking_ns")
+
+    def __init__(self):
+        self.calls = 0
+        self.stalls = 0
+        self.offloaded = 0
+        self.max_slice_ns = 0
+        self.blocking_ns = 0
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "stalls": self.stalls,
+            "offloaded": self.offloaded,
+            "max_slice_ms": round(self.max_slice_ns / 1e6, 3),
+            "mean_blocking_ms": round(self.blocking_ns / self.calls / 1e6, 3) if self.calls else 0,
+        }
+
+
+class StallMonitor:
+    def __init__(self):
+        self._stats = {}
+
+    def _get(self, node_type):
+        stats = self._stats.get(node_type)
+        if stats is None:
+            stats = self._stats[node_type] = NodeTypeStalls()
+        return stats
+
+    def record(self, node_type, timed, threshold_ns):
+        """
+        Record a measured node execution
+
+        Returns:
+            bool: Whether the execution stalled the event loop
+        """
+        stats = self._get(node_type)
+        stats.calls += 1
+        stats.blocking_ns += timed.blocking_ns
+        stats.max_slice_ns = max(stats.max_slice_ns, timed.max_slice_ns)
+        stalled = timed.max_slice_ns > threshold_ns
+        if stalled:
+            stats.stalls += 1
+        return stalled
+
+    def record_offload(self, node_type):
+        self._get(node_type).offloaded += 1
+
+    def should_offload(self, node_type):
+        """Whether a node type has stalled often enough to run off the event loop."""
+        stats = self._stats.get(node_type)
+        return (
+            stats is not None
+            and stats.stalls >= OFFLOAD_MIN_STALLS
+            and stats.stalls >= OFFLOAD_MIN_RATIO * stats.calls
+        )
+
+    def get_stats(self, node_type=None):
+        """Statistics of one node type, or of every measured node type."""
+        if node_type is not None:
+            return self._get(node_type).to_dict()
+        return {node_type: stats.to_dict() for node_type, stats in self._stats.items()}
+
+    def clear(self):
+        self._stats = {}
+
+
+_shared_monitor = None
+
+
+def get_stall_monitor():
+    """Get the stall monitor shared by every engine in the interpreter."""
+    global _shared_monitor
+    if _shared_monitor is None:
+        _shared_monitor = StallMonitor()
+    return _shared_monitor
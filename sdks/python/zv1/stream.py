@@ -0,0 +1,152 @@
+"""
+Streaming port values
+
+A StreamValue is stored in a node's output port while the node is still
+producing it, for example an LLM's content while tokens arrive. Any number
+of consumers can iterate it independently: each iteration replays the
+chunks received so far and then waits for new ones. Consumers that need
+the complete value await materialize(), which resolves to the port's final
+value once the producing node has finished.
+"""
+
+import asyncio
+
+_UNSET = object()
+
+# The on_node_update data of LLM nodes (OpenRouterIntegration) carries
+# content and reasoning as increments but role whole, and no message, so
+# only these of their can_stream ports are streamed; other nodes push
+# chunks of each can_stream port themselves
+LLM_DELTA_PORTS = frozenset({"content", "reasoning"})
+
+
+def streams_deltas(config, output_def):
+    """Whether a node's can_stream output receives incremental chunks while the node runs."""
+    if not output_def.get("can_stream"):
+        return False
+    return config.get("category") != "llm" or output_def["name"] in LLM_DELTA_PORTS
+
+
+class EmptyStream(BaseException):
+    """
+    Raised to the consumers holding a stream whose producer finished without
+    a value. Node by node, that None would have been their last input and
+    they would not have run, so the engine skips them. Like
+    asyncio.CancelledError, it isn't an Exception, so node code catching
+    errors doesn't turn it into a failure.
+    """
+
+
+class StreamValue:
+    __slots__ = ("_chunks", "_done", "_value", "_error", "_waiter")
+
+    def __init__(self):
+        self._chunks = []
+        self._done = False
+        self._value = None
+        self._error = None
+        self._waiter = None
+
+    @property
+    def done(self):
+        """Whether the producer has finished (successfully or not)."""
+        return self._done
+
+    @property
+    def chunks(self):
+        """Chunks received so far."""
+        return list(self._chunks)
+
+    @property
+    def value(self):
+        """The final value; only meaningful once the stream is done."""
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    def push(self, chunk):
+        """Append a chunk and wake waiting consumers."""
+        if self._done:
+            raise RuntimeError("Cannot push to a closed stream")
+        self._chunks.append(chunk)
+        self._wake()
+
+    def close(self, value=_UNSET):
+        """
+        Finish the stream
+
+        Args:
+            value: The final value. Defaults to the joined chunks when they are
+                all strings, otherwise the list of chunks.
+        """
+        if self._done:
+            return
+        if value is _UNSET:
+            if all(isinstance(chunk, str) for chunk in self._chunks):
+                value = "".join(self._chunks)
+            else:
+                value = list(self._chunks)
+        self._value = value
+        self._done = True
+        self._wake()
+
+    def fail(self, error):
+        """Finish the stream with an error raised to every consumer."""
+        if self._done:
+            return
+        self._error = error
+        self._done = True
+        self._wake()
+
+    def _wake(self):
+        waiter = self._waiter
+        if waiter is not None:
+            self._waiter = None
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def _wait(self):
+        if self._waiter is None:
+            self._waiter = asyncio.get_running_loop().create_future()
+        await asyncio.shield(self._waiter)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        index = 0
+        while True:
+            while index < len(self._chunks):
+                yield self._chunks[index]
+                index += 1
+            if self._done:
+                if self._error is not None:
+                    raise self._error
+                return
+            await self._wait()
+
+    async def materialize(self):
+        """Wait for the producer to finish and return the final value."""
+        while not self._done:
+            await self._wait()
+        return self.value
+
+    def __repr__(self):
+        state = "done" if self._done else "open"
+        return f"<StreamValue {state}, {len(self._chunks)} chunks>"
+
+
+def settled(value):
+    """The final value of a finished stream, or the value itself."""
+    if isinstance(value, StreamValue):
+        return value.value if value.done else None
+    return value
+
+
+async def materialize(value):
+    """Resolve streams in a value (directly or as list items) to their final values."""
+    if isinstance(value, StreamValue):
+        return await value.materialize()
+    if isinstance(value, list) and any(isinstance(item, StreamValue) for item in value):
+        return [await materialize(item) for item in value]
+    return value
@@ -0,0 +1,225 @@
+"""
+Execution timeline recorder
+
+Every node execution is recorded as a slotted TimelineRecord with
+monotonic nanosecond timestamps. Wall-clock ISO times, durations and the
+dict form returned in run results are derived only when the timeline is
+read, so recording a node costs two clock reads and one small object.
+
+What a record captures of a node's values is configurable:
+
+    {"timeline_capture": "full"}      # inputs, settings and outputs (default)
+    {"timeline_capture": "preview"}   # size-capped previews of them
+    {"timeline_capture": "off"}       # ids, status and timings only
+    {"timeline_preview_chars": 200}   # string length kept by previews
+    {"timeline_sample_rate": 0.01}    # runs recorded with timeline_capture;
+                                      # the other runs record with "off"
+
+Port values are frozen, so full capture shares them by reference rather
+than copying. Costs reported by nodes are always recorded so the cost
+summary is complete whatever the capture mode.
+"""
+
+import random
+import time
+from datetime import datetime, timezone
+
+CAPTURE_MODES = ("off", "preview", "full")
+DEFAULT_PREVIEW_CHARS = 200
+PREVIEW_ITEMS = 10
+PREVIEW_DEPTH = 4
+
+
+def preview(value, chars=DEFAULT_PREVIEW_CHARS, depth=PREVIEW_DEPTH):
+    """
+    Size-capped copy of a value for the timeline
+    Long strings are cut to `chars`, containers to their first items, and
+    nesting below `depth` is summarized.
+    """
+    if isinstance(value, str):
+        if len(value) <= chars:
+            return value
+        return f"{value[:chars]}... ({len(value)} chars)"
+    if isinstance(value, dict):
+        if depth <= 0:
+            return f"{{...}} ({len(value)} keys)"
+        result = {}
+        for index, (key, item) in enumerate(value.items()):
+            if index == PREVIEW_ITEMS:
+                result["..."] = f"{len(value) - PREVIEW_ITEMS} more keys"
+                break
+            result[key] = preview(item, chars, depth - 1)
+        return result
+    if isinstance(value, (list, tuple)):
+        if depth <= 0:
+            return f"[...] ({len(value)} items)"
+        result = [preview(item, chars, depth - 1) for item in value[:PREVIEW_ITEMS]]
+        if len(value) > PREVIEW_ITEMS:
+            result.append(f"... {len(value) - PREVIEW_ITEMS} more items")
+        return result
+    return value
+
+
+class TimelineRecord:
+    __slots__ = (
+        "node_id", "node_type", "status", "start_ns", "end_ns",
+        "inputs", "settings", "outputs", "error_message", "cost", "extra",
+    )
+
+    def __init__(self, node_id, node_type, start_ns, status="running"):
+        self.node_id = node_id
+        self.node_type = node_type
+        self.status = status
+        self.start_ns = start_ns
+        self.end_ns = None
+        self.inputs = None
+        self.settings = None
+        self.outputs = None
+        self.error_message = None
+        # (cost_total, cost_itemized) reported by the node, if any
+        self.cost = None
+        # Rarely used fields such as "memoized" or "terminal_nodes"
+        self.extra = None
+
+    @property
+    def duration_ns(self):
+        return None if self.end_ns is None else self.end_ns - self.start_ns
+
+    def __repr__(self):
+        return f"<TimelineRecord {self.node_id} {self.status}>"
+
+
+class Timeline:
+    """
+    Records of the node executions of an engine, in completion order
+    """
+
+    def __init__(self, capture="full", preview_chars=DEFAULT_PREVIEW_CHARS, sample_rate=1.0):
+        if capture not in CAPTURE_MODES:
+            raise ValueError(f"Invalid timeline capture mode {capture!r}, expected one of {', '.join(CAPTURE_MODES)}")
+        self.capture = capture
+        self.preview_chars = preview_chars
+        self.sample_rate = sample_rate
+        self.records = []
+        # The mode of the current run, after sampling
+        self.mode = capture
+        # Wall clock anchor for converting monotonic timestamps
+        self._wall_ns = time.time_ns()
+        self._clock_ns = time.perf_counter_ns()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            capture=config.get("timeline_capture", "full"),
+            preview_chars=config.get("timeline_preview_chars", DEFAULT_PREVIEW_CHARS),
+            sample_rate=config.get("timeline_sample_rate", 1.0),
+        )
+
+    def begin_run(self):
+        """Decide whether the next run is sampled."""
+        sampled = self.sample_rate >= 1 or random.random() < self.sample_rate
+        self.mode = self.capture if sampled else "off"
+
+    def start(self, node_id, node_type, inputs=None, settings=None):
+        """
+        Start a record
+        It is added to the timeline by finish(), or right away with add().
+        """
+        record = TimelineRecord(node_id, node_type, time.perf_counter_ns())
+        if self.mode != "off":
+            record.inputs = self._capture(inputs)
+            record.settings = self._capture(settings)
+        return record
+
+    def add(self, record):
+        self.records.append(record)
+        return record
+
+    def finish(self, record, status, outputs=None, error=None, append=True):
+        """Complete a record with its outputs or error, appending it unless it is already added."""
+        record.end_ns = time.perf_counter_ns()
+        record.status = status
+        if error is not None:
+            record.error_message = str(error)
+        if outputs is not None:
+            cost_total = outputs.get("cost_total")
+            if isinstance(cost_total, (int, float)) and not isinstance(cost_total, bool):
+                record.cost = (cost_total, outputs.get("cost_itemized"))
+            if self.mode != "off":
+                record.outputs = self._capture(outputs)
+        if append:
+            self.records.append(record)
+        return record
+
+    def set_extra(self, record, key, value):
+        if record.extra is None:
+            record.extra = {}
+        record.extra[key] = value
+
+    def _capture(self, values):
+        if values is None:
+            return None
+        if self.mode == "full":
+            return dict(values)
+        return {name: preview(value, self.preview_chars) for name, value in values.items()}
+
+    def _iso(self, clock_ns):
+        wall_ns = self._wall_ns + clock_ns - self._clock_ns
+        moment = datetime.fromtimestamp(wall_ns / 1e9, timezone.utc)
+        return moment.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+    def to_dict(self, record):
+        """The record in the run result format."""
+        entry = {"node_id": record.node_id, "node_type": record.node_type}
+        if record.inputs is not None:
+            entry["inputs"] = record.inputs
+        if record.settings is not None:
+            entry["settings"] = record.settings
+        entry["start_time"] = self._iso(record.start_ns)
+        entry["status"] = record.status
+        if record.end_ns is not None:
+            entry["end_time"] = self._iso(record.end_ns)
+            entry["duration_ms"] = round(record.duration_ns / 1e6)
+        if record.outputs is not None:
+            entry["outputs"] = record.outputs
+        if record.error_message is not None:
+            entry["error_message"] = record.error_message
+        if record.extra:
+            entry.update(record.extra)
+        return entry
+
+    def to_list(self):
+        return [self.to_dict(record) for record in self.records]
+
+    def cost_summary(self):
+        total = 0
+        saved = 0
+        itemized = []
+        for record in self.records:
+            if record.cost is None:
+                continue
+            cost_total, cost_itemized = record.cost
+            total += cost_total
+            # Responses served from the LLM cache report what they would have cost as saved
+            for item in cost_itemized or ():
+                if isinstance(item, dict) and isinstance(item.get("saved"), (int, float)):
+                    saved += item["saved"]
+            itemized.append({
+                "node_id": record.node_id,
+                "node_type": record.node_type,
+                "total": cost_total,
+                "itemized": cost_itemized,
+            })
+        summary = {"total": total, "itemized": itemized}
+        if saved:
+            summary["saved"] = round(saved, 8)
+        return summary
+
+    def clear(self):
+        self.records = []
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
@@ -0,0 +1,205 @@
+"""
+Cache management utilities for the zv1 engine
+Provides a consistent interface for reading and writing cache values
+Making it easy to change cache structure/format without modifying core logic
+
+Cache Structure:
+Each (node_id, port_name) key stores a ring buffer of CacheEntry records:
+[
+  CacheEntry(value="hello", sequence=1),
+  CacheEntry(value="world", sequence=4)
+]
+
+Sequences come from a single counter per cache, so they are strictly
+increasing across every port and can be compared between ports.
+
+The ring buffer keeps the most recent `capacity` entries of a port, so a
+loop writing the same port on every iteration holds constant memory.
+Full history (capacity None) is a debug mode for inspecting every value a
+port produced.
+
+This enables:
+- Refiring input support (consume only NEW values)
+- Non-refiring inputs (always use latest, can reuse consumed values)
+- Debugging and time-travel (with full history)
+
+Consumption Tracking:
+Tracked by the engine per-node, per-input as the last consumed sequence,
+which acts as the consumer's cursor into the ring buffer. Only used for
+refiring inputs - non-refiring inputs ignore it. A consumer that falls
+more than `capacity` values behind resumes at the oldest retained value.
+"""
+
+from collections import deque
+
+DEFAULT_CAPACITY = 16
+
+
+class CacheEntry:
+    __slots__ = ("value", "sequence")
+
+    def __init__(self, value, sequence):
+        self.value = value
+        self.sequence = sequence
+
+    def __repr__(self):
+        return f"CacheEntry(value={self.value!r}, sequence={self.sequence})"
+
+
+class CacheManager:
+    """
+    Manages the execution cache for node outputs
+    - set() appends a new entry with the next sequence number
+    - get() returns the most recent value
+    - get_next() / get_new() return values newer than a sequence (for refiring)
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        """
+        Args:
+            capacity: Entries retained per port, or None to keep the full history
+        """
+        if capacity is not None and capacity < 1:
+            raise ValueError("Cache capacity must be at least 1")
+        self.capacity = capacity
+        self._store = {}
+        self._ports_by_node = {}
+        self._sequence = 0
+        self._dropped = 0
+
+    def set(self, node_id, port_name, value):
+        """
+        Set a value in the cache (appends to the port's ring buffer)
+
+        Returns:
+            int: The sequence number assigned to the value
+        """
+        key = (node_id, port_name)
+        entries = self._store.get(key)
+        if entries is None:
+            entries = self._store[key] = deque(maxlen=self.capacity)
+            self._ports_by_node.setdefault(node_id, []).append(port_name)
+        elif len(entries) == self.capacity:
+            self._dropped += 1
+        self._sequence += 1
+        entries.append(CacheEntry(value, self._sequence))
+        return self._sequence
+
+    def get(self, node_id, port_name):
+        """Get the most recent value, or None if not found."""
+        entries = self._store.get((node_id, port_name))
+        if not entries:
+            return None
+        return entries[-1].value
+
+    def get_entry(self, node_id, port_name):
+        """Get the most recent CacheEntry, or None if not found."""
+        entries = self._store.get((node_id, port_name))
+        if not entries:
+            return None
+        return entries[-1]
+
+    def _unread_count(self, entries, after_sequence):
+        # Entries are in sequence order, so count back from the newest one
+        count = 0
+        for entry in reversed(entries):
+            if entry.sequence <= after_sequence:
+                break
+            count += 1
+        return count
+
+    def get_next(self, node_id, port_name, after_sequence):
+        """
+        Get the oldest retained entry that arrived after a sequence (for refiring inputs)
+
+        Returns:
+            CacheEntry or None: The entry, or None when there is nothing new
+        """
+        entries = self._store.get((node_id, port_name))
+        if not entries or entries[-1].sequence <= after_sequence:
+            return None
+        return entries[-self._unread_count(entries, after_sequence)]
+
+    def get_new(self, node_id, port_name, after_sequence):
+        """Get retained values that arrived after a specific sequence (for refiring inputs)."""
+        entries = self._store.get((node_id, port_name))
+        if not entries:
+            return []
+        count = self._unread_count(entries, after_sequence)
+        return [entries[index].value for index in range(len(entries) - count, len(entries))]
+
+    def get_latest_sequence(self, node_id, port_name):
+        """Get the sequence of the most recent value, or 0 if not found."""
+        entries = self._store.get((node_id, port_name))
+        if not entries:
+            return 0
+        return entries[-1].sequence
+
+    def has(self, node_id, port_name):
+        """Check if the key exists and has at least one value (None values count)."""
+        return bool(self._store.get((node_id, port_name)))
+
+    def has_new(self, node_id, port_name, after_sequence):
+        """Check if there are values newer than a sequence (for refiring)."""
+        return self.get_latest_sequence(node_id, port_name) > after_sequence
+
+    def delete(self, node_id, port_name):
+        """
+        Delete a key from the cache
+
+        Returns:
+            bool: True if the key existed and was deleted
+        """
+        key = (node_id, port_name)
+        if key not in self._store:
+            return False
+        del self._store[key]
+        self._ports_by_node[node_id].remove(port_name)
+        return True
+
+    def clear(self):
+        """Clear all values from the cache."""
+        self._store = {}
+        self._ports_by_node = {}
+
+    def get_node_outputs(self, node_id):
+        """Get the most recent value for every port of a node."""
+        return {
+            port_name: self._store[(node_id, port_name)][-1].value
+            for port_name in self._ports_by_node.get(node_id, ())
+        }
+
+    def get_history(self, node_id, port_name):
+        """Get the retained history of values for a key (oldest to newest)."""
+        return [entry.value for entry in self._store.get((node_id, port_name), ())]
+
+    def get_history_with_metadata(self, node_id, port_name):
+        """Get the retained history of CacheEntry records for a key (oldest to newest)."""
+        return list(self._store.get((node_id, port_name), ()))
+
+    def get_node_history(self, node_id):
+        """Get the retained history for every port of a node."""
+        return {
+            port_name: self.get_history(node_id, port_name)
+            for port_name in self._ports_by_node.get(node_id, ())
+        }
+
+    def get_history_length(self, node_id, port_name):
+        """Get the number of values stored for a key."""
+        return len(self._store.get((node_id, port_name), ()))
+
+    def get_all_keys(self):
+        """Get all (node_id, port_name) cache keys."""
+        return list(self._store)
+
+    def get_stats(self):
+        """Get statistics about the cache."""
+        total_keys = len(self._store)
+        total_entries = sum(len(entries) for entries in self._store.values())
+        return {
+            "total_keys": total_keys,
+            "total_entries": total_entries,
+            "average_history_length": round(total_entries / total_keys, 2) if total_keys else 0,
+            "capacity": self.capacity,
+            "dropped_entries": self._dropped,
+        }
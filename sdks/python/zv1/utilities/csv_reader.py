@@ -0,0 +1,221 @@
+"""
+Chunked CSV reading for the csv-parser node
+
+CSV sources are read incrementally instead of being split into a list of
+every row up front:
+
+- Text is read through a StringIO.
+- Bytes-like buffers (bytes, bytearray, memoryview, mmap) are decoded as
+  UTF-8 in blocks of BLOCK_SIZE without copying the buffer.
+- os.PathLike sources (pathlib.Path) are memory-mapped and decoded the
+  same way, so the file is paged in by the OS rather than read into a
+  string. Plain strings are always CSV text; paths can only come from
+  host code, never from a flow's JSON.
+
+iter_row_chunks yields lists of at most CHUNK_ROWS parsed rows, and
+ColumnBuilder collects rows into typed columns, inferring per column
+whether its values are integers, numbers, booleans, dates or strings.
+"""
+
+import codecs
+import csv
+import io
+import mmap
+import os
+import re
+from contextlib import contextmanager
+from itertools import islice
+
+BLOCK_SIZE = 1024 * 1024
+CHUNK_ROWS = 1000
+
+# Canonical forms only, so values such as "007" or "+1" keep their text
+_INTEGER = re.compile(r"-?(?:0|[1-9][0-9]*)\Z")
+_NUMBER = re.compile(r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?\Z")
+_DATE = re.compile(r"[0-9]{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12][0-9]|3[01])\Z")
+_DATETIME = re.compile(
+    r"[0-9]{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12][0-9]|3[01])[T ]"
+    r"(?:[01][0-9]|2[0-3]):[0-5][0-9](?::[0-5][0-9](?:\.[0-9]+)?)?(?:Z|[+-][0-9]{2}:?[0-9]{2})?\Z"
+)
+_BOOLEANS = {"true": True, "false": False}
+
+# Column types in widening order; a value that fits none of a column's candidates makes it a string column
+COLUMN_TYPES = ("integer", "number", "boolean", "date", "datetime", "string")
+_WIDER = {
+    "integer": ("number",),
+    "date": ("datetime",),
+}
+
+
+def _matches(column_type, value):
+    if column_type == "integer":
+        return _INTEGER.match(value) is not None
+    if column_type == "number":
+        return _NUMBER.match(value) is not None
+    if column_type == "boolean":
+        return value.lower() in _BOOLEANS
+    if column_type == "date":
+        return _DATE.match(value) is not None
+    if column_type == "datetime":
+        return _DATETIME.match(value) is not None
+    return True
+
+
+def infer_type(value, current=None):
+    """
+    The narrowest column type holding a column's values so far and `value`
+
+    Args:
+        value: A non-empty cell
+        current: The column's type so far, None before its first non-empty cell
+    """
+    if current is None:
+        candidates = COLUMN_TYPES
+    elif _matches(current, value):
+        return current
+    else:
+        candidates = _WIDER.get(current, ())
+    for candidate in candidates:
+        if _matches(candidate, value):
+            return candidate
+    return "string"
+
+
+def _convert(column_type, values):
+    """
+    Convert a column's cells to its type, in place so each cell's text is
+    freed as it is replaced. Empty cells of typed columns become None.
+    """
+    convert = _CONVERTERS.get(column_type)
+    if convert is not None:
+        for index, value in enumerate(values):
+            values[index] = convert(value) if value else None
+    return values
+
+
+_CONVERTERS = {
+    "integer": int,
+    "number": float,
+    "boolean": lambda value: _BOOLEANS[value.lower()],
+    "date": str,
+    "datetime": str,
+}
+
+
+def _buffer_lines(buffer):
+    """Lines of a UTF-8 buffer, decoded block by block from zero-copy slices."""
+    view = memoryview(buffer).cast("B")
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+    for offset in range(0, len(view), BLOCK_SIZE):
+        lines = (tail + decoder.decode(view[offset:offset + BLOCK_SIZE])).split("\n")
+        tail = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+@contextmanager
+def open_lines(source):
+    """
+    Open a CSV source as an iterator of text lines
+
+    Args:
+        source: CSV text, a bytes-like buffer, or an os.PathLike to memory-map
+    """
+    if isinstance(source, str):
+        yield io.StringIO(source)
+    elif isinstance(source, os.PathLike):
+        with open(source, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield iter(())
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                lines = _buffer_lines(mapped)
+                try:
+                    yield lines
+                finally:
+                    # Release the generator's views before the map closes
+                    lines.close()
+    elif isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        yield _buffer_lines(source)
+    else:
+        raise TypeError(f"Unsupported CSV source: {type(source).__name__}")
+
+
+def iter_row_chunks(lines, delimiter=",", trim_values=True, skip_empty_lines=True, chunk_rows=None):
+    """
+    Parse CSV lines in chunks
+
+    Yields:
+        list: Up to chunk_rows (default CHUNK_ROWS) rows, each a list of cells
+    """
+    chunk_rows = chunk_rows or CHUNK_ROWS
+    reader = csv.reader(lines, delimiter=delimiter)
+    while True:
+        rows = list(islice(reader, chunk_rows))
+        if not rows:
+            return
+        if skip_empty_lines:
+            rows = [row for row in rows if any(cell.strip() for cell in row)]
+        if trim_values:
+            rows = [[cell.strip() for cell in row] for row in rows]
+        yield rows
+
+
+class ColumnBuilder:
+    """
+    Collects rows into columns and infers each column's type as it goes
+    """
+
+    def __init__(self, width=0):
+        self.columns = [[] for _ in range(width)]
+        self.types = [None] * width
+        self.rows = 0
+
+    @property
+    def width(self):
+        return len(self.columns)
+
+    def widen(self, width):
+        """Add columns, empty for the rows added so far."""
+        for _ in range(width - len(self.columns)):
+            self.columns.append([""] * self.rows)
+            self.types.append(None)
+
+    def add_rows(self, rows, widen=False):
+        """
+        Add parsed rows; cells beyond the columns are dropped unless widen is set
+        """
+        if widen:
+            self.widen(max(map(len, rows), default=0))
+        types = self.types
+        for index, column in enumerate(self.columns):
+            values = [row[index] if index < len(row) else "" for row in rows]
+            column.extend(values)
+            column_type = types[index]
+            if column_type == "string":
+                continue
+            for value in values:
+                if value:
+                    column_type = infer_type(value, column_type)
+                    if column_type == "string":
+                        break
+            types[index] = column_type
+        self.rows += len(rows)
+
+    def finish(self, names):
+        """
+        Returns:
+            tuple: (dict of column name to typed values, dict of column name to type)
+        """
+        columns = {}
+        types = {}
+        for name, column_type, values in zip(names, self.types, self.columns):
+            column_type = column_type or "string"
+            columns[name] = _convert(column_type, values)
+            types[name] = column_type
+        self.columns = []
+        return columns, types
@@ -0,0 +1,79 @@
+"""
+Chunked CSV writing for the csv-stringifier node
+
+Headers of object rows are discovered in one pass over every key, with a
+dict used as an ordered set. Rows are written with csv.writer into a
+buffer that is flushed every CHUNK_ROWS rows, so the output can be
+streamed or written to a file without holding the whole CSV in memory.
+
+Data can be given as rows (objects or arrays) or as columns, an object of
+arrays such as the csv-parser node's columns output. Columns are zipped
+into rows without building per-row objects.
+"""
+
+import csv
+import io
+from itertools import chain, islice, zip_longest
+
+CHUNK_ROWS = 10000
+
+
+def discover_headers(rows):
+    """Keys of every row, in the order they first appear."""
+    return list(dict.fromkeys(chain.from_iterable(rows)))
+
+
+def iter_records(data, headers):
+    """
+    The rows to write, as lists of values in header order
+
+    Args:
+        data: Object rows, array rows, or an object of columns
+        headers: Column order for object rows and columns
+    """
+    if isinstance(data, dict):
+        columns = [data.get(header) or () for header in headers]
+        return zip_longest(*columns, fillvalue="")
+    if data and isinstance(data[0], dict):
+        return ([row.get(header, "") for header in headers] for row in data)
+    return (row if isinstance(row, list) else [row] for row in data)
+
+
+def iter_csv_chunks(records, headers=None, delimiter=",", quote_strings=True, newline="\n", chunk_rows=None):
+    """
+    Write rows as CSV text, in chunks of up to chunk_rows (default CHUNK_ROWS) rows
+    The text has no trailing line break.
+
+    Yields:
+        str: The next part of the CSV text
+    """
+    chunk_rows = chunk_rows or CHUNK_ROWS
+    buffer = io.StringIO()
+    writer = csv.writer(
+        buffer,
+        delimiter=delimiter,
+        quotechar='"',
+        quoting=csv.QUOTE_NONNUMERIC if quote_strings else csv.QUOTE_MINIMAL,
+        lineterminator=newline,
+    )
+    if headers:
+        writer.writerow(headers)
+
+    # Each chunk ends with a line break; it's moved to the start of the next
+    # chunk so the last one can be emitted without it
+    separator = ""
+    records = iter(records)
+    while True:
+        start = buffer.tell()
+        writer.writerows(islice(records, chunk_rows))
+        if buffer.tell() == start and not headers:
+            break
+        headers = None
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        if newline and text.endswith(newline):
+            text = text[:-len(newline)]
+        yield separator + text
+        separator = newline
+
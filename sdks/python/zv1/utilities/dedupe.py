@@ -0,0 +1,167 @@
+"""
+Deduplication by structural hashing, for the array-unique node
+
+structural_hash digests nested dicts, lists and scalars into one 64-bit
+int without building strings: flat containers are hashed by CPython in
+C, as a frozenset of a dict's items (so key order doesn't matter) or a
+tuple of a list's values. Nested containers are rebuilt as frozensets
+and tuples, never serialized. The hash is Python's own, salted per
+process, so digests are only compared within one process.
+
+unique_indices deduplicates by position: it maps each digest to the
+index of its first key and returns index lists, so items are never
+copied or kept in a seen-set of their own. Values with the same digest
+are compared before one is called a duplicate, which keeps hash
+collisions (and 1 / 1.0 / True, which hash alike) from merging
+different values.
+
+With prefilter=True, a first pass runs the digests through a Bloom
+filter and keeps only the digests it reports as possibly seen before.
+The second pass indexes just those, so the memory for the index scales
+with the duplicates rather than with the whole array; the result is the
+same.
+"""
+
+import math
+from array import array
+from operator import eq
+
+FALSE_POSITIVE_RATE = 0.01
+
+_SCALARS = frozenset({str, int, float, bool, type(None)})
+
+
+def _canonical(value):
+    """Hashable stand-in for a value: dicts become frozensets of their items, lists tuples."""
+    if isinstance(value, dict):
+        if _SCALARS.issuperset(map(type, value.values())):
+            return frozenset(value.items())
+        return frozenset([(key, item if type(item) in _SCALARS else _canonical(item)) for key, item in value.items()])
+    if isinstance(value, (list, tuple)):
+        if _SCALARS.issuperset(map(type, value)):
+            return tuple(value)
+        return tuple([item if type(item) in _SCALARS else _canonical(item) for item in value])
+    try:
+        hash(value)
+    except TypeError:
+        return str(value)
+    return value
+
+
+def structural_hash(value):
+    """
+    64-bit hash of a JSON-like value; structurally equal values hash
+    alike, whatever the order of their dicts' keys
+    """
+    return hash(_canonical(value))
+
+
+def json_equal(a, b):
+    """
+    Whether two values serialize to the same JSON with sorted keys:
+    booleans, integers and floats differ, and lists equal tuples
+    """
+    if type(a) in _SCALARS or type(b) in _SCALARS:
+        return type(a) is type(b) and a == b
+    if isinstance(a, dict):
+        return isinstance(b, dict) and a.keys() == b.keys() and all(map(json_equal, a.values(), map(b.__getitem__, a)))
+    if isinstance(a, (list, tuple)):
+        return isinstance(b, (list, tuple)) and len(a) == len(b) and all(map(json_equal, a, b))
+    return type(a) is type(b) and str(a) == str(b)
+
+
+def _digests(keys):
+    try:
+        # Scalars and tuples of scalars hash in one C-level pass
+        return array("q", map(hash, keys))
+    except TypeError:
+        return array("q", map(structural_hash, keys))
+
+
+def _bloom_candidates(digests, false_positive_rate=FALSE_POSITIVE_RATE):
+    """Digests a Bloom filter reports as possibly seen earlier in the sequence."""
+    count = max(1, len(digests))
+    size = max(64, int(-count * math.log(false_positive_rate) / math.log(2) ** 2))
+    probes = max(1, round(size / count * math.log(2)))
+    bits = bytearray((size + 7) // 8)
+    candidates = set()
+    for digest in digests:
+        # Double hashing: probe positions h1 + i * h2 from the digest's two halves
+        first = digest & 0xFFFFFFFF
+        step = (digest >> 32) | 1
+        seen = True
+        for probe in range(probes):
+            position = (first + probe * step) % size
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                seen = False
+        if seen:
+            candidates.add(digest)
+    return candidates
+
+
+def unique_indices(keys, equal=eq, prefilter=False):
+    """
+    Positions of the first occurrence of each key, and of the repeats
+
+    Args:
+        keys: Sequence of the values to compare, one per item
+        equal: Equality of two keys with the same digest
+        prefilter: Index only the digests a Bloom filter flags as repeated
+
+    Returns:
+        tuple: (kept indices, duplicate indices), both in order
+    """
+    digests = _digests(keys)
+    candidates = _bloom_candidates(digests) if prefilter else None
+
+    first = {}
+    kept = []
+    duplicates = []
+    for index, digest in enumerate(digests):
+        if candidates is not None and digest not in candidates:
+            kept.append(index)
+            continue
+        seen = first.get(digest)
+        if seen is None:
+            first[digest] = index
+        elif type(seen) is int:
+            if equal(keys[seen], keys[index]):
+                duplicates.append(index)
+                continue
+            # Different keys with the same digest
+            first[digest] = [seen, index]
+        else:
+            key = keys[index]
+            if any(equal(keys[other], key) for other in seen):
+                duplicates.append(index)
+                continue
+            seen.append(index)
+        kept.append(index)
+    return kept, duplicates
+
+
+def iter_unique(items, key=None, equal=eq):
+    """
+    The items whose key wasn't seen before, lazily, for streams of items
+    that are never held as one list (fused array chains). Each digest keeps
+    references to its distinct keys, to compare later keys against.
+
+    Args:
+        items: Iterable of items
+        key: Function giving the value to compare for an item, or None for the item itself
+        equal: Equality of two keys with the same digest
+    """
+    first = {}
+    for item in items:
+        value = item if key is None else key(item)
+        digest = structural_hash(value)
+        seen = first.get(digest)
+        if seen is None:
+            first[digest] = [value]
+        elif any(equal(other, value) for other in seen):
+            continue
+        else:
+            seen.append(value)
+        yield item
@@ -0,0 +1,80 @@
+"""
+Read-only port values
+
+Values written to output ports are frozen once, recursively: dicts become
+FrozenDict and lists become FrozenList. Both are subclasses of the builtin
+types, so isinstance checks, indexing, iteration, equality and JSON
+serialization behave as before, but every mutating method raises. That
+lets the cache, every downstream node and the timeline share one copy of
+a value instead of deep-copying it at each step.
+
+Shallow copies (dict(value), list(value), value.copy(), copy.copy(value),
+slicing) are ordinary mutable containers whose nested values stay frozen;
+copy.deepcopy(value) is fully mutable. Nodes that
+need to mutate their inputs in place set `"mutates_inputs": true` in their
+config and receive private mutable copies made with thaw().
+"""
+
+
+def _readonly(self, *args, **kwargs):
+    raise TypeError(
+        f"{type(self).__name__} port values are read-only; copy the value or set "
+        f"\"mutates_inputs\": true in the node config"
+    )
+
+
+class FrozenDict(dict):
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+
+class FrozenList(list):
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = clear = extend = insert = pop = remove = reverse = sort = _readonly
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+
+def freeze(value):
+    """
+    Freeze dicts and lists in a value, recursively
+    Already frozen values are returned as is, so freezing a value read from
+    another port costs nothing.
+    """
+    value_type = type(value)
+    if value_type is FrozenDict or value_type is FrozenList:
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """Make a mutable deep copy of a (possibly frozen) value."""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [thaw(item) for item in value]
+    return value
@@ -0,0 +1,83 @@
+import json
+import os
+import re
+
+_UNSAFE_TOOL_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_-]")
+
+
+def create_safe_tool_name(name):
+    """
+    Create a safe tool name
+
+    Args:
+        name: The name to make safe
+
+    Returns:
+        str: The safe name (matches ^[a-zA-Z0-9_-]+$, max 64 chars)
+    """
+    return _UNSAFE_TOOL_NAME_CHARS.sub("", name)[:64]
+
+
+def is_remote_mcp_tool(node):
+    """Check if a node is a remote MCP tool."""
+    return node.get("type") == "remote-mcp-tool"
+
+
+def is_manual_tool_node(node):
+    """Check if a node is a manual tool node."""
+    return node.get("type") == "tool"
+
+
+def map_type_to_json_schema(type_name):
+    """
+    Map node semantic input types to JSON Schema types for tool parameters
+
+    Args:
+        type_name: The type to map
+
+    Returns:
+        str: The JSON Schema type
+    """
+    if not type_name:
+        return "string"
+    t = type_name.lower()
+    if t in ("number", "integer"):
+        return "number"
+    if t == "boolean":
+        return "boolean"
+    if t.startswith("array"):
+        return "array"
+    if t == "object":
+        return "object"
+    return "string"
+
+
+def json_clone(value):
+    """
+    Deep copy a JSON-compatible value the way the timeline records it
+    Values that are not JSON serializable are stringified
+    """
+    return json.loads(json.dumps(value, default=str))
+
+
+def json_dumps(value):
+    """Serialize a value compactly, matching JSON.stringify output."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def get_package_root():
+    """Get the directory containing the zv1 package (sdks/python)."""
+    return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def resolve_shared_dir(name):
+    """
+    Resolve a shared directory (nodes, types)
+    Prefers the copy synced into the SDK by scripts/sync_sdks.py and
+    falls back to the monorepo root when running from a checkout
+    """
+    package_root = get_package_root()
+    synced = os.path.join(package_root, name)
+    if os.path.isdir(synced):
+        return synced
+    return os.path.normpath(os.path.join(package_root, "..", "..", name))
@@ -0,0 +1,299 @@
+import io
+import json
+import os
+import zipfile
+
+from ..registry import get_registry
+from .helpers import resolve_shared_dir
+from .typers import convert_import_to_node_type
+
+# Integrations shared by every engine in the interpreter
+_integrations = {}
+
+
+def _collect_node_types(flow, node_types):
+    for node in flow.get("nodes", []):
+        node_types.add(node["type"])
+    for import_def in flow.get("imports") or []:
+        _collect_node_types(import_def, node_types)
+    return node_types
+
+
+def load_nodes(self, flow):
+    """
+    Load node configurations and processes
+
+    Returns:
+        dict: Map of node types to their definitions ({"config", "process"})
+    """
+    registry = get_registry(self.nodes_dir)
+    nodes = {}
+
+    # Only the node types the flow references are resolved; their modules are imported on first use
+    for node_type in _collect_node_types(flow, set()):
+        if node_type.startswith("imported-"):
+            continue
+
+        try:
+            node_definition = registry.get(node_type)
+        except FileNotFoundError as error:
+            print(error)
+            continue
+        except Exception as error:
+            print(f"Failed to load node {node_type}: {error}")
+            continue
+
+        if node_definition is None:
+            print(f"Missing process file for regular node {node_type}")
+            continue
+        nodes[node_type] = node_definition
+
+    nodes.update(load_import_nodes(self, flow))
+    return nodes
+
+
+def load_import_nodes(self, flow):
+    """
+    Convert a flow's imports into node types bound to this engine
+
+    Returns:
+        dict: Map of import node types to their definitions
+    """
+    nodes = {}
+    for import_def in flow.get("imports") or []:
+        node_type = convert_import_to_node_type(self, import_def)
+        # Store with both the import ID and the prefixed name for backward compatibility
+        nodes[import_def["id"]] = node_type
+        nodes[f"imported-{import_def['id']}"] = node_type
+    return nodes
+
+
+def load_integrations(config, flow=None):
+    """
+    Load integrations
+
+    Args:
+        config: Configuration dict
+        flow: Flow dict
+
+    Returns:
+        dict: Map of integration names to their instances
+    """
+    integrations = {}
+
+    keys = config.get("keys") or {}
+    if keys.get("openrouter"):
+        from ..integrations.openrouter import OpenRouterIntegration
+
+        base_url = config.get("openrouter_base_url") or "https://openrouter.ai/api/v1"
+        # Clients keep a connection pool, so one per key and endpoint is shared process-wide
+        cache_key = ("openrouter", keys["openrouter"], base_url)
+        if cache_key not in _integrations:
+            _integrations[cache_key] = OpenRouterIntegration(keys["openrouter"], {
+                "base_url": base_url,
+                "referer": "https://zv1.ai",
+                "title": "zv1 by ZeroWidth",
+            })
+        integrations["openrouter"] = _integrations[cache_key]
+
+    if flow and flow.get("knowledge_db_path"):
+        print("[WARN] Knowledge databases are not supported by the Python SDK, skipping")
+
+    return integrations
+
+
+def _read_orchestration(data, label="orchestration.json"):
+    try:
+        orchestration = json.loads(data.decode("utf-8"))
+    except ValueError as error:
+        raise ValueError(f"Invalid JSON in {label}: {error}") from error
+
+    if not isinstance(orchestration.get("nodes"), list):
+        raise ValueError(f'{label} must contain a "nodes" array')
+    if not isinstance(orchestration.get("links"), list):
+        raise ValueError(f'{label} must contain a "links" array')
+    return orchestration
+
+
+def _find_import_folder(import_id, import_folders):
+    # Folders are named after the import ID; version info lives in the import's metadata
+    if import_id in import_folders:
+        return import_id
+    for folder_name in import_folders:
+        if import_id in folder_name:
+            return folder_name
+    return None
+
+
+def _load_zv1_import_folder(folder_name, folder_entries):
+    if "orchestration.json" not in folder_entries:
+        raise ValueError(f"Missing orchestration.json in import folder '{folder_name}'")
+    orchestration = _read_orchestration(
+        folder_entries["orchestration.json"], f"import folder '{folder_name}/orchestration.json'"
+    )
+
+    import_id = orchestration.get("id")
+    metadata = orchestration.get("metadata") or {}
+
+    # Group nested import entries by folder name
+    nested_folders = {}
+    for relative_path, data in folder_entries.items():
+        if relative_path.startswith("imports/"):
+            nested_name, _, nested_path = relative_path[len("imports/"):].partition("/")
+            nested_folders.setdefault(nested_name, {})[nested_path] = data
+
+    nested_imports = []
+    for nested_name, nested_entries in nested_folders.items():
+        try:
+            nested_imports.append(_load_zv1_import_folder(nested_name, nested_entries))
+        except ValueError as error:
+            raise ValueError(f"Failed to load nested import '{nested_name}' in '{folder_name}': {error}") from error
+
+    return {
+        "id": f"imported-{import_id}",
+        "display_name": metadata.get("display_name") or import_id,
+        "snapshot": metadata.get("snapshot") or "unknown",
+        "unique_id": import_id,
+        "folder_name": folder_name,
+        "nodes": orchestration["nodes"],
+        "links": orchestration["links"],
+        "imports": nested_imports,
+        # Preserve any additional metadata from orchestration.json
+        **orchestration,
+    }
+
+
+def _load_zv1_imports_from_object(imports_object, entries):
+    import_folders = {}
+    for name, data in entries.items():
+        if name.startswith("imports/") and not name.endswith("/"):
+            parts = name.split("/")
+            if len(parts) >= 2:
+                import_folders.setdefault(parts[1], {})["/".join(parts[2:])] = data
+
+    imports = []
+    for import_id, snapshot in imports_object.items():
+        try:
+            folder_name = _find_import_folder(import_id, import_folders)
+            if not folder_name:
+                raise ValueError(f"Import '{import_id}' with snapshot '{snapshot}' not found")
+            import_data = _load_zv1_import_folder(folder_name, import_folders[folder_name])
+            import_data["importId"] = import_id
+            import_data["requestedSnapshot"] = snapshot
+            imports.append(import_data)
+        except ValueError as error:
+            raise ValueError(f"Failed to load import '{import_id}' ({snapshot}): {error}") from error
+    return imports
+
+
+def _load_zv1_archive(archive):
+    entries = {
+        info.filename[2:] if info.filename.startswith("./") else info.filename: archive.read(info)
+        for info in archive.infolist()
+        if not info.is_dir()
+    }
+
+    if "orchestration.json" not in entries:
+        raise ValueError("Missing required orchestration.json file in .zv1 archive")
+    orchestration = _read_orchestration(entries["orchestration.json"])
+
+    imports = orchestration.get("imports") or []
+    if isinstance(imports, dict):
+        # New format: imports as object { "import-id": "snapshot" }
+        imports = _load_zv1_imports_from_object(imports, entries)
+
+    if "knowledge.db" in entries:
+        print("[WARN] Knowledge databases are not supported by the Python SDK, skipping knowledge.db")
+
+    return {**orchestration, "imports": imports}
+
+
+def load_zv1_file(file_path):
+    """
+    Load a .zv1 file (a ZIP archive containing orchestration.json and optional imports)
+
+    Returns:
+        dict: Extracted flow with orchestration.json contents and imports
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Zv1 file not found: {file_path}")
+    if not file_path.endswith(".zv1"):
+        raise ValueError(f"Invalid file extension. Expected .zv1, got: {os.path.splitext(file_path)[1]}")
+
+    with zipfile.ZipFile(file_path) as archive:
+        return _load_zv1_archive(archive)
+
+
+def load_zv1_from_bytes(data):
+    """
+    Load a .zv1 file from raw ZIP data in memory
+
+    Returns:
+        dict: Extracted flow with orchestration.json contents and imports
+    """
+    if len(data) < 4 or data[:2] != b"PK":
+        raise ValueError("Invalid ZIP data: Missing ZIP file signature")
+
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        return _load_zv1_archive(archive)
+
+
+def convert_legacy_imports(legacy_imports):
+    """
+    Convert a legacy imports list (full orchestration objects) to import definitions
+    """
+    if not isinstance(legacy_imports, list):
+        return []
+
+    converted = []
+    for index, legacy_import in enumerate(legacy_imports):
+        unique_id = legacy_import.get("id") or f"legacy-import-{index}"
+        display_name = legacy_import.get("display_name") or legacy_import.get("name") or f"Legacy Import {index + 1}"
+        snapshot = legacy_import.get("snapshot") or "legacy"
+        converted.append({
+            "id": f"imported-{unique_id}",
+            "display_name": display_name,
+            "snapshot": snapshot,
+            "unique_id": unique_id,
+            "folder_name": f"{display_name}.{snapshot}.{unique_id}",
+            "nodes": legacy_import.get("nodes") or [],
+            "links": legacy_import.get("links") or [],
+            "imports": convert_legacy_imports(legacy_import.get("imports") or []),
+            **legacy_import,
+        })
+    return converted
+
+
+def detect_and_load_flow(source):
+    """
+    Detect the input format and load accordingly
+    Supports flow dicts, .json / .zv1 file paths and raw .zv1 bytes
+
+    Returns:
+        dict: Flow ready for engine initialization
+    """
+    if isinstance(source, dict):
+        return source
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return load_zv1_from_bytes(bytes(source))
+
+    if isinstance(source, (str, os.PathLike)):
+        file_path = os.path.abspath(os.fspath(source))
+        if file_path.endswith(".zv1"):
+            return load_zv1_file(file_path)
+        if file_path.endswith(".json"):
+            if not os.path.exists(file_path):
+                raise FileNotFoundError(f"Flow file not found: {file_path}")
+            with open(file_path, "r", encoding="utf-8") as f:
+                flow = json.load(f)
+            if isinstance(flow.get("imports"), list):
+                flow["imports"] = convert_legacy_imports(flow["imports"])
+            return flow
+        raise ValueError(f"Unsupported file format. Expected .zv1 or .json, got: {os.path.splitext(file_path)[1]}")
+
+    raise TypeError("Invalid input type. Expected file path (string), flow dict, or ZIP data (bytes).")
+
+
+def default_nodes_dir():
+    return resolve_shared_dir("nodes")
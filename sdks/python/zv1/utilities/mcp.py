@@ -0,0 +1,94 @@
+import uuid
+
+
+async def _post_json(url, payload):
+    try:
+        import aiohttp
+    except ImportError as error:
+        raise ImportError("Remote MCP tools require aiohttp: pip install zv1[mcp]") from error
+
+    async with aiohttp.ClientSession() as session:
+        async with session.post(url, json=payload) as response:
+            response.raise_for_status()
+            return await response.json()
+
+
+async def call_mcp_tool(node, args):
+    """
+    Call an MCP tool for a given node
+
+    Args:
+        node: The node to call the tool for
+        args: The arguments to pass to the tool
+
+    Returns:
+        The result of the tool call
+    """
+    url = (node.get("settings") or {}).get("url")
+    if not url:
+        raise ValueError(f"No MCP URL specified for node {node.get('id')}")
+
+    tool_name = (node.get("settings") or {}).get("toolName")
+    try:
+        data = await _post_json(url, {
+            "id": str(uuid.uuid4()),
+            "method": "tools/call",
+            "params": {"name": tool_name, **args},
+        })
+    except Exception as error:
+        raise RuntimeError(f"Failed to call MCP tool at {url}: {error}") from error
+    return (data or {}).get("result")
+
+
+async def list_mcp_tools(url):
+    """
+    Fetch all tool schemas from an MCP endpoint
+
+    Args:
+        url: The MCP endpoint URL
+
+    Returns:
+        list: Tool schemas in the internal {name, description, parameters} format
+    """
+    data = await _post_json(url, {
+        "id": str(uuid.uuid4()),
+        "method": "tools/list",
+        "params": {},
+    })
+    tools = ((data or {}).get("result") or {}).get("tools") or []
+    return [
+        {
+            "name": tool.get("name"),
+            "description": tool.get("description"),
+            "parameters": tool.get("inputSchema"),
+        }
+        for tool in tools
+    ]
+
+
+async def fetch_mcp_tool_schema(self, node):
+    """
+    Fetch the MCP tool schema for a given node, cached per URL
+
+    Args:
+        node: The node to fetch the schema for
+
+    Returns:
+        dict: The MCP tool schema
+    """
+    url = (node.get("settings") or {}).get("url")
+    if not url:
+        raise ValueError(f"No MCP URL specified for node {node.get('id')}")
+
+    if url in self._mcp_schema_cache:
+        return self._mcp_schema_cache[url]
+
+    try:
+        tools = await list_mcp_tools(url)
+        if not tools:
+            raise RuntimeError(f"No tools found at MCP endpoint {url}")
+    except Exception as error:
+        raise RuntimeError(f"Failed to fetch MCP tool schema from {url}: {error}") from error
+
+    self._mcp_schema_cache[url] = tools[0]
+    return tools[0]
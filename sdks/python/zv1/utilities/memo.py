@@ -0,0 +1,160 @@
+"""
+Memoization of pure node outputs
+
+Nodes whose config sets `"pure": true` are functions of their inputs and
+settings only. Their outputs are stored under a hash of
+(node type, process code, inputs, settings), so an identical call - later
+in the same run, in another run, or in another engine in the process -
+is answered without running the node. When one flow input changes, only
+the nodes downstream of it see new inputs, so only that cone recomputes.
+
+Outputs are stored pickled. The pickle's length sizes the LRU, and every
+hit unpickles a fresh copy with the same types as a miss (tuples, sets,
+int dict keys), so a consumer mutating its inputs can never corrupt the
+memo. Keys hash inputs and settings as sorted-key JSON. JSON would
+write a tuple like a list, so tuples, the columns of tables made by the
+nodes (zv1.utilities.table), are written as tagged objects, and so are
+array.array and NumPy columns with their type. Calls whose inputs or
+settings aren't JSON serializable, have non-string dict keys or use a
+tag as a key are not memoized, nor are outputs that can't be pickled.
+"""
+
+import array
+import hashlib
+import json
+import pickle
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Keys of the objects standing in for tuples and typed arrays in memo keys
+_TUPLE_TAG = "\u0000tuple"
+_ARRAY_TAG = "\u0000array"
+# Types JSON writes exactly, so sequences of them are written as they are
+_SCALARS = frozenset({str, int, float, bool, type(None)})
+
+
+class MemoCache:
+    """
+    LRU of pickled node outputs bounded by their total size
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(node_type, code_version, inputs, settings):
+        """
+        Build the memo key for a call
+
+        Returns:
+            str or None: Hex digest, or None when the call can't be hashed canonically
+        """
+        try:
+            payload = json.dumps(
+                [node_type, code_version, _canonical(inputs), _canonical(settings)],
+                sort_keys=True,
+                separators=(",", ":"),
+                ensure_ascii=False,
+                allow_nan=True,
+            )
+        except (_NotCanonical, TypeError, ValueError):
+            return None
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Get a fresh copy of the memoized outputs
+
+        Returns:
+            dict or None: The outputs, or None on a miss
+        """
+        data = self._entries.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return pickle.loads(data)
+
+    def set(self, key, outputs):
+        """
+        Memoize outputs, evicting least recently used entries to stay within max_bytes
+
+        Returns:
+            bool: Whether the outputs were stored
+        """
+        try:
+            data = pickle.dumps(outputs, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return False
+        if len(data) > self.max_bytes:
+            return False
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self._entries[key] = data
+        self.size += len(data)
+
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+        return True
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_stats(self):
+        return {
+            "entries": len(self._entries),
+            "size": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class _NotCanonical(Exception):
+    pass
+
+
+def _canonical(value):
+    """
+    A value JSON writes apart from every other value: tuples and typed arrays become tagged objects
+
+    Raises:
+        _NotCanonical: A dict has a key that isn't a string or is a tag
+    """
+    if isinstance(value, dict):
+        if any(type(key) is not str or key in (_TUPLE_TAG, _ARRAY_TAG) for key in value):
+            raise _NotCanonical
+        return {key: _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if not all(type(item) in _SCALARS for item in value):
+            value = [_canonical(item) for item in value] if isinstance(value, list) else tuple(map(_canonical, value))
+        return {_TUPLE_TAG: value} if isinstance(value, tuple) else value
+    if isinstance(value, array.array):
+        return {_ARRAY_TAG: [value.typecode, value.tolist()]}
+    if hasattr(value, "dtype") and hasattr(value, "tolist"):
+        # NumPy arrays and scalars
+        return {_ARRAY_TAG: [value.dtype.str, value.tolist()]}
+    return value
+
+
+_shared_memo = None
+
+
+def get_shared_memo():
+    """Get the memo cache shared by every engine in the interpreter."""
+    global _shared_memo
+    if _shared_memo is None:
+        _shared_memo = MemoCache()
+    return _shared_memo
@@ -0,0 +1,203 @@
+"""
+Mergeable sketches of streams of numbers
+
+A HistogramSketch summarizes any number of values in bounded space:
+counts in fixed-width bins (plus underflow and overflow), the count,
+sum, minimum and maximum, and a KLL quantile sketch. Sketches are
+updated a batch at a time and merged with the sketches of other batches
+(loop iterations, runs, worker processes). They round-trip through plain
+JSON objects (types/sketch.json), so they can pass between nodes and be
+stored between runs.
+
+The KLL sketch keeps a stack of compactors, where the values of level h
+each stand for 2**h values. A compactor over its capacity sorts its
+values and promotes every other one to the next level. Capacities shrink
+by 2/3 per level below the top, so the sketch holds about 3 * k values
+however many it has seen, and a quantile's rank is off by about 1.7 / k
+of the count. Each level alternates between promoting the odd and the
+even positions rather than flipping a coin, so the same batches always
+give the same sketch, as pure nodes need.
+"""
+
+from .stats import bin_counts, bounds, total
+
+DEFAULT_K = 200
+MIN_CAPACITY = 8
+
+
+class KLLSketch:
+    """
+    Quantile sketch of a stream of numbers
+    """
+
+    def __init__(self, k=DEFAULT_K):
+        self.k = k
+        self.count = 0
+        self.levels = [[]]
+        self.flips = [0]
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(MIN_CAPACITY, int(self.k * (2 / 3) ** depth))
+
+    def update(self, values):
+        """Add a batch of values."""
+        values = values.tolist() if hasattr(values, "tolist") else list(values)
+        self.levels[0].extend(values)
+        self.count += len(values)
+        self._compact()
+
+    def merge(self, other):
+        """Add the values summarized by another sketch."""
+        for level, values in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append([])
+                self.flips.append(0)
+            self.levels[level].extend(values)
+            self.flips[level] += other.flips[level]
+        self.count += other.count
+        self._compact()
+
+    def _compact(self):
+        level = 0
+        while level < len(self.levels):
+            values = self.levels[level]
+            if len(values) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append([])
+                    self.flips.append(0)
+                values.sort()
+                # An odd value out stays behind, so the total weight is unchanged
+                leftover = [values.pop()] if len(values) % 2 else []
+                self.levels[level + 1].extend(values[self.flips[level] % 2::2])
+                self.levels[level] = leftover
+                self.flips[level] += 1
+            level += 1
+
+    def quantiles(self, fractions):
+        """
+        The smallest values whose rank reaches each fraction of the count
+
+        Returns:
+            list: One value per fraction, None when the sketch is empty
+        """
+        if not self.count:
+            return [None] * len(fractions)
+        weighted = sorted(
+            (value, 1 << level) for level, values in enumerate(self.levels) for value in values
+        )
+        results = []
+        for fraction in fractions:
+            target = fraction * self.count
+            cumulative = 0
+            for value, weight in weighted:
+                cumulative += weight
+                if cumulative >= target:
+                    break
+            results.append(value)
+        return results
+
+    def to_dict(self):
+        return {"k": self.k, "count": self.count, "levels": [list(values) for values in self.levels], "flips": list(self.flips)}
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(state.get("k", DEFAULT_K))
+        sketch.count = state["count"]
+        sketch.levels = [list(values) for values in state["levels"]] or [[]]
+        sketch.flips = list(state.get("flips") or [0] * len(sketch.levels))
+        return sketch
+
+
+class HistogramSketch:
+    """
+    Fixed-bin histogram, summary statistics and quantiles of a stream of numbers
+
+    Args:
+        start: Lower bound of the first bin
+        bin_size: Width of each bin
+        bin_count: Number of bins
+    """
+
+    def __init__(self, start, bin_size, bin_count, k=DEFAULT_K):
+        self.start = start
+        self.bin_size = bin_size
+        self.bin_count = bin_count
+        self.counts = [0] * bin_count
+        self.underflow = 0
+        self.overflow = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+        self.quantile_sketch = KLLSketch(k)
+
+    def update(self, floats):
+        """Add a batch of values, an array from zv1.utilities.stats."""
+        if not len(floats):
+            return
+        counts, underflow, overflow = bin_counts(floats, self.start, self.bin_size, self.bin_count)
+        self.counts = [a + b for a, b in zip(self.counts, counts)]
+        self.underflow += underflow
+        self.overflow += overflow
+        self.count += len(floats)
+        self.sum += total(floats)
+        self._extend_bounds(*bounds(floats))
+        self.quantile_sketch.update(floats)
+
+    def merge(self, other):
+        """Add the values summarized by another sketch with the same bins."""
+        if (other.start, other.bin_size, other.bin_count) != (self.start, self.bin_size, self.bin_count):
+            raise ValueError("Sketches with different bins cannot be merged")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        self.count += other.count
+        self.sum += other.sum
+        if other.count:
+            self._extend_bounds(other.min, other.max)
+        self.quantile_sketch.merge(other.quantile_sketch)
+
+    def _extend_bounds(self, low, high):
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    def quantiles(self, fractions):
+        """Approximate quantiles; 0 and 1 give the exact minimum and maximum."""
+        values = self.quantile_sketch.quantiles(fractions)
+        for index, fraction in enumerate(fractions):
+            if fraction <= 0:
+                values[index] = self.min
+            elif fraction >= 1:
+                values[index] = self.max
+        return values
+
+    def to_dict(self):
+        """The sketch as a JSON object (types/sketch.json)."""
+        return {
+            "start": self.start,
+            "bin_size": self.bin_size,
+            "bin_count": self.bin_count,
+            "counts": list(self.counts),
+            "underflow": self.underflow,
+            "overflow": self.overflow,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "quantiles": self.quantile_sketch.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        quantiles = state["quantiles"]
+        sketch = cls(state["start"], state["bin_size"], state["bin_count"], quantiles.get("k", DEFAULT_K))
+        sketch.counts = list(state["counts"])
+        sketch.underflow = state["underflow"]
+        sketch.overflow = state["overflow"]
+        sketch.count = state["count"]
+        sketch.sum = state["sum"]
+        sketch.min = state["min"]
+        sketch.max = state["max"]
+        sketch.quantile_sketch = KLLSketch.from_dict(quantiles)
+        return sketch
@@ -0,0 +1,331 @@
+"""
+Shared numeric kernel for the statistics nodes
+
+mean, median, mode, quartiles, standard-deviation, histogram and describe
+read their input once with to_floats: a single validation and conversion
+pass into a compact typed array of floats (a NumPy array when NumPy is
+installed, array("d") otherwise). The statistics are then computed from
+that array:
+
+- Sums and the variance's sum of squared deviations are added by the
+  builtin sum(), in the order the nodes always have, so results are
+  unchanged to the last digit. NumPy only computes the squared
+  deviations, which round the same element by element, and hands the
+  values over with tolist(); its pairwise .sum() can differ in the last
+  digit. A one-pass Welford loop would run in Python, three times
+  slower, and round differently.
+- Medians and quartiles are order statistics, found by quickselect
+  (NumPy's partition when available) instead of a full sort. Several
+  ranks are selected together, each partition step splitting the ranks
+  between its sides.
+- Histograms bin the whole array with NumPy's bincount, or in one loop
+  over the typed array without NumPy (chains of map() measured slower).
+  zv1.utilities.sketch builds mergeable sketches on the same binning.
+"""
+
+import math
+from array import array
+from collections import Counter
+
+from .table import get_column, is_table
+
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
+
+# Partitions at most this long are sorted instead of split further
+SORT_SIZE = 64
+
+
+def to_floats(values, skip_none=False):
+    """
+    Validate and convert numbers in one pass
+
+    Args:
+        values: Numbers, or numeric strings and booleans
+        skip_none: Drop None values (empty table cells) instead of rejecting them
+
+    Returns:
+        A NumPy array when NumPy is installed, array("d") otherwise
+    """
+    if _np is not None and isinstance(values, _np.ndarray) and values.dtype.kind in "biuf":
+        return values.astype(float)
+    try:
+        if skip_none:
+            floats = array("d", [float(value) for value in values if value is not None])
+        else:
+            floats = array("d", [float(value) for value in values])
+    except (ValueError, TypeError):
+        raise ValueError("Input contains non-numeric values that cannot be processed")
+    return _np.asarray(floats) if _np is not None else floats
+
+
+def input_floats(numbers, column=None):
+    """
+    The numbers input of a statistics node as floats
+
+    Args:
+        numbers: An array, a single value, or a table
+        column: The table column to read; its empty cells are skipped
+    """
+    if is_table(numbers):
+        return to_floats(get_column(numbers, column), skip_none=True)
+    if not isinstance(numbers, list):
+        numbers = [numbers]
+    return to_floats(numbers)
+
+
+def numeric_floats(values):
+    """
+    The numbers among values as floats, skipping booleans and anything
+    float() rejects, in the same typed array as to_floats
+    """
+    if _np is not None and isinstance(values, _np.ndarray) and values.dtype.kind in "iuf":
+        return values.astype(float)
+    if set(map(type, values)) <= {int, float}:
+        floats = array("d", values)
+    else:
+        floats = array("d")
+        for value in values:
+            if isinstance(value, bool):
+                continue
+            try:
+                floats.append(float(value))
+            except (ValueError, TypeError):
+                continue
+    return _np.asarray(floats) if _np is not None else floats
+
+
+def total(floats):
+    """Sum of the values, as the builtin sum() adds them."""
+    return sum(floats.tolist()) if _np is not None else sum(floats)
+
+
+def mean(floats):
+    """Arithmetic mean of a non-empty array."""
+    return total(floats) / len(floats)
+
+
+def variance(floats, center=None):
+    """
+    Population variance of a non-empty array
+
+    Args:
+        center: The mean, when already known
+    """
+    if center is None:
+        center = mean(floats)
+    if _np is not None:
+        return sum(((floats - center) ** 2).tolist()) / len(floats)
+    return sum((x - center) ** 2 for x in floats) / len(floats)
+
+
+def order_statistics(floats, ranks):
+    """
+    Values at the given ranks of the sorted array, without sorting it
+
+    Returns:
+        dict: rank -> value
+    """
+    ranks = sorted(set(ranks))
+    if _np is not None:
+        partitioned = _np.partition(floats, ranks)
+        return {rank: float(partitioned[rank]) for rank in ranks}
+
+    found = {}
+    pending = [(list(floats), 0, ranks)]
+    while pending:
+        values, offset, wanted = pending.pop()
+        if len(values) <= SORT_SIZE:
+            values.sort()
+            for rank in wanted:
+                found[rank] = values[rank - offset]
+            continue
+
+        # Median-of-three pivot, then a three-way split
+        pivot = sorted((values[0], values[len(values) // 2], values[-1]))[1]
+        lower = [x for x in values if x < pivot]
+        upper = [x for x in values if x > pivot]
+        equal_start = offset + len(lower)
+        equal_end = offset + len(values) - len(upper)
+
+        for rank in wanted:
+            if equal_start <= rank < equal_end:
+                found[rank] = pivot
+        lower_ranks = [rank for rank in wanted if rank < equal_start]
+        upper_ranks = [rank for rank in wanted if rank >= equal_end]
+        if lower_ranks:
+            pending.append((lower, offset, lower_ranks))
+        if upper_ranks:
+            pending.append((upper, equal_end, upper_ranks))
+    return found
+
+
+def _median_ranks(start, length):
+    mid = start + length // 2
+    return (mid,) if length % 2 else (mid - 1, mid)
+
+
+def _median_of(found, ranks):
+    if len(ranks) == 1:
+        return found[ranks[0]]
+    return (found[ranks[0]] + found[ranks[1]]) / 2
+
+
+def median(floats):
+    """Median of a non-empty array."""
+    ranks = _median_ranks(0, len(floats))
+    return _median_of(order_statistics(floats, ranks), ranks)
+
+
+def quartiles(floats):
+    """
+    Quartiles of a non-empty array: the median, and the medians of the
+    lower and upper halves, which exclude the middle value of an odd count
+
+    Returns:
+        tuple: (q1, q2, q3)
+    """
+    length = len(floats)
+    if length == 1:
+        value = float(floats[0])
+        return value, value, value
+
+    half = length // 2
+    q1_ranks = _median_ranks(0, half)
+    q2_ranks = _median_ranks(0, length)
+    q3_ranks = _median_ranks(half + length % 2, half)
+    found = order_statistics(floats, q1_ranks + q2_ranks + q3_ranks)
+    return _median_of(found, q1_ranks), _median_of(found, q2_ranks), _median_of(found, q3_ranks)
+
+
+def mode(floats):
+    """
+    The most frequent value of a non-empty array; the first seen wins ties
+
+    Returns:
+        tuple: (value, frequency, number of distinct values)
+    """
+    counter = Counter(floats.tolist() if _np is not None else floats)
+    value, frequency = counter.most_common(1)[0]
+    return value, frequency, len(counter)
+
+
+def bounds(floats):
+    """(minimum, maximum) of a non-empty array."""
+    if _np is not None:
+        return float(floats.min()), float(floats.max())
+    return min(floats), max(floats)
+
+
+def histogram(floats, num_bins):
+    """
+    Equal-width bins between the minimum and maximum of a non-empty array
+
+    Returns:
+        tuple: (bin boundaries, counts)
+    """
+    min_val, max_val = bounds(floats)
+
+    # All values are the same: repeated boundaries, everything in the first bin
+    if min_val == max_val:
+        counts = [0] * num_bins
+        counts[0] = len(floats)
+        return [min_val] * (num_bins + 1), counts
+
+    bin_width = (max_val - min_val) / num_bins
+
+    # Fixed precision boundaries avoid floating point noise
+    bins = [round(min_val + (bin_width * i), 10) for i in range(num_bins + 1)]
+
+    # Each value's bin is int((value - min) / width); the maximum belongs to the last bin
+    if _np is not None:
+        indexes = ((floats - min_val) / bin_width).astype(_np.intp)
+        indexes[floats == max_val] = num_bins - 1
+        return bins, _np.bincount(_np.minimum(indexes, num_bins - 1), minlength=num_bins).tolist()
+
+    # Without NumPy a plain loop beats chains of map() over the array. The
+    # extra slot catches values that round up to the end of the last bin.
+    counts = [0] * (num_bins + 1)
+    for num in floats:
+        if num == max_val:
+            counts[-2] += 1
+            continue
+        counts[int((num - min_val) / bin_width)] += 1
+    past = counts.pop()
+    counts[-1] += past
+    return bins, counts
+
+
+def bin_counts(floats, start, bin_size, bin_count):
+    """
+    Counts of values in fixed bins [start + i * bin_size, start + (i + 1) * bin_size)
+
+    Returns:
+        tuple: (counts, underflow below start, overflow past the last bin)
+    """
+    start = float(start)
+    if _np is not None:
+        if _np.isnan(floats).any():
+            raise ValueError("cannot convert float NaN to integer")
+        kept = floats[floats >= start]
+        positions = (kept - start) / bin_size
+        past = positions >= bin_count
+        counts = _np.bincount(positions[~past].astype(_np.intp), minlength=bin_count)
+        return counts.tolist(), len(floats) - len(kept), int(past.sum())
+
+    counts = [0] * bin_count
+    underflow = overflow = 0
+    for num in floats:
+        if num < start:
+            underflow += 1
+            continue
+        position = (num - start) / bin_size
+        if position >= bin_count:
+            overflow += 1
+        else:
+            counts[int(position)] += 1
+    return counts, underflow, overflow
+
+
+def describe(floats, num_bins=10):
+    """
+    Every statistic of the statistics nodes, from one array
+
+    Returns:
+        dict: count, mean, median, mode, frequency, q1, q3, iqr, min, max,
+        range, standard_deviation, variance, bins and counts; the same
+        zeros and empty values as the individual nodes when there are no values
+    """
+    count = len(floats)
+    if not count:
+        return {
+            "count": 0, "mean": 0, "median": 0, "mode": None, "frequency": 0,
+            "q1": 0, "q3": 0, "iqr": 0, "min": 0, "max": 0, "range": 0,
+            "standard_deviation": 0, "variance": 0, "bins": [], "counts": [],
+        }
+
+    min_val, max_val = bounds(floats)
+    center = mean(floats)
+    spread = variance(floats, center)
+    q1, q2, q3 = quartiles(floats)
+    mode_value, frequency, _ = mode(floats)
+    bins, counts = histogram(floats, num_bins)
+    return {
+        "count": count,
+        "mean": center,
+        "median": q2,
+        "mode": mode_value,
+        "frequency": frequency,
+        "q1": q1,
+        "q3": q3,
+        "iqr": q3 - q1,
+        "min": min_val,
+        "max": max_val,
+        "range": max_val - min_val,
+        "standard_deviation": math.sqrt(spread),
+        "variance": spread,
+        "bins": bins,
+        "counts": counts,
+    }
@@ -0,0 +1,131 @@
+"""
+Columnar tables for the data-processing nodes
+
+A table (types/table.json) holds tabular data as one array per column
+instead of one object per row:
+
+    {"columns": {"id": [1, 2], "name": ["Ann", "Bob"]}, "types": {"id": "integer", "name": "string"}}
+
+`types` is optional and uses the csv-parser node's type names. The
+csv-parser node returns tables with `output: "table"`, and the array and
+math nodes accept them and work column by column: a filter or sort
+computes the kept row positions from one column and gathers every column
+by position, without building an object per row. Numeric columns are
+read with zv1.utilities.stats.
+
+Columns made by the nodes are tuples. Port values are frozen by walking
+lists, and a tuple is already read-only, so a table passes between nodes
+without being walked again; it still serializes as JSON arrays. Hosts can
+also pass columns as lists, array.array or NumPy arrays.
+"""
+
+from itertools import compress
+
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
+
+
+def is_table(value):
+    """Whether a value is a table: an object with an object of columns."""
+    return isinstance(value, dict) and isinstance(value.get("columns"), dict)
+
+
+def make_table(columns, types=None):
+    """
+    Build a table value
+
+    Args:
+        columns: dict of column name to values
+        types: Optional dict of column name to type, kept for the columns present
+    """
+    table = {"columns": {name: _as_tuple(values) for name, values in columns.items()}}
+    if types:
+        table["types"] = {name: types[name] for name in columns if name in types}
+    return table
+
+
+def from_rows(rows, headers=None):
+    """
+    Build a table from an array of objects
+
+    Args:
+        rows: Objects, one per row
+        headers: Column order; defaults to every key in order of first appearance
+    """
+    if headers is None:
+        headers = list(dict.fromkeys(key for row in rows for key in row))
+    return make_table({name: [row.get(name) for row in rows] for name in headers})
+
+
+def to_rows(table):
+    """The rows of a table as an array of objects."""
+    columns = table["columns"]
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+def row_count(table):
+    """Number of rows; every column holds one value per row."""
+    return len(next(iter(table["columns"].values()), ()))
+
+
+def get_column(table, name=None):
+    """
+    A column's values
+
+    Args:
+        name: Column name; may be omitted when the table has a single column
+    """
+    columns = table["columns"]
+    if not name:
+        if len(columns) != 1:
+            raise ValueError("Choose a column of the table")
+        return next(iter(columns.values()))
+    if name not in columns:
+        raise ValueError(f"Unknown column: {name}")
+    return columns[name]
+
+
+def as_list(values):
+    """A column's values as a list of Python values."""
+    return values.tolist() if hasattr(values, "tolist") else list(values)
+
+
+def take(table, indices):
+    """A table of the rows at the given positions, in that order."""
+    return _derive(table, lambda values: _gather(values, indices))
+
+
+def select(table, mask):
+    """A table of the rows whose mask value is true."""
+    return _derive(table, lambda values: _compress(values, mask))
+
+
+def _derive(table, transform):
+    derived = {"columns": {name: transform(values) for name, values in table["columns"].items()}}
+    if "types" in table:
+        derived["types"] = table["types"]
+    return derived
+
+
+def _as_tuple(values):
+    if type(values) is tuple:
+        return values
+    if hasattr(values, "tolist"):
+        # NumPy and array.array: Python scalars instead of NumPy scalars
+        return tuple(values.tolist())
+    return tuple(values)
+
+
+def _gather(values, indices):
+    if _np is not None and isinstance(values, _np.ndarray):
+        return tuple(values[_np.asarray(indices, dtype=_np.intp)].tolist())
+    return tuple(map(values.__getitem__, indices))
+
+
+def _compress(values, mask):
+    if _np is not None and isinstance(values, _np.ndarray):
+        return tuple(values[_np.asarray(mask, dtype=bool)].tolist())
+    return tuple(compress(values, mask))
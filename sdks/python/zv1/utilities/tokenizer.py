@@ -0,0 +1,424 @@
+"""
+Shared tokenizer service for the tiktoken-based nodes
+
+The token-count, tokenizer, untokenizer and truncate-by-tokens nodes get
+their encodings from one process-wide service instead of resolving them
+on every call:
+
+- Node settings ("cl200k_base", "cl100k_base") are mapped to tiktoken
+  encodings in one place. cl200k_base is the name the nodes use for
+  tiktoken's o200k_base.
+- Encodings are loaded once per process. When a directory of BPE rank
+  files (<encoding>.tiktoken, the format tiktoken downloads) is
+  configured, ranks are parsed from a memory map of the local file and
+  nothing is fetched over the network.
+- encode_batch / count_batch tokenize many texts at once on tiktoken's
+  native threads.
+- Token counts are kept in an LRU keyed by a hash of the text, so the
+  system prompt and earlier turns of a conversation are only tokenized
+  once.
+- count_messages reads the count of a chat message from its
+  `_token_counts` field ({"digest": "5e8f...", "cl200k_base": 12}) when
+  the field's digest matches the message's content, so an edited message
+  is counted again. Hosts that store conversations annotated with
+  annotate(), or with the `annotate` setting of the truncate nodes, make
+  every later turn tokenize only the new message, in any process;
+  input-chat passes the field through and the LLM integration drops it
+  from requests. Only messages with string content are annotated, since
+  the nodes extract multi-modal text differently.
+- With precision="estimate", counts come from the UTF-8 size of the text
+  divided by a fixed bytes-per-token ratio for English text, in
+  microseconds and without loading an encoding. The ratio doesn't depend
+  on what the process counted before, so estimates stay deterministic and
+  the nodes remain pure. For prose and code the estimate is usually
+  within ESTIMATE_MARGIN (25%) of the exact count. Dense text such as
+  CJK, base64 or long digit runs can be underestimated by more, so the
+  estimate is only reported (token-count) and never checked against a
+  budget.
+- bound_messages gives a proven upper bound instead, the UTF-8 size of
+  the text, which the truncate nodes' estimate precision keeps within
+  their budget with (see zv1.utilities.truncation).
+
+The rank file directory comes from the ZV1_TIKTOKEN_DIR environment
+variable, or from configure_tokenizer(bpe_dir=...). Without one, the rank
+files tiktoken downloaded earlier are read from its cache directory, and
+an encoding found in neither place is fetched by tiktoken.get_encoding as
+usual. Hosts that must not reach the network during a run set
+ZV1_TIKTOKEN_OFFLINE=1 or configure_tokenizer(offline=True): a missing
+encoding then raises FileNotFoundError instead.
+"""
+
+import base64
+import hashlib
+import math
+import mmap
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+# Node setting -> tiktoken encoding
+ENCODING_NAMES = {
+    "cl200k_base": "o200k_base",
+    "cl100k_base": "cl100k_base",
+}
+
+DEFAULT_CACHE_SIZE = 8192
+# Message field holding token counts by tokenizer setting, and the digest of the content they were counted from
+TOKEN_COUNTS_FIELD = "_token_counts"
+DIGEST_KEY = "digest"
+
+PRECISIONS = ("exact", "estimate")
+# Bytes per token of English text, the estimator's ratio; an average, not a bound, so budgets use bound_messages
+BYTES_PER_TOKEN = {
+    "cl200k_base": 4.2,
+    "cl100k_base": 4.0,
+}
+# Relative error the estimate usually stays within
+ESTIMATE_MARGIN = 0.25
+DEFAULT_THREADS = 8
+# Texts up to this length are cache keys themselves; longer ones are hashed
+_HASH_KEY_MIN_LENGTH = 64
+
+# Where tiktoken downloads rank files from, and caches them under the SHA-1 of this URL
+_RANKS_URL = "https://openaipublic.blob.core.windows.net/encodings/{}.tiktoken"
+
+# Pattern and special tokens of the supported encodings, as defined by tiktoken_ext.openai_public
+_ENCODING_PARAMS = {
+    "cl100k_base": {
+        "pat_str": r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}++|\p{N}{1,3}+| ?[^\s\p{L}\p{N}]++[\r\n]*+|\s++$|\s*[\r\n]|\s+(?!\S)|\s""",
+        "special_tokens": {
+            "<|endoftext|>": 100257,
+            "<|fim_prefix|>": 100258,
+            "<|fim_middle|>": 100259,
+            "<|fim_suffix|>": 100260,
+            "<|endofprompt|>": 100276,
+        },
+    },
+    "o200k_base": {
+        "pat_str": "|".join([
+            r"""[^\r\n\p{L}\p{N}]?[\p{Lu}\p{Lt}\p{Lm}\p{Lo}\p{M}]*[\p{Ll}\p{Lm}\p{Lo}\p{M}]+(?i:'s|'t|'re|'ve|'m|'ll|'d)?""",
+            r"""[^\r\n\p{L}\p{N}]?[\p{Lu}\p{Lt}\p{Lm}\p{Lo}\p{M}]+[\p{Ll}\p{Lm}\p{Lo}\p{M}]*(?i:'s|'t|'re|'ve|'m|'ll|'d)?""",
+            r"""\p{N}{1,3}""",
+            r""" ?[^\s\p{L}\p{N}]+[\r\n/]*""",
+            r"""\s*[\r\n]+""",
+            r"""\s+(?!\S)""",
+            r"""\s+""",
+        ]),
+        "special_tokens": {
+            "<|endoftext|>": 199999,
+            "<|endofprompt|>": 200018,
+        },
+    },
+}
+
+
+def resolve_encoding_name(tokenizer):
+    """
+    Map a node's tokenizer setting to a tiktoken encoding name
+
+    Raises:
+        ValueError: The tokenizer is not supported
+    """
+    encoding_name = ENCODING_NAMES.get(tokenizer)
+    if encoding_name is None:
+        supported = " and ".join(ENCODING_NAMES)
+        raise ValueError(f"Unsupported tokenizer: {tokenizer}. Only {supported} are supported.")
+    return encoding_name
+
+
+def message_text(message):
+    """Text of a message's content, joining the text parts of multi-modal content."""
+    if not isinstance(message, dict):
+        return ''
+    content = message.get('content', '')
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return ' '.join(
+            item['text'] for item in content
+            if isinstance(item, dict) and item.get('type') == 'text' and 'text' in item
+        )
+    return str(content)
+
+
+def validate_precision(precision):
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unsupported precision: {precision}. Only exact and estimate are supported.")
+    return precision
+
+
+def utf8_size(text):
+    return len(text) if text.isascii() else len(text.encode("utf-8", "surrogatepass"))
+
+
+def content_digest(text):
+    """Digest of a message's content stored next to its annotated counts (first 16 hex digits of its SHA-256)."""
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()[:16]
+
+
+def _annotatable(message):
+    return isinstance(message, dict) and isinstance(message.get('content'), str)
+
+
+def _annotation(message):
+    """The _token_counts of a message, if they were counted from its current content."""
+    if not _annotatable(message):
+        return None
+    annotated = message.get(TOKEN_COUNTS_FIELD)
+    if isinstance(annotated, dict) and annotated.get(DIGEST_KEY) == content_digest(message['content']):
+        return annotated
+    return None
+
+
+def _tiktoken_cache_path(encoding_name):
+    """Path of the rank file tiktoken caches when it downloads an encoding (see tiktoken.load)."""
+    cache_dir = os.environ.get("TIKTOKEN_CACHE_DIR") or os.environ.get("DATA_GYM_CACHE_DIR")
+    if cache_dir is None:
+        cache_dir = os.path.join(tempfile.gettempdir(), "data-gym-cache")
+    url = _RANKS_URL.format(encoding_name)
+    return os.path.join(cache_dir, hashlib.sha1(url.encode()).hexdigest())
+
+
+def read_bpe_ranks(path):
+    """Parse a .tiktoken rank file (one "<base64 token> <rank>" per line) through a memory map."""
+    ranks = {}
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for line in iter(data.readline, b""):
+            token, _, rank = line.partition(b" ")
+            if rank:
+                ranks[base64.b64decode(token)] = int(rank)
+    return ranks
+
+
+class TokenizerService:
+    def __init__(self, bpe_dir=None, cache_size=DEFAULT_CACHE_SIZE, threads=DEFAULT_THREADS, offline=False):
+        """
+        Args:
+            bpe_dir: Directory of local <encoding>.tiktoken rank files
+            cache_size: Token counts kept in the LRU
+            threads: Threads used by the batch methods
+            offline: Raise instead of letting tiktoken fetch encodings found
+                neither in bpe_dir nor in its cache
+        """
+        self.bpe_dir = bpe_dir
+        self.offline = offline
+        self.cache_size = cache_size
+        self.threads = threads
+        self._encodings = {}
+        self._counts = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def encoding(self, tokenizer):
+        """Get the tiktoken Encoding for a tokenizer setting, loading it on first use."""
+        encoding_name = resolve_encoding_name(tokenizer)
+        encoding = self._encodings.get(encoding_name)
+        if encoding is None:
+            with self._lock:
+                encoding = self._encodings.get(encoding_name)
+                if encoding is None:
+                    encoding = self._encodings[encoding_name] = self._load(encoding_name)
+        return encoding
+
+    def _load(self, encoding_name):
+        try:
+            import tiktoken
+        except ImportError as error:
+            raise ImportError("Token nodes require tiktoken: pip install zv1[tokenizers]") from error
+
+        local_path = self.rank_file(encoding_name)
+        if local_path is not None:
+            return tiktoken.Encoding(
+                name=encoding_name,
+                mergeable_ranks=read_bpe_ranks(local_path),
+                **_ENCODING_PARAMS[encoding_name],
+            )
+        if self.offline:
+            raise FileNotFoundError(
+                f"No rank file for the {encoding_name} encoding and downloads are off. Put {encoding_name}.tiktoken "
+                f"in the directory set by ZV1_TIKTOKEN_DIR or configure_tokenizer(bpe_dir=...), or unset "
+                f"ZV1_TIKTOKEN_OFFLINE to let tiktoken fetch it."
+            )
+        return tiktoken.get_encoding(encoding_name)
+
+    def rank_file(self, encoding_name):
+        """The local rank file of an encoding: in bpe_dir, or in tiktoken's download cache. None if neither has it."""
+        candidates = [_tiktoken_cache_path(encoding_name)]
+        if self.bpe_dir:
+            candidates.insert(0, os.path.join(self.bpe_dir, f"{encoding_name}.tiktoken"))
+        return next((path for path in candidates if os.path.exists(path)), None)
+
+    def preload(self, tokenizers=None):
+        """Load encodings ahead of the first node call (all supported ones by default)."""
+        for tokenizer in tokenizers or ENCODING_NAMES:
+            self.encoding(tokenizer)
+
+    def encode(self, text, tokenizer):
+        return self.encoding(tokenizer).encode(text)
+
+    def encode_batch(self, texts, tokenizer):
+        """Tokenize several texts in parallel."""
+        return self.encoding(tokenizer).encode_batch(list(texts), num_threads=self.threads)
+
+    def decode(self, tokens, tokenizer):
+        return self.encoding(tokenizer).decode(tokens)
+
+    def _key(self, text, tokenizer):
+        if len(text) < _HASH_KEY_MIN_LENGTH:
+            return (tokenizer, text)
+        return (tokenizer, hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest())
+
+    def count(self, text, tokenizer):
+        """Count the tokens of a text, reusing counts of texts seen before."""
+        return self.count_batch([text], tokenizer)[0]
+
+    def count_batch(self, texts, tokenizer):
+        """
+        Count the tokens of several texts
+        Texts missing from the LRU are tokenized together in one batch.
+
+        Returns:
+            list: Token count of each text
+        """
+        keys = [self._key(text, tokenizer) for text in texts]
+        counts = [None] * len(keys)
+        missing = {}
+        with self._lock:
+            for index, key in enumerate(keys):
+                count = self._counts.get(key)
+                if count is None:
+                    missing.setdefault(key, []).append(index)
+                else:
+                    self._counts.move_to_end(key)
+                    counts[index] = count
+            self.hits += len(keys) - sum(len(indexes) for indexes in missing.values())
+            self.misses += len(missing)
+
+        if missing:
+            pending = list(missing.items())
+            texts_to_encode = [texts[indexes[0]] for _, indexes in pending]
+            if len(texts_to_encode) == 1:
+                token_lists = [self.encode(texts_to_encode[0], tokenizer)]
+            else:
+                token_lists = self.encode_batch(texts_to_encode, tokenizer)
+            with self._lock:
+                for (key, indexes), tokens in zip(pending, token_lists):
+                    for index in indexes:
+                        counts[index] = len(tokens)
+                    self._counts[key] = len(tokens)
+                while len(self._counts) > self.cache_size:
+                    self._counts.popitem(last=False)
+        return counts
+
+    def estimate_batch(self, texts, tokenizer):
+        """
+        Estimate the tokens of several texts from their size
+
+        Returns:
+            list: Estimated token count of each text
+        """
+        resolve_encoding_name(tokenizer)
+        ratio = BYTES_PER_TOKEN[tokenizer]
+        return [math.ceil(utf8_size(text) / ratio) for text in texts]
+
+    def count_messages(self, messages, tokenizer, text_of=message_text, precision="exact"):
+        """
+        Count the tokens of each message's content
+        Annotated counts whose digest matches the content are used as they
+        are; the other messages are counted together with count_batch, or
+        estimated.
+
+        Args:
+            text_of: Function extracting the text of a message
+            precision: "exact" or "estimate"
+
+        Returns:
+            list: Token count of each message
+        """
+        validate_precision(precision)
+        counts = [None] * len(messages)
+        pending = []
+        for index, message in enumerate(messages):
+            annotated = _annotation(message)
+            if annotated is not None and isinstance(annotated.get(tokenizer), int):
+                counts[index] = annotated[tokenizer]
+            else:
+                pending.append(index)
+        if pending:
+            texts = [text_of(messages[index]) for index in pending]
+            if precision == "estimate":
+                new_counts = self.estimate_batch(texts, tokenizer)
+            else:
+                new_counts = self.count_batch(texts, tokenizer)
+            for index, count in zip(pending, new_counts):
+                counts[index] = count
+        return counts
+
+    def bound_messages(self, messages, tokenizer, text_of=message_text):
+        """
+        Upper bounds of the tokens of each message, without tokenizing
+        Every token of a byte-level BPE encoding covers at least one byte,
+        so a message has no more tokens than the UTF-8 size of its text.
+        Annotated counts are used where the digest matches.
+
+        Returns:
+            list: Upper bound of the token count of each message
+        """
+        resolve_encoding_name(tokenizer)
+        bounds = []
+        for message in messages:
+            annotated = _annotation(message)
+            count = annotated.get(tokenizer) if annotated is not None else None
+            bounds.append(count if isinstance(count, int) else utf8_size(text_of(message)))
+        return bounds
+
+    def annotate(self, messages, tokenizer):
+        """
+        Copies of messages with their counts and content digest in the _token_counts field
+        A host that stores the conversation with these annotations lets the
+        next runs skip counting its messages, in any process. Counts of a
+        message's earlier content are dropped.
+        """
+        annotated = []
+        for message, count in zip(messages, self.count_messages(messages, tokenizer)):
+            if _annotatable(message):
+                counts = _annotation(message) or {DIGEST_KEY: content_digest(message['content'])}
+                message = {**message, TOKEN_COUNTS_FIELD: {**counts, tokenizer: count}}
+            annotated.append(message)
+        return annotated
+
+    def get_stats(self):
+        return {
+            "encodings": sorted(self._encodings),
+            "cached_counts": len(self._counts),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._counts.clear()
+
+
+
+_service = None
+
+
+def get_tokenizer():
+    """Get the tokenizer service shared by every node in the interpreter."""
+    global _service
+    if _service is None:
+        _service = TokenizerService(
+            bpe_dir=os.environ.get("ZV1_TIKTOKEN_DIR"),
+            offline=os.environ.get("ZV1_TIKTOKEN_OFFLINE") == "1",
+        )
+    return _service
+
+
+def configure_tokenizer(**options):
+    """Replace the shared tokenizer service, e.g. configure_tokenizer(bpe_dir="/opt/bpe", cache_size=20000)."""
+    global _service
+    _service = TokenizerService(**options)
+    return _service
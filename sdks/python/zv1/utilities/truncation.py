@@ -0,0 +1,101 @@
+"""
+Token-budget truncation of message lists
+
+The truncate-by-tokens nodes keep the longest run of messages at one end
+of a history that fits a token budget. Token counts are non-negative, so
+the sums of the kept run only grow as it extends, and the cut point is
+found by binary search over their running sums instead of by rebuilding
+the result message by message.
+
+Counting is lazy by default: messages are tokenized from the kept end in
+batches that double in size, and counting stops at the batch holding the
+cut point. A budget that keeps the last 20 of 50,000 messages tokenizes a
+few dozen of them. With lazy=False every message is counted in one batch,
+which suits histories that are truncated again with other budgets, since
+the counts are then all in the tokenizer service's cache.
+
+With precision="estimate", messages are accepted on an upper bound of
+their counts while the running sum of the bounds fits the budget, and
+are never tokenized. The bound is the UTF-8 size of a message's text (or
+its annotated count): every token of a byte-level BPE encoding covers at
+least one byte, so no text has more tokens than bytes. Only the next
+EXACT_WINDOW messages past the accepted run, those near the cut point,
+are tokenized, and the run extends over those that fit exactly. The
+reported total is the bounds of the accepted run plus the exact counts
+after it, so it never understates the kept tokens and the budget holds.
+Since the bounds are loose (about four bytes per token in English), the
+run can stop short of the one precision="exact" keeps.
+"""
+
+from bisect import bisect_right
+from itertools import accumulate
+
+# Messages counted in the first batch; later batches double
+FIRST_BATCH = 16
+# Messages past the run accepted on bounds that precision="estimate" tokenizes
+EXACT_WINDOW = 16
+
+
+def _extend(count, messages, indexes, kept, total, limit, size):
+    """Extend a kept run of `indexes` while its running sum of `count` stays within the limit."""
+    while kept < len(indexes):
+        batch = indexes[kept:kept + size]
+        counts = count([messages[i] for i in batch])
+        sums = list(accumulate(counts, initial=total))
+        fits = bisect_right(sums, limit) - 1
+        kept += fits
+        total = sums[fits]
+        if fits < len(batch):
+            break
+        size *= 2
+    return kept, total
+
+
+def _fit(service, messages, indexes, tokenizer, budget, lazy, precision):
+    """
+    Count of the leading `indexes` whose messages fit the budget together
+
+    Returns:
+        tuple: (kept, tokens of the kept messages)
+    """
+    if budget < 0:
+        return 0, 0
+    size = FIRST_BATCH if lazy else max(len(indexes), 1)
+    if precision == "estimate":
+        # Messages whose UTF-8 bounds fit the budget together fit it in tokens too;
+        # their bounds stand in for their counts, and only the window after them is tokenized
+        kept, total = _extend(lambda batch: service.bound_messages(batch, tokenizer), messages, indexes, 0, 0, budget, size)
+        indexes = indexes[:kept + EXACT_WINDOW]
+        return _extend(lambda batch: service.count_messages(batch, tokenizer), messages, indexes, kept, total, budget, EXACT_WINDOW)
+    return _extend(lambda batch: service.count_messages(batch, tokenizer), messages, indexes, 0, 0, budget, size)
+
+
+def keep_tail(service, messages, tokenizer, budget, indexes=None, lazy=True, precision="exact"):
+    """
+    Keep the most recent messages that fit the budget
+
+    Args:
+        service: TokenizerService
+        messages: The message list
+        tokenizer: Tokenizer setting of the node
+        budget: Token budget
+        indexes: Positions in `messages` to consider, in order (all by default)
+        lazy: Tokenize from the end only as far as the cut point
+        precision: "estimate" to accept messages on their UTF-8 size and tokenize only those near the cut
+
+    Returns:
+        tuple: (kept positions in order, tokens of the kept messages, an upper bound with "estimate")
+    """
+    if indexes is None:
+        indexes = range(len(messages))
+    kept, total = _fit(service, messages, indexes[::-1], tokenizer, budget, lazy, precision)
+    return indexes[len(indexes) - kept:], total
+
+
+def keep_head(service, messages, tokenizer, budget, indexes=None, lazy=True, precision="exact"):
+    """Keep the earliest messages that fit the budget, see keep_tail."""
+    if indexes is None:
+        indexes = range(len(messages))
+    kept, total = _fit(service, messages, indexes, tokenizer, budget, lazy, precision)
+    return indexes[:kept], total
+
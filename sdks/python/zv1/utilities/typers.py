@@ -0,0 +1,359 @@
+import json
+import os
+
+from ..stream import StreamValue
+from .helpers import json_dumps, resolve_shared_dir
+
+_JSON_TYPE_CHECKS = {
+    "string": lambda v: isinstance(v, str),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "integer": lambda v: (isinstance(v, int) and not isinstance(v, bool)) or (isinstance(v, float) and v.is_integer()),
+    "boolean": lambda v: isinstance(v, bool),
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "null": lambda v: v is None,
+}
+
+# Equivalent of JavaScript's `typeof value === type` for the basic type names
+_BASIC_TYPE_CHECKS = {
+    "string": lambda v: isinstance(v, str),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "object": lambda v: isinstance(v, (dict, list)),
+    "function": callable,
+}
+
+
+def compile_schema(schema):
+    """
+    Compile a JSON schema into a validator function
+
+    Supports the subset of JSON Schema used by the shared types:
+    type, nullable, enum, properties, required, additionalProperties,
+    items, oneOf and anyOf.
+
+    Args:
+        schema: The JSON schema to compile
+
+    Returns:
+        callable: validator(value) -> bool
+    """
+    if not isinstance(schema, dict):
+        return lambda value: True
+
+    checks = []
+
+    schema_type = schema.get("type")
+    if schema_type is not None:
+        type_names = schema_type if isinstance(schema_type, list) else [schema_type]
+        if schema.get("nullable"):
+            type_names = [*type_names, "null"]
+        type_checks = [_JSON_TYPE_CHECKS[name] for name in type_names if name in _JSON_TYPE_CHECKS]
+        checks.append(lambda v: any(check(v) for check in type_checks))
+
+    if "enum" in schema:
+        allowed = schema["enum"]
+        checks.append(lambda v: v in allowed)
+
+    properties = {
+        name: compile_schema(sub_schema)
+        for name, sub_schema in (schema.get("properties") or {}).items()
+    }
+    required = schema.get("required") or []
+    additional = schema.get("additionalProperties", True)
+    if properties or required or additional is not True:
+        additional_check = compile_schema(additional) if isinstance(additional, dict) else None
+
+        def check_object(v):
+            if not isinstance(v, dict):
+                return True
+            if any(name not in v for name in required):
+                return False
+            for key, item in v.items():
+                property_check = properties.get(key)
+                if property_check is not None:
+                    if not property_check(item):
+                        return False
+                elif additional is False:
+                    return False
+                elif additional_check is not None and not additional_check(item):
+                    return False
+            return True
+
+        checks.append(check_object)
+
+    if "items" in schema:
+        items_check = compile_schema(schema["items"])
+        checks.append(lambda v: not isinstance(v, list) or all(items_check(item) for item in v))
+
+    if "oneOf" in schema:
+        one_of = [compile_schema(sub_schema) for sub_schema in schema["oneOf"]]
+        checks.append(lambda v: sum(1 for check in one_of if check(v)) == 1)
+
+    if "anyOf" in schema:
+        any_of = [compile_schema(sub_schema) for sub_schema in schema["anyOf"]]
+        checks.append(lambda v: any(check(v) for check in any_of))
+
+    return lambda value: all(check(value) for check in checks)
+
+
+# Compiled validators per types directory, shared by every engine in the interpreter
+_compiled_types = {}
+
+
+def load_custom_types(types_dir=None):
+    """
+    Load custom type configurations from types/<type>.json
+    Each directory is compiled once per interpreter
+
+    Returns:
+        dict: Map of type names to compiled validators
+    """
+    type_dir = os.path.abspath(types_dir or resolve_shared_dir("types"))
+    compiled = _compiled_types.get(type_dir)
+    if compiled is not None:
+        return compiled
+
+    if not os.path.isdir(type_dir):
+        raise RuntimeError("No types directory found, skipping custom type loading")
+
+    compiled = {}
+    for type_file in os.listdir(type_dir):
+        if not type_file.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(type_dir, type_file), "r", encoding="utf-8") as f:
+                compiled[type_file[:-len(".json")]] = compile_schema(json.load(f))
+        except (OSError, ValueError) as error:
+            print(error)
+
+    _compiled_types[type_dir] = compiled
+    return compiled
+
+
+def _is_numeric_string(value):
+    # Mirrors JavaScript's !isNaN(value) for strings
+    text = value.strip()
+    if text == "" or text.lstrip("+-") == "Infinity":
+        return True
+    if text.lower().lstrip("+-") in ("nan", "inf", "infinity"):
+        return False
+    try:
+        float(text)
+        return True
+    except ValueError:
+        pass
+    try:
+        int(text, 0)
+        return text[:1] not in "+-"
+    except ValueError:
+        return False
+
+
+def type_check(self, value, type_name):
+    """
+    Check if a value matches a given type
+    Handles basic types, custom types, and type unions
+
+    Args:
+        value: The value to check
+        type_name: The expected type
+
+    Returns:
+        bool: Whether the value matches the type
+    """
+    # Streams are checked once they materialize into the consuming node's inputs
+    if value is None or isinstance(value, StreamValue):
+        return True
+
+    type_name = type_name.lower().strip()
+
+    if type_name == "any":
+        return True
+
+    if " or " in type_name:
+        return any(self.type_check(value, option.strip()) for option in type_name.split(" or "))
+
+    if type_name == "number" and isinstance(value, str):
+        return _is_numeric_string(value)
+
+    if type_name == "array":
+        return isinstance(value, list)
+
+    if type_name.startswith("array of "):
+        if not isinstance(value, list):
+            return False
+        item_type = type_name[9:]
+        if item_type.endswith("s"):
+            item_type = item_type[:-1]
+        return all(self.type_check(item, item_type) for item in value)
+
+    validator = self.compiled_custom_types.get(type_name)
+    if validator is not None:
+        return validator(value)
+
+    basic_check = _BASIC_TYPE_CHECKS.get(type_name)
+    if basic_check is not None:
+        return basic_check(value)
+    return False
+
+
+def convert_import_to_node_type(self, import_def):
+    """
+    Convert an import definition into a node type definition
+
+    Args:
+        import_def: The import definition (a flow with id/nodes/links)
+
+    Returns:
+        dict: {"config": ..., "process": ...}
+    """
+    self.log_debug(f"Converting import {import_def.get('id')} to node type")
+
+    # Nested imports stay in "imports" and are loaded by the engine that runs this import
+    processed_import_def = dict(import_def)
+    processed_import_def["nodes"] = [node for node in processed_import_def["nodes"] if not node.get("debug_only")]
+
+    input_nodes = [
+        node for node in processed_import_def["nodes"]
+        if node.get("type") in ("input-chat", "input-prompt", "input-data")
+    ]
+    output_nodes = [
+        node for node in processed_import_def["nodes"]
+        if node.get("type") in ("output-chat", "output-data")
+    ]
+
+    self.log_debug(f"Found {len(input_nodes)} input nodes and {len(output_nodes)} output nodes")
+
+    def input_port(node):
+        settings = node.get("settings") or {}
+        if node["type"] == "input-data":
+            return {
+                "name": settings.get("key") or "data",
+                "display_name": f"Data: {settings.get('key') or 'value'}",
+                "type": settings.get("type") or "any",
+                "required": True,
+                "is_data_input": True,
+                "description": settings.get("description") or "Imported data input",
+            }
+        if node["type"] == "input-chat":
+            return {
+                "name": settings.get("key") or "chat",
+                "display_name": "Chat",
+                "type": "array of messages",
+                "required": True,
+                "is_chat_input": True,
+                "description": "Chat messages to process",
+            }
+        return {
+            "name": settings.get("key") or "prompt",
+            "display_name": "Prompt",
+            "type": "string",
+            "required": True,
+            "is_prompt_input": True,
+            "description": "Prompt input",
+        }
+
+    def output_port(node):
+        settings = node.get("settings") or {}
+        if node["type"] == "output-data":
+            return {
+                "name": settings.get("key") or "data",
+                "display_name": f"Data: {settings.get('key') or 'value'}",
+                "type": settings.get("type") or "any",
+                "description": settings.get("description") or "Imported data output",
+            }
+        return {
+            "name": settings.get("key") or "chat",
+            "display_name": "Response",
+            "type": "message",
+            "description": "Chat response output",
+        }
+
+    config = {
+        "display_name": processed_import_def.get("display_name") or "Imported Flow",
+        "description": processed_import_def.get("description") or "An imported flow",
+        "category": "imported",
+        "is_constant": True,  # All imports are potentially constant
+        "is_plugin": True,    # All imports are plugin-capable
+        "is_import": True,
+        "accepts_plugins": any(node.get("type") == "input-plugins" for node in processed_import_def["nodes"]),
+        # Store import metadata for reference
+        "importId": processed_import_def.get("importId"),
+        "requestedSnapshot": processed_import_def.get("requestedSnapshot"),
+        "inputs": [input_port(node) for node in input_nodes],
+        "outputs": [output_port(node) for node in output_nodes],
+        # Store the full import definition for use during processing
+        "importDefinition": processed_import_def,
+    }
+
+    async def process(inputs, settings, config, nodeConfig):
+        self.log_debug("Processing import node with inputs:", inputs)
+
+        record = self.timeline.start(processed_import_def.get("id"), "import", inputs, settings)
+
+        import_config = dict(config)
+
+        # If this import accepts plugins, create tool runners that execute in the parent context
+        tools = {}
+        if nodeConfig.get("accepts_plugins"):
+            self.log_debug(f"Import [{nodeConfig.get('id')}] accepts plugins, creating tool runners for parent context execution")
+            current_node = self.graph.nodes.get(nodeConfig.get("id"))
+            if current_node is not None:
+                for plugin_node_id in self.graph.plugin_sources.get(current_node["id"], ()):
+                    plugin_node = self.graph.nodes.get(plugin_node_id)
+                    if plugin_node is None:
+                        continue
+                    schema = self.generate_tool_schema(plugin_node)
+
+                    async def tool_runner(args, plugin_node=plugin_node):
+                        return await self.execute_plugin_in_parent_context(plugin_node, args)
+
+                    tools[schema["name"]] = {"schema": schema, "process": tool_runner}
+
+        if tools:
+            import_config["tools"] = tools
+
+        import_engine = await type(self).create(processed_import_def, import_config)
+
+        # Map input port names to the data keys that the imported flow expects
+        input_data = {}
+        for input_node in input_nodes:
+            default_key = {"input-data": "data", "input-chat": "chat"}.get(input_node["type"], "prompt")
+            data_key = (input_node.get("settings") or {}).get("key") or default_key
+            if data_key in inputs:
+                input_data[data_key] = inputs[data_key]
+
+        self.log_debug("Final input data for imported flow:", input_data)
+
+        result = await import_engine.run(input_data)
+        await import_engine.cleanup()
+
+        self.timeline.set_extra(record, "terminal_nodes", list(result.get("terminal_nodes") or []))
+        self.timeline.finish(record, "success", result.get("outputs") or {})
+
+        outputs = dict(result.get("outputs") or {})
+
+        # Handle terminal nodes from the imported flow
+        terminal_nodes = result.get("terminal_nodes")
+        if isinstance(terminal_nodes, list):
+            # Map terminal node ids to the output keys of the output nodes they feed
+            terminal_output_mapping = {}
+            for output_node in output_nodes:
+                default_key = "data" if output_node["type"] == "output-data" else "chat"
+                output_key = (output_node.get("settings") or {}).get("key") or default_key
+                for link in processed_import_def.get("links", []):
+                    if link["to"]["node_id"] == output_node["id"]:
+                        terminal_output_mapping.setdefault(link["from"]["node_id"], {})[link["from"]["port_name"]] = output_key
+
+            for terminal_node in terminal_nodes:
+                node_mapping = terminal_output_mapping.get(terminal_node["node_id"], {})
+                for output_name, output_value in (terminal_node.get("outputs") or {}).items():
+                    mapped_key = node_mapping.get(output_name, output_name)
+                    full_key = f"imported-{processed_import_def.get('id')}-{terminal_node['node_id']}_{mapped_key}"
+                    outputs[full_key] = output_value
+
+        self.log_debug("Import node execution result:", json_dumps(outputs))
+        return outputs
+
+    return {"config": config, "process": process}
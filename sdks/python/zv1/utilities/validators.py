@@ -0,0 +1,62 @@
+from .helpers import json_dumps
+
+
+def validate_keys(self):
+    """
+    Validate keys for all nodes that specify `needs_key_from`
+    """
+    self.log_debug("Validating required API keys for nodes...")
+
+    for node_type, node_definition in self.nodes.items():
+        needs_key_from = node_definition["config"].get("needs_key_from")
+        if not needs_key_from:
+            continue
+
+        required_keys = needs_key_from if isinstance(needs_key_from, list) else [needs_key_from]
+        missing_keys = [key for key in required_keys if key not in self.keys]
+
+        if missing_keys:
+            raise ValueError(
+                f"Node type '{node_type}' requires the following missing keys: {', '.join(missing_keys)}"
+            )
+
+    self.log_debug("Key validation completed successfully")
+
+
+def validate_flow(self, plan):
+    """
+    Ensure this flow can run
+
+    Args:
+        plan: The compiled ExecutionPlan for the flow
+    """
+    input_nodes = plan.input_nodes
+    entry_nodes = plan.entry_nodes
+
+    self.log_debug(f"Found {len(input_nodes)} input nodes" + (": " + ", ".join(input_nodes) if input_nodes else ""))
+    self.log_debug(f"Found {len(entry_nodes)} entry nodes" + (": " + ", ".join(entry_nodes) if entry_nodes else ""))
+
+    if not input_nodes and not entry_nodes:
+        raise ValueError("Flow must have at least one input node or constant node without inputs to start execution")
+
+
+def validate_inputs(self, node_config, inputs):
+    """
+    Validate inputs against the node's configuration
+
+    Args:
+        node_config: The node's configuration
+        inputs: The inputs to validate
+    """
+    for input_def in node_config.get("inputs", []):
+        name = input_def["name"]
+        value = inputs.get(name)
+
+        if input_def.get("required") and value is None:
+            raise ValueError(f"{node_config.get('display_name')} is missing required input: {name}")
+
+        if name in inputs and not self.type_check(value, input_def.get("type") or "any"):
+            raise TypeError(
+                f"{node_config.get('display_name')} has a type mismatch for input '{name}': "
+                f"Expected {input_def.get('type')}, got {json_dumps(value)}"
+            )